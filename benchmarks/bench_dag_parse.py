@@ -0,0 +1,61 @@
+"""
+Benchmark: tempo de parse de cada arquivo de DAG (como no dag-processor) e
+módulos carregados pelo parse, em processo novo a cada repetição.
+
+O custo base (import do Airflow) é pago antes da medição: o número reportado é
+o que cada arquivo acrescenta a cada loop de parse.
+
+Uso:
+    python -m benchmarks.bench_dag_parse --repeat 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import PROJECT_ROOT, report
+
+DAG_FILES = ["dag_extracao_brewery.py", "dag_transformation_silver.py", "dag_transformation_gold.py",
+             "dag_fused_brewery.py", "dag_backfill_brewery.py"]
+HEAVY_MODULES = ["pandas", "pyarrow", "numpy", "requests"]
+
+_SCRIPT = """
+import importlib.util, json, sys, time
+sys.path.insert(0, {dags_dir!r})
+import airflow.decorators, airflow.datasets
+before = set(sys.modules)
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("dag_under_test", {path!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(json.dumps({{"parse_s": time.perf_counter() - t0, "new_modules": len(set(sys.modules) - before),
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_once(dag_file: str) -> dict:
+    dags_dir = str(PROJECT_ROOT / "dags")
+    script = _SCRIPT.format(dags_dir=dags_dir, path=f"{dags_dir}/{dag_file}", heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for dag_file in DAG_FILES:
+        runs = [parse_once(dag_file) for _ in range(args.repeat)]
+        times = [r["parse_s"] for r in runs]
+        results.append({
+            "dag_file": dag_file, "repeat": args.repeat,
+            "parse_median_s": statistics.median(times), "parse_max_s": max(times),
+            "new_modules": runs[-1]["new_modules"], "heavy_modules": runs[-1]["heavy"],
+        })
+    report("dag_parse", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: extração (meta + páginas via `get_api_data` + `save_api_data`)
+contra o servidor mock local (`benchmarks.mock_api`), em cenários de latência,
+erros e rate limit.
+
+Reproduz o laço de `get_api_task` (páginas sequenciais). Uma página que falha é
+refeita até `--retries` vezes; na DAG a falha derruba a task inteira, que o
+Airflow refaz do início após `retry_delay`, então `failed_attempts` também
+indica o custo de retrabalho em produção.
+
+Uso:
+    python -m benchmarks.bench_extract --scale 1
+    python -m benchmarks.bench_extract --scale 1 --latency lognormal:40:250 --error-rate 0.01 --rate-limit-rate 0.02
+"""
+import argparse
+import logging
+import math
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import report
+from benchmarks.mock_api import MockConfig, start_mock_server
+
+SCENARIOS = {
+    "local": {"latency": "none"},
+    "wan": {"latency": "lognormal:40:250"},
+    "wan_flaky": {"latency": "lognormal:40:250", "error_rate": 0.01, "rate_limit_rate": 0.02},
+}
+
+
+def run_extract(config: MockConfig, per_page: int, retries: int) -> dict:
+    from dags.utils.get_api_data import API_URL_ENV, get_api_data, api_base_url
+    from dags.utils.save_api_data import save_api_data
+
+    server, url = start_mock_server(config)
+    previous = os.environ.get(API_URL_ENV)
+    os.environ[API_URL_ENV] = url
+    latencies, failed, rows = [], 0, 0
+
+    def fetch(link: str):
+        nonlocal failed
+        for attempt in range(retries + 1):
+            t0 = time.perf_counter()
+            try:
+                return get_api_data(link)
+            except ValueError:
+                failed += 1
+                if attempt == retries:
+                    raise
+            finally:
+                latencies.append(time.perf_counter() - t0)
+
+    try:
+        with tempfile.TemporaryDirectory() as raw:
+            t0 = time.perf_counter()
+            total_pages = math.ceil(fetch(f"{api_base_url()}/meta")["total"] / per_page)
+            for page in range(1, total_pages + 1):
+                data = fetch(f"{api_base_url()}?page={page}&per_page={per_page}")
+                save_api_data(data, raw, page)
+                rows += len(data)
+            wall = time.perf_counter() - t0
+    finally:
+        server.shutdown()
+        server.server_close()
+        if previous is None:
+            os.environ.pop(API_URL_ENV, None)
+        else:
+            os.environ[API_URL_ENV] = previous
+
+    lat_ms = sorted(x * 1000 for x in latencies)
+    return {
+        "pages": total_pages, "rows": rows, "wall_s": wall,
+        "rows_per_s": rows / wall if wall else None,
+        "requests": len(latencies), "failed_attempts": failed,
+        "p50_ms": statistics.median(lat_ms),
+        "p99_ms": lat_ms[min(len(lat_ms) - 1, int(0.99 * len(lat_ms)))],
+        "server": dict(config.stats),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--per-page", type=int, default=200)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--latency", help="cenário único (senão roda local, wan e wan_flaky)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.getLogger("airflow").setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.CRITICAL)
+    if args.latency:
+        scenarios = {"custom": {"latency": args.latency, "error_rate": args.error_rate,
+                                "rate_limit_rate": args.rate_limit_rate}}
+    else:
+        scenarios = SCENARIOS
+
+    results = []
+    for name, params in scenarios.items():
+        # retry_after=0: o benchmark mede a vazão do laço, não a espera do Retry-After
+        config = MockConfig(scale=args.scale, retry_after=0, **params)
+        results.append({"scenario": name, "scale": args.scale, **params,
+                        **run_extract(config, args.per_page, args.retries)})
+    report("extract", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: consultas por raio e k vizinhos no `GeoGridIndex` (buckets de grade,
+memory-map) vs varredura completa com haversine sobre todos os pontos.
+
+Uso:
+    python -m benchmarks.bench_geo_index --points 500000 --queries 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import report
+
+
+def _latencies(fn, queries) -> dict:
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(*q)
+        lat.append(time.perf_counter() - t0)
+    lat.sort()
+    return {"queries": len(lat), "p50_ms": lat[len(lat) // 2] * 1000,
+            "p99_ms": lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000}
+
+
+def main() -> None:
+    from dags.utils.geo import GeoGridIndex, haversine_km
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--radius-km", type=float, default=10.0)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--cell-deg", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # Pontos concentrados em "cidades" (como breweries reais) + ruído uniforme
+    centers = np.column_stack([rng.uniform(-50, 60, 500), rng.uniform(-125, 150, 500)])
+    pick = rng.integers(0, len(centers), args.points)
+    lat = np.clip(centers[pick, 0] + rng.normal(0, 0.2, args.points), -90, 90)
+    lon = centers[pick, 1] + rng.normal(0, 0.2, args.points)
+    ids = np.array([f"{i:08d}" for i in range(args.points)])
+    queries = [tuple(centers[i]) for i in rng.integers(0, len(centers), args.queries)]
+
+    def brute_within(q_lat, q_lon):
+        d = haversine_km(q_lat, q_lon, lat, lon)
+        return ids[d <= args.radius_km]
+
+    def brute_knn(q_lat, q_lon):
+        d = haversine_km(q_lat, q_lon, lat, lon)
+        return ids[np.argpartition(d, args.k)[:args.k]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        GeoGridIndex.build(lat, lon, ids, args.cell_deg).save(os.path.join(tmp, "index"))
+        build_s = time.perf_counter() - t0
+        index = GeoGridIndex.load(os.path.join(tmp, "index"))
+
+        n_brute = min(len(queries), 100)
+        results = [
+            {"engine": "brute_force", "op": "within", **_latencies(brute_within, queries[:n_brute])},
+            {"engine": "brute_force", "op": "knn", **_latencies(brute_knn, queries[:n_brute])},
+            {"engine": "grid_index_mmap", "op": "within", "build_s": build_s,
+             **_latencies(lambda a, b: index.within(a, b, args.radius_km), queries)},
+            {"engine": "grid_index_mmap", "op": "knn",
+             **_latencies(lambda a, b: index.nearest(a, b, args.k), queries)},
+        ]
+        for r in results:
+            r.update(points=args.points, radius_km=args.radius_km, k=args.k)
+
+    report("geo_index", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: agregação gold anterior (to_pandas + groupby + Series.add por lote)
+vs `gold_pipeline` atual (projeção das chaves + group_by Arrow + acumulador hash),
+serial e em modo paralelo por partição country/state.
+
+Também confere que as duas saídas têm o mesmo conteúdo.
+
+Uso:
+    python -m benchmarks.bench_gold_aggregation --rows 500000 --parts 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import make_rows, write_dims, report
+
+KEYS = ["country", "state", "city", "brewery_type"]
+
+
+def _legacy_gold(silver_path: str, batch_size: int):
+    """Reprodução do laço anterior do gold_pipeline (referência de comparação)."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(silver_path, format="parquet", partitioning="hive")
+    agg_series = None
+    for batch in dataset.scanner(batch_size=batch_size).to_batches():
+        table = pa.Table.from_batches([batch])
+        if table.num_rows == 0:
+            continue
+        gb = table.to_pandas().groupby(KEYS, dropna=False).size()
+        agg_series = gb if agg_series is None else agg_series.add(gb, fill_value=0)
+    df = agg_series.astype("int64").reset_index().rename(columns={0: "count"})
+    return df.sort_values("count", ascending=False, ignore_index=True)
+
+
+def build_silver(tmp: str, n_rows: int, parts: int) -> str:
+    import pyarrow as pa
+    from dags.utils.normalization import normalize_brewery_table
+    from dags.utils.silver_pipeline import silver_pipeline_arrow
+
+    rows = make_rows(n_rows)
+    dim = os.path.join(tmp, "dim")
+    write_dims(rows, dim)
+    fact = os.path.join(tmp, "fact")
+    step = max(1, n_rows // parts)
+    for p, i in enumerate(range(0, n_rows, step)):
+        table = normalize_brewery_table(pa.Table.from_pylist(rows[i:i + step]))
+        silver_pipeline_arrow(table, fact, dim, "2025-09-27", part=p)
+    return os.path.join(fact, "batch=2025-09-27")
+
+
+def main() -> None:
+    import pandas as pd
+    from dags.utils.gold_pipeline import gold_pipeline
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--parts", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=8_192)
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, 8],
+                        help="nº de workers do modo paralelo (threads)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        silver = build_silver(tmp, args.rows, args.parts)
+
+        t0 = time.perf_counter()
+        legacy = _legacy_gold(silver, args.batch_size)
+        legacy_s = time.perf_counter() - t0
+
+        gold = os.path.join(tmp, "gold")
+        t0 = time.perf_counter()
+        gold_pipeline(silver, gold, batch_size=args.batch_size)
+        arrow_s = time.perf_counter() - t0
+
+        current = pd.read_parquet(os.path.join(gold, "total.parquet"))
+        a = legacy.sort_values(KEYS, ignore_index=True)
+        b = current.sort_values(KEYS, ignore_index=True)
+        identical = a.astype(str).equals(b.astype(str))
+
+        results = [
+            {"engine": "pandas_groupby_add", "rows": args.rows, "wall_s": legacy_s, "groups": len(legacy)},
+            {"engine": "arrow_group_by_hash", "rows": args.rows, "wall_s": arrow_s, "groups": len(current),
+             "speedup": legacy_s / arrow_s, "identical": identical},
+        ]
+        for workers in args.workers:
+            out = os.path.join(tmp, f"gold_w{workers}")
+            t0 = time.perf_counter()
+            gold_pipeline(silver, out, batch_size=args.batch_size, workers=workers)
+            wall = time.perf_counter() - t0
+            par = pd.read_parquet(os.path.join(out, "total.parquet"))
+            results.append({"engine": "arrow_parallel", "workers": workers, "rows": args.rows, "wall_s": wall,
+                            "speedup": legacy_s / wall, "identical": par.equals(current)})
+
+    report("gold_aggregation", results)
+
+
+if __name__ == "__main__":
+    main()
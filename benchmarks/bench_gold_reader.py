@@ -0,0 +1,141 @@
+"""
+Benchmark: latência (p50/p99) de consultas à Gold sob carga concorrente local.
+
+Compara o acesso atual dos consumidores (pandas.read_parquet do total.parquet a
+cada requisição) com o `GoldReader` (índices hash + cache LRU), chamado direto
+e via o endpoint HTTP local.
+
+Uso:
+    python -m benchmarks.bench_gold_reader --rows 200000 --requests 2000 --concurrency 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from benchmarks.common import make_rows, report
+
+KEYS = ["country", "state", "city", "brewery_type"]
+
+
+def build_gold(tmp: str, n_rows: int) -> tuple[str, list[dict]]:
+    """Gera um batch gold (total + rollups) e a lista de consultas possíveis."""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from dags.utils.aggregation import rollup_table
+
+    df = pd.DataFrame(make_rows(n_rows))[KEYS]
+    leaf = df.groupby(KEYS, dropna=False).size().rename("count").reset_index()
+    batch_dir = os.path.join(tmp, "gold", "batch=2025-09-27")
+    os.makedirs(batch_dir)
+    table = pa.Table.from_pandas(leaf, preserve_index=False)
+    pq.write_table(table, os.path.join(batch_dir, "total.parquet"))
+    pq.write_table(rollup_table(table), os.path.join(batch_dir, "rollups.parquet"))
+
+    queries = []
+    for country, state, city in leaf[["country", "state", "city"]].drop_duplicates().itertuples(index=False):
+        queries.append({"op": "count", "country": country})
+        queries.append({"op": "count", "country": country, "state": state})
+        queries.append({"op": "count", "country": country, "state": state, "city": city})
+        queries.append({"op": "top", "n": 10, "by": "city", "country": country, "state": state})
+    return os.path.join(tmp, "gold"), queries
+
+
+def _pandas_query(total_path: str, q: dict):
+    import pandas as pd
+
+    df = pd.read_parquet(total_path)
+    for k in ("country", "state", "city"):
+        if k in q:
+            df = df[df[k] == q[k]]
+    if q["op"] == "count":
+        return int(df["count"].sum())
+    by = KEYS[:KEYS.index(q["by"]) + 1]
+    return df.groupby(by)["count"].sum().nlargest(q["n"])
+
+
+def _reader_query(reader, q: dict):
+    q = dict(q)
+    op = q.pop("op")
+    return reader.count(**q) if op == "count" else reader.top(**q)
+
+
+def _http_query(base: str, q: dict):
+    q = dict(q)
+    op = q.pop("op")
+    with urllib.request.urlopen(f"{base}/{op}?{urlencode(q)}") as r:
+        return r.read()
+
+
+def _run_load(fn, workload: list[dict], concurrency: int) -> dict:
+    latencies = []
+
+    def timed(q):
+        t0 = time.perf_counter()
+        fn(q)
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(timed, workload))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "throughput_rps": len(latencies) / wall,
+    }
+
+
+def main() -> None:
+    from dags.utils.gold_reader import GoldReader, make_server
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--baseline-requests", type=int, default=200,
+                        help="requisições do baseline pandas (mais lento)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gold_root, queries = build_gold(tmp, args.rows)
+        rnd = random.Random(7)
+        # Distribuição enviesada (consultas populares se repetem, como em dashboards)
+        hot = queries[: max(1, len(queries) // 10)]
+        workload = [rnd.choice(hot) if rnd.random() < 0.8 else rnd.choice(queries) for _ in range(args.requests)]
+
+        total_path = os.path.join(gold_root, "batch=2025-09-27", "total.parquet")
+        results = [{"engine": "pandas_read_per_request",
+                    **_run_load(lambda q: _pandas_query(total_path, q), workload[:args.baseline_requests],
+                                args.concurrency)}]
+
+        reader = GoldReader(gold_root)
+        reader.batch  # carga inicial fora da medição
+        results.append({"engine": "gold_reader_api", **_run_load(lambda q: _reader_query(reader, q), workload,
+                                                                args.concurrency),
+                        "cache_hits": reader.hits, "cache_misses": reader.misses})
+
+        server = make_server(GoldReader(gold_root), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            results.append({"engine": "gold_reader_http",
+                            **_run_load(lambda q: _http_query(base, q), workload, args.concurrency)})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    report("gold_reader", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: layout da fato silver com defaults do pyarrow vs `DEFAULT_WRITE_PROFILE`
+(zstd, dictionary nas chaves, page index, ordenação por city/brewery_type/name).
+
+Reporta bytes em disco, nº de arquivos e tempo de scan (completo, projeção de
+chaves e filtro seletivo por city/brewery_type).
+
+Uso:
+    python -m benchmarks.bench_parquet_profile --rows 500000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import make_rows, write_dims, report
+
+
+def _dir_stats(path: str) -> tuple[int, int]:
+    n_files, n_bytes = 0, 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            if f.endswith(".parquet"):
+                n_files += 1
+                n_bytes += os.path.getsize(os.path.join(root, f))
+    return n_files, n_bytes
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from dags.utils.normalization import normalize_brewery_table
+    from dags.utils.parquet_profile import ParquetWriteProfile, DEFAULT_WRITE_PROFILE
+    from dags.utils.silver_pipeline import silver_pipeline_arrow
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    table = normalize_brewery_table(pa.Table.from_pylist(rows))
+    profiles = {"pyarrow_defaults": ParquetWriteProfile.pyarrow_defaults(), "tuned": DEFAULT_WRITE_PROFILE}
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        dim = os.path.join(tmp, "dim")
+        write_dims(rows, dim)
+        for name, profile in profiles.items():
+            fact = os.path.join(tmp, name)
+            t0 = time.perf_counter()
+            silver_pipeline_arrow(table, fact, dim, "2025-09-27", part=0, profile=profile)
+            write_s = time.perf_counter() - t0
+
+            dataset = ds.dataset(fact, format="parquet", partitioning="hive")
+            sample_city = table["city"][0].as_py().lower().replace(" ", "_")
+            selective = (ds.field("city") == sample_city) & (ds.field("brewery_type") == "micro")
+            n_files, n_bytes = _dir_stats(fact)
+            results.append({
+                "profile": name,
+                "rows": table.num_rows,
+                "files": n_files,
+                "bytes": n_bytes,
+                "write_s": write_s,
+                "scan_full_s": _best_of(lambda: dataset.to_table()),
+                "scan_keys_s": _best_of(lambda: dataset.to_table(
+                    columns=["country", "state", "city", "brewery_type"])),
+                "scan_filter_s": _best_of(lambda: dataset.to_table(filter=selective)),
+            })
+
+    base = results[0]
+    for r in results[1:]:
+        r["bytes_delta_pct"] = 100.0 * (r["bytes"] - base["bytes"]) / base["bytes"]
+        r["scan_filter_delta_pct"] = 100.0 * (r["scan_filter_s"] - base["scan_filter_s"]) / base["scan_filter_s"]
+    report("parquet_profile", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Suite de escala: executa cada etapa do pipeline (e a cadeia completa) sobre
+dados sintéticos (`benchmarks.synthetic`) em vários fatores de escala e registra
+linhas/s, tempo de parede e pico de RSS, cada etapa em processo isolado.
+
+Etapas (espelham as tasks das DAGs):
+    extract           get_api_task: parse do JSON da página + save_api_data
+    update_dimensions update_dim das 4 dimensões, lotes de 10 arquivos (leitura antecipada)
+    silver            read_raw_table (antecipada) + normalize_brewery_table + silver_pipeline_arrow
+    remove_duplicates remove_duplicates_batch
+    gold              gold_pipeline
+    full_chain        todas acima em sequência, no mesmo processo
+    fused_chain       extract + fused_pipeline (modo OPENBREWERYDB_EXECUTION_MODE=fused)
+
+A saída é JSON lines (stdout e, com --output, anexada ao arquivo junto com
+metadados do run). Com --baseline, compara cada (etapa, escala) com um run
+anterior e imprime a variação.
+
+Uso:
+    python -m benchmarks.bench_pipeline_scale --scales 1 10 --output bench_results.jsonl
+    python -m benchmarks.bench_pipeline_scale --scales 1 10 --baseline bench_results.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from glob import glob
+
+from benchmarks.common import PROJECT_ROOT, report, run_isolated
+
+STAGES = ["extract", "update_dimensions", "silver", "remove_duplicates", "gold"]
+FILES_PER_BATCH = 10
+
+
+def _paths(root: str) -> dict:
+    return {
+        "raw": os.path.join(root, "raw"),
+        "dim": os.path.join(root, "silver", "dim"),
+        "fact": os.path.join(root, "silver", "fact"),
+        "gold": os.path.join(root, "gold"),
+    }
+
+
+def _raw_files(root: str, day: str) -> list[str]:
+    year, month, dd = day.split("-")
+    return sorted(glob(os.path.join(_paths(root)["raw"], f"year={year}", f"month={month}", f"day={dd}", "*.json")))
+
+
+def stage_extract(root: str, day: str, scale: float, seed: int) -> dict:
+    from benchmarks.synthetic import iter_pages
+    from dags.utils.save_api_data import save_api_data
+
+    rows = 0
+    for page, records in iter_pages(scale, seed=seed):
+        # o custo de rede fica de fora; mede decode do payload + gravação na raw
+        payload = json.loads(json.dumps(records, ensure_ascii=False))
+        save_api_data(payload, _paths(root)["raw"], page)
+        rows += len(payload)
+    return {"rows": rows}
+
+
+def stage_update_dimensions(root: str, day: str) -> dict:
+    from contextlib import closing
+    from dags.utils.normalization import normalize_name
+    from dags.utils.prefetch import prefetch
+    from dags.utils.raw_reader import read_raw_frame
+    from dags.utils.update_dim import update_dim
+
+    dim = _paths(root)["dim"]
+    os.makedirs(dim, exist_ok=True)
+    # Mesmo laço da task: leitura do lote seguinte sobreposta ao update_dim do atual
+    files, rows = _raw_files(root, day), 0
+    batches = [files[i:i + FILES_PER_BATCH] for i in range(0, len(files), FILES_PER_BATCH)]
+    with closing(prefetch(batches, read_raw_frame)) as loaded:
+        for _, df in loaded:
+            rows += len(df)
+            for col in ["country", "state", "city", "brewery_type"]:
+                # pandas >= 3 lê strings nulas como NaN (float): não passam por normalize_name
+                df[f"{col}_norm"] = df[col].map(normalize_name, na_action="ignore")
+                update_dim(df[[col, f"{col}_norm"]].dropna(), col, f"{col}_norm",
+                           os.path.join(dim, f"dim_{col}.parquet"))
+    return {"rows": rows}
+
+
+def stage_silver(root: str, day: str) -> dict:
+    from contextlib import closing
+    from dags.utils.normalization import normalize_brewery_table
+    from dags.utils.prefetch import prefetch
+    from dags.utils.raw_reader import read_raw_table
+    from dags.utils.silver_pipeline import clear_batch, silver_pipeline_arrow
+
+    p = _paths(root)
+    clear_batch(p["fact"], day)
+    files, rows = _raw_files(root, day), 0
+    offsets = range(0, len(files), FILES_PER_BATCH)
+    with closing(prefetch(offsets, lambda i: read_raw_table(files[i:i + FILES_PER_BATCH]))) as loaded:
+        for i, table in loaded:
+            rows += table.num_rows
+            silver_pipeline_arrow(normalize_brewery_table(table), p["fact"], p["dim"], day, part=i)
+    return {"rows": rows}
+
+
+def stage_remove_duplicates(root: str, day: str) -> dict:
+    import pyarrow.dataset as ds
+    from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+
+    batch = os.path.join(_paths(root)["fact"], f"batch={day}")
+    rows = ds.dataset(batch, format="parquet", partitioning="hive").count_rows()
+    remove_duplicates_batch(day, _paths(root)["fact"])
+    return {"rows": rows}
+
+
+def stage_gold(root: str, day: str) -> dict:
+    import pyarrow.dataset as ds
+    from dags.utils.gold_pipeline import gold_pipeline
+
+    p = _paths(root)
+    silver = os.path.join(p["fact"], f"batch={day}")
+    rows = ds.dataset(silver, format="parquet", partitioning="hive").count_rows()
+    gold_pipeline(silver, os.path.join(p["gold"], f"batch={day}"))
+    return {"rows": rows}
+
+
+def stage_full_chain(root: str, day: str, scale: float, seed: int) -> dict:
+    rows = stage_extract(root, day, scale, seed)["rows"]
+    stage_update_dimensions(root, day)
+    stage_silver(root, day)
+    stage_remove_duplicates(root, day)
+    stage_gold(root, day)
+    return {"rows": rows}
+
+
+def stage_fused_chain(root: str, day: str, scale: float, seed: int) -> dict:
+    from dags.utils.fused_pipeline import fused_pipeline
+
+    p = _paths(root)
+    rows = stage_extract(root, day, scale, seed)["rows"]
+    fused_pipeline(_raw_files(root, day), day, p["fact"], p["dim"], os.path.join(p["gold"], f"batch={day}"),
+                   batch_size=FILES_PER_BATCH)
+    return {"rows": rows}
+
+
+def _quiet(fn, *args) -> dict:
+    """Executa a etapa com os logs do Airflow em WARNING (não medem nada e poluem a saída)."""
+    import logging
+    logging.getLogger("airflow").setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    return fn(*args)
+
+
+def _run_meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {"run_at": datetime.now(timezone.utc).isoformat(), "commit": commit,
+            "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def run_scale(scale: float, seed: int, stages: list[str]) -> list[dict]:
+    day = datetime.today().strftime("%Y-%m-%d")  # save_api_data grava na partição do dia
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        # as etapas dependem das anteriores: as não selecionadas rodam só para preparar a entrada
+        last = max(STAGES.index(s) for s in stages)
+        for stage in STAGES[:last + 1]:
+            args = (root, day, scale, seed) if stage == "extract" else (root, day)
+            fn = globals()[f"stage_{stage}"]
+            if stage not in stages:
+                _quiet(fn, *args)
+                continue
+            r = run_isolated(_quiet, fn, *args)
+            results.append({"stage": stage, "scale": scale, **r})
+    for chain in ("full_chain", "fused_chain"):
+        with tempfile.TemporaryDirectory() as root:
+            r = run_isolated(_quiet, globals()[f"stage_{chain}"], root, day, scale, seed)
+            results.append({"stage": chain, "scale": scale, **r})
+    for r in results:
+        r["rows_per_s"] = r["rows"] / r["wall_s"] if r["wall_s"] else None
+    return results
+
+
+def compare(results: list[dict], baseline_path: str) -> list[dict]:
+    """Variação de wall_s e peak_rss_kb vs. o último registro de cada (etapa, escala) no baseline."""
+    base = {}
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        for line in f:
+            r = json.loads(line)
+            base[(r["stage"], float(r["scale"]))] = r
+    out = []
+    for r in results:
+        b = base.get((r["stage"], float(r["scale"])))
+        if b is None:
+            continue
+        out.append({
+            "stage": r["stage"], "scale": r["scale"],
+            "wall_s": r["wall_s"], "baseline_wall_s": b["wall_s"],
+            "wall_change_pct": 100 * (r["wall_s"] / b["wall_s"] - 1),
+            "peak_rss_change_pct": 100 * (r["peak_rss_kb"] / b["peak_rss_kb"] - 1),
+        })
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="anexa os resultados (JSON lines) a este arquivo")
+    parser.add_argument("--baseline", help="JSON lines de um run anterior para comparação")
+    args = parser.parse_args()
+
+    meta = _run_meta()
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(scale, args.seed, args.stages))
+    results = [{**r, **meta} for r in results]
+    report("pipeline_scale", results)
+
+    if args.baseline:
+        report("pipeline_scale_compare", compare(results, args.baseline))
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps({"benchmark": "pipeline_scale", **r}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: busca por nome no `SearchIndex` (termos/trigramas memory-mapped) vs
+o acesso atual (ler a silver inteira com pandas e filtrar com `str.contains`).
+
+Uso:
+    python -m benchmarks.bench_search_index --rows 200000 --queries 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import report
+from benchmarks.bench_gold_aggregation import build_silver
+
+
+def _latencies(fn, queries) -> dict:
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        lat.append(time.perf_counter() - t0)
+    lat.sort()
+    return {"queries": len(lat), "p50_ms": lat[len(lat) // 2] * 1000,
+            "p99_ms": lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000}
+
+
+def main() -> None:
+    import pandas as pd
+    from dags.utils.search_index import SearchIndex, build_search_index
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--parts", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(3)
+    # make_rows gera nomes "Brewery <n>" e cidades "City <n>"
+    queries = [f"brewery {rnd.randrange(args.rows)}" for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        silver = build_silver(tmp, args.rows, args.parts)
+        index_root = os.path.join(tmp, "search")
+
+        t0 = time.perf_counter()
+        build_search_index(silver, index_root)
+        build_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        rebuild = build_search_index(silver, index_root)
+        noop_s = time.perf_counter() - t0
+
+        idx = SearchIndex(index_root)
+
+        def pandas_scan(q):
+            df = pd.read_parquet(silver, columns=["id", "name", "country", "state"])
+            return df[df["name"].str.lower().str.contains(q)]
+
+        n_scan = min(len(queries), 20)
+        results = [
+            {"engine": "pandas_scan_contains", "rows": args.rows, **_latencies(pandas_scan, queries[:n_scan])},
+            {"engine": "search_index_terms", "rows": args.rows, "build_s": build_s,
+             "incremental_noop_s": noop_s, "reused": rebuild["reused"],
+             **_latencies(lambda q: idx.search(q, limit=20), queries)},
+            {"engine": "search_index_trigram", "rows": args.rows,
+             **_latencies(lambda q: idx.substring(q.split()[1], limit=20), queries)},
+        ]
+
+    report("search_index", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: silver pandas (`normalize_brewery_df` + `silver_pipeline`) vs
+Arrow-native (`read_raw_table` + `normalize_brewery_table` + `silver_pipeline_arrow`).
+
+Uso:
+    python -m benchmarks.bench_silver_engines --rows 200000 --files 10
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.common import make_rows, write_dims, run_isolated, report
+
+
+def _run_pandas(files: list[str], fact: str, dim: str) -> dict:
+    import pandas as pd
+    from dags.utils.normalization import normalize_brewery_df
+    from dags.utils.silver_pipeline import silver_pipeline
+
+    df = pd.concat([pd.read_json(f) for f in files], ignore_index=True)
+    silver_pipeline(normalize_brewery_df(df), fact, dim, "2025-09-27", part=0)
+    return {"rows": len(df)}
+
+
+def _run_arrow(files: list[str], fact: str, dim: str) -> dict:
+    import pyarrow as pa
+    from dags.utils.normalization import normalize_brewery_table
+    from dags.utils.raw_reader import read_raw_table
+    from dags.utils.silver_pipeline import silver_pipeline_arrow
+
+    table = read_raw_table(files)
+    silver_pipeline_arrow(normalize_brewery_table(table), fact, dim, "2025-09-27", part=0)
+    return {"rows": table.num_rows, "arrow_pool_peak_bytes": pa.default_memory_pool().max_memory()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--files", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = make_rows(args.rows)
+        raw = os.path.join(tmp, "raw")
+        os.makedirs(raw)
+        per_file = max(1, len(rows) // args.files)
+        files = []
+        for i in range(0, len(rows), per_file):
+            path = os.path.join(raw, f"breweries_page_{i // per_file:03d}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(rows[i:i + per_file], f, ensure_ascii=False)
+            files.append(path)
+        dim = os.path.join(tmp, "dim")
+        write_dims(rows, dim)
+
+        results = []
+        for engine, fn in (("pandas", _run_pandas), ("arrow", _run_arrow)):
+            res = run_isolated(fn, files, os.path.join(tmp, f"fact_{engine}"), dim)
+            results.append({"engine": engine, **res})
+        report("silver_engines", results)
+
+
+if __name__ == "__main__":
+    main()
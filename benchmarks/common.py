@@ -0,0 +1,111 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Os benchmarks rodam a partir da raiz do repositório (ex.:
+`python -m benchmarks.bench_silver_engines`) e precisam do mesmo ambiente
+das DAGs (airflow, pandas, pyarrow).
+"""
+import json
+import multiprocessing as mp
+import os
+import queue
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+COUNTRIES = {
+    "United States": ["California", "Oregon", "Colorado", "Texas", "New York"],
+    "Brasil": ["São Paulo", "Minas Gerais", "Paraná"],
+    "Ireland": ["Dublin", "Cork"],
+}
+BREWERY_TYPES = ["micro", "brewpub", "large", "regional", "planning", "contract", "closed"]
+
+
+def make_rows(n: int, seed: int = 42) -> list[dict]:
+    """Gera `n` breweries no formato da API (determinístico por `seed`)."""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        country = rnd.choice(list(COUNTRIES))
+        state = rnd.choice(COUNTRIES[country])
+        rows.append({
+            "id": f"{i:08d}",
+            "name": f"Brewery {rnd.randrange(n)}",
+            "brewery_type": rnd.choice(BREWERY_TYPES),
+            "address_1": f"{rnd.randrange(9999)} Main St",
+            "address_2": None,
+            "address_3": None,
+            "city": f"City {rnd.randrange(200)}",
+            "state_province": state,
+            "postal_code": f"{rnd.randrange(99999):05d}",
+            "country": country,
+            "longitude": str(rnd.uniform(-120, 10)) if rnd.random() > 0.1 else None,
+            "latitude": str(rnd.uniform(-30, 50)) if rnd.random() > 0.1 else None,
+            "phone": str(rnd.randrange(10**9, 10**10)) if rnd.random() > 0.3 else None,
+            "website_url": f"http://brewery{i}.com" if rnd.random() > 0.5 else None,
+            "state": state,
+            "street": f"{rnd.randrange(9999)} Main St",
+        })
+    return rows
+
+
+def write_dims(rows: list[dict], dim_path: str) -> None:
+    """Grava as dimensões de-para para as linhas geradas."""
+    from dags.utils.normalization import normalize_name
+
+    os.makedirs(dim_path, exist_ok=True)
+    df = pd.DataFrame(rows)
+    for col in ["country", "state", "city", "brewery_type"]:
+        dim = df[[col]].dropna().drop_duplicates()
+        dim[f"{col}_norm"] = dim[col].map(normalize_name)
+        dim.to_parquet(os.path.join(dim_path, f"dim_{col}.parquet"), index=False)
+
+
+def _measure(fn: Callable, args: tuple, queue) -> None:
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    extra = fn(*args) or {}
+    wall = time.perf_counter() - t0
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({"wall_s": wall, "peak_rss_kb": peak_rss, "rss_growth_kb": peak_rss - base_rss, **extra})
+
+
+def run_isolated(fn: Callable, *args) -> dict:
+    """
+    Executa `fn(*args)` em um processo novo (spawn) e retorna tempo de parede e
+    pico de RSS do processo, para que medições de memória não se contaminem.
+    `fn` deve ser importável no nível de módulo.
+    """
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(fn, args, results))
+    proc.start()
+    # Lê antes do join: com resultado maior que o buffer do pipe, o filho só termina
+    # depois que o pai consome a fila
+    while True:
+        try:
+            result = results.get(timeout=1.0)
+            break
+        except queue.Empty:
+            if not proc.is_alive() and results.empty():
+                proc.join()
+                raise RuntimeError(
+                    f"{getattr(fn, '__name__', fn)} falhou no processo isolado (exit={proc.exitcode})"
+                )
+    proc.join()
+    return result
+
+
+def report(name: str, results: list[dict]) -> None:
+    """Imprime os resultados como JSON lines (uma linha por medição)."""
+    for r in results:
+        print(json.dumps({"benchmark": name, **r}, ensure_ascii=False))
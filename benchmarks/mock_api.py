@@ -0,0 +1,171 @@
+"""
+Servidor local que imita a OpenBreweryDB (`/v1/breweries` e `/v1/breweries/meta`)
+sobre dados sintéticos (`benchmarks.synthetic`), para testar a extração sem rede.
+
+Cenários configuráveis: distribuição de latência por requisição, taxa de erros
+5xx, taxa de 429 (com `Retry-After`) e limite de `per_page` (a API pública
+limita em 200; acima disso devolve 200 itens).
+
+A extração usa o mock via `OPENBREWERYDB_API_URL`:
+
+    python -m benchmarks.mock_api --port 8099 --scale 1 --latency lognormal:40:250 --error-rate 0.01
+    OPENBREWERYDB_API_URL=http://127.0.0.1:8099/v1/breweries airflow dags test extracao_brewery
+
+Latência (ms): `none`, `fixed:50`, `uniform:10:100` ou `lognormal:<mediana>:<p99>`.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import iter_breweries
+
+API_PREFIX = "/v1/breweries"
+DEFAULT_PER_PAGE = 50
+Z_99 = 2.3263
+
+
+def latency_sampler(spec: str, rnd: random.Random):
+    """Converte a especificação de latência em uma função sem argumentos que devolve segundos."""
+    kind, *params = spec.split(":")
+    values = [float(p) / 1000 for p in params]
+    if kind == "none":
+        return lambda: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: rnd.uniform(*values)
+    if kind == "lognormal" and len(values) == 2:
+        median, p99 = values
+        sigma = math.log(p99 / median) / Z_99
+        return lambda: rnd.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Latência inválida: {spec!r}")
+
+
+@dataclass
+class MockConfig:
+    """
+    Attributes:
+        scale: Fator de escala dos dados sintéticos (1 = tamanho real).
+        seed: Semente dos dados e dos sorteios de latência/erro.
+        latency: Especificação da latência (ver docstring do módulo).
+        error_rate: Fração de requisições respondidas com 500.
+        rate_limit_rate: Fração de requisições respondidas com 429.
+        retry_after: Valor (s) do header `Retry-After` nas respostas 429.
+        max_per_page: Limite de itens por página.
+    """
+    scale: float = 1
+    seed: int = 42
+    latency: str = "none"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+    max_per_page: int = 200
+    stats: dict = field(default_factory=lambda: {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0})
+
+
+def make_mock_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Cria o servidor (porta 0 = livre; ver `server.server_address`). Os dados são
+    gerados uma vez; `config.stats` acumula as respostas por tipo.
+    """
+    breweries = list(iter_breweries(config.scale, config.seed))
+    rnd = random.Random(config.seed)
+    lock = threading.Lock()
+    sample_latency = latency_sampler(config.latency, rnd)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload, headers: dict | None = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            with lock:
+                config.stats["requests"] += 1
+                delay, draw = sample_latency(), rnd.random()
+            time.sleep(delay)
+
+            if draw < config.rate_limit_rate:
+                with lock:
+                    config.stats["rate_limited"] += 1
+                return self._send(429, {"message": "Too Many Requests"}, {"Retry-After": str(config.retry_after)})
+            if draw < config.rate_limit_rate + config.error_rate:
+                with lock:
+                    config.stats["errors"] += 1
+                return self._send(500, {"message": "Internal Server Error"})
+
+            try:
+                page = max(1, int(params.get("page", 1)))
+                per_page = min(config.max_per_page, max(1, int(params.get("per_page", DEFAULT_PER_PAGE))))
+            except ValueError:
+                return self._send(400, {"message": "page/per_page inválidos"})
+
+            if url.path.rstrip("/") == f"{API_PREFIX}/meta":
+                payload = {"total": len(breweries), "page": page, "per_page": per_page}
+            elif url.path.rstrip("/") == API_PREFIX:
+                payload = breweries[(page - 1) * per_page: page * per_page]
+            else:
+                return self._send(404, {"message": f"rota desconhecida: {url.path}"})
+            with lock:
+                config.stats["ok"] += 1
+            self._send(200, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def start_mock_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Sobe o servidor em thread daemon e devolve (server, URL base de `/v1/breweries`)."""
+    server = make_mock_server(config, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{API_PREFIX}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", default="none")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--max-per-page", type=int, default=200)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        scale=args.scale, seed=args.seed, latency=args.latency, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, max_per_page=args.max_per_page,
+    )
+    server = make_mock_server(config, args.host, args.port)
+    print(f"OPENBREWERYDB_API_URL=http://{args.host}:{server.server_address[1]}{API_PREFIX}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(config.stats), flush=True)
+
+
+if __name__ == "__main__":
+    main()
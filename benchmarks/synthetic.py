@@ -0,0 +1,162 @@
+"""
+Gerador determinístico de dados sintéticos no formato da OpenBreweryDB.
+
+Escala 1x ~ tamanho real da API (~8 mil breweries). Cardinalidades seguem a
+forma do dataset real: poucos países com os EUA dominando, dezenas de estados,
+cidades com distribuição de cauda longa (crescem ~ sqrt(escala)). Inclui acentos
+e caracteres especiais, nulos por coluna e uma taxa de registros duplicados
+(mesmo id reaparecendo em outra página, às vezes com campos alterados).
+
+Uso:
+    from benchmarks.synthetic import iter_pages
+    for page_no, page in iter_pages(scale=10):
+        ...
+"""
+import math
+import random
+from typing import Iterator
+
+BASE_ROWS = 8_000
+
+# (país, peso, estados)
+COUNTRIES = [
+    ("United States", 0.78, [
+        "California", "Colorado", "Washington", "Michigan", "New York", "Pennsylvania", "Texas",
+        "Oregon", "Ohio", "North Carolina", "Florida", "Illinois", "Virginia", "Wisconsin",
+        "Massachusetts", "Minnesota", "Indiana", "Maine", "Missouri", "Vermont",
+    ]),
+    ("England", 0.04, ["Greater London", "West Yorkshire", "Bristol"]),
+    ("Ireland", 0.02, ["Dublin", "Cork", "Galway"]),
+    ("Germany", 0.02, ["Bayern", "Baden-Württemberg", "Nordrhein-Westfalen"]),
+    ("Brasil", 0.03, ["São Paulo", "Minas Gerais", "Paraná", "Santa Catarina", "Rio Grande do Sul"]),
+    ("Canada", 0.03, ["Québec", "Ontario", "British Columbia"]),
+    ("México", 0.02, ["Jalisco", "Nuevo León", "Ciudad de México"]),
+    ("Austria", 0.01, ["Wien", "Oberösterreich"]),
+    ("France", 0.02, ["Île-de-France", "Auvergne-Rhône-Alpes"]),
+    ("South Korea", 0.01, ["Seoul", "Busan"]),
+    ("Poland", 0.01, ["Mazowieckie", "Małopolskie"]),
+    ("Scotland", 0.01, ["Glasgow", "Edinburgh"]),
+]
+BREWERY_TYPES = [
+    ("micro", 0.52), ("brewpub", 0.30), ("planning", 0.06), ("regional", 0.03), ("closed", 0.03),
+    ("contract", 0.02), ("proprietor", 0.02), ("large", 0.01), ("taproom", 0.005), ("bar", 0.005),
+]
+CITY_ROOTS = [
+    "Springfield", "Portland", "San Diego", "Denver", "Asheville", "São José", "Köln", "Zürich",
+    "Montréal", "Trois-Rivières", "Łódź", "Málaga", "Curitiba", "Blumenau", "Gdańsk", "Fort Collins",
+    "Grand Rapids", "Bend", "St. Louis", "Coeur d'Alene", "Winston-Salem", "O'Fallon",
+]
+NAME_WORDS = [
+    "Brewing", "Brewery", "Cervejaria", "Brauerei", "Cervecería", "Brasserie", "Ales", "Beer Co",
+    "Taproom", "Craft", "Hop", "Barrel", "Öl", "Bière", "Golden", "Stone", "River", "Mountain",
+    "Hütte", "Açaí", "Señor", "Crème", "Fjörd", "Bear", "Wolf", "Oak", "Iron", "Harbor",
+]
+SPECIAL = ["", "", "", " & Co.", " (Taproom)", " - Kitchen", "'s", " #2", ' "The Pub"', " / Bar"]
+
+# probabilidade de nulo por campo (forma observada na API)
+NULL_RATES = {
+    "address_1": 0.08, "address_2": 0.95, "address_3": 0.99, "postal_code": 0.02,
+    "longitude": 0.25, "latitude": 0.25, "phone": 0.10, "website_url": 0.30,
+    "street": 0.08, "city": 0.002, "state": 0.002, "brewery_type": 0.001,
+}
+
+
+def _weighted(rnd: random.Random, items: list[tuple]) -> str:
+    x, acc = rnd.random() * sum(w for _, w, *_ in items), 0.0
+    for item in items:
+        acc += item[1]
+        if x <= acc:
+            return item
+    return items[-1]
+
+
+class _Universe:
+    """Pools de cidades por estado, dimensionados pela escala."""
+
+    def __init__(self, scale: float, rnd: random.Random):
+        cities_per_state = max(5, int(60 * math.sqrt(scale)))
+        self.cities = {}
+        for country, _, states in COUNTRIES:
+            for state in states:
+                self.cities[(country, state)] = [
+                    f"{rnd.choice(CITY_ROOTS)}{'' if i < len(CITY_ROOTS) else f' {i}'}"
+                    for i in range(cities_per_state)
+                ]
+
+
+def _brewery(i: int, rnd: random.Random, universe: _Universe) -> dict:
+    country, _, states = _weighted(rnd, COUNTRIES)
+    state = rnd.choice(states)
+    cities = universe.cities[(country, state)]
+    # cauda longa: poucas cidades concentram muitas breweries
+    city = cities[min(len(cities) - 1, int(rnd.paretovariate(1.1)) - 1)]
+    name = f"{rnd.choice(NAME_WORDS)} {rnd.choice(NAME_WORDS)}{rnd.choice(SPECIAL)}"
+    if rnd.random() < 0.05:
+        name = name.upper()
+    if rnd.random() < 0.03:
+        name = f"  {name} "
+    street = f"{rnd.randrange(1, 9999)} {rnd.choice(['Main St', 'Rua Augusta', 'Hauptstraße', 'Av. Paulista'])}"
+    record = {
+        "id": f"{i:08x}-{rnd.getrandbits(16):04x}-4{rnd.getrandbits(12):03x}-{rnd.getrandbits(16):04x}-"
+              f"{rnd.getrandbits(48):012x}",
+        "name": name,
+        "brewery_type": _weighted(rnd, BREWERY_TYPES)[0],
+        "address_1": street,
+        "address_2": f"Suite {rnd.randrange(1, 500)}",
+        "address_3": "Building B",
+        "city": city,
+        "state_province": state,
+        "postal_code": f"{rnd.randrange(10000, 99999)}-{rnd.randrange(1000, 9999)}",
+        "country": country,
+        "longitude": round(rnd.uniform(-125, 30), 8),
+        "latitude": round(rnd.uniform(-35, 60), 8),
+        "phone": str(rnd.randrange(10 ** 9, 10 ** 10)),
+        "website_url": f"http://www.brewery{i}.com",
+        "state": state,
+        "street": street,
+    }
+    for field, rate in NULL_RATES.items():
+        if rnd.random() < rate:
+            record[field] = None
+    # a API às vezes devolve coordenadas como string
+    if record["latitude"] is not None and rnd.random() < 0.1:
+        record["latitude"], record["longitude"] = str(record["latitude"]), str(record["longitude"])
+    return record
+
+
+def iter_breweries(scale: float = 1, seed: int = 42, duplicate_rate: float = 0.02) -> Iterator[dict]:
+    """
+    Gera `BASE_ROWS * scale` registros (mais duplicatas). Determinístico por (scale, seed).
+
+    Args:
+        scale: Fator de escala (1 = tamanho real da API).
+        seed: Semente.
+        duplicate_rate: Fração de registros reemitidos com o mesmo id.
+    """
+    rnd = random.Random(f"{seed}:{scale}")
+    universe = _Universe(scale, rnd)
+    recent: list[dict] = []
+    for i in range(int(BASE_ROWS * scale)):
+        record = _brewery(i, rnd, universe)
+        yield record
+        recent.append(record)
+        if len(recent) > 1000:
+            recent.pop(0)
+        if rnd.random() < duplicate_rate:
+            dup = dict(rnd.choice(recent))
+            if rnd.random() < 0.5:
+                dup["phone"] = None  # duplicata com campo alterado
+            yield dup
+
+
+def iter_pages(scale: float = 1, per_page: int = 200, seed: int = 42,
+               duplicate_rate: float = 0.02) -> Iterator[tuple[int, list[dict]]]:
+    """Páginas (nº a partir de 1, registros) no formato de `/v1/breweries`."""
+    page, buf = 1, []
+    for record in iter_breweries(scale, seed, duplicate_rate):
+        buf.append(record)
+        if len(buf) == per_page:
+            yield page, buf
+            page, buf = page + 1, []
+    if buf:
+        yield page, buf
@@ -1,17 +1,18 @@
 from airflow.decorators import dag, task
 from airflow.datasets import Dataset
 from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow.operators.python import get_current_context
 from datetime import datetime, timedelta
 import math
 
-from utils.get_api_data import get_api_data  
-from utils.save_api_data import save_api_data
+# utils pesados (requests, I/O) são importados dentro das tasks: o parse da DAG fica leve
+from utils.context_utils import get_run_day
+from utils.profiling import profiled
+from utils.storage import lake_path
 
 log = LoggingMixin().log
 
-BASE_URL = "https://api.openbrewerydb.org/v1/breweries"
-META_URL = "https://api.openbrewerydb.org/v1/breweries/meta"
-RAW_PATH = "data_lake_mock/raw/"
+RAW_PATH = lake_path("raw")
 PER_PAGE = 200
 DATASET_PATH = Dataset("/logs/trigger_silver.csv")
 
@@ -24,15 +25,20 @@ DATASET_PATH = Dataset("/logs/trigger_silver.csv")
     description="Extração dos dados da API https://www.openbrewerydb.org/ ",
     tags=["extracao", "brewery"],
     catchup=False,
+    # profile=True no disparo manual liga o profiling das tasks pesadas (ver utils/profiling.py)
+    params={"profile": False},
 )
 def extracao_brewery():
 
     @task(retries=3, retry_delay=timedelta(seconds=60))
     def get_total_pages(per_page: int = PER_PAGE) -> int:
         """Busca o total de itens da API e calcula o total de páginas."""
-        log.info("Consultando meta endpoint: %s", META_URL)
+        from utils.get_api_data import get_api_data, api_base_url
+
+        meta_url = f"{api_base_url()}/meta"
+        log.info("Consultando meta endpoint: %s", meta_url)
         try:
-            meta = get_api_data(META_URL)
+            meta = get_api_data(meta_url)
         except ValueError as e:
             log.error("Falha ao obter meta: %s", e)
             raise
@@ -51,32 +57,46 @@ def extracao_brewery():
         return total_pages
 
     @task(retries=3, retry_delay=timedelta(seconds=60))
-    def get_api_task(total_pages: int, per_page: int = PER_PAGE) -> None:
-        """Consulta página a página e salva em RAW_PATH."""
+    @profiled
+    def get_api_task(total_pages: int, per_page: int = PER_PAGE) -> str:
+        """
+        Consulta página a página, salva em RAW_PATH na partição do dia do run e
+        grava o manifesto dos arquivos produzidos (caminho retornado via XCom).
+        """
+        from utils.get_api_data import get_api_data, api_base_url
+        from utils.save_api_data import save_api_data
+        from utils.manifest import build_manifest, write_manifest
+
+        day_run = get_run_day()
+        files = []
         if total_pages <= 0:
             log.warning("Nenhuma página para processar (total_pages=%s)", total_pages)
-            return
+            return write_manifest(build_manifest("raw", day_run, RAW_PATH, files))
 
+        base_url = api_base_url()
         for page in range(1, total_pages + 1):
-            url = f"{BASE_URL}?page={page}&per_page={per_page}"
+            url = f"{base_url}?page={page}&per_page={per_page}"
             log.info("Buscando página %s/%s: %s", page, total_pages, url)
             try:
                 data = get_api_data(url)          
-                save_api_data(data, RAW_PATH, page) 
+                files.append(save_api_data(data, RAW_PATH, page, day=day_run))
                 log.info("Página %s persistida com sucesso.", page)
             except ValueError as e:
                 log.error("Erro ao processar página %s: %s", page, e)
                 raise
 
         log.info("Todas as páginas processadas. total_pages=%s", total_pages)
+        return write_manifest(build_manifest("raw", day_run, RAW_PATH, files))
 
     @task(outlets=[DATASET_PATH])
-    def trigger_silver() -> None:
-        log.info("Transformação concluída e dataset atualizado.")
+    def trigger_silver(manifest_path: str) -> None:
+        # A silver lê o manifesto do evento em vez de listar a raw pela data do próprio run
+        get_current_context()["outlet_events"][DATASET_PATH].extra = {"manifest": manifest_path}
+        log.info("Extração concluída e dataset atualizado (manifesto=%s).", manifest_path)
 
     # Orquestração
     total_pages = get_total_pages()
     get_data = get_api_task(total_pages)
-    total_pages >> get_data >> trigger_silver()
+    total_pages >> get_data >> trigger_silver(get_data)
 
 extracao_brewery()
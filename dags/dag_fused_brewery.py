@@ -0,0 +1,110 @@
+from airflow.decorators import dag, task
+from airflow.datasets import Dataset
+from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow.operators.python import get_current_context
+from datetime import datetime
+
+# pandas/pyarrow e os utils que dependem deles são importados dentro das tasks
+from utils.execution_mode import FUSED, execution_mode
+from utils.profiling import profiled
+from utils.lake_tasks import RAW_PATH, SILVER_PATH_DIM, SILVER_PATH_FACT, gold_batch_path
+
+log = LoggingMixin().log
+
+# Mesmo Dataset publicado pela extração (no modo multi_dag, consumido pela silver)
+DATASET_SILVER_PATH = Dataset("/logs/trigger_silver.csv")
+
+
+@dag(
+    schedule=[DATASET_SILVER_PATH],
+    start_date=datetime(2025, 9, 27),
+    description="Raw -> Silver -> Gold em processo único (OPENBREWERYDB_EXECUTION_MODE=fused)",
+    tags=["transformation", "silver", "gold", "brewery", "fused"],
+    catchup=False,
+    # profile=True no disparo manual liga o profiling das tasks pesadas (ver utils/profiling.py)
+    params={"profile": False},
+)
+def fused_brewery():
+
+    @task()
+    def resolve_raw_manifest(raw_path: str = RAW_PATH) -> dict:
+        from utils import lake_tasks
+
+        return lake_tasks.resolve_raw_manifest(get_current_context(), DATASET_SILVER_PATH, raw_path)
+
+    @task()
+    @profiled
+    def fused_transformation(raw_manifest: dict) -> dict:
+        """Dimensões, fato silver deduplicada e gold do batch em uma passada; retorna o manifesto da silver."""
+        from utils.fused_pipeline import fused_pipeline
+        from utils.manifest import build_manifest, manifest_files
+
+        day_run = raw_manifest["batch"]
+        gold_path_batch = gold_batch_path(day_run)
+        written = fused_pipeline(
+            manifest_files(raw_manifest),
+            day_run,
+            SILVER_PATH_FACT,
+            SILVER_PATH_DIM,
+            gold_path_batch,
+        )
+        return build_manifest("silver", day_run, SILVER_PATH_FACT, written, gold_path=gold_path_batch)
+
+    @task()
+    def compact_fact(silver_manifest: dict) -> dict:
+        from utils import lake_tasks
+
+        # O manifesto relistado mantém o gold_path do batch
+        return lake_tasks.compact_fact(silver_manifest)
+
+    @task()
+    def build_stats_index(silver_manifest: dict) -> None:
+        from utils import lake_tasks
+
+        lake_tasks.build_stats_index(silver_manifest["batch"])
+
+    @task()
+    def update_current(silver_manifest: dict) -> None:
+        from utils import lake_tasks
+
+        lake_tasks.update_current(silver_manifest["batch"])
+
+    @task()
+    def update_gold_trend(silver_manifest: dict) -> str | None:
+        from utils import lake_tasks
+
+        return lake_tasks.update_gold_trend(silver_manifest["batch"])
+
+    @task()
+    def export_gold(silver_manifest: dict) -> str | None:
+        from utils import lake_tasks
+
+        return lake_tasks.export_gold(silver_manifest["gold_path"], silver_manifest["batch"])
+
+    @task()
+    def build_geo(silver_manifest: dict) -> dict:
+        from utils import lake_tasks
+        from utils.manifest import manifest_files
+
+        # Arquivos do manifesto já compactado: sem listar o batch
+        return lake_tasks.build_geo(silver_manifest["batch"], silver_manifest["gold_path"],
+                                    files=manifest_files(silver_manifest))
+
+    @task()
+    def build_search(silver_manifest: dict) -> dict:
+        from utils import lake_tasks
+        from utils.manifest import manifest_files
+
+        return lake_tasks.build_search(silver_manifest["batch"], files=manifest_files(silver_manifest))
+
+    silver_manifest = fused_transformation(resolve_raw_manifest())
+    update_gold_trend(silver_manifest)
+    export_gold(silver_manifest)
+    final_manifest = compact_fact(silver_manifest)
+    build_stats_index(final_manifest) >> update_current(final_manifest)
+    build_geo(final_manifest)
+    build_search(final_manifest)
+
+# Registrada só no modo "fused"; no padrão (multi_dag) rodam as DAGs silver e gold
+if execution_mode() == FUSED:
+    fused_brewery()
@@ -1,44 +1,113 @@
 from airflow.decorators import dag, task
 from airflow.datasets import Dataset
 from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow.operators.python import get_current_context
 from datetime import datetime
 import os
 
-from utils.gold_pipeline import gold_pipeline  # usa LoggingMixin().log internamente
+# utils (pandas/pyarrow/numpy) são importados dentro das tasks: o parse da DAG fica leve
 from utils.context_utils import get_run_day
+from utils.execution_mode import MULTI_DAG, execution_mode
+from utils.profiling import profiled
+from utils.lake_tasks import GOLD_PATH, SILVER_PATH_FACT, gold_batch_path, silver_batch_path
 
-SILVER_PATH = "data_lake_mock/silver/fact"
-GOLD_PATH = "data_lake_mock/gold"
 DATASET_GOLD_PATH = Dataset("/logs/trigger_gold.csv")
+# Agregação paralela por partição country/state (1 = serial)
+GOLD_WORKERS = min(8, os.cpu_count() or 1)
 
 log = LoggingMixin().log
 
+
+def _batch_of(out_dir: str) -> str:
+    """Batch do diretório gold (`.../batch=YYYY-MM-DD`) produzido pela agregação; fallback no dia do run."""
+    name = os.path.basename(out_dir.rstrip("/"))
+    return name.split("=", 1)[1] if name.startswith("batch=") else get_run_day()
+
+
+def _silver_files() -> list[str] | None:
+    """Arquivos do manifesto publicado pela silver no evento do run; None (run manual) lista o batch."""
+    from utils.manifest import manifest_files, manifest_from_events
+
+    manifest = manifest_from_events(get_current_context(), DATASET_GOLD_PATH)
+    return manifest_files(manifest) if manifest else None
+
 @dag(
     schedule=[DATASET_GOLD_PATH],
     start_date=datetime(2025, 9, 27),
     description="Agregação para a camada Gold - Nº de cervejarias por País/Estado/Cidade",
     tags=["aggregation", "gold", "brewery"],
     catchup=False,
+    # profile=True no disparo manual liga o profiling das tasks pesadas (ver utils/profiling.py)
+    params={"profile": False},
 )
 def transformation_gold():
 
     @task()
+    @profiled
     def aggregation_silver_to_gold(
-        silver_path: str = SILVER_PATH,
+        silver_path: str = SILVER_PATH_FACT,
         gold_path: str = GOLD_PATH,
     ) -> str:
-        
-        day_run = get_run_day()
+        from utils.gold_pipeline import gold_pipeline  # usa LoggingMixin().log internamente
+        from utils.gold_partials import previous_batch_path
+        from utils.manifest import manifest_files, manifest_from_events
+
+        # Manifesto publicado pela silver: batch e arquivos exatos, sem listar a silver.
+        # Sem evento (run manual), usa o dia do run e descobre os arquivos do batch.
+        manifest = manifest_from_events(get_current_context(), DATASET_GOLD_PATH)
+        day_run = manifest["batch"] if manifest else get_run_day()
+        files = manifest_files(manifest) if manifest else None
 
         # Gold particionada por batch para manter histórico de execuções
-        gold_path_batch = os.path.join(gold_path, f"batch={day_run}")
-        silver_path_bath = os.path.join(silver_path, f"batch={day_run}")
-        log.info("Iniciando gold_pipeline: silver=%s gold_batch=%s", silver_path_bath, gold_path_batch)
+        gold_path_batch = gold_batch_path(day_run, gold_path)
+        silver_path_bath = silver_batch_path(day_run, silver_path)
+        log.info("Iniciando gold_pipeline: silver=%s gold_batch=%s arquivos=%s", silver_path_bath, gold_path_batch,
+                 len(files) if files is not None else "listagem")
+
+        # Reaproveita as parciais das partições que não mudaram desde o último batch gold
+        previous_gold = previous_batch_path(gold_path, day_run)
+        log.info("Batch gold anterior para reaproveitamento: %s", previous_gold)
 
-        out_dir = gold_pipeline(silver_path=silver_path_bath, gold_path=gold_path_batch)
+        out_dir = gold_pipeline(
+            silver_path=silver_path_bath,
+            gold_path=gold_path_batch,
+            workers=GOLD_WORKERS,
+            previous_gold_path=previous_gold,
+            files=files,
+        )
         log.info("Gold concluído em: %s", out_dir)
         return out_dir
 
-    aggregation_silver_to_gold()
+    @task()
+    def update_gold_trend(out_dir: str, gold_path: str = GOLD_PATH) -> str | None:
+        from utils import lake_tasks
+
+        return lake_tasks.update_gold_trend(_batch_of(out_dir), gold_path)
+
+    @task()
+    def export_gold(out_dir: str) -> str | None:
+        from utils import lake_tasks
+
+        return lake_tasks.export_gold(out_dir, _batch_of(out_dir))
+
+    @task()
+    def build_geo(out_dir: str, silver_path: str = SILVER_PATH_FACT) -> dict:
+        from utils import lake_tasks
+
+        return lake_tasks.build_geo(_batch_of(out_dir), out_dir, silver_path, files=_silver_files())
+
+    @task()
+    def build_search(out_dir: str, silver_path: str = SILVER_PATH_FACT) -> dict:
+        from utils import lake_tasks
+
+        return lake_tasks.build_search(_batch_of(out_dir), silver_path, files=_silver_files())
+
+    out_dir = aggregation_silver_to_gold()
+    update_gold_trend(out_dir)
+    export_gold(out_dir)
+    build_geo(out_dir)
+    build_search(out_dir)
 
-transformation_gold()
+# No modo "fused" a silver e a gold rodam na DAG fused_brewery
+if execution_mode() == MULTI_DAG:
+    transformation_gold()
@@ -1,25 +1,22 @@
 from airflow.decorators import dag, task
 from airflow.datasets import Dataset
 from airflow.utils.log.logging_mixin import LoggingMixin
-from airflow.exceptions import AirflowFailException
 from airflow.operators.python import get_current_context
 from datetime import datetime
-from pathlib import Path
-from glob import glob
 import os
-import pandas as pd
 
-from utils.silver_pipeline import silver_pipeline           
-from utils.update_dim import update_dim              
-from utils.normalization import normalize_name, normalize_brewery_df
-from utils.remove_duplicates_batch import remove_duplicates_batch  
-from utils.context_utils import get_run_day
+# pandas/pyarrow e os utils que dependem deles são importados dentro das tasks:
+# o dag-processor só paga o custo do Airflow ao fazer o parse deste arquivo
+from utils.execution_mode import MULTI_DAG, execution_mode
+from utils.profiling import profiled
+from utils.lake_tasks import RAW_PATH, SILVER_PATH_DIM, SILVER_PATH_FACT
 
 log = LoggingMixin().log
 
-RAW_PATH = "data_lake_mock/raw"
-SILVER_PATH_DIM = "data_lake_mock/silver/dim"
-SILVER_PATH_FACT = "data_lake_mock/silver/fact"
+# "arrow": JSON -> Arrow -> Parquet sem pandas | "pandas": caminho original
+SILVER_ENGINE = "arrow"
+# Lotes lidos antecipadamente (thread de fundo) enquanto o lote atual é processado
+SILVER_PREFETCH_DEPTH = 1
 DATASET_SILVER_PATH = Dataset("/logs/trigger_silver.csv")
 DATASET_GOLD_PATH = Dataset("/logs/trigger_gold.csv")
 
@@ -30,109 +27,159 @@ DATASET_GOLD_PATH = Dataset("/logs/trigger_gold.csv")
     description="Transformação para a camada Silver - JSON -> Parquet particionado",
     tags=["transformation", "silver", "brewery"],
     catchup=False,
+    # profile=True no disparo manual liga o profiling das tasks pesadas (ver utils/profiling.py)
+    params={"profile": False},
 )
 def transformation_silver():
 
     @task()
-    def update_dimensions(raw_path: str = RAW_PATH,
+    def resolve_raw_manifest(raw_path: str = RAW_PATH) -> dict:
+        from utils import lake_tasks
+
+        return lake_tasks.resolve_raw_manifest(get_current_context(), DATASET_SILVER_PATH, raw_path)
+
+    @task()
+    def update_dimensions(raw_manifest: dict,
                           silver_path_dim: str = SILVER_PATH_DIM,
-                          batch_size: int = 10) -> None:
-        
-        day_run = get_run_day()
-        year, month, day = day_run.split("-")
-
-        read_path = os.path.join(
-            raw_path,
-            f"year={year}",
-            f"month={int(month):02d}",
-            f"day={int(day):02d}",
-        )
-        Path(silver_path_dim).mkdir(parents=True, exist_ok=True)
-
-        files = sorted(glob(os.path.join(read_path, "*.json")))
-        log.info("update_dimensions: path=%s files=%s", read_path, len(files))
+                          batch_size: int = 10,
+                          prefetch_depth: int = SILVER_PREFETCH_DEPTH) -> None:
+        from contextlib import closing
+        from utils.manifest import manifest_files
+        from utils.normalization import normalize_name
+        from utils.prefetch import prefetch
+        from utils.raw_reader import read_raw_frame
+        from utils.storage import makedirs
+        from utils.update_dim import update_dim
+
+        day_run = raw_manifest["batch"]
+        makedirs(silver_path_dim)
+
+        files = manifest_files(raw_manifest)
+        log.info("update_dimensions: batch=%s files=%s", day_run, len(files))
         if not files:
-            log.warning("Nenhum arquivo JSON encontrado em %s (run %s).", read_path, day_run)
+            log.warning("Nenhum arquivo JSON no manifesto da raw (batch %s).", day_run)
             return
 
-        for i in range(0, len(files), batch_size):
-            batch_files = files[i:i + batch_size]
-            log.info("Batch %s: %s arquivos", i // batch_size + 1, len(batch_files))
-            try:
-                dfs = [pd.read_json(f) for f in batch_files]
-                df = pd.concat(dfs, ignore_index=True)
+        # Leitura/parse do lote seguinte sobreposta à atualização das dimensões do atual
+        batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+        with closing(prefetch(batches, read_raw_frame, depth=prefetch_depth)) as loaded:
+            for n, (batch_files, df) in enumerate(loaded, start=1):
+                log.info("Batch %s: %s arquivos", n, len(batch_files))
                 if df.empty:
                     log.warning("Batch vazio após concatenação; pulando.")
                     continue
-            except Exception as e:
-                log.exception("Falha ao ler/concatenar JSONs do batch: %s", batch_files)
-                raise AirflowFailException(f"Erro de leitura de JSON: {e}") from e
-
-            # Normalizações de chave para dimensões
-            df["country_norm"] = df.get("country").map(normalize_name) if "country" in df else None
-            df["state_norm"] = df.get("state").map(normalize_name) if "state" in df else None
-            df["city_norm"] = df.get("city").map(normalize_name) if "city" in df else None
-            df["brewery_type_norm"] = df.get("brewery_type").map(normalize_name) if "brewery_type" in df else None
-
-            # Atualiza dims
-            update_dim(df[["country", "country_norm"]].dropna(), "country", "country_norm",
-                       os.path.join(silver_path_dim, "dim_country.parquet"))
-            update_dim(df[["state", "state_norm"]].dropna(), "state", "state_norm",
-                       os.path.join(silver_path_dim, "dim_state.parquet"))
-            update_dim(df[["city", "city_norm"]].dropna(), "city", "city_norm",
-                       os.path.join(silver_path_dim, "dim_city.parquet"))
-            update_dim(df[["brewery_type", "brewery_type_norm"]].dropna(), "brewery_type", "brewery_type_norm",
-                       os.path.join(silver_path_dim, "dim_brewery_type.parquet"))
+
+                # Normalizações de chave para dimensões
+                df["country_norm"] = df.get("country").map(normalize_name) if "country" in df else None
+                df["state_norm"] = df.get("state").map(normalize_name) if "state" in df else None
+                df["city_norm"] = df.get("city").map(normalize_name) if "city" in df else None
+                df["brewery_type_norm"] = df.get("brewery_type").map(normalize_name) if "brewery_type" in df else None
+
+                # Atualiza dims
+                update_dim(df[["country", "country_norm"]].dropna(), "country", "country_norm",
+                           os.path.join(silver_path_dim, "dim_country.parquet"))
+                update_dim(df[["state", "state_norm"]].dropna(), "state", "state_norm",
+                           os.path.join(silver_path_dim, "dim_state.parquet"))
+                update_dim(df[["city", "city_norm"]].dropna(), "city", "city_norm",
+                           os.path.join(silver_path_dim, "dim_city.parquet"))
+                update_dim(df[["brewery_type", "brewery_type_norm"]].dropna(), "brewery_type", "brewery_type_norm",
+                           os.path.join(silver_path_dim, "dim_brewery_type.parquet"))
 
     @task()
-    def transformation(raw_path: str = RAW_PATH,
+    @profiled
+    def transformation(raw_manifest: dict,
                        silver_path_fact: str = SILVER_PATH_FACT,
                        silver_path_dim: str = SILVER_PATH_DIM,
-                       batch_size: int = 10) -> None:
-        
-        day_run = get_run_day()
-        year, month, day = day_run.split("-")
-
-        read_path = os.path.join(
-            raw_path,
-            f"year={year}",
-            f"month={int(month):02d}",
-            f"day={int(day):02d}",
-        )
-
-        files = sorted(glob(os.path.join(read_path, "*.json")))
-        log.info("transformation: path=%s files=%s", read_path, len(files))
+                       batch_size: int = 10,
+                       engine: str = SILVER_ENGINE,
+                       prefetch_depth: int = SILVER_PREFETCH_DEPTH) -> dict:
+        """Grava a fato silver a partir dos arquivos do manifesto da raw; retorna o manifesto da silver."""
+        from contextlib import closing
+        from utils.manifest import build_manifest, manifest_files
+        from utils.normalization import normalize_brewery_df, normalize_brewery_table
+        from utils.prefetch import prefetch
+        from utils.raw_reader import read_raw_frame, read_raw_table
+        from utils.silver_pipeline import clear_batch, silver_pipeline, silver_pipeline_arrow
+
+        day_run = raw_manifest["batch"]
+        written: list[str] = []
+
+        # Rerun do dia: o manifesto passa a cobrir o batch inteiro (dedup/compactação/gold)
+        clear_batch(silver_path_fact, day_run)
+        files = manifest_files(raw_manifest)
+        log.info("transformation: batch=%s files=%s", day_run, len(files))
         if not files:
-            log.warning("Nenhum arquivo JSON encontrado em %s (run %s).", read_path, day_run)
-            return
+            log.warning("Nenhum arquivo JSON no manifesto da raw (batch %s).", day_run)
+            return build_manifest("silver", day_run, silver_path_fact, written)
+
+        # Leitura/parse do lote seguinte sobreposta à normalização/escrita do atual
+        read_batch = read_raw_table if engine == "arrow" else read_raw_frame
+        offsets = range(0, len(files), batch_size)
+        with closing(prefetch(offsets, lambda i: read_batch(files[i:i + batch_size]),
+                              depth=prefetch_depth)) as loaded:
+            for i, data in loaded:
+                log.info("Batch %s: %s arquivos", i // batch_size + 1, len(files[i:i + batch_size]))
+                if engine == "arrow":
+                    if data.num_rows == 0:
+                        log.warning("Batch vazio após concatenação; pulando.")
+                        continue
+                    written += silver_pipeline_arrow(normalize_brewery_table(data), silver_path_fact,
+                                                     silver_path_dim, day_run, part=i)
+                    continue
 
-        for i in range(0, len(files), batch_size):
-            batch_files = files[i:i + batch_size]
-            log.info("Batch %s: %s arquivos", i // batch_size + 1, len(batch_files))
-            try:
-                dfs = [pd.read_json(f) for f in batch_files]
-                df = pd.concat(dfs, ignore_index=True)
-                if df.empty:
+                if data.empty:
                     log.warning("Batch vazio após concatenação; pulando.")
                     continue
-            except Exception as e:
-                log.exception("Falha ao ler/concatenar JSONs do batch: %s", batch_files)
-                raise AirflowFailException(f"Erro de leitura de JSON: {e}") from e
 
-            df_norm = normalize_brewery_df(df)
+                df_norm = normalize_brewery_df(data)
 
-            silver_pipeline(df_norm, silver_path_fact, silver_path_dim, day_run, part=i)
+                written += silver_pipeline(df_norm, silver_path_fact, silver_path_dim, day_run, part=i)
+
+        return build_manifest("silver", day_run, silver_path_fact, written)
 
     @task()
-    def remove_duplicates() -> None:
-        day_run = get_run_day()
-        remove_duplicates_batch(day_run, SILVER_PATH_FACT)
+    @profiled
+    def remove_duplicates(silver_manifest: dict) -> dict:
+        from utils.manifest import build_manifest, manifest_files
+        from utils.remove_duplicates_batch import remove_duplicates_batch
 
-    @task(outlets=[DATASET_GOLD_PATH])
-    def trigger_gold() -> None:
-        log.info("Finalizada transformação para camada silver; dataset_gold atualizado.")
+        day_run = silver_manifest["batch"]
+        written = remove_duplicates_batch(day_run, SILVER_PATH_FACT, files=manifest_files(silver_manifest))
+        return build_manifest("silver", day_run, SILVER_PATH_FACT, written)
 
-    update_dimensions() >> transformation() >> remove_duplicates() >> trigger_gold()
+    @task()
+    def compact_fact(silver_manifest: dict) -> dict:
+        from utils import lake_tasks
+
+        return lake_tasks.compact_fact(silver_manifest)
+
+    @task()
+    def build_stats_index(silver_manifest: dict) -> None:
+        from utils import lake_tasks
 
+        lake_tasks.build_stats_index(silver_manifest["batch"])
 
-transformation_silver()
+    @task()
+    def update_current(silver_manifest: dict) -> None:
+        from utils import lake_tasks
+
+        lake_tasks.update_current(silver_manifest["batch"])
+
+    @task(outlets=[DATASET_GOLD_PATH])
+    def trigger_gold(silver_manifest: dict) -> None:
+        from utils.manifest import write_manifest
+
+        # A gold agrega exatamente os arquivos deste manifesto, sem listar a silver
+        path = write_manifest(silver_manifest)
+        get_current_context()["outlet_events"][DATASET_GOLD_PATH].extra = {"manifest": path}
+        log.info("Finalizada transformação para camada silver; dataset_gold atualizado (manifesto=%s).", path)
+
+    raw_manifest = resolve_raw_manifest()
+    silver_manifest = transformation(raw_manifest)
+    update_dimensions(raw_manifest) >> silver_manifest
+    final_manifest = compact_fact(remove_duplicates(silver_manifest))
+    build_stats_index(final_manifest) >> update_current(final_manifest) >> trigger_gold(final_manifest)
+
+# No modo "fused" a silver e a gold rodam na DAG fused_brewery
+if execution_mode() == MULTI_DAG:
+    transformation_silver()
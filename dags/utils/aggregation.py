@@ -0,0 +1,122 @@
+from typing import Callable, Iterable, Sequence, TypeVar
+
+import pyarrow as pa
+
+GROUP_KEYS = ["country", "state", "city", "brewery_type"]
+
+T = TypeVar("T")
+
+
+class CountAccumulator:
+    """
+    Acumulador hash de contagens por chave de agrupamento.
+
+    Cada lote é agregado em Arrow (`Table.group_by(...).aggregate`) e só o
+    resultado parcial (uma linha por grupo) é somado no dict, então o custo por
+    lote é proporcional ao nº de grupos do lote e não ao tamanho acumulado.
+    """
+
+    def __init__(self, keys: Sequence[str] = GROUP_KEYS):
+        self.keys = list(keys)
+        self.counts: dict[tuple, int] = {}
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add_counts(self, keys: Iterable[tuple], counts: Iterable[int]) -> None:
+        acc = self.counts
+        for key, n in zip(keys, counts):
+            acc[key] = acc.get(key, 0) + n
+
+    def add_table(self, table: pa.Table | pa.RecordBatch) -> None:
+        """Agrega um lote (precisa conter as colunas `keys`)."""
+        if table.num_rows == 0:
+            return
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        keys_table = table.select(self.keys)
+        keys_table = keys_table.cast(pa.schema([pa.field(k, pa.string()) for k in self.keys]))
+        partial = keys_table.group_by(self.keys).aggregate([([], "count_all")])
+        key_cols = [partial[k].to_pylist() for k in self.keys]
+        self.add_counts(zip(*key_cols), partial["count_all"].to_pylist())
+        self.rows += table.num_rows
+
+    def merge(self, other: "CountAccumulator") -> "CountAccumulator":
+        """Soma as contagens de `other` neste acumulador (in-place) e o retorna."""
+        if len(other.counts) > len(self.counts):
+            self.counts, other_counts = dict(other.counts), self.counts
+        else:
+            other_counts = other.counts
+        self.add_counts(other_counts.keys(), other_counts.values())
+        self.rows += other.rows
+        return self
+
+    def to_table(self) -> pa.Table:
+        """Tabela keys + count (int64), ordenada por count desc e chaves asc."""
+        items = list(self.counts.items())
+        columns = {
+            k: pa.array([key[i] for key, _ in items], type=pa.string())
+            for i, k in enumerate(self.keys)
+        }
+        columns["count"] = pa.array([n for _, n in items], type=pa.int64())
+        table = pa.table(columns)
+        return table.sort_by([("count", "descending")] + [(k, "ascending") for k in self.keys])
+
+
+def tree_reduce(items: Sequence[T], combine: Callable[[T, T], T]) -> T | None:
+    """
+    Reduz `items` em pares (rodadas de log2(n)), ex.: parciais de workers.
+    Retorna None para lista vazia.
+    """
+    level = list(items)
+    if not level:
+        return None
+    while len(level) > 1:
+        nxt = [combine(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+# Níveis de rollup (grouping sets) derivados das contagens folha
+ROLLUP_LEVELS: list[tuple[str, ...]] = [
+    ("country",),
+    ("country", "brewery_type"),
+    ("country", "state"),
+    ("country", "state", "brewery_type"),
+    ("country", "state", "city"),
+    ("country", "state", "city", "brewery_type"),
+]
+
+
+def rollup_table(leaf: pa.Table, levels: Sequence[tuple[str, ...]] = ROLLUP_LEVELS) -> pa.Table:
+    """
+    Agrega as contagens folha (keys + count) em todos os `levels` de uma vez.
+
+    Cada nível é um `group_by(...).aggregate(sum)` sobre a tabela folha (já pequena),
+    então os rollups não exigem nova varredura da silver. As colunas fora do nível
+    ficam nulas e `grouping_level` (ex.: "country,state") identifica o nível.
+
+    Returns:
+        Tabela grouping_level + GROUP_KEYS + count, ordenada por nível, count desc e chaves.
+    """
+    key_fields = [pa.field(k, pa.string()) for k in GROUP_KEYS]
+    schema = pa.schema([pa.field("grouping_level", pa.string()), *key_fields, pa.field("count", pa.int64())])
+    parts = []
+    for order, level in enumerate(levels):
+        grouped = leaf.group_by(list(level)).aggregate([("count", "sum")])
+        n = grouped.num_rows
+        columns = {
+            "grouping_level": pa.repeat(pa.scalar(",".join(level)), n),
+            **{
+                k: grouped[k].cast(pa.string()) if k in level else pa.nulls(n, pa.string())
+                for k in GROUP_KEYS
+            },
+            "count": grouped["count_sum"].cast(pa.int64()),
+        }
+        table = pa.table(columns, schema=schema)
+        table = table.sort_by([("count", "descending")] + [(k, "ascending") for k in level])
+        parts.append(table)
+    return pa.concat_tables(parts) if parts else schema.empty_table()
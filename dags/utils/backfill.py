@@ -0,0 +1,279 @@
+"""
+Reprocessamento (backfill) de partições históricas da raw: silver e gold de cada
+dia em paralelo, com de-para das dimensões compartilhado e checkpoint para retomar.
+
+Uso (a partir da raiz do projeto):
+    python -m dags.utils.backfill --start 2025-09-01 --end 2025-09-30 --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date as date_cls, datetime, timezone
+from glob import glob
+
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .current_table import update_current_table
+from .fused_pipeline import DimensionStore, fused_pipeline
+from .gold_trend import update_trend
+from .lake_tasks import require_local
+from .partition_stats import build_batch_stats_index
+
+BACKFILL_DIR = "_backfill"  # prefixo "_": ignorado pelos scans do pyarrow e pela listagem de batches
+
+
+def _parse_day(value: str) -> str:
+    try:
+        return date_cls.fromisoformat(value).isoformat()
+    except (TypeError, ValueError) as e:
+        raise AirflowFailException(f"Data inválida (esperado YYYY-MM-DD): {value!r}") from e
+
+
+def discover_raw_days(raw_path: str, start: str, end: str) -> list[str]:
+    """
+    Dias (YYYY-MM-DD) com partição `year=/month=/day=` na raw entre `start` e `end` (inclusive).
+
+    Raises:
+        AirflowFailException: Se as datas forem inválidas ou `start` > `end`.
+    """
+    start, end = _parse_day(start), _parse_day(end)
+    if start > end:
+        raise AirflowFailException(f"Intervalo inválido: {start} > {end}")
+    days = set()
+    for path in glob(os.path.join(raw_path, "year=*", "month=*", "day=*")):
+        parts = dict(p.split("=", 1) for p in os.path.relpath(path, raw_path).split(os.sep))
+        try:
+            day = date_cls(int(parts["year"]), int(parts["month"]), int(parts["day"])).isoformat()
+        except ValueError:
+            continue
+        if start <= day <= end:
+            days.add(day)
+    return sorted(days)
+
+
+def raw_day_files(raw_path: str, day: str) -> list[str]:
+    year, month, dd = day.split("-")
+    return sorted(glob(os.path.join(raw_path, f"year={year}", f"month={month}", f"day={dd}", "*.json")))
+
+
+class BackfillCheckpoint:
+    """
+    Checkpoint JSON do backfill: dias concluídos (com resumo) e falhos. Gravado de
+    forma atômica a cada dia concluído, só pela thread que coordena o backfill.
+    """
+
+    def __init__(self, path: str, start: str, end: str):
+        self.path = path
+        self.state = {"start": start, "end": end, "done": {}, "failed": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.state["done"] = saved.get("done", {})
+            self.state["failed"] = saved.get("failed", {})
+
+    @property
+    def done(self) -> dict:
+        return self.state["done"]
+
+    @property
+    def failed(self) -> dict:
+        return self.state["failed"]
+
+    def mark_done(self, day: str, summary: dict) -> None:
+        self.failed.pop(day, None)
+        self.done[day] = {**summary, "finished_at": datetime.now(timezone.utc).isoformat()}
+        self.save()
+
+    def mark_failed(self, day: str, error: str) -> None:
+        self.failed[day] = error
+        self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def _swap_dir(staged: str, target: str, trash: str) -> None:
+    """Troca `target` por `staged` (renames no mesmo filesystem) e apaga a versão antiga."""
+    if os.path.exists(trash):
+        shutil.rmtree(trash)
+    if os.path.exists(target):
+        os.replace(target, trash)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(staged, target)
+    shutil.rmtree(trash, ignore_errors=True)
+
+
+def reprocess_day(
+    day: str,
+    raw_path: str,
+    silver_path_fact: str,
+    silver_path_dim: str,
+    gold_path: str,
+    dims: DimensionStore,
+    batch_size: int = 10,
+) -> dict:
+    """
+    Reprocessa um dia: raw -> silver -> gold (`fused_pipeline`) em diretórios de
+    staging e troca `batch=<day>` da silver e da gold só ao final, então um dia
+    interrompido não deixa o batch publicado pela metade.
+
+    Returns:
+        Resumo do dia (arquivos raw/silver e de-paras das dimensões vistos).
+    """
+    staging = os.path.join(silver_path_fact, BACKFILL_DIR, day)
+    staged_fact = os.path.join(staging, "fact")
+    staged_gold = os.path.join(staging, "gold")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    raw_files = raw_day_files(raw_path, day)
+    written = fused_pipeline(raw_files, day, staged_fact, silver_path_dim, staged_gold,
+                             batch_size=batch_size, dims=dims)
+
+    batch = f"batch={day}"
+    staged_batch = os.path.join(staged_fact, batch)
+    os.makedirs(staged_batch, exist_ok=True)
+    _swap_dir(staged_batch, os.path.join(silver_path_fact, batch), os.path.join(staging, "old_fact"))
+    _swap_dir(staged_gold, os.path.join(gold_path, batch), os.path.join(staging, "old_gold"))
+    shutil.rmtree(staging, ignore_errors=True)
+    build_batch_stats_index(os.path.join(silver_path_fact, batch))
+
+    return {"raw_files": len(raw_files), "silver_files": len(written), "dims": dims.snapshot()}
+
+
+def run_backfill(
+    start: str,
+    end: str,
+    raw_path: str,
+    silver_path_fact: str,
+    silver_path_dim: str,
+    gold_path: str,
+    silver_path_current: str | None = None,
+    workers: int = 4,
+    pool: str = "thread",
+    checkpoint_path: str | None = None,
+    batch_size: int = 10,
+) -> dict:
+    """
+    Reprocessa as partições da raw entre `start` e `end` com até `workers` dias em
+    paralelo. Um único `DimensionStore` é compartilhado entre os dias (em "process",
+    cada worker recebe uma cópia e os de-paras novos voltam no resultado) e as
+    dimensões parquet são gravadas pela thread coordenadora a cada dia concluído.
+
+    Dias já concluídos no checkpoint são pulados (retomada). Ao final, a tendência
+    da gold é refeita em ordem cronológica para os dias reprocessados; a tabela
+    `silver/current` só é reaplicada se não houver batch silver mais novo que o
+    último dia reprocessado (senão ela seria revertida a uma versão antiga).
+
+    Args:
+        start: Primeiro dia (YYYY-MM-DD), inclusive.
+        end: Último dia (YYYY-MM-DD), inclusive.
+        raw_path: Base da raw (year=/month=/day=).
+        silver_path_fact: Base da fato silver.
+        silver_path_dim: Diretório das dimensões parquet.
+        gold_path: Base da gold (batch=YYYY-MM-DD).
+        silver_path_current: Tabela current; None não a atualiza.
+        workers: Nº máximo de dias processados ao mesmo tempo.
+        pool: "thread" ou "process".
+        checkpoint_path: JSON de checkpoint (default: `<silver_fact>/_backfill/<start>_<end>.json`).
+        batch_size: Nº de arquivos raw por lote de leitura.
+
+    Returns:
+        Resumo com os dias encontrados, reprocessados, pulados e falhos.
+
+    Raises:
+        AirflowFailException: Se algum caminho não for local ou algum dia falhar (o
+            checkpoint guarda os concluídos).
+    """
+    log = LoggingMixin().log
+    # glob/listdir/renames locais: numa URL fsspec não achariam dia nenhum e o backfill "passaria"
+    for path in (raw_path, silver_path_fact, silver_path_dim, gold_path, silver_path_current):
+        if path:
+            require_local(path, "backfill")
+    days = discover_raw_days(raw_path, start, end)
+    checkpoint_path = checkpoint_path or os.path.join(silver_path_fact, BACKFILL_DIR, f"{start}_{end}.json")
+    checkpoint = BackfillCheckpoint(checkpoint_path, start, end)
+    pending = [d for d in days if d not in checkpoint.done]
+    skipped = [d for d in days if d in checkpoint.done]
+    log.info("Backfill %s..%s: dias=%s pendentes=%s já concluídos=%s workers=%s pool=%s checkpoint=%s",
+             start, end, len(days), len(pending), len(skipped), workers, pool, checkpoint_path)
+
+    dims = DimensionStore()
+    processed: list[str] = []
+    if pending:
+        executor_cls = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+        with executor_cls(max_workers=max(1, min(workers, len(pending)))) as executor:
+            futures = {
+                executor.submit(reprocess_day, day, raw_path, silver_path_fact, silver_path_dim, gold_path,
+                                dims, batch_size): day
+                for day in pending
+            }
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    log.exception("Backfill: falha no dia %s", day)
+                    checkpoint.mark_failed(day, str(e))
+                    continue
+                dims.merge(summary.pop("dims"))
+                # Dimensões antes do checkpoint: um dia "done" nunca fica sem seus de-paras gravados
+                dims.flush(silver_path_dim)
+                checkpoint.mark_done(day, summary)
+                processed.append(day)
+                log.info("Backfill: dia %s concluído (%s/%s)", day, len(processed), len(pending))
+
+    # Pós-processamento dependente de ordem: refeito para todos os dias concluídos do intervalo
+    done = sorted(d for d in days if d in checkpoint.done)
+    for day in done:
+        update_trend(gold_root=gold_path, day=day)
+    if silver_path_current and done:
+        batches = sorted(
+            d.split("=", 1)[1] for d in os.listdir(silver_path_fact) if d.startswith("batch=")
+        )
+        if batches and batches[-1] > done[-1]:
+            log.warning("Backfill: current não reaplicada (há batch silver mais novo: %s)", batches[-1])
+        else:
+            for day in done:
+                update_current_table(day, silver_path_fact, silver_path_current)
+
+    summary = {"days": days, "processed": sorted(processed), "skipped": skipped,
+               "failed": sorted(checkpoint.failed), "checkpoint": checkpoint_path}
+    log.info("Backfill %s..%s finalizado: %s", start, end,
+             {k: len(v) if isinstance(v, list) else v for k, v in summary.items()})
+    if checkpoint.failed:
+        raise AirflowFailException(
+            f"Backfill com falhas em {sorted(checkpoint.failed)}; rode novamente para retomar ({checkpoint_path})."
+        )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--raw-path", default="data_lake_mock/raw")
+    parser.add_argument("--silver-fact", default="data_lake_mock/silver/fact")
+    parser.add_argument("--silver-dim", default="data_lake_mock/silver/dim")
+    parser.add_argument("--silver-current", default="data_lake_mock/silver/current")
+    parser.add_argument("--gold-path", default="data_lake_mock/gold")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--checkpoint")
+    args = parser.parse_args()
+
+    summary = run_backfill(
+        args.start, args.end, args.raw_path, args.silver_fact, args.silver_dim, args.gold_path,
+        silver_path_current=args.silver_current, workers=args.workers, pool=args.pool,
+        checkpoint_path=args.checkpoint,
+    )
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
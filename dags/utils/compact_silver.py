@@ -0,0 +1,202 @@
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .parquet_profile import ParquetWriteProfile, DEFAULT_WRITE_PROFILE
+from .partition_stats import compute_partition_stats, write_stats_file
+
+STAGING_DIR = "_compaction_staging"
+TRASH_DIR = "_compaction_trash"
+# Sentinela numérico: `part` segue inteiro na inferência Hive (os demais valores são offsets >= 0)
+COMPACTED_PART = -1
+
+
+def _is_hidden(name: str) -> bool:
+    # Mesma regra do pyarrow.dataset (ignore_prefixes=['.', '_'])
+    return name.startswith((".", "_"))
+
+
+def partition_files(batch_path: str) -> dict[tuple[str, str], list[tuple[str, int]]]:
+    """
+    Lista os Parquet de um batch agrupados por partição country/state.
+
+    Args:
+        batch_path: Diretório do batch (batch=<date>).
+
+    Returns:
+        Dict (country, state) -> lista de (caminho, tamanho em bytes).
+    """
+    out: dict[tuple[str, str], list[tuple[str, int]]] = {}
+    if not os.path.isdir(batch_path):
+        return out
+    for country_dir in sorted(os.listdir(batch_path)):
+        if _is_hidden(country_dir) or not country_dir.startswith("country="):
+            continue
+        country_path = os.path.join(batch_path, country_dir)
+        for state_dir in sorted(os.listdir(country_path)):
+            if _is_hidden(state_dir) or not state_dir.startswith("state="):
+                continue
+            state_path = os.path.join(country_path, state_dir)
+            files = []
+            for root, dirs, names in os.walk(state_path):
+                dirs[:] = [d for d in dirs if not _is_hidden(d)]
+                for name in names:
+                    if name.endswith(".parquet") and not _is_hidden(name):
+                        p = os.path.join(root, name)
+                        files.append((p, os.path.getsize(p)))
+            key = (country_dir.split("=", 1)[1], state_dir.split("=", 1)[1])
+            out[key] = sorted(files)
+    return out
+
+
+def needs_compaction(
+    batch_path: str,
+    max_files_per_partition: int = 8,
+    min_avg_file_bytes: int = 32 * 1024 * 1024,
+) -> bool:
+    """
+    Indica se algum country/state do batch passou dos limites de small files:
+    mais de `max_files_per_partition` arquivos, ou 2+ arquivos com tamanho
+    médio abaixo de `min_avg_file_bytes`.
+    """
+    for files in partition_files(batch_path).values():
+        if len(files) > max_files_per_partition:
+            return True
+        if len(files) >= 2 and sum(size for _, size in files) / len(files) < min_avg_file_bytes:
+            return True
+    return False
+
+
+def _recover(batch_path: str) -> None:
+    """Desfaz resíduos de uma compactação interrompida."""
+    log = LoggingMixin().log
+    staging = os.path.join(batch_path, STAGING_DIR)
+    if os.path.isdir(staging):
+        log.warning("Removendo staging de compactação anterior: %s", staging)
+        shutil.rmtree(staging)
+
+    trash = os.path.join(batch_path, TRASH_DIR)
+    if not os.path.isdir(trash):
+        return
+    for country_dir in os.listdir(trash):
+        for state_dir in os.listdir(os.path.join(trash, country_dir)):
+            old = os.path.join(trash, country_dir, state_dir)
+            target = os.path.join(batch_path, country_dir, state_dir)
+            if not os.path.exists(target):
+                log.warning("Restaurando partição de compactação interrompida: %s", target)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.rename(old, target)
+    shutil.rmtree(trash)
+
+
+def compact_batch(
+    batch_path: str,
+    target_file_bytes: int = 128 * 1024 * 1024,
+    min_files: int = 2,
+    profile: ParquetWriteProfile = DEFAULT_WRITE_PROFILE,
+) -> dict:
+    """
+    Compacta os arquivos de cada country/state do batch em arquivos de ~`target_file_bytes`
+    (gravados em part=`COMPACTED_PART`). Cada partição é escrita em staging e trocada por
+    dois renames (antiga -> trash, staging -> partição). A troca não é atômica: entre os
+    dois renames o country/state fica ausente para quem lista o batch; rode a compactação
+    antes de publicar o manifesto do batch (consumidores leem os arquivos do manifesto).
+    Um crash nesse intervalo é desfeito por `_recover` na execução seguinte.
+
+    Args:
+        batch_path: Diretório do batch (batch=<date>).
+        target_file_bytes: Tamanho alvo de cada arquivo compactado.
+        min_files: Partições com menos arquivos que isso são mantidas.
+        profile: Layout dos Parquet reescritos.
+
+    Returns:
+        Relatório com partições compactadas e contagem de arquivos/bytes antes e depois.
+
+    Raises:
+        AirflowFailException: Em falhas de leitura ou escrita.
+    """
+    log = LoggingMixin().log
+    report = {"partitions_compacted": 0, "files_before": 0, "files_after": 0,
+              "bytes_before": 0, "bytes_after": 0}
+    log.info("Compactação do batch %s (target=%s bytes)", batch_path, target_file_bytes)
+
+    try:
+        if not os.path.isdir(batch_path):
+            log.warning("Path do batch não existe: %s", batch_path)
+            return report
+
+        _recover(batch_path)
+
+        for (country, state), files in partition_files(batch_path).items():
+            n_bytes = sum(size for _, size in files)
+            report["files_before"] += len(files)
+            report["bytes_before"] += n_bytes
+            if len(files) < min_files:
+                report["files_after"] += len(files)
+                report["bytes_after"] += n_bytes
+                continue
+
+            paths = [p for p, _ in files]
+            schema = pa.unify_schemas([pq.read_schema(p) for p in paths], promote_options="permissive")
+            table = ds.dataset(paths, schema=schema, format="parquet").to_table()
+            table = table.drop_columns([c for c in ("country", "state", "part") if c in table.column_names])
+            table = profile.sort(table)
+            table = table.append_column("part", pa.repeat(pa.scalar(str(COMPACTED_PART)), table.num_rows))
+
+            bytes_per_row = max(1.0, n_bytes / max(1, table.num_rows))
+            rows_per_file = max(1, int(target_file_bytes / bytes_per_row))
+
+            rel = os.path.join(f"country={country}", f"state={state}")
+            staging = os.path.join(batch_path, STAGING_DIR, rel)
+            kwargs = profile.write_dataset_kwargs()
+            kwargs["max_rows_per_group"] = min(kwargs["max_rows_per_group"], rows_per_file)
+            kwargs["min_rows_per_group"] = min(kwargs["min_rows_per_group"], kwargs["max_rows_per_group"])
+            ds.write_dataset(
+                data=table,
+                base_dir=staging,
+                format="parquet",
+                partitioning=["part"],
+                partitioning_flavor="hive",
+                basename_template="compacted-{i}.parquet",
+                max_rows_per_file=rows_per_file,
+                existing_data_behavior="overwrite_or_ignore",
+                **kwargs,
+            )
+
+            stats = compute_partition_stats(table.drop_columns(["part"]))
+            write_stats_file({"country": country, "state": state, "part": str(COMPACTED_PART), **stats},
+                             os.path.join(staging, f"part={COMPACTED_PART}"))
+
+            # Commit: partição antiga -> trash, staging -> partição
+            target = os.path.join(batch_path, rel)
+            trash = os.path.join(batch_path, TRASH_DIR, rel)
+            os.makedirs(os.path.dirname(trash), exist_ok=True)
+            os.rename(target, trash)
+            os.rename(staging, target)
+            shutil.rmtree(trash)
+
+            new_files = [os.path.join(r, f) for r, _, fs in os.walk(target) for f in fs if f.endswith(".parquet")]
+            report["partitions_compacted"] += 1
+            report["files_after"] += len(new_files)
+            report["bytes_after"] += sum(os.path.getsize(p) for p in new_files)
+            log.info("Compactado %s: arquivos %s -> %s", rel, len(files), len(new_files))
+
+        for d in (STAGING_DIR, TRASH_DIR):
+            shutil.rmtree(os.path.join(batch_path, d), ignore_errors=True)
+
+        log.info(
+            "Compactação concluída: partições=%s arquivos %s -> %s bytes %s -> %s",
+            report["partitions_compacted"], report["files_before"], report["files_after"],
+            report["bytes_before"], report["bytes_after"]
+        )
+        return report
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado na compactação de %s", batch_path)
+        raise AirflowFailException(f"compact_batch falhou: {e}") from e
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow.dataset as ds
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .required_columns import require_columns
+
+INDEX_FILE = "_index.parquet"
+VERSIONS_FILE = "_versions.json"
+DATA_FILE = "data.parquet"
+PARTITION_KEYS = ["country", "state"]
+
+
+def _partition_dir(current_path: str, country: str, state: str) -> str:
+    return os.path.join(current_path, f"country={country}", f"state={state}")
+
+
+def _partition_key(country: str, state: str) -> str:
+    return f"country={country}/state={state}"
+
+
+def _fingerprint(df: pd.DataFrame) -> str:
+    """Hash do conteúdo da partição, independente de ordem de linhas/colunas e de dtype."""
+    cols = sorted(df.columns)
+    work = df[cols].sort_values("id", ignore_index=True)
+    h = hashlib.sha256()
+    for c in cols:
+        col = work[c].astype(object)
+        values = col.where(col.notna(), None).astype(str).to_numpy(dtype=object)
+        h.update(c.encode("utf-8"))
+        h.update(pd.util.hash_array(values).tobytes())
+    return h.hexdigest()
+
+
+def _write_parquet_atomic(df: pd.DataFrame, filepath: str) -> None:
+    tmp = f"{filepath}.tmp"
+    df.to_parquet(tmp, index=False, engine="pyarrow")
+    os.replace(tmp, filepath)
+
+
+def _load_versions(current_path: str) -> dict:
+    p = os.path.join(current_path, VERSIONS_FILE)
+    if not os.path.exists(p):
+        return {}
+    with open(p, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_versions(current_path: str, versions: dict) -> None:
+    p = os.path.join(current_path, VERSIONS_FILE)
+    tmp = f"{p}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(versions, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, p)
+
+
+def update_current_table(date: str, silver_path_fact: str, current_path: str, snapshot: bool = True) -> dict:
+    """
+    Mescla o batch (batch=<date>) da fato silver na tabela compactada `silver/current`,
+    chaveada por `id` e particionada por country/state (Hive).
+
+    Apenas as partições afetadas pelo batch (onde há ids novos/alterados ou de onde
+    um id saiu) são reescritas; partições cujo conteúdo final não mudou são mantidas.
+    Com `snapshot=True` (padrão: a extração traz a API inteira), ids do current
+    ausentes do batch foram removidos na origem e saem da tabela.
+    Cada partição tem metadado de versão em `_versions.json` e o mapeamento
+    id -> partição fica em `_index.parquet`.
+
+    Args:
+        date: Identificador do batch (ex.: '2025-09-27').
+        silver_path_fact: Diretório base da fato silver (particionado Hive).
+        current_path: Diretório da tabela current.
+        snapshot: Se o batch é um snapshot completo; False faz apenas upsert (batch parcial).
+
+    Returns:
+        Resumo com as partições reescritas (`changed`), mantidas (`unchanged`)
+        e removidas (`removed`).
+
+    Raises:
+        AirflowFailException: Em falhas de leitura, validação ou escrita.
+    """
+    log = LoggingMixin().log
+    batch_path = os.path.join(silver_path_fact, f"batch={date}")
+    summary = {"changed": [], "unchanged": [], "removed": []}
+    log.info("Atualizando current=%s a partir de %s", current_path, batch_path)
+
+    try:
+        if not os.path.isdir(batch_path):
+            log.warning("Path do batch não existe: %s", batch_path)
+            return summary
+
+        table = ds.dataset(batch_path, format="parquet", partitioning="hive").to_table()
+        if table.num_rows == 0:
+            log.warning("Nenhum dado encontrado para batch=%s", date)
+            return summary
+
+        df = table.to_pandas()
+        require_columns(df, ["id"] + PARTITION_KEYS, f"batch={date}")
+        df = df.drop(columns=[c for c in ("batch", "part") if c in df.columns])
+
+        n_null = int(df["id"].isna().sum())
+        if n_null:
+            log.warning("Registros sem id descartados do current: %s", n_null)
+            df = df.dropna(subset=["id"])
+
+        # Um id por registro; mantém a versão mais completa
+        value_cols = [c for c in df.columns if c != "id"]
+        df = (
+            df.assign(__completeness__=df[value_cols].notna().sum(axis=1))
+              .sort_values(["id", "__completeness__"], ascending=[True, False])
+              .drop_duplicates(subset=["id"], keep="first")
+              .drop(columns="__completeness__")
+        )
+        df["country"] = df["country"].astype(str)
+        df["state"] = df["state"].astype(str)
+
+        os.makedirs(current_path, exist_ok=True)
+        index_path = os.path.join(current_path, INDEX_FILE)
+        if os.path.exists(index_path):
+            index = pd.read_parquet(index_path)
+        else:
+            index = pd.DataFrame({"id": pd.Series(dtype=str), "country": pd.Series(dtype=str),
+                                  "state": pd.Series(dtype=str)})
+        versions = _load_versions(current_path)
+
+        # Partições afetadas: as do batch + as de onde ids mudaram de lugar ou foram removidos
+        new_ids = set(df["id"].astype(str))
+        deleted_ids = set(index["id"].astype(str)) - new_ids if snapshot else set()
+        replaced_ids = new_ids | deleted_ids
+        old_locations = index[index["id"].astype(str).isin(replaced_ids)]
+        affected = set(map(tuple, df[PARTITION_KEYS].drop_duplicates().to_numpy()))
+        affected |= set(map(tuple, old_locations[PARTITION_KEYS].drop_duplicates().to_numpy()))
+
+        for country, state in sorted(affected):
+            key = _partition_key(country, state)
+            part_dir = _partition_dir(current_path, country, state)
+            part_file = os.path.join(part_dir, DATA_FILE)
+
+            if os.path.exists(part_file):
+                existing = pd.read_parquet(part_file)
+                existing = existing[~existing["id"].astype(str).isin(replaced_ids)]
+            else:
+                existing = None
+
+            incoming = df[(df["country"] == country) & (df["state"] == state)].drop(columns=PARTITION_KEYS)
+            frames = [f for f in (existing, incoming) if f is not None and not f.empty]
+            if not frames:
+                if os.path.isdir(part_dir):
+                    shutil.rmtree(part_dir)
+                versions.pop(key, None)
+                summary["removed"].append(key)
+                continue
+
+            merged = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+            fingerprint = _fingerprint(merged)
+            previous = versions.get(key)
+            if previous and previous.get("fingerprint") == fingerprint and os.path.exists(part_file):
+                summary["unchanged"].append(key)
+                continue
+
+            os.makedirs(part_dir, exist_ok=True)
+            _write_parquet_atomic(merged, part_file)
+            versions[key] = {
+                "version": (previous or {}).get("version", 0) + 1,
+                "batch": str(date),
+                "rows": int(len(merged)),
+                "fingerprint": fingerprint,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            summary["changed"].append(key)
+
+        index = pd.concat(
+            [index[~index["id"].astype(str).isin(replaced_ids)], df[["id"] + PARTITION_KEYS]],
+            ignore_index=True,
+        )
+        _write_parquet_atomic(index, index_path)
+        _save_versions(current_path, versions)
+
+        log.info(
+            "Current atualizado batch=%s: reescritas=%s mantidas=%s removidas=%s ids=%s ids_excluidos=%s",
+            date, len(summary["changed"]), len(summary["unchanged"]), len(summary["removed"]), len(index),
+            len(deleted_ids)
+        )
+        return summary
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado ao atualizar current para batch=%s", date)
+        raise AirflowFailException(f"update_current_table falhou: {e}") from e
@@ -0,0 +1,22 @@
+import os
+
+from airflow.exceptions import AirflowFailException
+
+EXECUTION_MODE_ENV = "OPENBREWERYDB_EXECUTION_MODE"
+MULTI_DAG = "multi_dag"  # extração -> silver -> gold em DAGs separadas (Dataset triggers)
+FUSED = "fused"  # extração -> uma DAG raw->silver->gold em processo único
+EXECUTION_MODES = (MULTI_DAG, FUSED)
+
+
+def execution_mode() -> str:
+    """
+    Modo de execução do deployment (`OPENBREWERYDB_EXECUTION_MODE`, padrão multi_dag).
+    Lido no parse das DAGs: só as DAGs do modo ativo são registradas.
+
+    Raises:
+        AirflowFailException: Se o valor não for um modo conhecido.
+    """
+    mode = (os.environ.get(EXECUTION_MODE_ENV) or MULTI_DAG).strip().lower()
+    if mode not in EXECUTION_MODES:
+        raise AirflowFailException(f"{EXECUTION_MODE_ENV} inválido: {mode!r} (esperado: {', '.join(EXECUTION_MODES)})")
+    return mode
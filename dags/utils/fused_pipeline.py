@@ -0,0 +1,235 @@
+import os
+import threading
+from contextlib import closing
+from typing import Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .aggregation import CountAccumulator, GROUP_KEYS
+from .gold_partials import partition_fingerprint, partition_key
+from .gold_pipeline import save_gold_partials, write_empty_gold, write_gold_totals
+from .manifest import collecting_visitor
+from .metrics import instrumented, record, record_files
+from .normalization import normalize_brewery_table, normalize_name
+from .parquet_profile import ParquetWriteProfile, DEFAULT_WRITE_PROFILE
+from .partition_stats import write_partition_stats
+from .prefetch import DEFAULT_PREFETCH_DEPTH, prefetch
+from .raw_reader import read_raw_table
+from .remove_duplicates_batch import deduplicate_frame
+from .schema import DIMENSION_COLUMNS
+from .sketches import DEFAULT_SKETCH_CONFIG, SketchConfig
+from .silver_pipeline import clear_batch, map_dimensions
+from .update_dim import update_dim
+from . import storage
+
+
+class DimensionStore:
+    """
+    De-para original -> normalizado das dimensões, mantido em memória e
+    compartilhável entre batches (ex.: backfill de várias datas em threads).
+    Valores novos são normalizados uma única vez (`normalize_name`) e ficam
+    pendentes até `flush`, que grava cada dimensão com uma chamada a `update_dim`.
+    """
+
+    def __init__(self):
+        self.mappings: dict[str, dict[str, str]] = {col: {} for col in DIMENSION_COLUMNS}
+        self._pending: dict[str, dict[str, str]] = {col: {} for col in DIMENSION_COLUMNS}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> dict[str, dict[str, str]]:
+        """Cópia dos de-paras conhecidos (para devolver de um worker de processo)."""
+        with self._lock:
+            return {c: dict(m) for c, m in self.mappings.items()}
+
+    def __getstate__(self) -> dict:
+        # Cópia enviada a workers de processo: o lock não é serializável
+        return {"mappings": self.snapshot()}
+
+    def __setstate__(self, state: dict) -> None:
+        self.mappings = state["mappings"]
+        self._pending = {col: {} for col in DIMENSION_COLUMNS}
+        self._lock = threading.Lock()
+
+    def arrays_for(self, table: pa.Table) -> dict[str, tuple[pa.Array, pa.Array]]:
+        """Registra os valores de `table` ainda não vistos e devolve os arrays para `map_dimensions`."""
+        dims = {}
+        for col in DIMENSION_COLUMNS:
+            values = [v for v in pc.unique(table[col]).to_pylist() if v is not None]
+            with self._lock:
+                known = self.mappings[col]
+                for value in values:
+                    if value not in known:
+                        known[value] = self._pending[col][value] = normalize_name(value)
+                mapping = dict(known)
+            dims[col] = (pa.array(list(mapping.keys()), type=pa.string()),
+                         pa.array(list(mapping.values()), type=pa.string()))
+        return dims
+
+    def merge(self, mappings: dict[str, dict[str, str]]) -> None:
+        """Incorpora de-paras descobertos por outro processo (marcados como pendentes)."""
+        with self._lock:
+            for col, mapping in mappings.items():
+                for value, norm in mapping.items():
+                    if value not in self.mappings[col]:
+                        self.mappings[col][value] = self._pending[col][value] = norm
+
+    def flush(self, silver_path_dim: str) -> int:
+        """Grava os valores pendentes nas dimensões parquet; devolve quantos foram gravados."""
+        with self._lock:
+            pending, self._pending = self._pending, {col: {} for col in DIMENSION_COLUMNS}
+        storage.makedirs(silver_path_dim)
+        for col, mapping in pending.items():
+            if not mapping:
+                continue
+            update_dim(pd.DataFrame({col: list(mapping.keys()), f"{col}_norm": list(mapping.values())}),
+                       col, f"{col}_norm", os.path.join(silver_path_dim, f"dim_{col}.parquet"))
+        return sum(len(m) for m in pending.values())
+
+
+def _partition_of(path: str, batch_path: str) -> str:
+    """partition_key de um arquivo escrito em batch=<date>/country=../state=../part=../"""
+    parts = dict(p.split("=", 1) for p in os.path.relpath(path, batch_path).split(os.sep) if "=" in p)
+    return partition_key(parts["country"], parts["state"])
+
+
+@instrumented("fused_pipeline", batch=lambda a: a["date"])
+def fused_pipeline(
+    raw_files: Sequence[str],
+    date: str,
+    silver_path_fact: str,
+    silver_path_dim: str,
+    gold_path: str,
+    batch_size: int = 10,
+    profile: ParquetWriteProfile = DEFAULT_WRITE_PROFILE,
+    sketch_config: SketchConfig | None = DEFAULT_SKETCH_CONFIG,
+    dims: DimensionStore | None = None,
+    prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+) -> list[str]:
+    """
+    Execução fundida raw -> silver -> gold em um único processo. Os arquivos raw são
+    lidos em lotes de `batch_size`, normalizados e mapeados nas dimensões em memória;
+    a deduplicação e a agregação rodam sobre a tabela do batch inteiro, sem reler a
+    silver. Grava as mesmas saídas do fluxo em três DAGs: dimensões, fato silver
+    (batch/country/state/part + `_stats.json`) e gold (total, rollups, parciais, sketches).
+
+    Args:
+        raw_files: Arquivos JSON da raw do batch (manifesto da extração).
+        date: Batch (YYYY-MM-DD).
+        silver_path_fact: Caminho base da fato silver.
+        silver_path_dim: Caminho das dimensões parquet.
+        gold_path: Diretório do batch gold (ex.: '<gold>/batch=<date>').
+        batch_size: Nº de arquivos raw por lote de leitura (vira a partição `part`).
+        profile: Layout dos Parquet da silver.
+        sketch_config: Limites de erro dos sketches da gold (ver `gold_pipeline`); None desliga.
+        dims: De-para compartilhado entre batches. Informado, as dimensões parquet não
+            são gravadas aqui (quem compartilha chama `dims.flush`); None = de-para
+            local, gravado ao final.
+        prefetch_depth: Lotes raw lidos antecipadamente (thread de fundo) enquanto o
+            lote atual é normalizado.
+
+    Returns:
+        Arquivos Parquet escritos na fato silver (para o manifesto).
+
+    Raises:
+        AirflowFailException: Em falhas de leitura, validação ou escrita.
+    """
+    log = LoggingMixin().log
+    batch_str = str(date)
+    batch_path = os.path.join(silver_path_fact, f"batch={batch_str}")
+    written: list[str] = []
+    log.info("Início fused_pipeline batch=%s arquivos=%s silver=%s gold=%s",
+             batch_str, len(raw_files), silver_path_fact, gold_path)
+
+    try:
+        # Reprocessar o dia substitui o batch silver inteiro
+        clear_batch(silver_path_fact, batch_str)
+
+        # 1) raw -> tabela normalizada, lote a lote; de-para das dimensões acumulado em memória
+        store = dims if dims is not None else DimensionStore()
+        tables: list[pa.Table] = []
+        rows_in = 0
+        offsets = range(0, len(raw_files), batch_size)
+        with closing(prefetch(offsets, lambda i: read_raw_table(list(raw_files[i:i + batch_size])),
+                              depth=prefetch_depth)) as loaded:
+            for i, table in loaded:
+                if table.num_rows == 0:
+                    log.warning("Lote vazio após leitura (%s arquivos); pulando.", len(raw_files[i:i + batch_size]))
+                    continue
+                table = normalize_brewery_table(table)
+                rows_in += table.num_rows
+
+                table = map_dimensions(table, store.arrays_for(table))
+                tables.append(table.append_column("part", pa.repeat(pa.scalar(str(i)), table.num_rows)))
+
+        record(rows_in=rows_in)
+        record_files(raw_files, written=False)
+        if not tables:
+            log.warning("Nenhum dado na raw para batch=%s; gold vazia.", batch_str)
+            write_empty_gold(gold_path)
+            return written
+
+        # 2) Dimensões: uma escrita por dimensão para o batch inteiro
+        if dims is None:
+            store.flush(silver_path_dim)
+
+        # 3) Deduplicação em memória (mesma regra da remove_duplicates_batch)
+        table = pa.concat_tables(tables)
+        df = deduplicate_frame(table.to_pandas(), f"batch={batch_str}")
+        log.info("Dedup batch=%s: antes=%s depois=%s removidos=%s",
+                 batch_str, table.num_rows, len(df), table.num_rows - len(df))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        record(rows_out=table.num_rows)
+
+        # 4) Silver: escrita única, já deduplicada
+        table = profile.sort(table.append_column("batch", pa.repeat(pa.scalar(batch_str), table.num_rows)))
+        try:
+            filesystem, base_dir = storage.arrow_filesystem(silver_path_fact)
+            ds.write_dataset(
+                data=table,
+                base_dir=base_dir,
+                filesystem=filesystem,
+                format="parquet",
+                partitioning=["batch", "country", "state", "part"],
+                partitioning_flavor="hive",
+                existing_data_behavior="overwrite_or_ignore",
+                file_visitor=collecting_visitor(written, silver_path_fact),
+                **profile.write_dataset_kwargs(),
+            )
+        except Exception as e:
+            log.exception("Falha ao escrever parquet batch=%s", batch_str)
+            raise AirflowFailException(f"Erro ao escrever parquet: {e}") from e
+        write_partition_stats(table.drop_columns(["batch"]), batch_path)
+        log.info("Silver salvo em %s: rows=%s arquivos=%s", batch_path, table.num_rows, len(written))
+
+        # 5) Gold: agrega a tabela em memória; parciais por country/state com o
+        #    mesmo fingerprint da gold_pipeline (reaproveitáveis pelo próximo batch)
+        leaf = CountAccumulator(GROUP_KEYS)
+        leaf.add_table(table)
+        files_by_partition: dict[str, list[str]] = {}
+        for path in written:
+            files_by_partition.setdefault(_partition_of(path, batch_path), []).append(path)
+        partitions = sorted({(key[0], key[1]) for key in leaf.counts})
+        partials: dict[str, tuple[str, CountAccumulator]] = {}
+        for country, state in partitions:
+            pk = partition_key(country, state)
+            partials[pk] = (partition_fingerprint(files_by_partition.get(pk, []), batch_path),
+                            CountAccumulator(GROUP_KEYS))
+        for key, n in leaf.counts.items():
+            acc = partials[partition_key(key[0], key[1])][1]
+            acc.add_counts([key], [n])
+            acc.rows += n
+
+        acc = save_gold_partials(gold_path, GROUP_KEYS, partials, partitions, sketch_config)
+        write_gold_totals(gold_path, acc, len(partitions))
+        log.info("fused_pipeline concluída: batch=%s gold=%s", batch_str, gold_path)
+        return written
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado na fused_pipeline")
+        raise AirflowFailException(f"fused_pipeline falhou: {e}") from e
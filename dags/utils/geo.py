@@ -0,0 +1,280 @@
+import json
+import math
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+GEO_DIR = "geo"
+DENSITY_DIR = "density"
+INDEX_DIR = "index"
+DEFAULT_RESOLUTIONS = (2, 3, 4, 5)
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+_BASE32 = np.frombuffer(b"0123456789bcdefghjkmnpqrstuvwxyz", dtype=np.uint8)
+
+
+def geohash_encode(lat: np.ndarray, lon: np.ndarray, precision: int) -> np.ndarray:
+    """
+    Geohash vetorizado: quantiza lat/lon em inteiros, intercala os bits (lon primeiro)
+    e converte grupos de 5 bits em base32.
+
+    Returns:
+        Array de strings com `precision` caracteres.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    n_bits = 5 * precision
+    lon_bits, lat_bits = (n_bits + 1) // 2, n_bits // 2
+
+    lat_q = np.clip(((lat + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    lon_q = np.clip(((lon + 180.0) / 360.0 * (1 << lon_bits)).astype(np.int64), 0, (1 << lon_bits) - 1)
+
+    code = np.zeros(lat.shape, dtype=np.int64)
+    i_lon, i_lat = lon_bits - 1, lat_bits - 1
+    for bit in range(n_bits):
+        code <<= 1
+        if bit % 2 == 0:
+            code |= (lon_q >> i_lon) & 1
+            i_lon -= 1
+        else:
+            code |= (lat_q >> i_lat) & 1
+            i_lat -= 1
+
+    shifts = np.arange(precision - 1, -1, -1, dtype=np.int64) * 5
+    chars = _BASE32[(code[:, None] >> shifts[None, :]) & 31]
+    return np.ascontiguousarray(chars).view(f"S{precision}").ravel().astype(str)
+
+
+def geohash_center(geohash: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    """Centro (lat, lon) das células geohash."""
+    lookup = np.full(256, -1, dtype=np.int64)
+    lookup[_BASE32] = np.arange(32)
+    raw = np.asarray(geohash, dtype=f"S{precision}").view(np.uint8).reshape(-1, precision)
+    code = np.zeros(len(raw), dtype=np.int64)
+    for j in range(precision):
+        code = (code << 5) | lookup[raw[:, j]]
+
+    n_bits = 5 * precision
+    lon_bits, lat_bits = (n_bits + 1) // 2, n_bits // 2
+    lat_q = np.zeros(len(raw), dtype=np.int64)
+    lon_q = np.zeros(len(raw), dtype=np.int64)
+    for bit in range(n_bits):
+        b = (code >> (n_bits - 1 - bit)) & 1
+        if bit % 2 == 0:
+            lon_q = (lon_q << 1) | b
+        else:
+            lat_q = (lat_q << 1) | b
+    lat = (lat_q + 0.5) * 180.0 / (1 << lat_bits) - 90.0
+    lon = (lon_q + 0.5) * 360.0 / (1 << lon_bits) - 180.0
+    return lat, lon
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def density_table(lat: np.ndarray, lon: np.ndarray, precision: int) -> pa.Table:
+    """Contagem por célula geohash de `precision` caracteres, com o centro da célula."""
+    cells, counts = np.unique(geohash_encode(lat, lon, precision), return_counts=True)
+    c_lat, c_lon = geohash_center(cells, precision)
+    table = pa.table({
+        "geohash": pa.array(cells, pa.string()),
+        "count": pa.array(counts, pa.int64()),
+        "center_lat": pa.array(c_lat, pa.float64()),
+        "center_lon": pa.array(c_lon, pa.float64()),
+    })
+    return table.sort_by([("count", "descending"), ("geohash", "ascending")])
+
+
+class GeoGridIndex:
+    """
+    Índice espacial por buckets de grade (lat/lon em células de `cell_deg` graus).
+
+    Os pontos ficam ordenados pela célula, então cada célula é uma fatia contígua
+    dos arrays; uma consulta visita só as células que cobrem o raio e calcula
+    haversine apenas para esses candidatos. Os arrays podem ser gravados em .npy
+    e reabertos com memory-map.
+    """
+
+    def __init__(self, lat, lon, ids, cell_deg: float, cells=None, starts=None):
+        self.cell_deg = float(cell_deg)
+        self.n_cols = int(math.ceil(360.0 / self.cell_deg))
+        self.n_rows = int(math.ceil(180.0 / self.cell_deg))
+        self.lat, self.lon, self.ids = lat, lon, ids
+        if cells is None:
+            cell = self._cell(lat, lon)
+            order = np.argsort(cell, kind="stable")
+            self.lat, self.lon, self.ids = lat[order], lon[order], ids[order]
+            cells, starts = np.unique(cell[order], return_index=True)
+        self.cells = cells
+        self.starts = np.append(starts, len(self.lat)).astype(np.int64)
+
+    @classmethod
+    def build(cls, lat, lon, ids, cell_deg: float = 0.5) -> "GeoGridIndex":
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        ids = np.asarray(["" if i is None else str(i) for i in ids])
+        return cls(lat, lon, ids, cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _row_col(self, lat, lon):
+        row = np.clip(np.floor((np.asarray(lat) + 90.0) / self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+        col = np.floor((np.asarray(lon) + 180.0) / self.cell_deg).astype(np.int64) % self.n_cols
+        return row, col
+
+    def _cell(self, lat, lon):
+        row, col = self._row_col(lat, lon)
+        return row * self.n_cols + col
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        dlat = radius_km / KM_PER_DEG_LAT
+        r0, _ = self._row_col(max(-90.0, lat - dlat), lon)
+        r1, _ = self._row_col(min(90.0, lat + dlat), lon)
+        max_abs_lat = min(90.0, abs(lat) + dlat)
+        cos_lat = math.cos(math.radians(max_abs_lat))
+        dlon = dlat / cos_lat if cos_lat > 1e-9 else 360.0
+        if dlon >= 180.0:
+            cols = np.arange(self.n_cols)
+        else:
+            _, c0 = self._row_col(lat, lon - dlon)
+            n = int(math.ceil(2 * dlon / self.cell_deg)) + 2
+            cols = (c0 + np.arange(n)) % self.n_cols
+        wanted = np.unique(np.arange(int(r0), int(r1) + 1)[:, None] * self.n_cols + cols[None, :])
+
+        # Células presentes no índice (cells é ordenado)
+        pos = np.searchsorted(self.cells, wanted)
+        inside = pos < len(self.cells)
+        pos, wanted = pos[inside], wanted[inside]
+        pos = pos[self.cells[pos] == wanted]
+        if len(pos) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(self.starts[p], self.starts[p + 1]) for p in pos])
+
+    def within(self, lat: float, lon: float, radius_km: float) -> list[tuple[str, float]]:
+        """Pontos a até `radius_km` de (lat, lon), ordenados por distância."""
+        idx = self._candidates(lat, lon, radius_km)
+        if len(idx) == 0:
+            return []
+        dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        keep = dist <= radius_km
+        idx, dist = idx[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return [(str(self.ids[i]), float(d)) for i, d in zip(idx[order], dist[order])]
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> list[tuple[str, float]]:
+        """k vizinhos mais próximos: raio crescente até cobrir k pontos (resultado exato)."""
+        if len(self) == 0 or k <= 0:
+            return []
+        radius = self.cell_deg * KM_PER_DEG_LAT
+        while True:
+            found = self.within(lat, lon, radius)
+            # Todos os pontos a <= radius estão em `found`; se há k, o k-ésimo global também
+            if len(found) >= k or radius >= math.pi * EARTH_RADIUS_KM:
+                return found[:k]
+            radius *= 2
+
+    def save(self, path: str) -> str:
+        """Grava os arrays em `path/*.npy` + `meta.json`."""
+        os.makedirs(path, exist_ok=True)
+        for name in ("lat", "lon", "ids", "cells", "starts"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"cell_deg": self.cell_deg, "points": len(self)}, f)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "GeoGridIndex":
+        mode = "r" if mmap else None
+        arrays = {n: np.load(os.path.join(path, f"{n}.npy"), mmap_mode=mode)
+                  for n in ("lat", "lon", "ids", "cells", "starts")}
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(arrays["lat"], arrays["lon"], arrays["ids"], meta["cell_deg"],
+                   cells=arrays["cells"], starts=arrays["starts"][:-1])
+
+
+def build_geo_gold(
+    silver_path: str,
+    gold_path: str,
+    resolutions: tuple[int, ...] = DEFAULT_RESOLUTIONS,
+    cell_deg: float = 0.5,
+    files: list[str] | None = None,
+) -> dict:
+    """
+    Estágio geoespacial da Gold: lê só id/latitude/longitude da silver, grava a
+    densidade por célula geohash em `geo/density/precision=N/data.parquet` (uma
+    tabela por resolução; a célula-pai é o prefixo do geohash) e o índice de
+    grade em `geo/index/` para consultas por raio e k vizinhos.
+
+    Args:
+        silver_path: Caminho da silver (Hive).
+        gold_path: Diretório do batch gold.
+        resolutions: Precisões de geohash (nº de caracteres).
+        cell_deg: Tamanho da célula do índice em graus.
+        files: Arquivos do batch vindos do manifesto da silver (sem listar o
+            diretório). None = descobre os arquivos em `silver_path`.
+
+    Returns:
+        Resumo com nº de pontos válidos e células por resolução.
+
+    Raises:
+        AirflowFailException: Se faltarem as colunas de coordenadas ou em falhas de escrita.
+    """
+    log = LoggingMixin().log
+    try:
+        summary = {"points": 0, "skipped": 0, "cells": {}}
+        if not os.path.isdir(silver_path):
+            log.warning("Silver path não existe: %s", silver_path)
+            return summary
+
+        if files is None:
+            dataset = ds.dataset(silver_path, format="parquet", partitioning="hive")
+        elif files:
+            dataset = ds.dataset(files, format="parquet", partitioning="hive", partition_base_dir=silver_path)
+        else:
+            log.warning("Manifesto da silver sem arquivos: %s", silver_path)
+            return summary
+        missing = [c for c in ("latitude", "longitude") if c not in dataset.schema.names]
+        if missing:
+            raise AirflowFailException(f"Colunas ausentes em build_geo_gold: {missing}")
+        columns = ["latitude", "longitude"] + (["id"] if "id" in dataset.schema.names else [])
+        table = dataset.to_table(columns=columns)
+
+        lat = pc.cast(table["latitude"], pa.float64()).to_numpy(zero_copy_only=False)
+        lon = pc.cast(table["longitude"], pa.float64()).to_numpy(zero_copy_only=False)
+        valid = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+        ids = table["id"].to_numpy(zero_copy_only=False) if "id" in columns else np.arange(len(lat)).astype(str)
+        lat, lon, ids = lat[valid], lon[valid], ids[valid]
+        summary["points"], summary["skipped"] = int(valid.sum()), int((~valid).sum())
+
+        geo_path = os.path.join(gold_path, GEO_DIR)
+        for precision in resolutions:
+            out_dir = os.path.join(geo_path, DENSITY_DIR, f"precision={precision}")
+            os.makedirs(out_dir, exist_ok=True)
+            density = density_table(lat, lon, precision)
+            pq.write_table(density, os.path.join(out_dir, "data.parquet"))
+            summary["cells"][precision] = density.num_rows
+
+        GeoGridIndex.build(lat, lon, ids, cell_deg).save(os.path.join(geo_path, INDEX_DIR))
+        log.info(
+            "Geo gold gravado em %s (pontos=%s sem coordenadas=%s células=%s)",
+            geo_path, summary["points"], summary["skipped"], summary["cells"]
+        )
+        return summary
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado em build_geo_gold")
+        raise AirflowFailException(f"build_geo_gold falhou: {e}") from e
@@ -1,6 +1,25 @@
+import os
+
 import requests
 from airflow.utils.log.logging_mixin import LoggingMixin
+from .metrics import instrumented, record
+
+API_URL_ENV = "OPENBREWERYDB_API_URL"
+DEFAULT_API_URL = "https://api.openbrewerydb.org/v1/breweries"
+
+
+def api_base_url() -> str:
+    """
+    URL base do endpoint de breweries: `OPENBREWERYDB_API_URL` se definida
+    (ex.: servidor mock local em benchmarks/testes), senão a API pública.
+
+    Returns:
+        URL sem barra final; o meta fica em `<base>/meta`.
+    """
+    return (os.environ.get(API_URL_ENV) or DEFAULT_API_URL).rstrip("/")
+
 
+@instrumented("get_api_data")
 def get_api_data(link: str) -> dict:
     """
     Faz GET em `link` e retorna o JSON.
@@ -27,6 +46,7 @@ def get_api_data(link: str) -> dict:
         try:
             payload = response.json()
             log.info("JSON parse ok (%s bytes)", len(response.content))
+            record(bytes_read=len(response.content), rows_out=len(payload) if isinstance(payload, list) else 0)
             return payload
         except ValueError as e:
             preview = (response.text or "")[:200]
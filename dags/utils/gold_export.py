@@ -0,0 +1,131 @@
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .aggregation import GROUP_KEYS, ROLLUP_LEVELS, rollup_table
+
+TOTAL_FILE = "total.parquet"
+ROLLUPS_FILE = "rollups.parquet"
+
+_DDL = """
+CREATE TABLE breweries_count (
+    country TEXT, state TEXT, city TEXT, brewery_type TEXT, count INTEGER NOT NULL
+);
+CREATE TABLE breweries_rollup (
+    grouping_level TEXT NOT NULL,
+    country TEXT, state TEXT, city TEXT, brewery_type TEXT, count INTEGER NOT NULL
+);
+CREATE TABLE export_metadata (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_INDEXES = """
+CREATE INDEX ix_count_keys ON breweries_count (country, state, city, brewery_type);
+CREATE INDEX ix_count_type ON breweries_count (brewery_type, country, state);
+CREATE INDEX ix_count_count ON breweries_count (count DESC);
+CREATE INDEX ix_rollup_keys ON breweries_rollup (grouping_level, country, state, city, brewery_type);
+CREATE INDEX ix_rollup_rank ON breweries_rollup (grouping_level, count DESC);
+"""
+
+
+def latest_gold_batch(gold_root: str) -> str | None:
+    """Dia do `batch=<dia>` mais novo em `gold_root` com total.parquet (None se não houver)."""
+    if not os.path.isdir(gold_root):
+        return None
+    days = [d.split("=", 1)[1] for d in os.listdir(gold_root)
+            if d.startswith("batch=") and os.path.exists(os.path.join(gold_root, d, TOTAL_FILE))]
+    return max(days) if days else None
+
+
+def _view_name(level: tuple[str, ...]) -> str:
+    return "v_by_" + "_".join(level)
+
+
+def export_gold_sqlite(gold_batch_path: str, db_path: str, batch: str | None = None) -> str:
+    """
+    Exporta um batch gold para um arquivo SQLite indexado, para BI local.
+
+    Tabelas `breweries_count` (folha) e `breweries_rollup` (todos os níveis), índices
+    nas chaves de agrupamento e uma view por nível (`v_by_country`,
+    `v_by_country_state`, ...). O arquivo é montado em `<db_path>.tmp` e trocado
+    por `os.replace`, então leitores veem o export anterior ou o novo completo.
+
+    Args:
+        gold_batch_path: Diretório do batch gold (com total.parquet e, se houver, rollups.parquet).
+        db_path: Caminho do arquivo SQLite de saída.
+        batch: Identificador do batch gravado em `export_metadata`.
+
+    Returns:
+        Caminho do arquivo SQLite.
+
+    Raises:
+        AirflowFailException: Se o total.parquet não existir ou em falhas de escrita.
+    """
+    log = LoggingMixin().log
+    total_path = os.path.join(gold_batch_path, TOTAL_FILE)
+    rollups_path = os.path.join(gold_batch_path, ROLLUPS_FILE)
+    tmp = f"{db_path}.tmp"
+
+    try:
+        if not os.path.exists(total_path):
+            raise AirflowFailException(f"total.parquet não encontrado: {total_path}")
+
+        leaf = pq.read_table(total_path)
+        rollups = pq.read_table(rollups_path) if os.path.exists(rollups_path) else rollup_table(leaf)
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        conn = sqlite3.connect(tmp)
+        try:
+            # Arquivo novo e descartável até o replace: sem journal/sync durante a carga
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.executescript(_DDL)
+            with conn:
+                conn.executemany(
+                    "INSERT INTO breweries_count VALUES (?, ?, ?, ?, ?)",
+                    zip(*(leaf[c].to_pylist() for c in [*GROUP_KEYS, "count"])),
+                )
+                conn.executemany(
+                    "INSERT INTO breweries_rollup VALUES (?, ?, ?, ?, ?, ?)",
+                    zip(*(rollups[c].to_pylist() for c in ["grouping_level", *GROUP_KEYS, "count"])),
+                )
+                conn.executemany(
+                    "INSERT INTO export_metadata VALUES (?, ?)",
+                    [
+                        ("batch", batch or ""),
+                        ("source", gold_batch_path),
+                        ("exported_at", datetime.now(timezone.utc).isoformat()),
+                    ],
+                )
+            # Índices depois da carga (mais rápido que manter durante os inserts)
+            conn.executescript(_INDEXES)
+            for level in ROLLUP_LEVELS:
+                cols = ", ".join([*level, "count"])
+                conn.execute(
+                    f"CREATE VIEW {_view_name(level)} AS SELECT {cols} FROM breweries_rollup "
+                    f"WHERE grouping_level = '{','.join(level)}'"
+                )
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp, db_path)
+        log.info(
+            "Export SQLite gravado: %s (batch=%s linhas=%s rollups=%s)",
+            db_path, batch, leaf.num_rows, rollups.num_rows
+        )
+        return db_path
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado no export SQLite da gold")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise AirflowFailException(f"export_gold_sqlite falhou: {e}") from e
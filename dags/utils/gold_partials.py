@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+from .aggregation import CountAccumulator
+from . import storage
+from .partition_stats import STATS_FILE
+
+PARTIALS_DIR = "_partials"
+PARTIALS_FILE = "partials.parquet"
+MANIFEST_FILE = "manifest.json"
+
+
+def partition_key(country, state) -> str:
+    return f"country={country}/state={state}"
+
+
+def partition_fingerprint(paths: list[str], silver_path: str) -> str:
+    """
+    Fingerprint de uma partição country/state da silver.
+
+    Usa os sidecars `_stats.json` das parts (soma dos hashes de linha + linhas),
+    que independe de como as linhas se distribuem entre parts/arquivos e portanto
+    é estável entre batches com o mesmo conteúdo. Sem sidecar em alguma part,
+    cai para caminho relativo + tamanho + mtime dos arquivos.
+    """
+    part_dirs = sorted({os.path.dirname(p) for p in paths})
+    total_rows, hash_sum = 0, 0
+    for stats in storage.map_files(_read_sidecar, part_dirs):
+        if stats is None or "row_hash_sum" not in stats:
+            break
+        total_rows += stats["rows"]
+        hash_sum = (hash_sum + stats["row_hash_sum"]) % 2**64
+    else:
+        return hashlib.sha256(f"stats:rows={total_rows}:sum={hash_sum}".encode()).hexdigest()
+
+    h = hashlib.sha256(b"files")
+    paths = sorted(paths)
+    for p, (size, mtime_ns) in zip(paths, storage.map_files(storage.file_info, paths)):
+        h.update(f"{os.path.relpath(p, silver_path)}:{size}:{mtime_ns};".encode())
+    return h.hexdigest()
+
+
+def _read_sidecar(part_dir: str) -> dict | None:
+    sidecar = os.path.join(part_dir, STATS_FILE)
+    if not storage.exists(sidecar):
+        return None
+    with storage.open_file(sidecar, "rb") as f:
+        return json.load(f)
+
+
+def load_partials(gold_batch_path: str | None, keys: list[str]) -> dict[str, tuple[str, CountAccumulator]]:
+    """
+    Lê as parciais persistidas de um batch gold.
+
+    Returns:
+        Dict partition_key -> (fingerprint, CountAccumulator). Vazio se não houver.
+    """
+    if not gold_batch_path:
+        return {}
+    base = os.path.join(gold_batch_path, PARTIALS_DIR)
+    manifest_path = os.path.join(base, MANIFEST_FILE)
+    if not storage.exists(manifest_path):
+        return {}
+    with storage.open_file(manifest_path, "rb") as f:
+        manifest = json.load(f)
+    if manifest.get("keys") != keys:
+        return {}
+
+    table = storage.read_table(os.path.join(base, PARTIALS_FILE))
+    out = {pk: (fp, CountAccumulator(keys)) for pk, fp in manifest["fingerprints"].items()}
+    cols = [table[k].to_pylist() for k in keys]
+    for pk, key, n in zip(table["partition"].to_pylist(), zip(*cols), table["count"].to_pylist()):
+        if pk in out:
+            acc = out[pk][1]
+            acc.add_counts([key], [n])
+            acc.rows += n
+    return out
+
+
+def save_partials(gold_batch_path: str, keys: list[str], partials: dict[str, tuple[str, CountAccumulator]]) -> None:
+    """Persiste as parciais por partição (um parquet + manifest com fingerprints)."""
+    base = os.path.join(gold_batch_path, PARTIALS_DIR)
+    storage.makedirs(base)
+
+    columns = {"partition": []}
+    columns.update({k: [] for k in keys})
+    columns["count"] = []
+    for pk, (_, acc) in sorted(partials.items()):
+        for key, n in acc.counts.items():
+            columns["partition"].append(pk)
+            for k, v in zip(keys, key):
+                columns[k].append(v)
+            columns["count"].append(n)
+    table = pa.table({
+        name: pa.array(values, type=pa.int64() if name == "count" else pa.string())
+        for name, values in columns.items()
+    })
+
+    if storage.is_local(base):
+        tmp = os.path.join(base, f"{PARTIALS_FILE}.tmp")
+        storage.write_table(table, tmp)
+        os.replace(tmp, os.path.join(base, PARTIALS_FILE))
+    else:
+        # Object store: o PUT do objeto já é atômico
+        storage.write_table(table, os.path.join(base, PARTIALS_FILE))
+
+    manifest = {"keys": keys, "fingerprints": {pk: fp for pk, (fp, _) in sorted(partials.items())}}
+    storage.write_bytes(os.path.join(base, MANIFEST_FILE),
+                        json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def previous_batch_path(gold_root: str, day: str) -> str | None:
+    """Último `batch=<data>` anterior a `day` em `gold_root` que tenha parciais persistidas."""
+    if not storage.isdir(gold_root):
+        return None
+    candidates = sorted(
+        d for d in (os.path.basename(p) for p in storage.glob(os.path.join(gold_root, "batch=*")))
+        if d.split("=", 1)[1] < day
+        and storage.exists(os.path.join(gold_root, d, PARTIALS_DIR, MANIFEST_FILE))
+    )
+    return os.path.join(gold_root, candidates[-1]) if candidates else None
@@ -1,25 +1,150 @@
 import os
-import pandas as pd
-import pyarrow as pa
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pyarrow.dataset as ds
 from airflow.exceptions import AirflowFailException
 from airflow.utils.log.logging_mixin import LoggingMixin
 from .required_columns import require_columns
+from .aggregation import CountAccumulator, GROUP_KEYS, rollup_table, tree_reduce
+from .gold_partials import PARTIALS_DIR, load_partials, partition_fingerprint, partition_key, save_partials
+from .sketches import DEFAULT_SKETCH_CONFIG, SKETCHES_FILE, PartitionSketches, SketchConfig, write_sketches
+from .metrics import batch_from_path, instrumented, record, record_files
+from . import storage
+
+
+def _fragment_groups(dataset: ds.FileSystemDataset, silver_path: str) -> dict[tuple, list[str]]:
+    """Agrupa os arquivos do dataset por partição (country, state), com caminhos no formato de `silver_path`."""
+    groups: dict[tuple, list[str]] = defaultdict(list)
+    for fragment in dataset.get_fragments():
+        pkeys = ds.get_partition_keys(fragment.partition_expression)
+        groups[(pkeys.get("country"), pkeys.get("state"))].append(storage.unstrip(fragment.path, silver_path))
+    return groups
+
+
+def _aggregate_files(paths: list[str], silver_path: str, keys: list[str], batch_size: int) -> CountAccumulator:
+    """Contagem parcial de um grupo de arquivos (executada em worker)."""
+    filesystem, base_dir = storage.arrow_filesystem(silver_path)
+    dataset = ds.dataset([storage.strip(p) for p in paths], format="parquet", partitioning="hive",
+                         partition_base_dir=base_dir, filesystem=filesystem)
+    acc = CountAccumulator(keys)
+    for batch in dataset.scanner(columns=keys, batch_size=batch_size, use_threads=False).to_batches():
+        acc.add_table(batch)
+    return acc
+
+
+def save_gold_partials(
+    gold_path: str,
+    keys: list[str],
+    partials: dict[str, tuple[str, CountAccumulator]],
+    partitions: list[tuple],
+    sketch_config: SketchConfig | None,
+) -> CountAccumulator:
+    """
+    Persiste as parciais por country/state (e os sketches, se configurados) e
+    devolve a soma delas.
+
+    Args:
+        gold_path: Diretório do batch gold.
+        keys: Chaves de agrupamento.
+        partials: partition_key -> (fingerprint, CountAccumulator).
+        partitions: Pares (country, state) presentes no batch.
+        sketch_config: Configuração dos sketches; None não grava sketches.
+
+    Returns:
+        Acumulador com as contagens folha do batch inteiro.
+    """
+    save_partials(gold_path, keys, partials)
+
+    if sketch_config is not None:
+        # Artefato de merge entre partições/batches: alimentados pelas parciais exatas da
+        # mesma passada (uma linha por grupo), não substituem o group-by exato
+        sketches = {}
+        for (country, state) in partitions:
+            sk = PartitionSketches(sketch_config)
+            sk.add_counts(partials[partition_key(country, state)][1].counts, keys)
+            sketches[(str(country), str(state))] = sk
+        write_sketches(sketches, os.path.join(gold_path, SKETCHES_FILE), sketch_config)
+        LoggingMixin().log.info("Sketches gravados: partições=%s", len(sketches))
+    return tree_reduce([a for _, a in partials.values()], CountAccumulator.merge) or CountAccumulator(keys)
+
+
+def _write_table_atomic(table, filepath: str) -> None:
+    # Leitores (GoldReader) podem recarregar o batch durante a escrita: grava ao lado e troca
+    tmp = f"{filepath}.tmp"
+    storage.write_table(table, tmp)
+    storage.replace(tmp, filepath)
+
+
+def write_gold_totals(gold_path: str, acc: CountAccumulator, n_partitions: int) -> str:
+    """
+    Grava 'rollups.parquet' e depois 'total.parquet' (ordenado por count desc, empates
+    por chave), cada um trocado atomicamente; devolve o total. O total por último:
+    quem detecta o batch por ele já encontra os rollups completos.
+    """
+    table_count = acc.to_table()
+
+    storage.makedirs(gold_path)
+    filepath = os.path.join(gold_path, "total.parquet")
+    rollups = rollup_table(table_count)
+    _write_table_atomic(rollups, os.path.join(gold_path, "rollups.parquet"))
+    _write_table_atomic(table_count, filepath)
+    record(rows_in=acc.rows, rows_out=table_count.num_rows)
+    record_files([os.path.join(gold_path, f) for f in ("total.parquet", "rollups.parquet", SKETCHES_FILE)
+                  if os.path.exists(os.path.join(gold_path, f))], written=True)
+
+    LoggingMixin().log.info(
+        "Gold gravado: %s (groups=%s rollup_rows=%s total_rows=%s partitions=%s)",
+        filepath, table_count.num_rows, rollups.num_rows, acc.rows, n_partitions
+    )
+    return filepath
+
+
+def write_empty_gold(gold_path: str, keys: list[str] = GROUP_KEYS) -> str:
+    """
+    Gold vazia do batch: total/rollups tipados (mesmo schema de um batch com dados),
+    trocados atomicamente, sem as parciais e sketches de um run anterior do batch.
+    """
+    storage.rmtree(os.path.join(gold_path, PARTIALS_DIR))
+    sketches = os.path.join(gold_path, SKETCHES_FILE)
+    if storage.exists(sketches):
+        storage.remove([sketches])
+    return write_gold_totals(gold_path, CountAccumulator(keys), 0)
 
 
+@instrumented("gold_pipeline", batch=lambda a: batch_from_path(a["gold_path"]))
 def gold_pipeline(
     silver_path: str,
     gold_path: str,
     batch_size: int = 65_536,
+    workers: int = 1,
+    pool: str = "thread",
+    previous_gold_path: str | None = None,
+    sketch_config: SketchConfig | None = DEFAULT_SKETCH_CONFIG,
+    files: list[str] | None = None,
 ) -> str:
     """
     Agrega contagem por (country, state, city, brewery_type) a partir da Silver Layer (Hive-style)
-    e grava um único parquet 'total.parquet' na Gold Layer.
+    e grava um único parquet 'total.parquet' na Gold Layer, mais 'rollups.parquet' com os
+    níveis country; country+state; country+state+city (com e sem brewery_type),
+    derivados das contagens folha na mesma passada.
+    Lê apenas as 4 colunas-chave e agrega cada lote em Arrow (`CountAccumulator`).
 
     Args:
         silver_path: Caminho base da Silver (parquet particionado Hive).
         gold_path: Diretório de saída da Gold.
         batch_size: Número de linhas por lote ao varrer o dataset.
+        workers: Nº de workers. Com workers > 1 cada partição country/state é agregada
+            em paralelo e as parciais são combinadas por tree reduction.
+        pool: "thread" ou "process" (executor usado quando workers > 1).
+        previous_gold_path: Batch gold anterior. As parciais por country/state cujo
+            fingerprint não mudou são reaproveitadas de `<previous_gold_path>/_partials`
+            e só as partições alteradas são reagregadas.
+        sketch_config: Limites de erro dos sketches por partição (HyperLogLog de city,
+            Count-Min/Space-Saving de brewery_type) gravados em 'sketches.parquet'.
+            None desliga os sketches.
+        files: Arquivos do batch silver vindos do manifesto da silver (sem listar
+            diretórios). None = descobre os arquivos em `silver_path`.
 
     Returns:
         Caminho do diretório gold_path.
@@ -28,75 +153,90 @@ def gold_pipeline(
         AirflowFailException: Em falhas de leitura/validação/escrita.
     """
     log = LoggingMixin().log
-    keys = ["country", "state", "city", "brewery_type"]
+    keys = GROUP_KEYS
     log.info("Início gold_pipeline silver=%s gold=%s batch_size=%s", silver_path, gold_path, batch_size)
 
     try:
-        if not os.path.isdir(silver_path):
+        if not storage.isdir(silver_path):
             log.warning("Silver path não existe: %s", silver_path)
             # Gera arquivo vazio com schema esperado
-            os.makedirs(gold_path, exist_ok=True)
-            empty = pd.DataFrame(columns=keys + ["count"])
-            empty.to_parquet(os.path.join(gold_path, "total.parquet"), index=False, engine="pyarrow")
+            write_empty_gold(gold_path, keys)
             return gold_path
 
-        dataset = ds.dataset(silver_path, format="parquet", partitioning="hive")
+        filesystem, base_dir = storage.arrow_filesystem(silver_path)
+        if files is None:
+            dataset = ds.dataset(base_dir, format="parquet", partitioning="hive", filesystem=filesystem)
+        elif files:
+            dataset = ds.dataset([storage.strip(f) for f in files], format="parquet", partitioning="hive",
+                                 partition_base_dir=base_dir, filesystem=filesystem)
+        else:
+            log.warning("Manifesto da silver sem arquivos: %s", silver_path)
+            write_empty_gold(gold_path, keys)
+            return gold_path
 
-        # Acumulador incremental: MultiIndex -> count
-        agg_series = None
-        scanner = dataset.scanner(batch_size=batch_size)
+        # Projeta só as chaves; sem elas no schema a validação acontece no 1º lote útil
+        has_keys = all(k in dataset.schema.names for k in keys)
+
+        if has_keys:
+            # Partições country/state são disjuntas: parciais por partição não se sobrepõem
+            groups = _fragment_groups(dataset, silver_path)
+            previous = load_partials(previous_gold_path, keys)
+            partials: dict[str, tuple[str, CountAccumulator]] = {}
+            pending: dict[str, tuple[str, list[str]]] = {}
+            for (country, state), paths in groups.items():
+                pk = partition_key(country, state)
+                fingerprint = partition_fingerprint(paths, silver_path)
+                prev = previous.get(pk)
+                if prev is not None and prev[0] == fingerprint:
+                    partials[pk] = prev
+                else:
+                    pending[pk] = (fingerprint, paths)
+            log.info(
+                "gold_pipeline incremental: partições=%s reaproveitadas=%s recalculadas=%s",
+                len(groups), len(partials), len(pending)
+            )
+            record_files([p for _, paths in pending.values() for p in paths], written=False)
+
+            if workers > 1 and len(pending) > 1:
+                executor_cls = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+                log.info("gold_pipeline paralelo: partições=%s workers=%s pool=%s", len(pending), workers, pool)
+                with executor_cls(max_workers=workers) as executor:
+                    futures = {
+                        pk: executor.submit(_aggregate_files, paths, silver_path, keys, batch_size)
+                        for pk, (_, paths) in pending.items()
+                    }
+                    for pk, future in futures.items():
+                        partials[pk] = (pending[pk][0], future.result())
+            else:
+                for pk, (fingerprint, paths) in pending.items():
+                    partials[pk] = (fingerprint, _aggregate_files(paths, silver_path, keys, batch_size))
 
-        n_rows = 0
-        n_batches = 0
+            acc = save_gold_partials(gold_path, keys, partials, list(groups), sketch_config)
+        else:
+            scanner = dataset.scanner(batch_size=batch_size)
+            record_files(dataset.files, written=False)
 
-        for batch in scanner.to_batches():
-            n_batches += 1
-            table = pa.Table.from_batches([batch])
-            if table.num_rows == 0:
-                continue
+            # Sem as chaves no schema: a validação acontece no 1º lote útil
+            acc = CountAccumulator(keys)
 
-            df_batch = table.to_pandas()
-            n_rows += len(df_batch)
+            for batch in scanner.to_batches():
+                if batch.num_rows == 0:
+                    continue
 
-            # valida chaves no primeiro batch útil
-            if agg_series is None:
-                require_columns(df_batch, keys, "silver_batch")
+                # valida chaves no primeiro batch útil
+                if acc.rows == 0:
+                    require_columns(batch.schema, keys, "silver_batch")
 
-            # groupby do lote atual
-            gb = (
-                df_batch
-                .groupby(keys, dropna=False)
-                .size()
-            )
+                acc.add_table(batch)
 
-            # agrega incrementalmente (soma por índice)
-            if agg_series is None:
-                agg_series = gb
-            else:
-                # alinhar índices e somar
-                agg_series = agg_series.add(gb, fill_value=0)
-
-        if agg_series is None or len(agg_series) == 0:
-            log.warning("Nenhum dado agregado encontrado. (batches=%s rows=%s)", n_batches, n_rows)
-            os.makedirs(gold_path, exist_ok=True)
-            empty = pd.DataFrame(columns=keys + ["count"])
-            empty.to_parquet(os.path.join(gold_path, "total.parquet"), index=False, engine="pyarrow")
+        # Partições country/state agregadas (0 quando o schema não tem as chaves)
+        n_partitions = len(partials) if has_keys else 0
+        if len(acc) == 0:
+            log.warning("Nenhum dado agregado encontrado. (partitions=%s rows=%s)", n_partitions, acc.rows)
+            write_empty_gold(gold_path, keys)
             return gold_path
 
-        # Finaliza dataframe ordenado
-        df_count = agg_series.astype("int64").reset_index()
-        df_count = df_count.rename(columns={0: "count"})
-        df_count = df_count.sort_values("count", ascending=False, ignore_index=True)
-
-        # Salva parquet
-        os.makedirs(gold_path, exist_ok=True)
-        filepath = os.path.join(gold_path, "total.parquet")
-        df_count.to_parquet(filepath, index=False, engine="pyarrow")
-
-        log.info(
-            "Gold gravado: %s (groups=%s total_rows=%s batches=%s)",
-            filepath, len(df_count), n_rows, n_batches
-        )
+        write_gold_totals(gold_path, acc, n_partitions)
         return gold_path
 
     except AirflowFailException:
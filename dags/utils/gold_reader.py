@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+import pyarrow.parquet as pq
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .aggregation import GROUP_KEYS, ROLLUP_LEVELS, rollup_table
+
+TOTAL_FILE = "total.parquet"
+ROLLUPS_FILE = "rollups.parquet"
+TOP_BY = ("country", "state", "city")
+
+
+def latest_gold_batch(gold_root: str) -> str | None:
+    """Último `batch=YYYY-MM-DD` de `gold_root` que já tem `total.parquet`."""
+    if not os.path.isdir(gold_root):
+        return None
+    batches = sorted(
+        d for d in os.listdir(gold_root)
+        if d.startswith("batch=") and os.path.exists(os.path.join(gold_root, d, TOTAL_FILE))
+    )
+    return batches[-1].split("=", 1)[1] if batches else None
+
+
+class _GoldSnapshot:
+    """Índices hash de um batch: nível -> {chave: count} e nível -> [(chave, count)] por count desc."""
+
+    def __init__(self, batch: str, batch_dir: str):
+        self.batch = batch
+        rollups_path = os.path.join(batch_dir, ROLLUPS_FILE)
+        if os.path.exists(rollups_path):
+            rollups = pq.read_table(rollups_path)
+        else:
+            rollups = rollup_table(pq.read_table(os.path.join(batch_dir, TOTAL_FILE)))
+
+        self.index: dict[tuple, dict[tuple, int]] = {}
+        self.ranked: dict[tuple, list[tuple[tuple, int]]] = {}
+        columns = {c: rollups[c].to_pylist() for c in ["grouping_level", *GROUP_KEYS, "count"]}
+        by_level: dict[str, list[tuple[tuple, int]]] = {}
+        for i, name in enumerate(columns["grouping_level"]):
+            level = tuple(name.split(","))
+            by_level.setdefault(level, []).append(
+                (tuple(columns[k][i] for k in level), columns["count"][i])
+            )
+        for level, rows in by_level.items():
+            # rollup_table já ordena cada nível por count desc
+            self.ranked[level] = rows
+            self.index[level] = dict(rows)
+
+
+class GoldReader:
+    """
+    Leitura da Gold para consumo online: carrega o último batch uma vez em índices
+    hash (dicts Python; o Parquet não fica aberto), responde contagens e top-N por eles e guarda resultados num cache LRU
+    com TTL. Um batch novo é detectado em até `refresh_interval` segundos e
+    invalida o cache.
+
+    Args:
+        gold_root: Diretório base da Gold (contém batch=YYYY-MM-DD/).
+        cache_size: Máximo de resultados no cache LRU.
+        ttl_seconds: Validade de cada resultado no cache.
+        refresh_interval: Intervalo mínimo entre verificações de batch novo.
+        clock: Relógio monotônico (injetável em testes).
+    """
+
+    def __init__(
+        self,
+        gold_root: str,
+        cache_size: int = 1024,
+        ttl_seconds: float = 60.0,
+        refresh_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.gold_root = gold_root
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._snapshot: _GoldSnapshot | None = None
+        self._next_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.log = LoggingMixin().log
+
+    # ---------- snapshot / cache ----------
+
+    def _current(self) -> _GoldSnapshot | None:
+        now = self._clock()
+        if now < self._next_check and self._snapshot is not None:
+            return self._snapshot
+        with self._lock:
+            # outra thread pode ter carregado enquanto esperávamos o lock
+            if now < self._next_check and self._snapshot is not None:
+                return self._snapshot
+            self._next_check = now + self.refresh_interval
+            batch = latest_gold_batch(self.gold_root)
+            if batch is not None and (self._snapshot is None or self._snapshot.batch != batch):
+                t0 = time.perf_counter()
+                self._snapshot = _GoldSnapshot(batch, os.path.join(self.gold_root, f"batch={batch}"))
+                self._cache.clear()
+                self.log.info(
+                    "GoldReader: batch %s carregado em %.3fs (níveis=%s)",
+                    batch, time.perf_counter() - t0, len(self._snapshot.index)
+                )
+            return self._snapshot
+
+    def _cached(self, key: tuple, compute: Callable[[_GoldSnapshot], object]):
+        snapshot = self._current()
+        if snapshot is None:
+            raise LookupError(f"Nenhum batch gold disponível em {self.gold_root}")
+        key = (snapshot.batch, *key)
+        now = self._clock()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        value = compute(snapshot)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = (now + self.ttl_seconds, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    @property
+    def batch(self) -> str | None:
+        snapshot = self._current()
+        return snapshot.batch if snapshot else None
+
+    # ---------- consultas ----------
+
+    def count(
+        self,
+        country: str,
+        state: str | None = None,
+        city: str | None = None,
+        brewery_type: str | None = None,
+    ) -> int:
+        """
+        Nº de cervejarias para a chave informada (country; +state; +city; opcionalmente
+        por brewery_type).
+
+        Raises:
+            ValueError: Para combinações sem nível correspondente (ex.: city sem state).
+            LookupError: Se não houver batch gold.
+        """
+        given = {"country": country, "state": state, "city": city, "brewery_type": brewery_type}
+        level = tuple(k for k in GROUP_KEYS if given[k] is not None)
+        if level not in ROLLUP_LEVELS:
+            raise ValueError(f"Combinação de filtros não suportada: {level}")
+        key = tuple(given[k] for k in level)
+        return self._cached(("count", level, key), lambda s: s.index.get(level, {}).get(key, 0))
+
+    def top(
+        self,
+        n: int = 10,
+        by: str = "city",
+        country: str | None = None,
+        state: str | None = None,
+        brewery_type: str | None = None,
+    ) -> list[dict]:
+        """
+        Top-N por count no nível `by` ("country", "state" ou "city"), opcionalmente
+        filtrado por country/state e/ou por brewery_type.
+
+        Raises:
+            ValueError: Para `by` inválido ou filtro mais fino que `by`.
+        """
+        if by not in TOP_BY:
+            raise ValueError(f"by inválido: {by} (use {TOP_BY})")
+        prefix = GROUP_KEYS[:GROUP_KEYS.index(by) + 1]
+        level = tuple(prefix) + (("brewery_type",) if brewery_type is not None else ())
+        filters = {"country": country, "state": state, "brewery_type": brewery_type}
+        filters = {k: v for k, v in filters.items() if v is not None}
+        if any(k not in level for k in filters):
+            raise ValueError(f"Filtro {sorted(filters)} incompatível com by={by}")
+        positions = [(level.index(k), v) for k, v in filters.items()]
+
+        def compute(s: _GoldSnapshot) -> list[dict]:
+            out = []
+            for key, cnt in s.ranked.get(level, []):
+                if all(key[i] == v for i, v in positions):
+                    out.append({**dict(zip(level, key)), "count": cnt})
+                    if len(out) >= n:
+                        break
+            return out
+
+        return self._cached(("top", level, n, tuple(sorted(filters.items()))), compute)
+
+
+def make_server(reader: GoldReader, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Servidor HTTP local (JSON) sobre um `GoldReader`:
+    `/count?country=..&state=..&city=..&brewery_type=..`, `/top?n=10&by=city&country=..`
+    e `/health`. Use `serve_forever()` para atender.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == "/health":
+                    self._send(200, {"status": "ok", "batch": reader.batch})
+                elif url.path == "/count":
+                    if "country" not in params:
+                        raise ValueError("country é obrigatório")
+                    cnt = reader.count(**{k: params.get(k) for k in GROUP_KEYS})
+                    self._send(200, {"batch": reader.batch, "count": cnt})
+                elif url.path == "/top":
+                    n = int(params.pop("n", 10))
+                    rows = reader.top(n=n, **params)
+                    self._send(200, {"batch": reader.batch, "rows": rows})
+                else:
+                    self._send(404, {"error": f"rota desconhecida: {url.path}"})
+            except (ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+            except LookupError as e:
+                self._send(503, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            # Sem log por requisição (o benchmark gera milhares)
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -0,0 +1,135 @@
+import os
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .aggregation import GROUP_KEYS
+
+TREND_DIR = "trend"
+ROLLUPS_FILE = "rollups.parquet"
+TREND_KEYS = ["grouping_level"] + GROUP_KEYS
+
+TREND_SCHEMA = pa.schema([
+    pa.field("batch", pa.date32()),
+    pa.field("grouping_level", pa.string()),
+    *[pa.field(k, pa.string()) for k in GROUP_KEYS],
+    pa.field("count", pa.int64()),
+    pa.field("prev_batch", pa.date32()),
+    pa.field("prev_count", pa.int64()),
+    pa.field("delta", pa.int64()),
+    pa.field("growth", pa.float64()),
+])
+
+
+def trend_files(trend_path: str) -> dict[str, str]:
+    """Arquivos da tendência por batch: YYYY-MM-DD -> caminho (year=YYYY/batch=<dia>.parquet)."""
+    out = {}
+    if not os.path.isdir(trend_path):
+        return out
+    for year_dir in os.listdir(trend_path):
+        if not year_dir.startswith("year="):
+            continue
+        for name in os.listdir(os.path.join(trend_path, year_dir)):
+            if name.startswith("batch=") and name.endswith(".parquet"):
+                out[name[len("batch="):-len(".parquet")]] = os.path.join(trend_path, year_dir, name)
+    return out
+
+
+def _trend_rows(current: pd.DataFrame, previous: pd.DataFrame | None, day: str, prev_day: str | None) -> pd.DataFrame:
+    """
+    Linhas do batch `day`: contagem atual, contagem do batch anterior, delta e crescimento.
+    Chaves que sumiram em relação ao batch anterior entram com count 0 e chaves novas
+    com prev_count 0 (crescimento indefinido). No primeiro batch prev_count/delta são nulos.
+    """
+    current = current[TREND_KEYS + ["count"]]
+    if previous is None:
+        merged = current.assign(prev_count=pd.NA)
+    else:
+        prev = previous[TREND_KEYS + ["count"]].rename(columns={"count": "prev_count"})
+        # merge do pandas casa chaves nulas entre si (rollups têm colunas nulas por nível)
+        merged = current.merge(prev, on=TREND_KEYS, how="outer")
+        merged[["count", "prev_count"]] = merged[["count", "prev_count"]].fillna(0)
+
+    merged = merged.astype({"count": "int64", "prev_count": "Int64"})
+    merged["delta"] = merged["count"] - merged["prev_count"]
+    growth = merged["delta"].astype("Float64") / merged["prev_count"].astype("Float64")
+    merged["growth"] = growth.mask(merged["prev_count"] == 0)
+    merged["batch"] = date.fromisoformat(day)
+    merged["prev_batch"] = date.fromisoformat(prev_day) if prev_day else None
+    return merged.sort_values(TREND_KEYS, na_position="first", kind="stable")
+
+
+def update_trend(gold_root: str, day: str, trend_path: str | None = None) -> str:
+    """
+    Acrescenta o batch `day` à tabela de tendência da Gold de forma incremental:
+    lê apenas `gold_root/batch=<day>/rollups.parquet` e o arquivo do batch anterior
+    da própria tendência, e grava `trend/year=YYYY/batch=<day>.parquet`.
+
+    Cada arquivo tem um único batch e é ordenado pelas chaves, então consultas por
+    intervalo de datas leem só os arquivos/row groups do período (partição year=,
+    estatísticas min/max de `batch`).
+
+    Args:
+        gold_root: Diretório base da Gold (contém batch=YYYY-MM-DD/).
+        day: Batch (YYYY-MM-DD) a incorporar.
+        trend_path: Diretório da tendência (default: `<gold_root>/trend`).
+
+    Returns:
+        Caminho do arquivo gravado.
+
+    Raises:
+        AirflowFailException: Se os rollups do batch não existirem ou em falhas de escrita.
+    """
+    log = LoggingMixin().log
+    trend_path = trend_path or os.path.join(gold_root, TREND_DIR)
+    rollups_path = os.path.join(gold_root, f"batch={day}", ROLLUPS_FILE)
+
+    try:
+        if not os.path.exists(rollups_path):
+            raise AirflowFailException(f"Rollups do batch não encontrados: {rollups_path}")
+        current = pq.read_table(rollups_path).to_pandas()
+
+        files = trend_files(trend_path)
+        earlier = sorted(d for d in files if d < day)
+        later = sorted(d for d in files if d > day)
+        if later:
+            log.warning("Batches posteriores já na tendência (%s); deltas deles não são recalculados", later)
+
+        prev_day = earlier[-1] if earlier else None
+        previous = pq.read_table(files[prev_day]).to_pandas() if prev_day else None
+        # o batch anterior lido da tendência inclui chaves zeradas; elas não se propagam
+        if previous is not None:
+            previous = previous[previous["count"] > 0]
+
+        rows = _trend_rows(current, previous, day, prev_day)
+        table = pa.Table.from_pandas(rows[TREND_SCHEMA.names], schema=TREND_SCHEMA, preserve_index=False)
+
+        out_dir = os.path.join(trend_path, f"year={day[:4]}")
+        os.makedirs(out_dir, exist_ok=True)
+        out = os.path.join(out_dir, f"batch={day}.parquet")
+        tmp = f"{out}.tmp"
+        pq.write_table(table, tmp, compression="zstd", row_group_size=64 * 1024)
+        os.replace(tmp, out)
+
+        log.info(
+            "Tendência gravada: %s (linhas=%s batch_anterior=%s)", out, table.num_rows, prev_day
+        )
+        return out
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado em update_trend")
+        raise AirflowFailException(f"update_trend falhou: {e}") from e
+
+
+def read_trend(trend_path: str, start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """Lê a tendência no intervalo [start, end] (YYYY-MM-DD), abrindo só os arquivos do período."""
+    paths = [p for d, p in sorted(trend_files(trend_path).items())
+             if (start is None or d >= start) and (end is None or d <= end)]
+    if not paths:
+        return TREND_SCHEMA.empty_table().to_pandas()
+    return pa.concat_tables([pq.read_table(p, schema=TREND_SCHEMA) for p in paths]).to_pandas()
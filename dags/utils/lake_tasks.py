@@ -0,0 +1,151 @@
+import os
+
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .storage import is_local, lake_path
+
+# Caminhos do lake e corpos das tasks comuns às DAGs silver/gold (multi_dag) e fused.
+# Importado no parse das DAGs: utils pesados (pandas/pyarrow/numpy) só dentro das funções.
+RAW_PATH = lake_path("raw")
+SILVER_PATH_DIM = lake_path("silver", "dim")
+SILVER_PATH_FACT = lake_path("silver", "fact")
+SILVER_PATH_CURRENT = lake_path("silver", "current")
+GOLD_PATH = lake_path("gold")
+# Export opcional do último batch para SQLite indexado (consumo por BI local)
+GOLD_EXPORT_SQLITE = True
+GOLD_EXPORT_PATH = lake_path("gold", "export", "gold.sqlite")
+# Índice de busca por nome/cidade (segmentos por country/state, atualizados incrementalmente)
+GOLD_SEARCH_PATH = lake_path("gold", "search")
+# Compactação automática de small files após a deduplicação
+COMPACTION_MAX_FILES_PER_PARTITION = 8
+COMPACTION_MIN_AVG_FILE_BYTES = 32 * 1024 * 1024
+COMPACTION_TARGET_FILE_BYTES = 128 * 1024 * 1024
+
+log = LoggingMixin().log
+
+
+def silver_batch_path(day: str, silver_path_fact: str = SILVER_PATH_FACT) -> str:
+    return os.path.join(silver_path_fact, f"batch={day}")
+
+
+def gold_batch_path(day: str, gold_path: str = GOLD_PATH) -> str:
+    return os.path.join(gold_path, f"batch={day}")
+
+
+def require_local(path: str, task: str) -> None:
+    """
+    Falha se `path` não está no disco local. Para operações explícitas sobre o lake
+    (ex.: backfill), que numa URL fsspec não achariam nada e terminariam "com sucesso".
+    """
+    if not is_local(path):
+        raise AirflowFailException(f"{task} exige raiz local do lake (ou montada); recebido: {path}")
+
+
+def runs_locally(task: str, *paths: str) -> bool:
+    """
+    Compactação, current, tendência, export, geo e busca usam APIs de arquivo locais.
+    Com o lake numa URL fsspec a task é pulada com aviso (em vez de falhar o run e
+    bloquear o gatilho da gold, ou de não fazer nada em silêncio).
+    """
+    remote = [p for p in paths if not is_local(p)]
+    if remote:
+        log.warning("%s: pulado, exige raiz local do lake (ou montada); recebido: %s", task, remote[0])
+    return not remote
+
+
+def resolve_raw_manifest(context: dict, dataset, raw_path: str = RAW_PATH) -> dict:
+    """
+    Manifesto da raw publicado pela extração no evento do Dataset (arquivos e dia
+    exatos). Sem evento (run manual), lista a partição do dia do run.
+    """
+    from .context_utils import get_run_day
+    from .manifest import manifest_from_events, scan_raw_manifest
+
+    manifest = manifest_from_events(context, dataset)
+    if manifest is None:
+        manifest = scan_raw_manifest(raw_path, get_run_day())
+    log.info("Manifesto raw: batch=%s arquivos=%s", manifest["batch"], len(manifest["files"]))
+    return manifest
+
+
+def compact_fact(silver_manifest: dict, silver_path_fact: str = SILVER_PATH_FACT) -> dict:
+    """
+    Compacta o batch do manifesto se passou dos limites de small files e devolve o
+    manifesto relistado (campos extras do manifesto, ex.: gold_path, são mantidos).
+    """
+    from .compact_silver import compact_batch, needs_compaction
+    from .manifest import refresh_manifest
+
+    if not runs_locally("compact_fact", silver_path_fact):
+        return silver_manifest
+    day_run = silver_manifest["batch"]
+    batch_path = silver_batch_path(day_run, silver_path_fact)
+    if not needs_compaction(batch_path, COMPACTION_MAX_FILES_PER_PARTITION, COMPACTION_MIN_AVG_FILE_BYTES):
+        log.info("compact_fact: batch=%s abaixo dos limites; compactação não necessária.", day_run)
+        return silver_manifest
+    compact_batch(batch_path, target_file_bytes=COMPACTION_TARGET_FILE_BYTES)
+    # Compactação troca os arquivos de cada country/state: relista só essas partições
+    refreshed = refresh_manifest(silver_manifest, depth=3)
+    return {**{k: v for k, v in silver_manifest.items() if k not in refreshed}, **refreshed}
+
+
+def build_stats_index(day: str, silver_path_fact: str = SILVER_PATH_FACT) -> dict:
+    from .partition_stats import build_batch_stats_index
+
+    return build_batch_stats_index(silver_batch_path(day, silver_path_fact))
+
+
+def update_current(day: str, silver_path_fact: str = SILVER_PATH_FACT,
+                   current_path: str = SILVER_PATH_CURRENT) -> dict:
+    from .current_table import update_current_table
+
+    if not runs_locally("update_current", silver_path_fact, current_path):
+        return {"changed": [], "unchanged": [], "removed": []}
+    return update_current_table(day, silver_path_fact, current_path)
+
+
+def update_gold_trend(day: str, gold_root: str = GOLD_PATH) -> str | None:
+    from .gold_trend import update_trend
+
+    if not runs_locally("update_gold_trend", gold_root):
+        return None
+    # Acrescenta só o batch atual à tendência (delta vs. batch anterior)
+    trend_file = update_trend(gold_root=gold_root, day=day)
+    log.info("Tendência atualizada: %s", trend_file)
+    return trend_file
+
+
+def export_gold(gold_batch_path: str, day: str, export_path: str = GOLD_EXPORT_PATH,
+                enabled: bool = GOLD_EXPORT_SQLITE) -> str | None:
+    if not enabled:
+        log.info("export_gold: export SQLite desabilitado.")
+        return None
+    from .gold_export import export_gold_sqlite, latest_gold_batch
+
+    if not runs_locally("export_gold", gold_batch_path, export_path):
+        return None
+    # O export é um arquivo só: rerun/backfill de um dia antigo não substitui o do batch mais novo
+    newest = latest_gold_batch(os.path.dirname(gold_batch_path.rstrip("/")))
+    if newest and day < newest:
+        log.warning("export_gold: batch=%s é anterior ao batch gold mais novo (%s); export mantido.", day, newest)
+        return None
+    return export_gold_sqlite(gold_batch_path, export_path, batch=day)
+
+
+def build_geo(day: str, gold_batch_path: str, silver_path_fact: str = SILVER_PATH_FACT,
+              files: list[str] | None = None) -> dict:
+    from .geo import build_geo_gold
+
+    if not runs_locally("build_geo", silver_path_fact, gold_batch_path):
+        return {}
+    # Densidade por geohash + índice espacial (grade) do batch
+    return build_geo_gold(silver_batch_path(day, silver_path_fact), gold_batch_path, files=files)
+
+
+def build_search(day: str, silver_path_fact: str = SILVER_PATH_FACT, search_path: str = GOLD_SEARCH_PATH,
+                 files: list[str] | None = None) -> dict:
+    from .search_index import build_search_index
+
+    if not runs_locally("build_search", silver_path_fact, search_path):
+        return {}
+    return build_search_index(silver_batch_path(day, silver_path_fact), search_path, files=files)
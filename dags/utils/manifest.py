@@ -0,0 +1,137 @@
+import json
+import os
+from datetime import datetime, timezone
+
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .metrics import record_written_file
+from . import storage
+
+MANIFESTS_DIR = "_manifests"  # prefixo "_": ignorado pelos scans do pyarrow
+
+
+def _partition_of(rel_path: str) -> str:
+    """Partição Hive de um arquivo (segmentos `k=v` do diretório), ex.: 'country=us/state=ca/part=0'."""
+    return "/".join(p for p in os.path.dirname(rel_path).split(os.sep) if "=" in p)
+
+
+def build_manifest(stage: str, batch: str, root: str, files: list[str], **extra) -> dict:
+    """
+    Manifesto de uma etapa: arquivos exatos produzidos (relativos a `root`) e as
+    partições Hive que eles ocupam.
+
+    Args:
+        stage: Etapa produtora (ex.: "raw", "silver").
+        batch: Batch (YYYY-MM-DD) dos arquivos.
+        root: Diretório base dos caminhos relativos.
+        files: Caminhos (absolutos ou relativos ao cwd) dos arquivos produzidos.
+        **extra: Campos adicionais (ex.: rows).
+
+    Returns:
+        Dict serializável em JSON (XCom / arquivo).
+    """
+    rel = sorted({os.path.relpath(f, root) for f in files})
+    return {
+        "stage": stage,
+        "batch": str(batch),
+        "root": root,
+        "files": rel,
+        "partitions": sorted({_partition_of(f) for f in rel} - {""}),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **extra,
+    }
+
+
+def collecting_visitor(written: list[str], base_dir: str | None = None):
+    """
+    `file_visitor` para `ds.write_dataset` que acumula em `written` os caminhos escritos
+    (e os contabiliza nas métricas). Com `base_dir` remoto, os caminhos (que o pyarrow
+    devolve sem protocolo) voltam como URL do mesmo filesystem.
+    """
+
+    def visit(written_file) -> None:
+        written.append(storage.unstrip(written_file.path, base_dir) if base_dir else written_file.path)
+        record_written_file(written_file)
+
+    return visit
+
+
+def refresh_manifest(manifest: dict, depth: int, pattern: str = "*.parquet") -> dict:
+    """
+    Relista só as partições do manifesto (os `depth` primeiros níveis de cada uma,
+    ex.: batch/country/state), para etapas que reescrevem arquivos dentro delas.
+    """
+    prefixes = sorted({"/".join(p.split("/")[:depth]) for p in manifest["partitions"]})
+    files = []
+    for prefix in prefixes:
+        files.extend(storage.find_files(os.path.join(manifest["root"], prefix), pattern))
+    return build_manifest(manifest["stage"], manifest["batch"], manifest["root"], files)
+
+
+def manifest_files(manifest: dict) -> list[str]:
+    """Caminhos dos arquivos do manifesto (juntados a `root`)."""
+    return [os.path.join(manifest["root"], f) for f in manifest["files"]]
+
+
+def manifest_path(root: str, batch: str, stage: str) -> str:
+    return os.path.join(root, MANIFESTS_DIR, f"batch={batch}", f"{stage}.json")
+
+
+def write_manifest(manifest: dict, path: str | None = None) -> str:
+    """Grava o manifesto (atomicamente) e devolve o caminho; padrão `<root>/_manifests/batch=<batch>/<stage>.json`."""
+    path = path or manifest_path(manifest["root"], manifest["batch"], manifest["stage"])
+    storage.write_bytes(path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    return path
+
+
+def read_manifest(path: str) -> dict:
+    """
+    Lê um manifesto gravado por `write_manifest`.
+
+    Raises:
+        AirflowFailException: Se o arquivo não existir ou for inválido.
+    """
+    try:
+        with storage.open_file(path, "rb") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        raise AirflowFailException(f"Manifesto inválido em {path}: {e}") from e
+    missing = [k for k in ("stage", "batch", "root", "files") if k not in manifest]
+    if missing:
+        raise AirflowFailException(f"Manifesto sem campos {missing}: {path}")
+    return manifest
+
+
+def scan_manifest(stage: str, batch: str, root: str, pattern: str) -> dict:
+    """Fallback sem manifesto publicado: monta o manifesto listando `root/pattern` (glob)."""
+    files = storage.glob(os.path.join(root, pattern))
+    LoggingMixin().log.info("Manifesto %s por listagem: %s/%s arquivos=%s", stage, root, pattern, len(files))
+    return build_manifest(stage, batch, root, files, source="glob")
+
+
+def scan_raw_manifest(raw_path: str, day: str) -> dict:
+    """Manifesto da raw por listagem da partição year/month/day de `day` (YYYY-MM-DD)."""
+    year, month, dd = day.split("-")
+    pattern = os.path.join(f"year={year}", f"month={int(month):02d}", f"day={int(dd):02d}", "*.json")
+    return scan_manifest("raw", day, raw_path, pattern)
+
+
+def manifest_from_events(context: dict, dataset) -> dict | None:
+    """
+    Manifesto publicado pelo produtor no evento do Dataset que disparou o run
+    (`extra={"manifest": <caminho>}`), ou None se não houver (run manual, produtor antigo).
+    """
+    events = context.get("triggering_asset_events") or context.get("triggering_dataset_events") or {}
+    try:
+        items = list(events.items())
+    except Exception:
+        return None
+    uri = getattr(dataset, "uri", dataset)
+    for key, evs in items:
+        if getattr(key, "uri", key) != uri:
+            continue
+        for event in reversed(list(evs)):
+            path = (getattr(event, "extra", None) or {}).get("manifest")
+            if path:
+                return read_manifest(path)
+    return None
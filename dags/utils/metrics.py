@@ -0,0 +1,286 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import resource
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Iterable, Iterator
+
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+STATSD_ENV = "OPENBREWERYDB_STATSD"            # host:port; sem valor, StatsD desligado
+METRICS_DIR_ENV = "OPENBREWERYDB_METRICS_DIR"  # diretório do textfile; sem valor, desligado
+METRIC_PREFIX = "openbrewerydb"
+PROM_FILE = "openbrewerydb.prom"
+STATE_FILE = "openbrewerydb.prom.json"
+KEEP_BATCHES = 7
+COUNTERS = ("rows_in", "rows_out", "bytes_read", "bytes_written", "files")
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+_current: contextvars.ContextVar["StageMetrics | None"] = contextvars.ContextVar("stage_metrics", default=None)
+
+
+class StageMetrics:
+    """Medidas de uma execução de etapa (um batch): contadores + duração + pico de RSS."""
+
+    def __init__(self, stage: str, batch: str):
+        self.stage = stage
+        self.batch = batch
+        self.values = dict.fromkeys(COUNTERS, 0)
+        self.duration_s = 0.0
+        self.peak_rss_bytes = 0
+        self.status = "ok"
+        # `prefetch` roda `load` numa thread com o mesmo contexto: a etapa recebe `add` concorrentes
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int) -> None:
+        """Soma contadores (rows_in, rows_out, bytes_read, bytes_written, files); thread-safe."""
+        unknown = [name for name in counts if name not in self.values]
+        if unknown:
+            raise ValueError(f"Métrica desconhecida: {unknown[0]}")
+        with self._lock:
+            for name, value in counts.items():
+                self.values[name] += int(value or 0)
+
+    def as_dict(self) -> dict:
+        return {"stage": self.stage, "batch": self.batch, "status": self.status,
+                "duration_s": self.duration_s, "peak_rss_bytes": self.peak_rss_bytes, **self.values}
+
+
+def record(**counts: int) -> None:
+    """Soma contadores na etapa corrente (no-op fora de `stage_metrics`)."""
+    current = _current.get()
+    if current is not None:
+        current.add(**counts)
+
+
+def record_files(paths: Iterable[str], written: bool) -> None:
+    """Soma tamanho e nº de arquivos lidos/escritos na etapa corrente."""
+    current = _current.get()
+    if current is None:
+        return
+    paths = list(paths)
+    size = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+    current.add(files=len(paths), **{"bytes_written" if written else "bytes_read": size})
+
+
+def record_written_file(written_file) -> None:
+    """`file_visitor` para `ds.write_dataset`: contabiliza cada arquivo escrito."""
+    current = _current.get()
+    if current is None:
+        return
+    # `size` vem do próprio writer: sem stat, vale também fora do disco local
+    size = getattr(written_file, "size", None)
+    if size is None:
+        record_files([written_file.path], written=True)
+        return
+    current.add(files=1, bytes_written=size)
+
+
+def _current_rss_bytes() -> int | None:
+    """RSS atual do processo (`/proc/self/statm`); None fora do Linux."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class _RssSampler:
+    """
+    Pico de RSS entre `start` e `stop`: amostra o RSS atual a cada `interval` segundos em
+    uma thread de fundo (mais uma amostra na entrada e outra na saída). Sem
+    `/proc`, cai para `ru_maxrss`, que é o pico do processo inteiro, não do bloco.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        rss = _current_rss_bytes()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "_RssSampler":
+        if _current_rss_bytes() is not None:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        """Para a amostragem e devolve o pico em bytes."""
+        if self._thread is None:
+            # ru_maxrss em KB no Linux
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            return self.peak
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+def _emit_statsd(m: StageMetrics, address: str) -> None:
+    host, _, port = address.rpartition(":")
+    name = f"{METRIC_PREFIX}.{m.stage}"
+    lines = [f"{name}.duration:{m.duration_s * 1000:.3f}|ms", f"{name}.peak_rss_bytes:{m.peak_rss_bytes}|g"]
+    lines += [f"{name}.{k}:{v}|c" for k, v in m.values.items()]
+    if m.status != "ok":
+        lines.append(f"{name}.errors:1|c")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto("\n".join(lines).encode("utf-8"), (host or "127.0.0.1", int(port)))
+
+
+def _prom_escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(state: dict) -> str:
+    """Gera o textfile (formato de exposição do Prometheus) a partir do estado acumulado."""
+    series = {
+        "duration_seconds": ("Tempo total da etapa no batch", lambda s: s["duration_s"]),
+        "rows_in": ("Linhas de entrada", lambda s: s["rows_in"]),
+        "rows_out": ("Linhas de saída", lambda s: s["rows_out"]),
+        "bytes_read": ("Bytes lidos", lambda s: s["bytes_read"]),
+        "bytes_written": ("Bytes escritos", lambda s: s["bytes_written"]),
+        "files": ("Arquivos tocados", lambda s: s["files"]),
+        "calls": ("Execuções da etapa no batch", lambda s: s["calls"]),
+        "errors": ("Execuções com erro no batch", lambda s: s["errors"]),
+        "peak_rss_bytes": ("Pico de RSS amostrado durante a etapa", lambda s: s["peak_rss_bytes"]),
+        "rows_per_second": ("Vazão (linhas de saída, ou de entrada, por segundo)",
+                            lambda s: (s["rows_out"] or s["rows_in"]) / s["duration_s"] if s["duration_s"] else 0),
+        "last_run_timestamp_seconds": ("Fim da última execução (epoch)", lambda s: s["updated_at"]),
+    }
+    out = []
+    for suffix, (help_text, getter) in series.items():
+        metric = f"{METRIC_PREFIX}_stage_{suffix}"
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} gauge")
+        for stage in sorted(state):
+            for batch, s in sorted(state[stage].items()):
+                labels = f'stage="{_prom_escape(stage)}",batch="{_prom_escape(batch)}"'
+                out.append(f"{metric}{{{labels}}} {getter(s):g}")
+    return "\n".join(out) + "\n"
+
+
+def _emit_textfile(m: StageMetrics, directory: str) -> None:
+    import fcntl
+
+    os.makedirs(directory, exist_ok=True)
+    state_path = os.path.join(directory, STATE_FILE)
+    # Várias tasks podem terminar ao mesmo tempo: lê-acumula-grava sob lock
+    with open(os.path.join(directory, f"{STATE_FILE}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        state = {}
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+
+        batches = state.setdefault(m.stage, {})
+        s = batches.setdefault(m.batch, {**dict.fromkeys(COUNTERS, 0), "duration_s": 0.0, "calls": 0,
+                                         "errors": 0, "peak_rss_bytes": 0, "updated_at": 0})
+        for k, v in m.values.items():
+            s[k] += v
+        s["duration_s"] += m.duration_s
+        s["calls"] += 1
+        s["errors"] += m.status != "ok"
+        s["peak_rss_bytes"] = max(s["peak_rss_bytes"], m.peak_rss_bytes)
+        s["updated_at"] = time.time()
+        # Limita a cardinalidade: só os batches mais recentes de cada etapa
+        for old in sorted(batches, key=lambda b: batches[b]["updated_at"])[:-KEEP_BATCHES]:
+            del batches[old]
+
+        for path, content in ((state_path, json.dumps(state)), (os.path.join(directory, PROM_FILE),
+                                                                 render_prometheus(state))):
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, path)
+
+
+def emit(m: StageMetrics) -> None:
+    """Loga a etapa e envia para StatsD/textfile conforme o ambiente. Falhas de envio só geram warning."""
+    log = LoggingMixin().log
+    log.info(
+        "metrics stage=%s batch=%s status=%s duration_s=%.3f rows_in=%s rows_out=%s "
+        "bytes_read=%s bytes_written=%s files=%s peak_rss_mb=%.1f",
+        m.stage, m.batch, m.status, m.duration_s, m.values["rows_in"], m.values["rows_out"],
+        m.values["bytes_read"], m.values["bytes_written"], m.values["files"], m.peak_rss_bytes / 2**20,
+    )
+    statsd, directory = os.environ.get(STATSD_ENV), os.environ.get(METRICS_DIR_ENV)
+    try:
+        if statsd:
+            _emit_statsd(m, statsd)
+        if directory:
+            _emit_textfile(m, directory)
+    except Exception:
+        log.warning("Falha ao publicar métricas da etapa %s", m.stage, exc_info=True)
+
+
+@contextmanager
+def stage_metrics(stage: str, batch: str | None = None) -> Iterator[StageMetrics]:
+    """
+    Mede uma etapa: duração, pico de RSS (amostrado durante o bloco, não o pico do
+    processo) e os contadores somados com `record`/`record_files` (ou `m.add`) dentro
+    do bloco. Ao sair, publica via `emit` mesmo em erro (status=error) e repropaga a exceção.
+
+    Args:
+        stage: Nome da etapa (ex.: "gold_pipeline").
+        batch: Batch (YYYY-MM-DD); padrão, o dia corrente.
+    """
+    m = StageMetrics(stage, str(batch) if batch is not None else date.today().isoformat())
+    token = _current.set(m)
+    sampler = _RssSampler().start()
+    t0 = time.perf_counter()
+    try:
+        yield m
+    except BaseException:
+        m.status = "error"
+        raise
+    finally:
+        m.duration_s = time.perf_counter() - t0
+        m.peak_rss_bytes = sampler.stop()
+        _current.reset(token)
+        emit(m)
+
+
+def instrumented(stage: str, batch: Callable[[dict], str | None] | None = None):
+    """
+    Decorator: executa a função dentro de `stage_metrics(stage, ...)`. `batch`
+    recebe os argumentos nomeados da chamada e devolve o batch.
+    """
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            batch_value = None
+            if batch is not None:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                batch_value = batch(bound.arguments)
+            with stage_metrics(stage, batch_value):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def batch_from_path(path: str | None) -> str | None:
+    """Extrai o batch de um caminho `.../batch=YYYY-MM-DD`."""
+    name = os.path.basename(str(path or "").rstrip("/"))
+    return name.split("=", 1)[1] if name.startswith("batch=") else None
@@ -1,8 +1,11 @@
 import re
 import unicodedata
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from airflow.exceptions import AirflowFailException
 from airflow.utils.log.logging_mixin import LoggingMixin
+from .schema import BREWERY_SCHEMA
 
 log = LoggingMixin().log
 
@@ -81,3 +84,61 @@ def normalize_brewery_df(df: pd.DataFrame) -> pd.DataFrame:
     except Exception:
         log.exception("Erro ao normalizar DataFrame breweries")
         raise AirflowFailException("normalize_brewery_df falhou")
+
+
+_NUMERIC_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+
+def _coerce_numeric(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Equivalente Arrow de pd.to_numeric(errors='coerce') para colunas textuais."""
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return arr
+    trimmed = pc.utf8_trim_whitespace(arr)
+    valid = pc.match_substring_regex(trimmed, _NUMERIC_PATTERN)
+    return pc.if_else(valid, trimmed, pa.scalar(None, arr.type))
+
+
+def normalize_brewery_table(table: pa.Table) -> pa.Table:
+    """
+    Versão Arrow de `normalize_brewery_df`: conforma a tabela ao `BREWERY_SCHEMA`
+    com um único `Table.cast`, sem passar por pandas.
+    - Colunas ausentes viram nulas; colunas fora do schema são descartadas
+    - latitude/longitude textuais inválidas viram nulas (coerce)
+
+    Args:
+        table: Tabela Arrow de entrada.
+
+    Returns:
+        Tabela com exatamente o schema `BREWERY_SCHEMA`.
+
+    Raises:
+        AirflowFailException: Se a tabela for vazia ou None, ou se o cast falhar.
+    """
+    if table is None or table.num_rows == 0:
+        log.error("Tabela vazia recebida em normalize_brewery_table")
+        raise AirflowFailException("Tabela vazia em normalize_brewery_table")
+
+    try:
+        arrays = []
+        for field in BREWERY_SCHEMA:
+            if field.name not in table.column_names:
+                arrays.append(pa.nulls(table.num_rows, field.type))
+                continue
+            col = table[field.name]
+            if pa.types.is_floating(field.type):
+                col = _coerce_numeric(col)
+            arrays.append(col)
+
+        dropped = [c for c in table.column_names if c not in BREWERY_SCHEMA.names]
+        if dropped:
+            log.info("normalize_brewery_table: colunas fora do schema descartadas: %s", dropped)
+
+        out = pa.Table.from_arrays(arrays, names=BREWERY_SCHEMA.names).cast(BREWERY_SCHEMA)
+        log.info(
+            "normalize_brewery_table concluído: rows=%s cols=%s",
+            out.num_rows, out.num_columns
+        )
+        return out
+    except Exception:
+        log.exception("Erro ao normalizar tabela breweries")
+        raise AirflowFailException("normalize_brewery_table falhou")
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+
+@dataclass(frozen=True)
+class ParquetWriteProfile:
+    """
+    Configuração de layout dos Parquet da fato silver (usada por `silver_pipeline`
+    e `remove_duplicates_batch`).
+
+    Attributes:
+        compression: Codec ("zstd", "snappy", "gzip", "lz4", "none").
+        compression_level: Nível do codec (None = default do codec).
+        dictionary_columns: Colunas com dictionary encoding. Vazio desliga o encoding.
+        max_rows_per_group: Máximo de linhas por row group.
+        min_rows_per_group: Linhas acumuladas antes de fechar um row group.
+        write_statistics: Emite estatísticas min/max/null_count por coluna.
+        write_page_index: Emite column/offset index (pruning por página).
+        sort_by: Ordenação das linhas dentro de cada partição.
+        max_partitions: Máximo de partições (country/state/part) por escrita; o padrão
+            do pyarrow (1024) não comporta um batch inteiro reescrito de uma vez.
+    """
+    compression: str = "zstd"
+    compression_level: int | None = 3
+    dictionary_columns: tuple[str, ...] = ("country", "state", "city", "brewery_type")
+    max_rows_per_group: int = 64 * 1024
+    min_rows_per_group: int = 0
+    write_statistics: bool = True
+    write_page_index: bool = True
+    sort_by: tuple[str, ...] = ("city", "brewery_type", "name")
+    max_partitions: int = 64 * 1024
+
+    @classmethod
+    def pyarrow_defaults(cls) -> "ParquetWriteProfile":
+        """Perfil equivalente ao comportamento anterior (defaults do pyarrow, sem ordenação)."""
+        return cls(
+            compression="snappy",
+            compression_level=None,
+            dictionary_columns=(),
+            max_rows_per_group=1024 * 1024,
+            write_page_index=False,
+            sort_by=(),
+        )
+
+    def file_options(self) -> ds.ParquetFileWriteOptions:
+        return ds.ParquetFileFormat().make_write_options(
+            compression=self.compression,
+            compression_level=self.compression_level,
+            use_dictionary=list(self.dictionary_columns) if self.dictionary_columns else False,
+            write_statistics=self.write_statistics,
+            write_page_index=self.write_page_index,
+        )
+
+    def sort(self, table: pa.Table) -> pa.Table:
+        """Ordena por `sort_by` (apenas colunas presentes); a ordem é preservada na escrita."""
+        keys = [(c, "ascending") for c in self.sort_by if c in table.column_names]
+        if not keys or table.num_rows < 2:
+            return table
+        return table.sort_by(keys)
+
+    def write_dataset_kwargs(self) -> dict:
+        """Argumentos para `ds.write_dataset` derivados do perfil."""
+        return {
+            "file_options": self.file_options(),
+            "max_rows_per_group": self.max_rows_per_group,
+            "min_rows_per_group": self.min_rows_per_group,
+            "preserve_order": bool(self.sort_by),
+            "max_partitions": self.max_partitions,
+        }
+
+
+DEFAULT_WRITE_PROFILE = ParquetWriteProfile()
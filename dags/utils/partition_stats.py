@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from . import storage
+
+STATS_FILE = "_stats.json"
+STATS_INDEX_FILE = "_stats_index.json"
+PARTITION_KEYS = ["country", "state", "part"]
+MIN_MAX_COLUMNS = ["id", "name", "city", "brewery_type"]
+
+
+def _row_hashes(table: pa.Table) -> np.ndarray:
+    """Hash uint64 por linha (colunas em ordem alfabética)."""
+    cols = sorted(table.column_names)
+    return pd.util.hash_pandas_object(table.select(cols).to_pandas(), index=False).to_numpy()
+
+
+def _checksum_from_hashes(columns: list[str], row_hashes: np.ndarray) -> str:
+    h = hashlib.sha256(",".join(sorted(columns)).encode("utf-8"))
+    h.update(np.sort(row_hashes).tobytes())
+    return h.hexdigest()
+
+
+def table_checksum(table: pa.Table) -> str:
+    """
+    Checksum do conteúdo independente da ordem das linhas e colunas: hash por linha
+    (colunas em ordem alfabética), hashes ordenados e sha256 do resultado.
+    """
+    if table.num_rows == 0:
+        return hashlib.sha256(b"").hexdigest()
+    return _checksum_from_hashes(table.column_names, _row_hashes(table))
+
+
+def compute_partition_stats(table: pa.Table) -> dict:
+    """
+    Estatísticas de uma partição da fato silver (sem as colunas de partição):
+    linhas, distintos de city/brewery_type, nulos por coluna, min/max das chaves,
+    contagem parcial por (city, brewery_type), checksum do conteúdo e soma dos
+    hashes de linha (multiset hash, somável entre parts).
+    """
+    row_hashes = _row_hashes(table) if table.num_rows else np.array([], dtype=np.uint64)
+    stats = {
+        "rows": table.num_rows,
+        "null_counts": {c: table[c].null_count for c in table.column_names},
+        "min_max": {},
+        "checksum": _checksum_from_hashes(table.column_names, row_hashes) if table.num_rows
+        else hashlib.sha256(b"").hexdigest(),
+        # Soma (mod 2^64) dos hashes de linha: combinável entre parts de uma mesma partição
+        "row_hash_sum": int(row_hashes.sum(dtype=np.uint64)),
+    }
+    for col in ("city", "brewery_type"):
+        if col in table.column_names:
+            stats[f"distinct_{col}"] = pc.count_distinct(table[col]).as_py()
+    for col in MIN_MAX_COLUMNS:
+        if col in table.column_names and table.num_rows > table[col].null_count:
+            mm = pc.min_max(table[col]).as_py()
+            stats["min_max"][col] = [mm["min"], mm["max"]]
+    if {"city", "brewery_type"} <= set(table.column_names):
+        pairs = table.group_by(["city", "brewery_type"]).aggregate([([], "count_all")])
+        stats["city_type_counts"] = sorted(
+            ([r["city"], r["brewery_type"], r["count_all"]] for r in pairs.to_pylist()),
+            key=lambda r: (r[0] or "", r[1] or ""),
+        )
+    return stats
+
+
+def _split_by_partition(table: pa.Table) -> list[tuple[tuple, pa.Table]]:
+    """Separa a tabela por (country, state, part) via ordenação + fatiamento."""
+    keys = [k for k in PARTITION_KEYS if k in table.column_names]
+    if table.num_rows == 0:
+        return []
+    table = table.sort_by([(k, "ascending") for k in keys])
+    key_values = list(zip(*(table[k].cast(pa.string()).to_pylist() for k in keys)))
+    out, start = [], 0
+    for i in range(1, len(key_values) + 1):
+        if i == len(key_values) or key_values[i] != key_values[start]:
+            out.append((key_values[start], table.slice(start, i - start).drop_columns(keys)))
+            start = i
+    return out
+
+
+def write_stats_file(stats: dict, partition_dir: str) -> str:
+    """Grava o sidecar `_stats.json` (escrita atômica) em `partition_dir`."""
+    path = os.path.join(partition_dir, STATS_FILE)
+    storage.write_bytes(path, json.dumps(stats, ensure_ascii=False).encode("utf-8"))
+    return path
+
+
+def write_partition_stats(table: pa.Table, batch_path: str) -> list[str]:
+    """
+    Calcula e grava um sidecar `_stats.json` para cada batch/country/state/part
+    presente em `table` (que deve conter as colunas country, state e part).
+
+    Args:
+        table: Linhas escritas na fato (com colunas de partição).
+        batch_path: Diretório do batch (batch=<date>).
+
+    Returns:
+        Caminhos dos sidecars gravados.
+
+    Raises:
+        AirflowFailException: Se faltar alguma coluna de partição.
+    """
+    log = LoggingMixin().log
+    missing = [k for k in PARTITION_KEYS if k not in table.column_names]
+    if missing:
+        raise AirflowFailException(f"Colunas ausentes em partition_stats: {missing}")
+
+    written = []
+    for (country, state, part), part_table in _split_by_partition(table):
+        stats = {"country": country, "state": state, "part": part, **compute_partition_stats(part_table)}
+        partition_dir = os.path.join(batch_path, f"country={country}", f"state={state}", f"part={part}")
+        written.append(write_stats_file(stats, partition_dir))
+    log.info("partition_stats: %s sidecars gravados em %s", len(written), batch_path)
+    return written
+
+
+def build_batch_stats_index(batch_path: str) -> dict:
+    """
+    Consolida todos os sidecars `_stats.json` do batch em `_stats_index.json`,
+    com os totais do batch e a contagem por (country, state, city, brewery_type).
+
+    Args:
+        batch_path: Diretório do batch (batch=<date>).
+
+    Returns:
+        O índice gravado (vazio se o batch não existir).
+    """
+    log = LoggingMixin().log
+    if not storage.isdir(batch_path):
+        log.warning("Path do batch não existe: %s", batch_path)
+        return {}
+
+    # Uma listagem do batch inteiro e leituras concorrentes dos sidecars (fora do disco local)
+    sidecars = storage.find_files(batch_path, STATS_FILE)
+    partitions = []
+    for sidecar, data in zip(sidecars, storage.map_files(storage.read_bytes, sidecars)):
+        stats = json.loads(data)
+        stats["path"] = os.path.relpath(os.path.dirname(sidecar), batch_path)
+        partitions.append(stats)
+
+    index = {
+        "batch_path": batch_path,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "rows": sum(p["rows"] for p in partitions),
+        "partitions": partitions,
+    }
+    path = os.path.join(batch_path, STATS_INDEX_FILE)
+    storage.write_bytes(path, json.dumps(index, ensure_ascii=False).encode("utf-8"))
+    log.info("Índice de estatísticas gravado: %s (partições=%s rows=%s)", path, len(partitions), index["rows"])
+    return index
+
+
+def load_batch_stats_index(batch_path: str) -> dict | None:
+    """Lê o `_stats_index.json` do batch (None se não existir)."""
+    path = os.path.join(batch_path, STATS_INDEX_FILE)
+    if not storage.exists(path):
+        return None
+    with storage.open_file(path, "rb") as f:
+        return json.load(f)
+
+
+def counts_from_index(index: dict) -> pd.DataFrame:
+    """Contagem por (country, state, city, brewery_type) respondida só pelo índice."""
+    rows = [
+        (p["country"], p["state"], city, brewery_type, count)
+        for p in index.get("partitions", [])
+        for city, brewery_type, count in p.get("city_type_counts", [])
+    ]
+    df = pd.DataFrame(rows, columns=["country", "state", "city", "brewery_type", "count"])
+    return df.groupby(["country", "state", "city", "brewery_type"], dropna=False, as_index=False)["count"].sum()
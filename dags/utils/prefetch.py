@@ -0,0 +1,89 @@
+import contextvars
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Lotes já carregados à espera do consumidor. Em memória ficam no máximo
+# depth + 2 lotes: o em processamento, os da fila e o que a thread acabou de ler.
+DEFAULT_PREFETCH_DEPTH = 1
+
+_DONE = object()
+_PUT_TIMEOUT_S = 0.1
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(
+    items: Iterable[T],
+    load: Callable[[T], R],
+    depth: int = DEFAULT_PREFETCH_DEPTH,
+) -> Iterator[tuple[T, R]]:
+    """
+    Itera `(item, load(item))` na ordem de `items`, carregando os próximos itens
+    em uma thread de fundo enquanto o consumidor processa o atual (leitura/parse
+    do lote N+1 sobreposta à normalização/escrita do lote N).
+
+    A fila é limitada a `depth` itens prontos, o que limita a memória. Um erro em `load`
+    (ou ao iterar `items`) é relançado no consumidor na posição do item que
+    falhou, depois dos itens anteriores, como na versão sequencial. Ao sair do
+    loop antes do fim, feche o gerador (`contextlib.closing`) para parar a thread.
+
+    Args:
+        items: Itens a carregar (ex.: lotes de arquivos).
+        load: Função de carga, executada na thread de fundo (no contexto do chamador).
+        depth: Nº máximo de itens carregados à espera do consumidor (>= 1).
+
+    Returns:
+        Iterador de pares (item, resultado).
+
+    Raises:
+        ValueError: Se `depth` < 1.
+    """
+    if depth < 1:
+        raise ValueError(f"depth deve ser >= 1 (recebido {depth})")
+    ready: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        # Bloqueia com a fila cheia, mas desiste se o consumidor fechou o iterador
+        while not stop.is_set():
+            try:
+                ready.put(entry, timeout=_PUT_TIMEOUT_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if stop.is_set() or not put((item, load(item))):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+            return
+        put(_DONE)
+
+    # Mesmo contexto do chamador: métricas (`metrics.record`) feitas em `load` contam na etapa corrente
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(produce,), name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            entry = ready.get()
+            if entry is _DONE:
+                return
+            if isinstance(entry, _Failure):
+                raise entry.error
+            yield entry
+    finally:
+        stop.set()
+        thread.join()
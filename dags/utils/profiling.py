@@ -0,0 +1,185 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+PROFILE_ENV = "OPENBREWERYDB_PROFILE"          # "1"/"true" liga o profiling em todas as tasks
+PROFILE_DIR_ENV = "OPENBREWERYDB_PROFILE_DIR"  # padrão: <base_log_folder>/profiles
+PROFILE_PARAM = "profile"                      # param da DAG (liga só no run disparado com ele)
+SAMPLE_INTERVAL_S = 0.005
+TRACEMALLOC_FRAMES = 10
+TOP_N = 30
+
+
+def profiling_enabled() -> bool:
+    """Profiling ligado por env (`OPENBREWERYDB_PROFILE`) ou pelo param `profile` do run."""
+    if os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    try:
+        from airflow.operators.python import get_current_context
+        return bool(get_current_context().get("params", {}).get(PROFILE_PARAM))
+    except Exception:
+        return False
+
+
+def _report_dir(name: str) -> str:
+    """Diretório do relatório, no layout dos logs do Airflow (dag_id/run_id/task_id)."""
+    base = os.environ.get(PROFILE_DIR_ENV)
+    if not base:
+        try:
+            from airflow.configuration import conf
+            base = os.path.join(conf.get("logging", "base_log_folder"), "profiles")
+        except Exception:
+            base = os.path.join("logs", "profiles")
+    try:
+        from airflow.operators.python import get_current_context
+        ctx = get_current_context()
+        ti = ctx["ti"]
+        parts = [f"dag_id={ti.dag_id}", f"run_id={ctx['run_id']}", f"task_id={ti.task_id}"]
+        if getattr(ti, "map_index", -1) >= 0:
+            parts.append(f"map_index={ti.map_index}")
+    except Exception:
+        parts = [f"task_id={name}", f"run_id={datetime.now().strftime('%Y%m%dT%H%M%S')}"]
+    return os.path.join(base, *parts)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Amostra a pilha de uma thread a cada `interval` s (pilhas colapsadas para flamegraph)."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="openbrewerydb-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+class TaskProfiler:
+    """
+    Perfila um bloco: cProfile (CPU), amostragem de pilhas e tracemalloc (alocações).
+    Ao sair grava em `out_dir`:
+
+    - `profile.pstats` (para `python -m pstats` / snakeviz) e `profile.txt` (top por tempo acumulado)
+    - `stacks.collapsed` (formato do flamegraph.pl / speedscope)
+    - `memory_top.txt` (maiores sites de alocação vivos ao fim + pico)
+    - `summary.json`
+
+    Args:
+        out_dir: Diretório do relatório.
+        interval: Intervalo de amostragem das pilhas (s).
+    """
+
+    def __init__(self, out_dir: str, interval: float = SAMPLE_INTERVAL_S):
+        self.out_dir = out_dir
+        self.interval = interval
+        self.summary: dict = {}
+
+    def __enter__(self) -> "TaskProfiler":
+        self._own_tracemalloc = not tracemalloc.is_tracing()
+        if self._own_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        self._sampler = _StackSampler(threading.get_ident(), self.interval)
+        self._sampler.start()
+        self._profiler = cProfile.Profile()
+        self._t0, self._cpu0 = time.perf_counter(), time.process_time()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._profiler.disable()
+        wall, cpu = time.perf_counter() - self._t0, time.process_time() - self._cpu0
+        self._sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+        try:
+            self._write_report(wall, cpu, snapshot, peak, exc_type)
+        except Exception:
+            # o relatório nunca derruba a task
+            LoggingMixin().log.warning("Falha ao gravar profiling em %s", self.out_dir, exc_info=True)
+        return False
+
+    def _write_report(self, wall, cpu, snapshot, peak, exc_type) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._profiler.dump_stats(os.path.join(self.out_dir, "profile.pstats"))
+
+        buf = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative")
+        stats.print_stats(TOP_N)
+        with open(os.path.join(self.out_dir, "profile.txt"), "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+
+        with open(os.path.join(self.out_dir, "stacks.collapsed"), "w", encoding="utf-8") as f:
+            for stack, n in self._sampler.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        top = snapshot.statistics("lineno")[:TOP_N]
+        with open(os.path.join(self.out_dir, "memory_top.txt"), "w", encoding="utf-8") as f:
+            f.write(f"pico rastreado: {peak / 2**20:.1f} MiB\n")
+            for stat in top:
+                f.write(f"{stat}\n")
+
+        hot = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:5]
+        self.summary = {
+            "wall_s": wall, "cpu_s": cpu, "peak_traced_bytes": peak,
+            "samples": sum(self._sampler.stacks.values()), "status": "error" if exc_type else "ok",
+            "top_cumulative": [
+                {"function": f"{os.path.basename(file)}:{line}({func})", "cumtime_s": v[3]}
+                for (file, line, func), v in hot
+            ],
+        }
+        with open(os.path.join(self.out_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, ensure_ascii=False, indent=2)
+
+
+def profiled(fn):
+    """
+    Decorator para o corpo de uma task: com o profiling ligado (`profiling_enabled`)
+    executa dentro de um `TaskProfiler` e grava o relatório junto aos logs do run;
+    desligado, só chama a função.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not profiling_enabled():
+            return fn(*args, **kwargs)
+        log = LoggingMixin().log
+        out_dir = _report_dir(fn.__name__)
+        try:
+            with TaskProfiler(out_dir):
+                return fn(*args, **kwargs)
+        finally:
+            log.info("Profiling de %s gravado em %s", fn.__name__, out_dir)
+
+    return wrapper
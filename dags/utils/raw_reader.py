@@ -0,0 +1,79 @@
+import json
+from typing import Sequence
+
+import pyarrow as pa
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .schema import BREWERY_SCHEMA
+from . import storage
+
+
+def _to_arrow_column(values: list) -> pa.Array:
+    """Converte valores JSON em array Arrow; tipos mistos caem para string."""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _load_json(path: str) -> list[dict]:
+    with storage.open_file(path, "rb") as f:
+        data = json.load(f)
+    return [data] if isinstance(data, dict) else data
+
+
+def read_raw_table(files: Sequence[str]) -> pa.Table:
+    """
+    Lê um batch de arquivos JSON da camada raw (listas de breweries) direto
+    para uma tabela Arrow, montando apenas as colunas do `BREWERY_SCHEMA`.
+    Os tipos finais são aplicados por `normalize_brewery_table`. Os arquivos são
+    lidos em paralelo quando o lake está em object store (`storage.map_files`),
+    o que esconde a latência por arquivo; no disco local, em sequência.
+
+    Args:
+        files: Caminhos dos arquivos JSON do batch.
+
+    Returns:
+        Tabela Arrow (pode ter 0 linhas).
+
+    Raises:
+        AirflowFailException: Em erro de leitura ou JSON inválido.
+    """
+    log = LoggingMixin().log
+    records: list[dict] = []
+    try:
+        for data in storage.map_files(_load_json, files):
+            records.extend(data)
+    except Exception as e:
+        log.exception("Falha ao ler JSONs do batch: %s", list(files))
+        raise AirflowFailException(f"Erro de leitura de JSON: {e}") from e
+
+    try:
+        # Caminho rápido: conversão em C++ (une as chaves de todos os registros)
+        table = pa.Table.from_struct_array(pa.array(records)) if records else pa.table({})
+        table = table.select([c for c in BREWERY_SCHEMA.names if c in table.column_names])
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Tipos mistos na mesma coluna (ex.: latitude numérica e textual)
+        table = pa.table({
+            name: _to_arrow_column([r.get(name) for r in records])
+            for name in BREWERY_SCHEMA.names
+        })
+    log.info("read_raw_table: files=%s rows=%s", len(files), table.num_rows)
+    return table
+
+
+def read_raw_frame(files: Sequence[str]):
+    """
+    Caminho pandas (`SILVER_ENGINE="pandas"` e `update_dimensions`): um DataFrame
+    com todas as colunas dos JSON do batch (`pd.read_json` por arquivo, em paralelo fora do disco local).
+
+    Raises:
+        AirflowFailException: Em erro de leitura ou JSON inválido.
+    """
+    import pandas as pd
+
+    try:
+        return pd.concat(storage.map_files(pd.read_json, files), ignore_index=True)
+    except Exception as e:
+        LoggingMixin().log.exception("Falha ao ler/concatenar JSONs do batch: %s", list(files))
+        raise AirflowFailException(f"Erro de leitura de JSON: {e}") from e
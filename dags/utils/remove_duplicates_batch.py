@@ -6,6 +6,11 @@ import pyarrow as pa
 import pyarrow.dataset as ds
 from airflow.exceptions import AirflowFailException
 from airflow.utils.log.logging_mixin import LoggingMixin
+from .parquet_profile import ParquetWriteProfile, DEFAULT_WRITE_PROFILE
+from .partition_stats import STATS_FILE, write_partition_stats
+from .metrics import instrumented, record, record_files
+from .manifest import collecting_visitor
+from . import storage
 
 
 def _require_columns(df: pd.DataFrame, cols: Sequence[str], ctx: str) -> None:
@@ -14,7 +19,51 @@ def _require_columns(df: pd.DataFrame, cols: Sequence[str], ctx: str) -> None:
         raise AirflowFailException(f"Colunas ausentes em {ctx}: {missing}")
 
 
-def remove_duplicates_batch(date: str, silver_path_fact: str) -> None:
+IDENTITY_COLUMNS = ["name", "country", "state", "city", "brewery_type"]
+
+
+def deduplicate_frame(df: pd.DataFrame, ctx: str) -> pd.DataFrame:
+    """
+    Mantém uma linha por `IDENTITY_COLUMNS`: a mais completa (mais campos não nulos
+    fora das chaves).
+
+    Args:
+        df: Linhas do batch (com as colunas de identidade).
+        ctx: Contexto para mensagens de erro (ex.: 'batch=2025-09-27').
+
+    Returns:
+        DataFrame deduplicado.
+
+    Raises:
+        AirflowFailException: Se faltar alguma coluna de identidade.
+    """
+    identity_cols = IDENTITY_COLUMNS
+    _require_columns(df, identity_cols, ctx)
+
+    # Colunas não-chave para medir completude
+    cols_to_check = [c for c in df.columns if c not in identity_cols]
+    if not cols_to_check:
+        LoggingMixin().log.warning("Sem colunas não-chave para medir completude; apenas drop_duplicates.")
+        return df.drop_duplicates(subset=identity_cols, keep="first")
+
+    # Completude = contagem de não-nulos nas não-chaves
+    df = df.copy()
+    df["__completeness__"] = df[cols_to_check].notna().sum(axis=1)
+    return (
+        df.sort_values(by=identity_cols + ["__completeness__"],
+                       ascending=[True] * len(identity_cols) + [False])
+          .drop_duplicates(subset=identity_cols, keep="first")
+          .drop(columns="__completeness__")
+    )
+
+
+@instrumented("remove_duplicates_batch", batch=lambda a: a["date"])
+def remove_duplicates_batch(
+    date: str,
+    silver_path_fact: str,
+    profile: ParquetWriteProfile = DEFAULT_WRITE_PROFILE,
+    files: list[str] | None = None,
+) -> list[str]:
     """
     Deduplica apenas o batch informado (batch=<date>) dentro de `silver_path_fact`.
     Mantém a versão mais completa de cada registro com base em `identity_cols`,
@@ -23,6 +72,15 @@ def remove_duplicates_batch(date: str, silver_path_fact: str) -> None:
     Args:
         date: Identificador do batch (ex.: '2025-09-27').
         silver_path_fact: Diretório base da fato silver (particionado Hive).
+        profile: Layout dos Parquet reescritos (codec, dictionary, row groups, ordenação).
+        files: Arquivos do batch vindos do manifesto da etapa anterior; evita listar
+            o diretório. Devem cobrir o batch inteiro (a silver limpa batch=<date>
+            antes de escrever, ver `clear_batch`): a saída usa os nomes padrão do
+            pyarrow e os `_stats.json` são regravados só a partir dessas linhas.
+            None = descobre os arquivos em batch=<date>.
+
+    Returns:
+        Arquivos Parquet escritos (vazio se não havia o que deduplicar).
 
     Raises:
         AirflowFailException: Em falhas de leitura, validação ou escrita.
@@ -30,68 +88,88 @@ def remove_duplicates_batch(date: str, silver_path_fact: str) -> None:
     log = LoggingMixin().log
     batch_path = os.path.join(silver_path_fact, f"batch={date}")
     log.info("Deduplicação do batch=%s em %s", date, batch_path)
+    written: list[str] = []
 
     try:
-        if not os.path.isdir(batch_path):
+        if not storage.isdir(batch_path):
             log.warning("Path do batch não existe: %s", batch_path)
-            return
-
-        dataset = ds.dataset(batch_path, format="parquet", partitioning="hive")
+            return written
+        if files is not None and not files:
+            log.warning("Manifesto sem arquivos para batch=%s", date)
+            return written
+
+        filesystem, base_dir = storage.arrow_filesystem(batch_path)
+        if files is None:
+            dataset = ds.dataset(base_dir, format="parquet", partitioning="hive", filesystem=filesystem)
+        else:
+            dataset = ds.dataset([storage.strip(f) for f in files], format="parquet", partitioning="hive",
+                                 partition_base_dir=base_dir, filesystem=filesystem)
+        record_files(dataset.files, written=False)
         table = dataset.to_table() 
         if table.num_rows == 0:
             log.warning("Nenhum dado encontrado para batch=%s", date)
-            return
+            return written
 
         df = table.to_pandas()
         if df.empty:
             log.warning("DataFrame vazio após conversão; batch=%s", date)
-            return
+            return written
 
-        identity_cols = ["name", "country", "state", "city", "brewery_type"]
-        _require_columns(df, identity_cols, f"batch={date}")
-
-        # Colunas não-chave para medir completude
-        cols_to_check = [c for c in df.columns if c not in identity_cols]
-        if not cols_to_check:
-            log.warning("Sem colunas não-chave para medir completude; apenas drop_duplicates.")
-            df_sorted = df.drop_duplicates(subset=identity_cols, keep="first")
-        else:
-            # Completude = contagem de não-nulos nas não-chaves
-            df = df.copy()
-            df["__completeness__"] = df[cols_to_check].notna().sum(axis=1)
-            df_sorted = (
-                df.sort_values(by=identity_cols + ["__completeness__"],
-                               ascending=[True] * len(identity_cols) + [False])
-                  .drop_duplicates(subset=identity_cols, keep="first")
-                  .drop(columns="__completeness__")
-            )
+        df_sorted = deduplicate_frame(df, f"batch={date}")
 
         n_before = len(df)
         n_after = len(df_sorted)
+        record(rows_in=n_before, rows_out=n_after)
         log.info("Dedup batch=%s: antes=%s depois=%s removidos=%s",
                  date, n_before, n_after, n_before - n_after)
 
         # Para garantir limpeza total, removemos o diretório do batch antes.
+        # Com manifesto, só os arquivos lidos saem (o manifesto cobre o batch inteiro),
+        # junto com os `_stats.json` das parts dessas partições: uma part esvaziada
+        # pela dedup não recebe sidecar novo e o antigo inflaria o `_stats_index.json`.
         try:
-            for root, dirs, files in os.walk(batch_path, topdown=False):
-                for f in files:
-                    os.remove(os.path.join(root, f))
-                for d in dirs:
-                    os.rmdir(os.path.join(root, d))
+            if files is not None:
+                partition_dirs = {os.path.dirname(os.path.dirname(f)) for f in files}
+                stale = [s for s in storage.find_files(batch_path, STATS_FILE)
+                         if os.path.dirname(os.path.dirname(s)) in partition_dirs]
+            if not storage.is_local(batch_path):
+                # Object store: sem diretórios reais; remove os objetos lidos em um lote
+                storage.remove(files + stale if files is not None
+                               else storage.find_files(batch_path, include_hidden_dirs=True))
+            else:
+                if files is not None:
+                    for f in files + stale:
+                        os.remove(f)
+                for root, dirs, names in os.walk(batch_path, topdown=False):
+                    if files is None:
+                        for f in names:
+                            os.remove(os.path.join(root, f))
+                    for d in dirs:
+                        d = os.path.join(root, d)
+                        if files is None or not os.listdir(d):
+                            os.rmdir(d)
         except Exception:
             log.exception("Falha ao limpar diretório do batch antes da escrita: %s", batch_path)
             raise AirflowFailException("Não foi possível limpar o diretório do batch antes da escrita.")
 
+        table_out = profile.sort(pa.Table.from_pandas(df_sorted, preserve_index=False))
         ds.write_dataset(
-            data=pa.Table.from_pandas(df_sorted, preserve_index=False),
-            base_dir=batch_path,                      
+            data=table_out,
+            base_dir=base_dir,
+            filesystem=filesystem,
             format="parquet",
             partitioning=["country", "state", "part"], 
             partitioning_flavor="hive",
             existing_data_behavior="overwrite_or_ignore",
+            file_visitor=collecting_visitor(written, batch_path),
+            **profile.write_dataset_kwargs(),
         )
 
+        if "part" in table_out.column_names:
+            write_partition_stats(table_out, batch_path)
+
         log.info("Deduplicação concluída para batch=%s; registros finais=%s", date, n_after)
+        return written
 
     except AirflowFailException:
         raise
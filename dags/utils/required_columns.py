@@ -1,10 +1,17 @@
 from airflow.exceptions import AirflowFailException
 from typing import Iterable
 import pandas as pd
+import pyarrow as pa
 
 
-def require_columns(df: pd.DataFrame, cols: Iterable[str], ctx: str) -> None:
-    """Valida a presença de colunas exigidas."""
-    missing = [c for c in cols if c not in df.columns]
+def require_columns(df: pd.DataFrame | pa.Table | pa.Schema, cols: Iterable[str], ctx: str) -> None:
+    """Valida a presença de colunas exigidas (DataFrame, pa.Table ou pa.Schema)."""
+    if isinstance(df, pa.Table):
+        present = df.column_names
+    elif isinstance(df, pa.Schema):
+        present = df.names
+    else:
+        present = df.columns
+    missing = [c for c in cols if c not in present]
     if missing:
-        raise AirflowFailException(f"Colunas ausentes em {ctx}: {missing}")
\ No newline at end of file
+        raise AirflowFailException(f"Colunas ausentes em {ctx}: {missing}")
@@ -2,16 +2,21 @@ import json
 import os
 from datetime import datetime
 from airflow.utils.log.logging_mixin import LoggingMixin
+from .metrics import instrumented, record, record_files
+from . import storage
 
-def save_api_data(data: dict | list, base_path: str, page: int) -> str:
+@instrumented("save_api_data")
+def save_api_data(data: dict | list, base_path: str, page: int, day: str | None = None) -> str:
     """
     Salva dados JSON retornados da API em partições por data (year/month/day).
     Usa logger padrão do Airflow para registrar eventos.
 
     Args:
         data: Dados retornados da API (dict ou list).
-        base_path: Diretório base onde salvar os dados.
+        base_path: Diretório base onde salvar os dados (local ou URL fsspec, ver `storage`).
         page: Número da página (para compor o nome do arquivo).
+        day: Partição (YYYY-MM-DD) onde gravar; padrão, o dia corrente. A DAG passa
+            o dia do run para que a silver leia a mesma partição.
 
     Returns:
         Caminho completo do arquivo salvo.
@@ -22,21 +27,24 @@ def save_api_data(data: dict | list, base_path: str, page: int) -> str:
     log = LoggingMixin().log
 
     # Cria partições por data
-    today = datetime.today()
+    today = datetime.strptime(day, "%Y-%m-%d") if day else datetime.today()
     path = os.path.join(
         base_path,
         f"year={today.year}",
         f"month={today.month:02d}",
         f"day={today.day:02d}"
     )
-    os.makedirs(path, exist_ok=True)
+    storage.makedirs(path)
 
     filename = os.path.join(path, f"breweries_page_{page:03d}.json")
 
     try:
-        with open(filename, "w", encoding="utf-8") as f:
+        with storage.open_file(filename, "w", encoding="utf-8") as f:
             # `ensure_ascii=False` mantém acentos, `indent=2` é opcional
             json.dump(data, f, ensure_ascii=False)
+        n = len(data) if isinstance(data, list) else 1
+        record(rows_in=n, rows_out=n)
+        record_files([filename], written=True)
         log.info(
             "Página %s salva em %s (tipo=%s, tamanho=%s)",
             page,
@@ -0,0 +1,28 @@
+import pyarrow as pa
+
+# Schema canônico da brewery (camada raw -> silver). Toda parte escrita na
+# silver passa por este schema, evitando drift de tipos entre batches/parts.
+BREWERY_SCHEMA = pa.schema([
+    pa.field("id", pa.string()),
+    pa.field("name", pa.string()),
+    pa.field("brewery_type", pa.string()),
+    pa.field("address_1", pa.string()),
+    pa.field("address_2", pa.string()),
+    pa.field("address_3", pa.string()),
+    pa.field("city", pa.string()),
+    pa.field("state_province", pa.string()),
+    pa.field("postal_code", pa.string()),
+    pa.field("country", pa.string()),
+    pa.field("longitude", pa.float64()),
+    pa.field("latitude", pa.float64()),
+    pa.field("phone", pa.string()),
+    pa.field("website_url", pa.string()),
+    pa.field("state", pa.string()),
+    pa.field("street", pa.string()),
+])
+
+TEXT_COLUMNS = [f.name for f in BREWERY_SCHEMA if pa.types.is_string(f.type)]
+NUMERIC_COLUMNS = [f.name for f in BREWERY_SCHEMA if pa.types.is_floating(f.type)]
+
+# Colunas mapeadas pelas dimensões (original -> *_norm)
+DIMENSION_COLUMNS = ["country", "state", "city", "brewery_type"]
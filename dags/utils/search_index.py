@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pyarrow.dataset as ds
+from airflow.exceptions import AirflowFailException
+from airflow.utils.log.logging_mixin import LoggingMixin
+from .normalization import normalize_name
+from .gold_partials import partition_fingerprint, partition_key
+from .metrics import batch_from_path
+
+MANIFEST_FILE = "manifest.json"
+SEGMENT_PREFIX = "seg-"
+SEGMENT_ARRAYS = (
+    "ids", "names", "parts", "texts",
+    "terms", "term_offsets", "term_postings",
+    "grams", "gram_offsets", "gram_postings",
+)
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Tokens normalizados (minúsculas, sem acento, alfanuméricos)."""
+    norm = normalize_name(text) if text else None
+    return [t for t in norm.split("_") if t] if norm else []
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _postings(doc_keys: list[set[str]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Índice invertido compacto: chaves ordenadas + offsets + doc ids (int32) por chave."""
+    pairs = sorted((key, doc) for doc, keys in enumerate(doc_keys) for key in keys)
+    if not pairs:
+        return np.array([], dtype="U1"), np.zeros(1, dtype=np.int64), np.array([], dtype=np.int32)
+    keys = np.array([k for k, _ in pairs])
+    docs = np.array([d for _, d in pairs], dtype=np.int32)
+    uniq, starts = np.unique(keys, return_index=True)
+    return uniq, np.append(starts, len(docs)).astype(np.int64), docs
+
+
+def build_segment(ids: list, names: list, cities: list, parts: list, path: str) -> int:
+    """
+    Grava o segmento de uma partição country/state em `path/*.npy`:
+    termos (tokens de name + city) e trigramas do texto normalizado, cada um com
+    offsets + postings; mais ids, nomes e part de cada documento.
+    """
+    texts = [" ".join(tokenize(n) + tokenize(c)) for n, c in zip(names, cities)]
+    terms, term_offsets, term_postings = _postings([set(t.split()) for t in texts])
+    grams, gram_offsets, gram_postings = _postings([_trigrams(t) for t in texts])
+    arrays = {
+        "ids": np.array(["" if i is None else str(i) for i in ids]),
+        "names": np.array(["" if n is None else str(n) for n in names]),
+        "parts": np.array(["" if p is None else str(p) for p in parts]),
+        "texts": np.array(texts) if texts else np.array([], dtype="U1"),
+        "terms": terms, "term_offsets": term_offsets, "term_postings": term_postings,
+        "grams": grams, "gram_offsets": gram_offsets, "gram_postings": gram_postings,
+    }
+    os.makedirs(path, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), arr)
+    return len(texts)
+
+
+def segment_layout(paths: list[str], silver_path: str) -> str:
+    """
+    Chave do layout de uma partição: arquivos (caminho relativo) e fingerprint de
+    cada part. Muda quando linhas trocam de part/arquivo mesmo com o conteúdo da
+    partição igual, o que invalida o `part` gravado nos documentos do segmento.
+    """
+    by_part: dict[str, list[str]] = {}
+    for p in paths:
+        by_part.setdefault(os.path.dirname(p), []).append(p)
+    h = hashlib.sha256(b"layout")
+    for part_dir, files in sorted(by_part.items()):
+        h.update(f"{os.path.relpath(part_dir, silver_path)}:{partition_fingerprint(files, silver_path)};".encode())
+        for f in sorted(files):
+            h.update(f"{os.path.relpath(f, silver_path)};".encode())
+    return h.hexdigest()
+
+
+def _collect_segments(index_root: str, keep: set[str]) -> None:
+    """Remove versões de segmento (e arquivos de layouts antigos) fora de `keep` (caminhos relativos)."""
+    if not os.path.isdir(index_root):
+        return
+    for country_dir in os.listdir(index_root):
+        country_path = os.path.join(index_root, country_dir)
+        if not country_dir.startswith("country=") or not os.path.isdir(country_path):
+            continue
+        for state_dir in os.listdir(country_path):
+            state_path = os.path.join(country_path, state_dir)
+            if not os.path.isdir(state_path):
+                continue
+            for name in os.listdir(state_path):
+                rel = "/".join((country_dir, state_dir, name))
+                if rel in keep:
+                    continue
+                target = os.path.join(state_path, name)
+                if os.path.isdir(target):
+                    shutil.rmtree(target, ignore_errors=True)
+                else:
+                    os.remove(target)
+            if not os.listdir(state_path):
+                os.rmdir(state_path)
+        if not os.listdir(country_path):
+            os.rmdir(country_path)
+
+
+def build_search_index(silver_path: str, index_root: str, files: list[str] | None = None) -> dict:
+    """
+    Atualiza o índice de busca (um segmento por country/state) a partir da silver.
+
+    Só as partições cujo fingerprint ou layout (arquivos/parts) mudou são reindexadas;
+    segmentos de partições que sumiram saem do manifesto. Cada segmento novo é gravado
+    em um diretório versionado (`seg-<n>`) e publicado pela troca atômica do
+    `manifest.json`, que aponta para a versão vigente; leitores nunca encontram a
+    partição sem segmento. Versões antigas ficam até a execução seguinte (leitores
+    que abriram o manifesto anterior ainda as encontram) e então são removidas.
+
+    Args:
+        silver_path: Batch da silver (Hive, com id/name/city).
+        index_root: Diretório do índice (ex.: gold/search).
+        files: Arquivos do batch vindos do manifesto da silver (sem listar o
+            diretório). None = descobre os arquivos em `silver_path`.
+
+    Returns:
+        Relatório com partições reindexadas, reaproveitadas e removidas.
+
+    Raises:
+        AirflowFailException: Se faltarem colunas ou em falhas de escrita.
+    """
+    log = LoggingMixin().log
+    report = {"rebuilt": 0, "reused": 0, "removed": 0, "docs": 0}
+    try:
+        if not os.path.isdir(silver_path):
+            log.warning("Silver path não existe: %s", silver_path)
+            return report
+
+        if files is None:
+            dataset = ds.dataset(silver_path, format="parquet", partitioning="hive")
+        elif files:
+            dataset = ds.dataset(files, format="parquet", partitioning="hive", partition_base_dir=silver_path)
+        else:
+            log.warning("Manifesto da silver sem arquivos: %s", silver_path)
+            return report
+        missing = [c for c in ("id", "name", "city") if c not in dataset.schema.names]
+        if missing:
+            raise AirflowFailException(f"Colunas ausentes em build_search_index: {missing}")
+
+        manifest_path = os.path.join(index_root, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        groups: dict[tuple, list[str]] = {}
+        for fragment in dataset.get_fragments():
+            pkeys = ds.get_partition_keys(fragment.partition_expression)
+            groups.setdefault((pkeys.get("country"), pkeys.get("state")), []).append(fragment.path)
+
+        batch = batch_from_path(silver_path)
+        has_part = "part" in dataset.schema.names
+        new_manifest = {}
+        for (country, state), paths in sorted(groups.items(), key=lambda kv: (str(kv[0][0]), str(kv[0][1]))):
+            pk = partition_key(country, state)
+            previous = manifest.get(pk, {})
+            entry = {
+                "fingerprint": partition_fingerprint(paths, silver_path),
+                "layout": segment_layout(paths, silver_path),
+                "country": str(country),
+                "state": str(state),
+                "batch": batch,
+            }
+            new_manifest[pk] = entry
+            segment = previous.get("segment")
+            if (
+                segment
+                and (previous.get("fingerprint"), previous.get("layout")) == (entry["fingerprint"], entry["layout"])
+                and os.path.isdir(os.path.join(index_root, segment))
+            ):
+                # Mesmo layout: os `part` do segmento valem para o batch atual
+                entry.update(segment=segment, version=previous["version"], docs=previous.get("docs", 0))
+                report["reused"] += 1
+                continue
+
+            part_ds = ds.dataset(paths, format="parquet", partitioning="hive", partition_base_dir=silver_path)
+            cols = ["id", "name", "city"] + (["part"] if has_part else [])
+            table = part_ds.to_table(columns=cols)
+            parts = table["part"].cast("string").to_pylist() if has_part else [None] * table.num_rows
+
+            version = previous.get("version", 0) + 1
+            segment = f"{pk}/{SEGMENT_PREFIX}{version}"
+            seg_dir = os.path.join(index_root, segment)
+            shutil.rmtree(seg_dir, ignore_errors=True)
+            n = build_segment(
+                table["id"].to_pylist(), table["name"].to_pylist(), table["city"].to_pylist(), parts, seg_dir
+            )
+            entry.update(segment=segment, version=version, docs=n)
+            report["rebuilt"] += 1
+
+        report["removed"] = len(set(manifest) - set(new_manifest))
+        report["docs"] = sum(m["docs"] for m in new_manifest.values())
+        os.makedirs(index_root, exist_ok=True)
+        tmp = f"{manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(new_manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, manifest_path)
+
+        # Mantém as versões do manifesto novo e do anterior (leitores ainda abrindo segmentos)
+        keep = {m["segment"] for m in (*new_manifest.values(), *manifest.values()) if m.get("segment")}
+        _collect_segments(index_root, keep)
+
+        log.info(
+            "Índice de busca atualizado em %s (reindexadas=%s reaproveitadas=%s removidas=%s docs=%s)",
+            index_root, report["rebuilt"], report["reused"], report["removed"], report["docs"]
+        )
+        return report
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado em build_search_index")
+        raise AirflowFailException(f"build_search_index falhou: {e}") from e
+
+
+class _Segment:
+    def __init__(self, path: str, country: str, state: str, batch: str | None, mmap: bool):
+        self.country, self.state, self.batch = country, state, batch
+        mode = "r" if mmap else None
+        for name in SEGMENT_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode))
+
+    @staticmethod
+    def _lookup(keys, offsets, postings, key: str) -> np.ndarray:
+        i = int(np.searchsorted(keys, key))
+        if i < len(keys) and keys[i] == key:
+            return np.asarray(postings[offsets[i]:offsets[i + 1]])
+        return np.empty(0, dtype=np.int32)
+
+    def term_docs(self, term: str, prefix: bool) -> np.ndarray:
+        if not prefix:
+            return self._lookup(self.terms, self.term_offsets, self.term_postings, term)
+        # termos ordenados: o prefixo é um intervalo contíguo (busca binária, como uma trie)
+        lo = int(np.searchsorted(self.terms, term, side="left"))
+        hi = int(np.searchsorted(self.terms, term + "￿", side="left"))
+        if lo >= hi:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.asarray(self.term_postings[self.term_offsets[lo]:self.term_offsets[hi]]))
+
+    def gram_docs(self, text: str) -> np.ndarray:
+        docs = None
+        # trigramas internos (sem o padding de borda): a consulta pode começar no meio de uma palavra
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            found = self._lookup(self.grams, self.gram_offsets, self.gram_postings, gram)
+            docs = found if docs is None else np.intersect1d(docs, found, assume_unique=True)
+            if len(docs) == 0:
+                break
+        if docs is None:
+            return np.empty(0, dtype=np.int32)
+        # trigramas filtram candidatos; a confirmação é no texto
+        return np.array([d for d in docs if text in str(self.texts[d])], dtype=np.int32)
+
+    def hits(self, docs: np.ndarray) -> list[dict]:
+        return [
+            {"id": str(self.ids[d]), "name": str(self.names[d]), "country": self.country,
+             "state": self.state, "batch": self.batch, "part": str(self.parts[d]) or None}
+            for d in docs
+        ]
+
+
+class SearchIndex:
+    """
+    Busca por nome/cidade sobre os segmentos gravados por `build_search_index`
+    (arrays .npy abertos com memory-map).
+
+    Args:
+        index_root: Diretório do índice.
+        mmap: Abre os arrays com memory-map.
+    """
+
+    def __init__(self, index_root: str, mmap: bool = True):
+        with open(os.path.join(index_root, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.segments = [
+            _Segment(os.path.join(index_root, meta.get("segment", pk)), meta["country"], meta["state"],
+                     meta.get("batch"), mmap)
+            for pk, meta in sorted(manifest.items())
+        ]
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True,
+               country: str | None = None, state: str | None = None) -> list[dict]:
+        """
+        Todos os tokens da consulta devem casar (AND); com `prefix`, o último token
+        casa por prefixo (autocomplete). Retorna id, nome e localização (country, state,
+        batch e part) de cada resultado.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        out = []
+        for seg in self._segments(country, state):
+            postings = [seg.term_docs(tok, prefix=prefix and i == len(tokens) - 1) for i, tok in enumerate(tokens)]
+            # interseção a partir da lista mais curta (termos raros primeiro)
+            postings.sort(key=len)
+            docs = postings[0]
+            for found in postings[1:]:
+                if len(docs) == 0:
+                    break
+                docs = docs[np.isin(docs, found, assume_unique=True)]
+            out.extend(seg.hits(docs[: limit - len(out)]))
+            if len(out) >= limit:
+                break
+        return out
+
+    def substring(self, text: str, limit: int = 20,
+                  country: str | None = None, state: str | None = None) -> list[dict]:
+        """Busca de substring (>= 3 caracteres) no texto normalizado, via índice de trigramas."""
+        needle = " ".join(tokenize(text))
+        if len(needle) < 3:
+            return []
+        out = []
+        for seg in self._segments(country, state):
+            out.extend(seg.hits(seg.gram_docs(needle)[: limit - len(out)]))
+            if len(out) >= limit:
+                break
+        return out
+
+    def _segments(self, country, state):
+        return [s for s in self.segments
+                if (country is None or s.country == country) and (state is None or s.state == state)]
@@ -2,19 +2,46 @@ import os
 from typing import Iterable
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.dataset as ds
 from airflow.exceptions import AirflowFailException
 from airflow.utils.log.logging_mixin import LoggingMixin
 from .required_columns import require_columns
+from .schema import DIMENSION_COLUMNS
+from .parquet_profile import ParquetWriteProfile, DEFAULT_WRITE_PROFILE
+from .partition_stats import write_partition_stats
+from .metrics import instrumented, record, record_files
+from .manifest import collecting_visitor
+from . import storage
 
 
+def clear_batch(save_path_fact: str, date: str | int) -> bool:
+    """
+    Apaga `batch=<date>` da fato silver antes de (re)processar o dia. As etapas
+    seguintes (deduplicação, compactação, stats e gold) trabalham só com os arquivos
+    do manifesto deste run; sem a limpeza, arquivos de um run anterior do mesmo dia
+    seriam compactados junto e contados duas vezes na gold.
+
+    Returns:
+        True se havia um batch anterior.
+    """
+    batch_path = storage.join(save_path_fact, f"batch={date}")
+    if not storage.exists(batch_path):
+        return False
+    LoggingMixin().log.warning("Batch silver já existia; removendo antes de reprocessar: %s", batch_path)
+    storage.rmtree(batch_path)
+    return True
+
+
+@instrumented("silver_pipeline", batch=lambda a: a["date"])
 def silver_pipeline(
     df_raw: pd.DataFrame,
     save_path_fact: str,
     save_path_dim: str,
     date: str | int,
     part: int = 1,
-) -> None:
+    profile: ParquetWriteProfile = DEFAULT_WRITE_PROFILE,
+) -> list[str]:
     """
     Normaliza e particiona o dataset 'raw' (country/state/city) com dimensões
     e grava em Parquet particionado: batch/country/state/part (formato Hive).
@@ -25,11 +52,16 @@ def silver_pipeline(
         save_path_dim: Caminho onde estão as dimensões parquet (dim_country/state/city).
         date: Identificador do batch (ex.: '2025-09-27' ou run_id).
         part: Número da partição (útil para sharding do mesmo batch).
+        profile: Layout dos Parquet (codec, dictionary, row groups, ordenação).
+
+    Returns:
+        Arquivos Parquet escritos (para o manifesto da etapa).
 
     Raises:
         AirflowFailException: Para qualquer falha de validação/IO.
     """
     log = LoggingMixin().log
+    written: list[str] = []
     log.info(
         "Início silver_pipeline rows=%s cols=%s save_path_fact=%s part=%s batch=%s",
         len(df_raw) if df_raw is not None else "None",
@@ -47,6 +79,7 @@ def silver_pipeline(
         require_columns(
             df_raw, ["country", "state", "city", "name", "brewery_type"], "df_raw"
         )
+        record(rows_in=len(df_raw))
 
         # Dimensões
         p_country = os.path.join(save_path_dim, "dim_country.parquet")
@@ -55,10 +88,10 @@ def silver_pipeline(
         p_brewery_type = os.path.join(save_path_dim, "dim_brewery_type.parquet")
 
         try:
-            dim_country_df = pd.read_parquet(p_country)
-            dim_state_df = pd.read_parquet(p_state)
-            dim_city_df = pd.read_parquet(p_city)
-            dim_brewery_type_df = pd.read_parquet(p_brewery_type)
+            dim_country_df, dim_state_df, dim_city_df, dim_brewery_type_df = storage.map_files(
+                pd.read_parquet, [p_country, p_state, p_city, p_brewery_type]
+            )
+            record_files([p_country, p_state, p_city, p_brewery_type], written=False)
         except Exception as e:
             log.exception("Falha ao ler dimensões em %s | %s | %s", p_country, p_state, p_city)
             raise AirflowFailException(f"Erro ao ler dimensões: {e}") from e
@@ -112,6 +145,7 @@ def silver_pipeline(
             raise AirflowFailException("Todos os registros foram descartados após dropna().")
         if after < before:
             log.info("Registros removidos por NA: %s -> %s (removidos=%s)", before, after, before - after)
+        record(rows_out=after)
 
         # Escrita
         # Garantindo ser string
@@ -135,14 +169,21 @@ def silver_pipeline(
 
             # Salva nas partições
             try:
+                table_country = profile.sort(pa.Table.from_pandas(df_country, preserve_index=False))
+                filesystem, base_dir = storage.arrow_filesystem(save_path_fact)
                 ds.write_dataset(
-                    data=pa.Table.from_pandas(df_country, preserve_index=False),
-                    base_dir=save_path_fact,
+                    data=table_country,
+                    base_dir=base_dir,
+                    filesystem=filesystem,
                     format="parquet",
                     partitioning=["batch", "country", "state", "part"],
                     partitioning_flavor="hive",
                     existing_data_behavior="overwrite_or_ignore",
+                    file_visitor=collecting_visitor(written, save_path_fact),
+                    **profile.write_dataset_kwargs(),
                 )
+                write_partition_stats(table_country.drop_columns(["batch"]),
+                                      os.path.join(save_path_fact, f"batch={batch_str}"))
                 log.info(
                     "Escrito: rows=%s batch=%s country=%s states=%s",
                     len(df_country), batch_str, country, df_country["state"].nunique()
@@ -152,9 +193,183 @@ def silver_pipeline(
                 raise AirflowFailException(f"Erro ao escrever parquet: {e}") from e
 
         log.info("Silver salvo em %s/batch=%s", save_path_fact, batch_str)
+        return written
 
     except AirflowFailException:
         raise
     except Exception as e:
         log.exception("Erro inesperado na silver_pipeline")
-        raise AirflowFailException(f"silver_pipeline falhou: {e}") from e 
+        raise AirflowFailException(f"silver_pipeline falhou: {e}") from e
+
+
+def load_dimension_tables(save_path_dim: str) -> dict[str, tuple[pa.Array, pa.Array]]:
+    """
+    Lê as dimensões de-para como arrays Arrow.
+
+    Args:
+        save_path_dim: Caminho onde estão as dimensões parquet.
+
+    Returns:
+        Dict coluna -> (valores originais, valores normalizados).
+
+    Raises:
+        AirflowFailException: Se alguma dimensão não puder ser lida ou for inválida.
+    """
+    paths = [os.path.join(save_path_dim, f"dim_{col}.parquet") for col in DIMENSION_COLUMNS]
+    try:
+        # Fora do disco local, as quatro dimensões são lidas em paralelo (uma ida ao storage cada)
+        tables = storage.map_files(storage.read_table, paths)
+        record_files(paths, written=False)
+    except Exception as e:
+        raise AirflowFailException(f"Erro ao ler dimensões: {e}") from e
+
+    dims = {}
+    for col, dim in zip(DIMENSION_COLUMNS, tables):
+        require_columns(dim, [col, f"{col}_norm"], f"dim_{col}")
+        dims[col] = (
+            dim[col].combine_chunks().cast(pa.string()),
+            dim[f"{col}_norm"].combine_chunks().cast(pa.string()),
+        )
+    return dims
+
+
+def map_dimensions(table: pa.Table, dims: dict[str, tuple[pa.Array, pa.Array]]) -> pa.Table:
+    """
+    Substitui as colunas de dimensão pelos valores normalizados (hash join via
+    `pc.index_in` + `take`) e mantém só as linhas completas.
+
+    Args:
+        table: Tabela conformada ao `BREWERY_SCHEMA`.
+        dims: Dict coluna -> (valores originais, valores normalizados), ver `load_dimension_tables`.
+
+    Returns:
+        Tabela com as dimensões normalizadas e sem nulos nas chaves.
+
+    Raises:
+        AirflowFailException: Se todos os registros forem descartados.
+    """
+    log = LoggingMixin().log
+    misses = {}
+    for col in DIMENSION_COLUMNS:
+        original, normalized = dims[col]
+        idx = pc.index_in(table[col].cast(pa.string()), value_set=original)
+        mapped = pc.take(normalized, idx)
+        misses[col] = mapped.null_count
+        table = table.set_column(table.schema.get_field_index(col), col, mapped)
+
+    if any(misses.values()):
+        log.warning(
+            "Valores sem normalização: country=%s state=%s city=%s brewery_type=%s",
+            misses["country"], misses["state"], misses["city"], misses["brewery_type"]
+        )
+
+    # Seleciona somente as linhas completas
+    before = table.num_rows
+    mask = None
+    for col in ["name", "country", "state", "city", "brewery_type"]:
+        valid = pc.is_valid(table[col])
+        mask = valid if mask is None else pc.and_(mask, valid)
+    table = table.filter(mask)
+    after = table.num_rows
+    if after == 0:
+        raise AirflowFailException("Todos os registros foram descartados após dropna().")
+    if after < before:
+        log.info("Registros removidos por NA: %s -> %s (removidos=%s)", before, after, before - after)
+    return table
+
+
+@instrumented("silver_pipeline", batch=lambda a: a["date"])
+def silver_pipeline_arrow(
+    table: pa.Table,
+    save_path_fact: str,
+    save_path_dim: str,
+    date: str | int,
+    part: int = 1,
+    profile: ParquetWriteProfile = DEFAULT_WRITE_PROFILE,
+) -> list[str]:
+    """
+    Caminho Arrow-native da silver: mesma saída de `silver_pipeline`, mas sem
+    round trip por pandas. O lookup nas dimensões é feito com `pc.index_in` + `take`
+    e a tabela é escrita direto com `ds.write_dataset` (batch/country/state/part).
+
+    Args:
+        table: Tabela já conformada ao `BREWERY_SCHEMA` (ver `normalize_brewery_table`).
+        save_path_fact: Caminho base da fato silver.
+        save_path_dim: Caminho onde estão as dimensões parquet.
+        date: Identificador do batch (ex.: '2025-09-27' ou run_id).
+        part: Número da partição (útil para sharding do mesmo batch).
+        profile: Layout dos Parquet (codec, dictionary, row groups, ordenação).
+
+    Returns:
+        Arquivos Parquet escritos (para o manifesto da etapa).
+
+    Raises:
+        AirflowFailException: Para qualquer falha de validação/IO.
+    """
+    log = LoggingMixin().log
+    written: list[str] = []
+    log.info(
+        "Início silver_pipeline_arrow rows=%s cols=%s save_path_fact=%s part=%s batch=%s",
+        table.num_rows if table is not None else "None",
+        table.num_columns if table is not None else "None",
+        save_path_fact,
+        part,
+        date,
+    )
+
+    try:
+        if table is None or table.num_rows == 0:
+            raise AirflowFailException("table vazia ou None.")
+
+        require_columns(table, ["country", "state", "city", "name", "brewery_type"], "table")
+        record(rows_in=table.num_rows)
+
+        try:
+            dims = load_dimension_tables(save_path_dim)
+        except AirflowFailException:
+            log.exception("Falha ao ler dimensões em %s", save_path_dim)
+            raise
+
+        table = map_dimensions(table, dims)
+        after = table.num_rows
+        record(rows_out=after)
+
+        batch_str = str(date)
+        part_str = str(part)
+        table = (
+            table.append_column("batch", pa.repeat(pa.scalar(batch_str), after))
+                 .append_column("part", pa.repeat(pa.scalar(part_str), after))
+        )
+
+        try:
+            table = profile.sort(table)
+            filesystem, base_dir = storage.arrow_filesystem(save_path_fact)
+            ds.write_dataset(
+                data=table,
+                base_dir=base_dir,
+                filesystem=filesystem,
+                format="parquet",
+                partitioning=["batch", "country", "state", "part"],
+                partitioning_flavor="hive",
+                existing_data_behavior="overwrite_or_ignore",
+                file_visitor=collecting_visitor(written, save_path_fact),
+                **profile.write_dataset_kwargs(),
+            )
+        except Exception as e:
+            log.exception("Falha ao escrever parquet batch=%s", batch_str)
+            raise AirflowFailException(f"Erro ao escrever parquet: {e}") from e
+
+        write_partition_stats(table.drop_columns(["batch"]), os.path.join(save_path_fact, f"batch={batch_str}"))
+
+        log.info(
+            "Escrito: rows=%s batch=%s countries=%s",
+            after, batch_str, pc.count_distinct(table["country"]).as_py()
+        )
+        log.info("Silver salvo em %s/batch=%s", save_path_fact, batch_str)
+        return written
+
+    except AirflowFailException:
+        raise
+    except Exception as e:
+        log.exception("Erro inesperado na silver_pipeline_arrow")
+        raise AirflowFailException(f"silver_pipeline_arrow falhou: {e}") from e
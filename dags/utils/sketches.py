@@ -0,0 +1,286 @@
+import json
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from . import storage
+
+SKETCHES_FILE = "sketches.parquet"
+
+
+def hash_values(values: Iterable) -> np.ndarray:
+    """Hash uint64 determinístico de valores (None incluído) via pandas."""
+    arr = np.asarray(list(values), dtype=object)
+    arr = np.where(pd.isna(arr), "\x00<null>", arr).astype(object)
+    return pd.util.hash_array(arr, categorize=False)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Nº de bits significativos de cada uint64 (0 para 0), sem passar por float."""
+    x = x.astype(np.uint64, copy=True)
+    n = np.zeros(x.shape, dtype=np.int64)
+    for s in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(s))
+        n[mask] += s
+        x[mask] >>= np.uint64(s)
+    return n + (x > 0)
+
+
+@dataclass(frozen=True)
+class SketchConfig:
+    """
+    Limites de erro dos sketches.
+
+    O Count-Min é dimensionado para o domínio de brewery_type (~10 valores), e não
+    para o erro teórico em fluxos grandes. Com epsilon=0.02 a tabela tem 136 x 5
+    contadores (~5 KB por partição; com 0.001 seriam 2719 x 5, ~108 KB). Com ~10
+    chaves, a chance de uma chave colidir nas 5 linhas é ~(9/136)^5 ≈ 1e-6, então
+    as estimativas saem praticamente exatas.
+
+    Attributes:
+        hll_error: Erro relativo padrão do HyperLogLog (~1.04/sqrt(2^p)).
+        cms_epsilon: Erro aditivo do Count-Min, como fração do total (largura = e/epsilon).
+        cms_delta: Probabilidade de exceder o erro (profundidade = ln(1/delta)).
+        topk: Nº de contadores do Space-Saving.
+    """
+    hll_error: float = 0.02
+    cms_epsilon: float = 0.02
+    cms_delta: float = 0.01
+    topk: int = 32
+
+    @property
+    def hll_p(self) -> int:
+        return min(18, max(4, math.ceil(math.log2((1.04 / self.hll_error) ** 2))))
+
+    @property
+    def cms_width(self) -> int:
+        return math.ceil(math.e / self.cms_epsilon)
+
+    @property
+    def cms_depth(self) -> int:
+        return math.ceil(math.log(1 / self.cms_delta))
+
+
+DEFAULT_SKETCH_CONFIG = SketchConfig()
+
+
+class HyperLogLog:
+    """HyperLogLog (registros uint8, 2^p) para contagem aproximada de distintos."""
+
+    def __init__(self, p: int = 12, registers: np.ndarray | None = None):
+        self.p = p
+        self.registers = registers if registers is not None else np.zeros(1 << p, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        q = 64 - self.p
+        idx = (hashes >> np.uint64(q)).astype(np.int64)
+        rest = hashes & np.uint64((1 << q) - 1)
+        rank = (q - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def add(self, values: Iterable) -> None:
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError(f"HyperLogLog com p diferentes: {self.p} != {other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # correção para cardinalidades pequenas (linear counting)
+            return m * math.log(m / zeros)
+        return float(raw)
+
+
+class CountMinSketch:
+    """Count-Min (depth x width, int64): frequência estimada com erro <= epsilon * total."""
+
+    def __init__(self, width: int, depth: int, table: np.ndarray | None = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        # Hashing duplo (h1 + i*h2) a partir de um hash de 64 bits
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, values: Iterable, counts: Iterable[int]) -> None:
+        hashes = hash_values(values)
+        if len(hashes) == 0:
+            return
+        counts = np.asarray(list(counts), dtype=np.int64)
+        cols = self._columns(hashes)
+        for i in range(self.depth):
+            np.add.at(self.table[i], cols[i], counts)
+
+    def estimate(self, value) -> int:
+        cols = self._columns(hash_values([value]))[:, 0]
+        return int(self.table[np.arange(self.depth), cols].min())
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if other.table.shape != self.table.shape:
+            raise ValueError("Count-Min com dimensões diferentes")
+        self.table += other.table
+        return self
+
+
+class SpaceSaving:
+    """Space-Saving com `k` contadores (item -> [count, erro]) para heavy hitters; mergeable."""
+
+    def __init__(self, k: int = 32, counters: dict | None = None):
+        self.k = k
+        self.counters: dict = counters if counters is not None else {}
+
+    def add(self, values: Iterable, counts: Iterable[int]) -> None:
+        c = self.counters
+        for item, n in zip(values, counts):
+            if item in c:
+                c[item][0] += n
+            elif len(c) < self.k:
+                c[item] = [n, 0]
+            else:
+                victim = min(c, key=lambda x: c[x][0])
+                floor = c.pop(victim)[0]
+                c[item] = [floor + n, floor]
+
+    def floor(self) -> int:
+        """Maior contagem que um item fora do resumo pode ter (0 enquanto há contadores livres)."""
+        return min(n for n, _ in self.counters.values()) if len(self.counters) >= self.k else 0
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Merge do Space-Saving (Agarwal et al., "Mergeable Summaries"): um item ausente
+        de um dos resumos recebe o piso daquele resumo na contagem e no erro, o que
+        mantém `count - err <= real <= count` e a garantia de top-k após o corte em k.
+        """
+        floors = (self.floor(), other.floor())
+        merged: dict = {}
+        for item in self.counters.keys() | other.counters.keys():
+            n = err = 0
+            for counters, floor in zip((self.counters, other.counters), floors):
+                c, e = counters.get(item, (floor, floor))
+                n += c
+                err += e
+            merged[item] = [n, err]
+        self.counters = dict(sorted(merged.items(), key=lambda kv: (-kv[1][0], str(kv[0])))[: self.k])
+        return self
+
+    def top(self, k: int) -> list[tuple]:
+        return [(item, n, err) for item, (n, err) in sorted(self.counters.items(), key=lambda kv: -kv[1][0])[:k]]
+
+
+class PartitionSketches:
+    """
+    Sketches de uma partição country/state: HLL de city (distintos) e Count-Min +
+    Space-Saving de brewery_type (top-K). Mergeable entre partições e batches.
+
+    Na gold são alimentados pelas contagens parciais exatas de cada partição (uma
+    linha por grupo): não substituem a agregação exata, servem para combinar
+    distintos/top-K entre partições e batches sem reler a silver.
+    """
+
+    def __init__(self, config: SketchConfig = DEFAULT_SKETCH_CONFIG):
+        self.config = config
+        self.rows = 0
+        self.city_hll = HyperLogLog(config.hll_p)
+        self.type_cms = CountMinSketch(config.cms_width, config.cms_depth)
+        self.type_topk = SpaceSaving(config.topk)
+
+    def add_counts(self, counts: dict[tuple, int], keys: list[str]) -> None:
+        """Alimenta a partir de contagens (chave de agrupamento -> count) já agregadas."""
+        if not counts:
+            return
+        i_city, i_type = keys.index("city"), keys.index("brewery_type")
+        self.city_hll.add({key[i_city] for key in counts})
+        by_type: dict = {}
+        for key, n in counts.items():
+            by_type[key[i_type]] = by_type.get(key[i_type], 0) + n
+        self.type_cms.add(by_type.keys(), by_type.values())
+        self.type_topk.add(by_type.keys(), by_type.values())
+        self.rows += sum(counts.values())
+
+    def merge(self, other: "PartitionSketches") -> "PartitionSketches":
+        self.city_hll.merge(other.city_hll)
+        self.type_cms.merge(other.type_cms)
+        self.type_topk.merge(other.type_topk)
+        self.rows += other.rows
+        return self
+
+    def distinct_cities(self) -> float:
+        return self.city_hll.estimate()
+
+    def top_brewery_types(self, k: int = 5) -> list[dict]:
+        """Top-K por brewery_type: candidatos do Space-Saving, frequência pelo Count-Min."""
+        candidates = [item for item, _, _ in self.type_topk.top(self.config.topk)]
+        ranked = sorted(((t, self.type_cms.estimate(t)) for t in candidates), key=lambda x: (-x[1], str(x[0])))
+        return [{"brewery_type": t, "count": n} for t, n in ranked[:k]]
+
+
+def write_sketches(sketches: dict[tuple, PartitionSketches], path: str, config: SketchConfig) -> str:
+    """Grava um sketch por partição (country, state) em Parquet (binários + top-K em JSON)."""
+    items = sorted(sketches.items(), key=lambda kv: (str(kv[0][0]), str(kv[0][1])))
+    table = pa.table({
+        "country": pa.array([k[0] for k, _ in items], pa.string()),
+        "state": pa.array([k[1] for k, _ in items], pa.string()),
+        "rows": pa.array([s.rows for _, s in items], pa.int64()),
+        "city_hll": pa.array([s.city_hll.registers.tobytes() for _, s in items], pa.binary()),
+        "type_cms": pa.array([s.type_cms.table.tobytes() for _, s in items], pa.binary()),
+        "type_topk": pa.array(
+            [json.dumps([[t, n, e] for t, (n, e) in s.type_topk.counters.items()]) for _, s in items], pa.string()
+        ),
+    })
+    meta = {"hll_error": config.hll_error, "cms_epsilon": config.cms_epsilon,
+            "cms_delta": config.cms_delta, "topk": config.topk}
+    table = table.replace_schema_metadata({"sketch_config": json.dumps(meta)})
+    storage.write_table(table, path)
+    return path
+
+
+def read_sketches(path: str) -> dict[tuple, PartitionSketches]:
+    """Lê os sketches gravados por `write_sketches`."""
+    table = storage.read_table(path)
+    config = SketchConfig(**json.loads(table.schema.metadata[b"sketch_config"]))
+    out = {}
+    for row in table.to_pylist():
+        s = PartitionSketches(config)
+        s.rows = row["rows"]
+        s.city_hll.registers = np.frombuffer(row["city_hll"], dtype=np.uint8).copy()
+        s.type_cms.table = np.frombuffer(row["type_cms"], dtype=np.int64).reshape(config.cms_depth, -1).copy()
+        s.type_topk.counters = {t: [n, e] for t, n, e in json.loads(row["type_topk"])}
+        out[(row["country"], row["state"])] = s
+    return out
+
+
+def merge_sketches(
+    parts: Iterable[dict[tuple, PartitionSketches]],
+    country: str | None = None,
+    state: str | None = None,
+) -> PartitionSketches | None:
+    """
+    Combina sketches de várias partições/batches, opcionalmente filtrando por
+    country/state (ex.: todos os estados de um país para o top-K do país).
+    """
+    merged = None
+    for sketches in parts:
+        for (c, s), sk in sketches.items():
+            if (country is not None and c != country) or (state is not None and s != state):
+                continue
+            if merged is None:
+                merged = PartitionSketches(sk.config)
+            merged.merge(sk)
+    return merged
@@ -0,0 +1,261 @@
+import fnmatch
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob as _local_glob
+from typing import Callable, Iterable, TypeVar
+
+from fsspec.core import url_to_fs
+
+LAKE_ROOT_ENV = "OPENBREWERYDB_LAKE_ROOT"
+DEFAULT_LAKE_ROOT = "data_lake_mock"
+IO_WORKERS_ENV = "OPENBREWERYDB_IO_WORKERS"
+DEFAULT_IO_WORKERS = 8
+# Leitura sequencial em blocos grandes: 1 request por bloco em object stores
+READ_AHEAD_BYTES = 8 * 1024 * 1024
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def lake_root() -> str:
+    """Raiz do data lake: `OPENBREWERYDB_LAKE_ROOT` (diretório local ou URL fsspec, ex.: s3://bucket/lake)."""
+    root = (os.environ.get(LAKE_ROOT_ENV) or DEFAULT_LAKE_ROOT).rstrip("/")
+    # file:///dir é o disco local: segue pelas APIs nativas (rename atômico, compactação, current)
+    return root[len("file://"):] if root.startswith("file://") else root
+
+
+def lake_path(*parts: str) -> str:
+    """Caminho dentro do lake (ex.: lake_path("silver", "fact"))."""
+    return join(lake_root(), *parts)
+
+
+def is_local(path: str) -> bool:
+    """Caminho do disco local (sem protocolo). `file://` segue pelo fsspec, como os demais protocolos."""
+    return "://" not in path
+
+
+def join(base: str, *parts: str) -> str:
+    return os.path.join(base, *parts) if is_local(base) else posixpath.join(base, *parts)
+
+
+def filesystem(path: str):
+    """(fsspec filesystem, caminho sem protocolo) para `path`; instâncias são reaproveitadas pelo fsspec."""
+    if path.startswith("file://"):
+        # Como nos object stores, gravar num caminho não exige criar os diretórios antes
+        return url_to_fs(path, auto_mkdir=True)
+    return url_to_fs(path)
+
+
+def strip(path: str) -> str:
+    """Caminho sem protocolo, como o filesystem (fsspec/pyarrow) o enxerga; local fica igual."""
+    return path if is_local(path) else filesystem(path)[1]
+
+
+def unstrip(path: str, like: str) -> str:
+    """Recoloca em `path` (sem protocolo, como devolvido pelo filesystem) o protocolo de `like`."""
+    if is_local(like):
+        return path
+    protocol, rest = like.split("://", 1)
+    # file:///abs mantém a barra da raiz; memory://lake, s3://bucket não têm
+    root = "/" if rest.startswith("/") else ""
+    return f"{protocol}://{root}{path.lstrip('/')}"
+
+
+def arrow_filesystem(path: str):
+    """
+    (filesystem pyarrow, caminho) para `ds.dataset`/`ds.write_dataset`/`pq.*`.
+    Local: (None, path), i.e. o filesystem nativo do pyarrow; demais: fsspec via `FSSpecHandler`.
+    """
+    if is_local(path):
+        return None, path
+    import pyarrow.fs as pafs
+
+    fs, stripped = filesystem(path)
+    return pafs.PyFileSystem(pafs.FSSpecHandler(fs)), stripped
+
+
+def read_table(path: str, **kwargs):
+    """`pq.read_table` no filesystem de `path`."""
+    import pyarrow.parquet as pq
+
+    filesystem, stripped = arrow_filesystem(path)
+    return pq.read_table(stripped, filesystem=filesystem, **kwargs)
+
+
+def write_table(table, path: str, **kwargs) -> None:
+    """`pq.write_table` no filesystem de `path` (diretórios criados no disco local)."""
+    import pyarrow.parquet as pq
+
+    filesystem, stripped = arrow_filesystem(path)
+    if filesystem is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pq.write_table(table, stripped, filesystem=filesystem, **kwargs)
+
+
+def open_file(path: str, mode: str = "rb", **kwargs):
+    """
+    Abre um arquivo do lake. Fora do disco local, leituras usam buffer read-ahead de
+    `READ_AHEAD_BYTES` (um request por bloco em vez de um por `read`).
+    """
+    if is_local(path):
+        return open(path, mode, **kwargs)
+    fs, stripped = filesystem(path)
+    if "r" in mode:
+        kwargs.setdefault("block_size", READ_AHEAD_BYTES)
+        kwargs.setdefault("cache_type", "readahead")
+    return fs.open(stripped, mode, **kwargs)
+
+
+def exists(path: str) -> bool:
+    if is_local(path):
+        return os.path.exists(path)
+    fs, stripped = filesystem(path)
+    return fs.exists(stripped)
+
+
+def isdir(path: str) -> bool:
+    if is_local(path):
+        return os.path.isdir(path)
+    fs, stripped = filesystem(path)
+    return fs.isdir(stripped)
+
+
+def makedirs(path: str) -> None:
+    if is_local(path):
+        os.makedirs(path, exist_ok=True)
+        return
+    fs, stripped = filesystem(path)
+    fs.makedirs(stripped, exist_ok=True)
+
+
+def remove(paths: Iterable[str]) -> None:
+    """Remove arquivos (em object stores, uma chamada em lote)."""
+    paths = list(paths)
+    if not paths:
+        return
+    if is_local(paths[0]):
+        for p in paths:
+            os.remove(p)
+        return
+    fs, _ = filesystem(paths[0])
+    fs.rm([strip(p) for p in paths])
+
+
+def rmtree(path: str) -> None:
+    if is_local(path):
+        import shutil
+
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    fs, stripped = filesystem(path)
+    if fs.exists(stripped):
+        fs.rm(stripped, recursive=True)
+
+
+def replace(src: str, dst: str) -> None:
+    """Move `src` para `dst` (rename atômico no disco local; copy+delete em object stores)."""
+    if is_local(src):
+        os.replace(src, dst)
+        return
+    fs, stripped = filesystem(src)
+    fs.mv(stripped, filesystem(dst)[1], recursive=True)
+
+
+def write_bytes(path: str, data: bytes) -> None:
+    """
+    Grava `data` por inteiro: local via arquivo temporário + `os.replace`; em object
+    stores um único PUT, que já é atômico.
+    """
+    if is_local(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return
+    fs, stripped = filesystem(path)
+    fs.pipe_file(stripped, data)
+
+
+def read_bytes(path: str) -> bytes:
+    with open_file(path, "rb") as f:
+        return f.read()
+
+
+def file_info(path: str) -> tuple[int, int]:
+    """(tamanho em bytes, mtime em ns; 0 se o backend não informar)."""
+    if is_local(path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    fs, stripped = filesystem(path)
+    info = fs.info(stripped)
+    mtime = info.get("mtime") or info.get("LastModified") or info.get("created") or 0
+    if hasattr(mtime, "timestamp"):
+        mtime = mtime.timestamp()
+    return int(info.get("size") or 0), int(float(mtime) * 1e9)
+
+
+def _hidden(rel_path: str) -> bool:
+    return any(p.startswith(("_", ".")) for p in rel_path.split("/")[:-1])
+
+
+def find_files(root: str, pattern: str = "*", include_hidden_dirs: bool = False) -> list[str]:
+    """
+    Arquivos sob `root` cujo nome casa com `pattern`, ordenados. Em object stores é
+    uma listagem recursiva do prefixo (paginada pelo backend) em vez de um
+    `ls` por diretório. Diretórios `_*`/`.*` (stats, manifestos, staging) são ignorados.
+    """
+    if is_local(root):
+        out = []
+        for dirpath, dirs, names in os.walk(root):
+            if not include_hidden_dirs:
+                dirs[:] = [d for d in dirs if not d.startswith(("_", "."))]
+            out.extend(os.path.join(dirpath, n) for n in fnmatch.filter(names, pattern))
+        return sorted(out)
+    fs, stripped = filesystem(root)
+    if not fs.exists(stripped):
+        return []
+    base = stripped.rstrip("/")
+    out = []
+    for p in fs.find(stripped):
+        rel = p[len(base):].lstrip("/")
+        if fnmatch.fnmatch(posixpath.basename(p), pattern) and (include_hidden_dirs or not _hidden(rel)):
+            out.append(unstrip(p, root))
+    return sorted(out)
+
+
+def glob(pattern: str) -> list[str]:
+    if is_local(pattern):
+        return sorted(_local_glob(pattern))
+    fs, stripped = filesystem(pattern)
+    return sorted(unstrip(p, pattern) for p in fs.glob(stripped))
+
+
+def io_workers() -> int:
+    try:
+        return max(1, int(os.environ.get(IO_WORKERS_ENV) or DEFAULT_IO_WORKERS))
+    except ValueError:
+        return DEFAULT_IO_WORKERS
+
+
+def map_concurrent(fn: Callable[[T], R], items: Iterable[T], workers: int | None = None) -> list[R]:
+    """
+    `fn` aplicado a cada item em um pool de threads (I/O-bound), preservando a ordem.
+    Com 1 item ou 1 worker roda inline. Exceções são repropagadas na ordem dos itens.
+    """
+    items = list(items)
+    workers = min(workers or io_workers(), len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, items))
+
+
+def map_files(fn: Callable[[str], R], paths: Iterable[str]) -> list[R]:
+    """
+    `map_concurrent` para leituras de arquivos do lake: em paralelo só fora do disco
+    local, onde a latência por request domina; no disco local lê em sequência.
+    """
+    paths = list(paths)
+    return map_concurrent(fn, paths, workers=1 if not paths or is_local(paths[0]) else None)
@@ -1,9 +1,11 @@
 import pandas as pd
-from pathlib import Path
 from airflow.exceptions import AirflowFailException
 from airflow.utils.log.logging_mixin import LoggingMixin
 from typing import Optional, Callable
+from .metrics import instrumented, record, record_files
+from . import storage
 
+@instrumented("update_dim")
 def update_dim(
         df: pd.DataFrame,
         original_col: str,
@@ -22,7 +24,7 @@ def update_dim(
         df: DataFrame contendo a coluna original (e opcionalmente a normalizada).
         original_col: Nome da coluna original (ex.: "country").
         normalized_col: Nome da coluna normalizada (ex.: "country_norm"). Pode ser None.
-        filepath: Caminho do parquet da dimensão (persistido como mapping).
+        filepath: Caminho do parquet da dimensão (local ou URL fsspec; o pandas resolve o filesystem).
         normalizer: Função para normalizar (ex.: normalize_name). Obrigatória se normalized_col=None.
     """
     log = LoggingMixin().log
@@ -47,9 +49,9 @@ def update_dim(
 
     work = work.dropna(subset=[original_col, target_norm_col]).drop_duplicates(subset=[original_col])
 
-    p = Path(filepath)
-    if p.exists():
-        old = pd.read_parquet(p)
+    if storage.exists(filepath):
+        record_files([filepath], written=False)
+        old = pd.read_parquet(filepath)
         missing = [c for c in [original_col, target_norm_col] if c not in old.columns]
         if missing:
             log.warning("update_dim: arquivo existente sem colunas %s; será reescrito.", missing)
@@ -63,4 +65,6 @@ def update_dim(
         combined = work.sort_values(by=[original_col]).reset_index(drop=True)
 
     combined.to_parquet(filepath, index=False)
+    record(rows_in=len(df), rows_out=len(combined))
+    record_files([filepath], written=True)
     log.info("update_dim: %s linhas salvas em %s", len(combined), filepath)
@@ -0,0 +1,41 @@
+import sys
+import types
+import importlib
+from datetime import date
+
+MODULE_PATH = "dags.dag_backfill_brewery"
+
+# ------------------------------------------------------------------
+# Stubs p/ "utils.*" importados no topo da DAG (nada é executado)
+# ------------------------------------------------------------------
+sys.modules.setdefault("utils", types.ModuleType("utils"))
+
+# utils.profiling: decorator identidade
+mod_prof = types.ModuleType("utils.profiling")
+mod_prof.profiled = lambda fn: fn
+sys.modules["utils.profiling"] = mod_prof
+
+# utils.storage: raiz padrão do lake
+mod_storage = types.ModuleType("utils.storage")
+mod_storage.lake_path = lambda *parts: "/".join(("data_lake_mock",) + parts)
+sys.modules["utils.storage"] = mod_storage
+
+# ------------------------------------------------------------------
+# Importa o módulo da DAG
+# ------------------------------------------------------------------
+dag_mod = importlib.import_module(MODULE_PATH)
+
+
+def test_dag_manual_com_params():
+    dag = dag_mod.backfill_brewery()
+
+    # disparo só manual, um backfill por vez
+    assert dag.timetable.summary in ("None", "Never")
+    assert dag.max_active_runs == 1
+    assert dag.start_date.date() == date(2025, 9, 27)
+    assert dag.catchup is False
+    assert dag.params["start"] == "" and dag.params["end"] == ""
+    assert dag.params["workers"] == 4 and dag.params["pool"] == "thread"
+    assert dag.params["profile"] is False
+
+    assert {t.task_id for t in dag.tasks} == {"backfill"}
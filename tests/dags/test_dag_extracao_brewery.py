@@ -18,6 +18,7 @@ mod_get = types.ModuleType("utils.get_api_data")
 def _get_api_data_stub(*_, **__):
     raise AssertionError("get_api_data não deve ser chamado neste teste")
 mod_get.get_api_data = _get_api_data_stub
+mod_get.api_base_url = lambda: "http://mock/v1/breweries"
 sys.modules["utils.get_api_data"] = mod_get
 
 # submódulo utils.save_api_data com função dummy
@@ -27,6 +28,21 @@ def _save_api_data_stub(*_, **__):
 mod_save.save_api_data = _save_api_data_stub
 sys.modules["utils.save_api_data"] = mod_save
 
+# utils.context_utils
+mod_ctx = types.ModuleType("utils.context_utils")
+mod_ctx.get_run_day = lambda: "2025-09-27"  # não será chamado aqui
+sys.modules["utils.context_utils"] = mod_ctx
+
+# utils.profiling: decorator identidade
+mod_prof = types.ModuleType("utils.profiling")
+mod_prof.profiled = lambda fn: fn
+sys.modules["utils.profiling"] = mod_prof
+
+# utils.storage: raiz padrão do lake
+mod_storage = types.ModuleType("utils.storage")
+mod_storage.lake_path = lambda *parts: "/".join(("data_lake_mock",) + parts)
+sys.modules["utils.storage"] = mod_storage
+
 # ------------------------------------------------------------------
 # Importa o módulo da DAG
 # ------------------------------------------------------------------
@@ -47,6 +63,8 @@ def test_dag_metadata_e_tasks():
     # start_date definido no decorator
     assert dag.start_date.date() == date(2025, 9, 27)  
     assert dag.catchup is False
+    # profiling desligado por padrão (param do run)
+    assert dag.params["profile"] is False
 
     # tasks
     tids = {t.task_id for t in dag.tasks}
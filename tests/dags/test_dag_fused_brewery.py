@@ -0,0 +1,84 @@
+import sys
+import types
+import importlib
+from datetime import date
+from airflow.datasets import Dataset
+
+MODULE_PATH = "dags.dag_fused_brewery"
+
+# ------------------------------------------------------------------
+# Stubs p/ "utils.*" importados no topo da DAG (nada é executado)
+# ------------------------------------------------------------------
+sys.modules.setdefault("utils", types.ModuleType("utils"))
+
+# utils.context_utils
+mod_ctx = types.ModuleType("utils.context_utils")
+mod_ctx.get_run_day = lambda: "2025-09-27"  # não será chamado aqui
+sys.modules["utils.context_utils"] = mod_ctx
+
+# utils.execution_mode
+mod_mode = types.ModuleType("utils.execution_mode")
+mod_mode.MULTI_DAG, mod_mode.FUSED = "multi_dag", "fused"
+mod_mode.execution_mode = lambda: "multi_dag"
+sys.modules["utils.execution_mode"] = mod_mode
+
+# utils.profiling: decorator identidade
+mod_prof = types.ModuleType("utils.profiling")
+mod_prof.profiled = lambda fn: fn
+sys.modules["utils.profiling"] = mod_prof
+
+# utils.lake_tasks: caminhos do lake (corpos das tasks não são chamados aqui)
+mod_lake = types.ModuleType("utils.lake_tasks")
+mod_lake.RAW_PATH = "data_lake_mock/raw"
+mod_lake.SILVER_PATH_DIM = "data_lake_mock/silver/dim"
+mod_lake.SILVER_PATH_FACT = "data_lake_mock/silver/fact"
+mod_lake.GOLD_PATH = "data_lake_mock/gold"
+mod_lake.silver_batch_path = lambda day, root=mod_lake.SILVER_PATH_FACT: f"{root}/batch={day}"
+mod_lake.gold_batch_path = lambda day, root=mod_lake.GOLD_PATH: f"{root}/batch={day}"
+sys.modules["utils.lake_tasks"] = mod_lake
+
+# ------------------------------------------------------------------
+# Importa o módulo da DAG
+# ------------------------------------------------------------------
+dag_mod = importlib.import_module(MODULE_PATH)
+
+
+def _get_dag():
+    dag = dag_mod.fused_brewery()
+    assert dag is not None
+    return dag
+
+
+def test_dag_basics_and_schedule():
+    dag = _get_dag()
+
+    assert getattr(dag, "schedule", None) or getattr(dag, "schedule_interval", None)
+    assert dag.start_date.date() == date(2025, 9, 27)
+    assert dag.catchup is False
+    assert dag.params["profile"] is False
+
+    tids = {t.task_id for t in dag.tasks}
+    assert {"resolve_raw_manifest", "fused_transformation", "compact_fact", "build_stats_index",
+            "update_current", "update_gold_trend", "export_gold", "build_geo", "build_search"} == tids
+
+
+def test_task_dependencies():
+    dag = _get_dag()
+    t_man = dag.get_task("resolve_raw_manifest")
+    t_fus = dag.get_task("fused_transformation")
+    t_cmp = dag.get_task("compact_fact")
+
+    # resolve_raw_manifest -> fused_transformation -> [update_gold_trend, export_gold, compact_fact]
+    #   compact_fact -> [build_stats_index -> update_current, build_geo, build_search]
+    assert not t_man.upstream_list
+    assert t_fus in t_man.downstream_list
+    assert {t.task_id for t in t_fus.downstream_list} == {"update_gold_trend", "export_gold", "compact_fact"}
+    assert {t.task_id for t in t_cmp.downstream_list} == {"build_stats_index", "update_current", "build_geo",
+                                                          "build_search"}
+    assert dag.get_task("update_current") in dag.get_task("build_stats_index").downstream_list
+
+
+def test_mesmo_dataset_da_extracao():
+    # Consome o mesmo Dataset publicado pela extração (no lugar da DAG silver)
+    assert isinstance(dag_mod.DATASET_SILVER_PATH, Dataset)
+    assert dag_mod.DATASET_SILVER_PATH.uri == "/logs/trigger_silver.csv"
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+DAGS_DIR = Path(__file__).resolve().parents[2] / "dags"
+DAG_FILES = ["dag_extracao_brewery.py", "dag_transformation_silver.py", "dag_transformation_gold.py",
+             "dag_fused_brewery.py", "dag_backfill_brewery.py"]
+HEAVY_MODULES = ["pandas", "pyarrow", "numpy", "requests"]
+# Folgado para CI carregada: o parse típico fica em milissegundos (o 1º arquivo paga os utils comuns)
+PARSE_BUDGET_S = 2.0
+
+# Carrega cada arquivo como o dag-processor faz (pasta dags/ no sys.path, sem os stubs dos outros testes)
+_SCRIPT = """
+import importlib.util, json, sys, time
+sys.path.insert(0, {dags_dir!r})
+import airflow.decorators, airflow.datasets  # custo base do Airflow fora da medição
+out = {{}}
+for name in {files!r}:
+    t0 = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(name[:-3], f"{dags_dir}/{{name}}")
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    out[name] = {{"parse_s": time.perf_counter() - t0,
+                 "heavy": [m for m in {heavy!r} if m in sys.modules]}}
+print(json.dumps(out))
+"""
+
+
+def test_parse_das_dags_nao_importa_libs_pesadas():
+    script = _SCRIPT.format(dags_dir=str(DAGS_DIR), files=DAG_FILES, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    for name in DAG_FILES:
+        assert result[name]["heavy"] == [], f"{name} carregou {result[name]['heavy']} no parse"
+        assert result[name]["parse_s"] < PARSE_BUDGET_S, f"{name} levou {result[name]['parse_s']:.2f}s no parse"
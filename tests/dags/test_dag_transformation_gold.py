@@ -21,10 +21,59 @@ def _stub_gold_pipeline(*args, **kwargs):
 mod_gold.gold_pipeline = _stub_gold_pipeline
 sys.modules["utils.gold_pipeline"] = mod_gold
 
+mod_partials = types.ModuleType("utils.gold_partials")
+mod_partials.previous_batch_path = lambda *a, **k: None
+sys.modules["utils.gold_partials"] = mod_partials
+
+mod_trend = types.ModuleType("utils.gold_trend")
+def _stub_update_trend(*args, **kwargs):
+    raise AssertionError("update_trend não deve ser chamado neste teste.")
+mod_trend.update_trend = _stub_update_trend
+sys.modules["utils.gold_trend"] = mod_trend
+
+mod_export = types.ModuleType("utils.gold_export")
+def _stub_export(*args, **kwargs):
+    raise AssertionError("export_gold_sqlite não deve ser chamado neste teste.")
+mod_export.export_gold_sqlite = _stub_export
+sys.modules["utils.gold_export"] = mod_export
+
+mod_geo = types.ModuleType("utils.geo")
+def _stub_geo(*args, **kwargs):
+    raise AssertionError("build_geo_gold não deve ser chamado neste teste.")
+mod_geo.build_geo_gold = _stub_geo
+sys.modules["utils.geo"] = mod_geo
+
+mod_search = types.ModuleType("utils.search_index")
+def _stub_search(*args, **kwargs):
+    raise AssertionError("build_search_index não deve ser chamado neste teste.")
+mod_search.build_search_index = _stub_search
+sys.modules["utils.search_index"] = mod_search
+
 mod_ctx = types.ModuleType("utils.context_utils")
 mod_ctx.get_run_day = lambda: "2025-09-27"  # não será chamado aqui
 sys.modules["utils.context_utils"] = mod_ctx
 
+# utils.execution_mode: modo padrão (DAG registrada no import)
+mod_mode = types.ModuleType("utils.execution_mode")
+mod_mode.MULTI_DAG, mod_mode.FUSED = "multi_dag", "fused"
+mod_mode.execution_mode = lambda: "multi_dag"
+sys.modules["utils.execution_mode"] = mod_mode
+
+# utils.profiling: decorator identidade
+mod_prof = types.ModuleType("utils.profiling")
+mod_prof.profiled = lambda fn: fn
+sys.modules["utils.profiling"] = mod_prof
+
+# utils.lake_tasks: caminhos do lake (corpos das tasks não são chamados aqui)
+mod_lake = types.ModuleType("utils.lake_tasks")
+mod_lake.RAW_PATH = "data_lake_mock/raw"
+mod_lake.SILVER_PATH_DIM = "data_lake_mock/silver/dim"
+mod_lake.SILVER_PATH_FACT = "data_lake_mock/silver/fact"
+mod_lake.GOLD_PATH = "data_lake_mock/gold"
+mod_lake.silver_batch_path = lambda day, root=mod_lake.SILVER_PATH_FACT: f"{root}/batch={day}"
+mod_lake.gold_batch_path = lambda day, root=mod_lake.GOLD_PATH: f"{root}/batch={day}"
+sys.modules["utils.lake_tasks"] = mod_lake
+
 # ------------------------------
 # Importa o módulo da DAG
 # ------------------------------
@@ -47,19 +96,31 @@ def test_dag_basics_and_schedule():
     assert dag.start_date is not None
     assert dag.start_date.date() == date(2025, 9, 27)
     assert dag.catchup is False
+    # profiling desligado por padrão (param do run)
+    assert dag.params["profile"] is False
 
     # tasks presentes
     tids = {t.task_id for t in dag.tasks}
-    assert {"aggregation_silver_to_gold"} <= tids
+    assert {"aggregation_silver_to_gold", "update_gold_trend", "export_gold", "build_geo", "build_search"} <= tids
 
 
 def test_task_outlets_and_wiring():
     dag = _get_dag()
     t_agg = dag.get_task("aggregation_silver_to_gold")
+    t_trend = dag.get_task("update_gold_trend")
+
+    t_export = dag.get_task("export_gold")
+
+    t_geo = dag.get_task("build_geo")
 
-    # Não há upstreams/downs explicitas além dela mesma (DAG tem 1 task)
+    # aggregation_silver_to_gold >> [update_gold_trend, export_gold, build_geo, build_search]
     assert not t_agg.upstream_list
-    assert not t_agg.downstream_list
+    assert {t.task_id for t in t_agg.downstream_list} == {
+        "update_gold_trend", "export_gold", "build_geo", "build_search"
+    }
+    assert not t_trend.downstream_list
+    assert not t_export.downstream_list
+    assert not t_geo.downstream_list
 
     # A DAG agenda por Dataset; apenas valida que a constante existe e é Dataset
     assert isinstance(dag_mod.DATASET_GOLD_PATH, Dataset)
@@ -19,6 +19,8 @@ def _assert_not_called(*args, **kwargs):
 # utils.silver_pipeline
 mod_sp = types.ModuleType("utils.silver_pipeline")
 mod_sp.silver_pipeline = _assert_not_called
+mod_sp.silver_pipeline_arrow = _assert_not_called
+mod_sp.clear_batch = _assert_not_called
 sys.modules["utils.silver_pipeline"] = mod_sp
 
 # utils.update_dim
@@ -30,18 +32,61 @@ sys.modules["utils.update_dim"] = mod_ud
 mod_norm = types.ModuleType("utils.normalization")
 mod_norm.normalize_name = _assert_not_called
 mod_norm.normalize_brewery_df = _assert_not_called
+mod_norm.normalize_brewery_table = _assert_not_called
 sys.modules["utils.normalization"] = mod_norm
 
+# utils.raw_reader
+mod_rr = types.ModuleType("utils.raw_reader")
+mod_rr.read_raw_table = _assert_not_called
+sys.modules["utils.raw_reader"] = mod_rr
+
 # utils.remove_duplicates_batch
 mod_rdb = types.ModuleType("utils.remove_duplicates_batch")
 mod_rdb.remove_duplicates_batch = _assert_not_called
 sys.modules["utils.remove_duplicates_batch"] = mod_rdb
 
+# utils.current_table
+mod_cur = types.ModuleType("utils.current_table")
+mod_cur.update_current_table = _assert_not_called
+sys.modules["utils.current_table"] = mod_cur
+
+# utils.compact_silver
+mod_cmp = types.ModuleType("utils.compact_silver")
+mod_cmp.needs_compaction = _assert_not_called
+mod_cmp.compact_batch = _assert_not_called
+sys.modules["utils.compact_silver"] = mod_cmp
+
+# utils.partition_stats
+mod_ps = types.ModuleType("utils.partition_stats")
+mod_ps.build_batch_stats_index = _assert_not_called
+sys.modules["utils.partition_stats"] = mod_ps
+
 # utils.context_utils
 mod_ctx = types.ModuleType("utils.context_utils")
 mod_ctx.get_run_day = lambda: "2025-09-27"  # não será chamado aqui
 sys.modules["utils.context_utils"] = mod_ctx
 
+# utils.execution_mode: modo padrão (DAG registrada no import)
+mod_mode = types.ModuleType("utils.execution_mode")
+mod_mode.MULTI_DAG, mod_mode.FUSED = "multi_dag", "fused"
+mod_mode.execution_mode = lambda: "multi_dag"
+sys.modules["utils.execution_mode"] = mod_mode
+
+# utils.profiling: decorator identidade
+mod_prof = types.ModuleType("utils.profiling")
+mod_prof.profiled = lambda fn: fn
+sys.modules["utils.profiling"] = mod_prof
+
+# utils.lake_tasks: caminhos do lake (corpos das tasks não são chamados aqui)
+mod_lake = types.ModuleType("utils.lake_tasks")
+mod_lake.RAW_PATH = "data_lake_mock/raw"
+mod_lake.SILVER_PATH_DIM = "data_lake_mock/silver/dim"
+mod_lake.SILVER_PATH_FACT = "data_lake_mock/silver/fact"
+mod_lake.GOLD_PATH = "data_lake_mock/gold"
+mod_lake.silver_batch_path = lambda day, root=mod_lake.SILVER_PATH_FACT: f"{root}/batch={day}"
+mod_lake.gold_batch_path = lambda day, root=mod_lake.GOLD_PATH: f"{root}/batch={day}"
+sys.modules["utils.lake_tasks"] = mod_lake
+
 # ------------------------------------------------------------------
 # Importa o módulo da DAG
 # ------------------------------------------------------------------
@@ -64,23 +109,36 @@ def test_dag_basics_and_schedule():
     assert dag.start_date is not None
     assert dag.start_date.date() == date(2025, 9, 27)
     assert dag.catchup is False
+    # profiling desligado por padrão (param do run)
+    assert dag.params["profile"] is False
 
     # tasks presentes
     tids = {t.task_id for t in dag.tasks}
-    assert {"update_dimensions", "transformation", "remove_duplicates", "trigger_gold"} <= tids
+    assert {"resolve_raw_manifest", "update_dimensions", "transformation", "remove_duplicates", "compact_fact", "build_stats_index",
+            "update_current", "trigger_gold"} <= tids
 
 
 def test_task_dependencies_and_outlets():
     dag = _get_dag()
+    t_man = dag.get_task("resolve_raw_manifest")
     t_upd = dag.get_task("update_dimensions")
     t_trf = dag.get_task("transformation")
     t_rm  = dag.get_task("remove_duplicates")
+    t_cmp = dag.get_task("compact_fact")
+    t_idx = dag.get_task("build_stats_index")
+    t_cur = dag.get_task("update_current")
     t_trg = dag.get_task("trigger_gold")
 
-    # update_dimensions -> transformation -> remove_duplicates -> trigger_gold
+    # resolve_raw_manifest -> update_dimensions -> transformation -> remove_duplicates -> compact_fact
+    #   -> build_stats_index -> update_current -> trigger_gold
+    assert not t_man.upstream_list
+    assert {t_upd, t_trf} <= set(t_man.downstream_list)
     assert t_trf in t_upd.downstream_list
     assert t_rm  in t_trf.downstream_list
-    assert t_trg in t_rm.downstream_list
+    assert t_cmp in t_rm.downstream_list
+    assert t_idx in t_cmp.downstream_list
+    assert t_cur in t_idx.downstream_list
+    assert t_trg in t_cur.downstream_list
 
     # trigger_gold publica o Dataset esperado
     assert hasattr(t_trg, "outlets") and len(t_trg.outlets) == 1
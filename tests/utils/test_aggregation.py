@@ -0,0 +1,96 @@
+# tests/utils/test_aggregation.py
+import pyarrow as pa
+
+from dags.utils.aggregation import CountAccumulator, tree_reduce
+
+
+def _batch(rows):
+    keys = ["country", "state", "city", "brewery_type"]
+    return pa.table({k: [r[i] for r in rows] for i, k in enumerate(keys)})
+
+
+def test_add_table_acumula_entre_lotes():
+    acc = CountAccumulator()
+    acc.add_table(_batch([("us", "ca", "sf", "micro"), ("us", "ca", "sf", "micro"), ("br", "sp", "x", None)]))
+    acc.add_table(_batch([("us", "ca", "sf", "micro")]).to_batches()[0])
+
+    assert acc.rows == 4
+    assert acc.counts == {("us", "ca", "sf", "micro"): 3, ("br", "sp", "x", None): 1}
+
+
+def test_merge_soma_contagens():
+    a, b = CountAccumulator(), CountAccumulator()
+    a.add_table(_batch([("us", "ca", "sf", "micro")]))
+    b.add_table(_batch([("us", "ca", "sf", "micro"), ("us", "or", "pdx", "micro")]))
+
+    merged = a.merge(b)
+
+    assert merged is a
+    assert merged.rows == 3
+    assert merged.counts[("us", "ca", "sf", "micro")] == 2
+    assert merged.counts[("us", "or", "pdx", "micro")] == 1
+
+
+def test_to_table_ordena_por_count_desc_e_chaves():
+    acc = CountAccumulator()
+    acc.add_table(_batch([("b", "s", "c", "t"), ("a", "s", "c", "t"), ("z", "s", "c", "t"), ("z", "s", "c", "t")]))
+
+    out = acc.to_table()
+
+    assert out.column_names == ["country", "state", "city", "brewery_type", "count"]
+    assert out["country"].to_pylist() == ["z", "a", "b"]
+    assert out["count"].type == pa.int64()
+
+
+def test_chaves_nao_string_sao_convertidas():
+    acc = CountAccumulator(["part"])
+    acc.add_table(pa.table({"part": pa.array([1, 1, 2], pa.int32())}))
+    assert acc.counts == {("1",): 2, ("2",): 1}
+
+
+def test_tree_reduce():
+    assert tree_reduce([], lambda a, b: a + b) is None
+    assert tree_reduce([1, 2, 3, 4, 5], lambda a, b: a + b) == 15
+    accs = []
+    for i in range(5):
+        acc = CountAccumulator()
+        acc.add_table(_batch([("us", "ca", f"c{i % 2}", "micro")]))
+        accs.append(acc)
+    out = tree_reduce(accs, CountAccumulator.merge)
+    assert out.counts == {("us", "ca", "c0", "micro"): 3, ("us", "ca", "c1", "micro"): 2}
+
+
+def test_rollup_table_niveis_batem_com_groupby():
+    import pandas as pd
+    from dags.utils.aggregation import ROLLUP_LEVELS, rollup_table
+
+    leaf = pd.DataFrame({
+        "country": ["us", "us", "us", "br", "br"],
+        "state": ["ca", "ca", "or", "sp", "sp"],
+        "city": ["sf", "la", "pdx", "campinas", "campinas"],
+        "brewery_type": ["micro", "micro", "brewpub", "micro", None],
+        "count": [3, 2, 4, 1, 5],
+    })
+    out = rollup_table(pa.Table.from_pandas(leaf, preserve_index=False)).to_pandas()
+
+    assert list(out.columns) == ["grouping_level", "country", "state", "city", "brewery_type", "count"]
+    assert list(dict.fromkeys(out["grouping_level"])) == [",".join(lv) for lv in ROLLUP_LEVELS]
+    for level in ROLLUP_LEVELS:
+        got = out[out["grouping_level"] == ",".join(level)]
+        expected = leaf.groupby(list(level), dropna=False)["count"].sum()
+        assert got["count"].sum() == leaf["count"].sum()
+        assert len(got) == len(expected)
+        # colunas fora do nível ficam nulas
+        others = [c for c in ["country", "state", "city", "brewery_type"] if c not in level]
+        assert got[others].isna().all().all()
+
+    country = out[out["grouping_level"] == "country"].set_index("country")["count"].to_dict()
+    assert country == {"us": 9, "br": 6}
+
+
+def test_rollup_table_vazia():
+    from dags.utils.aggregation import rollup_table
+
+    out = rollup_table(CountAccumulator().to_table())
+    assert out.num_rows == 0
+    assert out.column_names[0] == "grouping_level"
@@ -0,0 +1,106 @@
+import json
+import os
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+
+from airflow.exceptions import AirflowFailException
+from dags.utils import backfill
+from dags.utils.backfill import BackfillCheckpoint, discover_raw_days, run_backfill
+
+DAYS = ["2025-09-01", "2025-09-02", "2025-09-03"]
+
+
+def _write_raw(raw, day, rows):
+    year, month, dd = day.split("-")
+    d = raw / f"year={year}" / f"month={month}" / f"day={dd}"
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "page_1.json").write_text(json.dumps(rows), encoding="utf-8")
+
+
+def _rows(n, city="San Diego"):
+    return [{"id": f"id-{i}", "name": f"Brew {i}", "brewery_type": "micro", "city": city,
+             "state": "California", "country": "United States"} for i in range(n)]
+
+
+@pytest.fixture
+def lake(tmp_path):
+    raw = tmp_path / "raw"
+    for i, day in enumerate(DAYS):
+        _write_raw(raw, day, _rows(3 + i))
+    return {
+        "raw_path": str(raw),
+        "silver_path_fact": str(tmp_path / "silver" / "fact"),
+        "silver_path_dim": str(tmp_path / "silver" / "dim"),
+        "gold_path": str(tmp_path / "gold"),
+        "silver_path_current": str(tmp_path / "silver" / "current"),
+    }
+
+
+def test_discover_raw_days_respeita_intervalo(lake):
+    assert discover_raw_days(lake["raw_path"], "2025-09-02", "2025-09-30") == DAYS[1:]
+    with pytest.raises(AirflowFailException):
+        discover_raw_days(lake["raw_path"], "2025-09-03", "2025-09-01")
+    with pytest.raises(AirflowFailException):
+        discover_raw_days(lake["raw_path"], "2025-13-01", "2025-09-01")
+
+
+def test_lake_remoto_falha_em_vez_de_nao_achar_dias(lake):
+    remote = {**lake, "raw_path": "memory://lake/raw"}
+    with pytest.raises(AirflowFailException, match="exige raiz local"):
+        run_backfill("2025-09-01", "2025-09-03", workers=1, **remote)
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_reprocessa_dias_em_paralelo(lake, pool):
+    summary = run_backfill("2025-09-01", "2025-09-03", workers=2, pool=pool, **lake)
+
+    assert summary["processed"] == DAYS and summary["failed"] == [] and summary["skipped"] == []
+    for i, day in enumerate(DAYS):
+        total = pq.read_table(os.path.join(lake["gold_path"], f"batch={day}", "total.parquet"))
+        assert total.to_pylist() == [{"country": "united_states", "state": "california", "city": "san_diego",
+                                      "brewery_type": "micro", "count": 3 + i}]
+        assert os.path.exists(os.path.join(lake["silver_path_fact"], f"batch={day}", "_stats_index.json"))
+    # dimensões gravadas uma vez com o de-para compartilhado; tendência e current refeitas
+    dim_city = pq.read_table(os.path.join(lake["silver_path_dim"], "dim_city.parquet")).to_pylist()
+    assert dim_city == [{"city": "San Diego", "city_norm": "san_diego"}]
+    assert os.path.isdir(os.path.join(lake["gold_path"], "trend"))
+    assert os.path.isdir(lake["silver_path_current"])
+    # staging removido
+    assert os.listdir(os.path.join(lake["silver_path_fact"], "_backfill")) == ["2025-09-01_2025-09-03.json"]
+
+
+def test_substitui_batch_antigo(lake):
+    stale = os.path.join(lake["silver_path_fact"], "batch=2025-09-01", "country=antigo", "x.parquet")
+    os.makedirs(os.path.dirname(stale))
+    open(stale, "wb").close()
+
+    run_backfill("2025-09-01", "2025-09-01", workers=1, **lake)
+
+    assert not os.path.exists(stale)
+    assert os.path.isdir(os.path.join(lake["silver_path_fact"], "batch=2025-09-01", "country=united_states"))
+
+
+def test_falha_registra_checkpoint_e_retomada(lake, monkeypatch):
+    raw = Path(lake["raw_path"])
+    (raw / "year=2025" / "month=09" / "day=02" / "page_1.json").write_text("{quebrado")
+
+    with pytest.raises(AirflowFailException, match="2025-09-02"):
+        run_backfill("2025-09-01", "2025-09-03", workers=2, **lake)
+
+    ck = BackfillCheckpoint(os.path.join(lake["silver_path_fact"], "_backfill", "2025-09-01_2025-09-03.json"),
+                            "2025-09-01", "2025-09-03")
+    assert sorted(ck.done) == ["2025-09-01", "2025-09-03"]
+    assert list(ck.failed) == ["2025-09-02"]
+
+    # corrigida a raw, a retomada só reprocessa o dia que faltou
+    _write_raw(raw, "2025-09-02", _rows(4))
+    calls = []
+    original = backfill.reprocess_day
+    monkeypatch.setattr(backfill, "reprocess_day", lambda day, *a, **k: calls.append(day) or original(day, *a, **k))
+
+    summary = run_backfill("2025-09-01", "2025-09-03", workers=2, **lake)
+
+    assert calls == ["2025-09-02"]
+    assert summary["processed"] == ["2025-09-02"] and summary["skipped"] == ["2025-09-01", "2025-09-03"]
@@ -0,0 +1,88 @@
+# tests/utils/test_compact_silver.py
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+
+from dags.utils.compact_silver import (
+    compact_batch, needs_compaction, partition_files, COMPACTED_PART, STAGING_DIR, TRASH_DIR,
+)
+
+
+def _write_part(batch_dir: Path, country: str, state: str, part: int, names: list[str]):
+    df = pd.DataFrame({"name": names, "city": ["x"] * len(names), "brewery_type": ["micro"] * len(names)})
+    path = batch_dir / f"country={country}" / f"state={state}" / f"part={part}" / "part-0.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), str(path))
+
+
+def _read_batch(batch_dir: Path) -> pd.DataFrame:
+    return ds.dataset(str(batch_dir), format="parquet", partitioning="hive").to_table().to_pandas()
+
+
+def _small_batch(tmp_path: Path) -> Path:
+    batch_dir = tmp_path / "fact" / "batch=2025-09-27"
+    for part in range(4):
+        _write_part(batch_dir, "us", "ca", part, [f"ca{part}a", f"ca{part}b"])
+    _write_part(batch_dir, "br", "sp", 0, ["sp"])
+    return batch_dir
+
+
+def test_needs_compaction_limites(tmp_path):
+    batch_dir = _small_batch(tmp_path)
+    assert needs_compaction(str(batch_dir), max_files_per_partition=8, min_avg_file_bytes=1024 * 1024)
+    assert needs_compaction(str(batch_dir), max_files_per_partition=3, min_avg_file_bytes=0)
+    assert not needs_compaction(str(batch_dir), max_files_per_partition=8, min_avg_file_bytes=0)
+    assert not needs_compaction(str(tmp_path / "inexistente"))
+
+
+def test_compact_batch_reduz_arquivos_e_preserva_linhas(tmp_path, capsys):
+    batch_dir = _small_batch(tmp_path)
+    before = _read_batch(batch_dir)
+
+    report = compact_batch(str(batch_dir))
+
+    assert report["partitions_compacted"] == 1  # br/sp tem 1 arquivo só
+    assert report["files_before"] == 5
+    assert report["files_after"] == 2
+    files = partition_files(str(batch_dir))
+    assert len(files[("us", "ca")]) == 1
+    assert f"part={COMPACTED_PART}" in files[("us", "ca")][0][0]
+
+    after = _read_batch(batch_dir)
+    assert sorted(after["name"]) == sorted(before["name"])
+    assert set(after.loc[after["state"] == "ca", "part"]) == {COMPACTED_PART}
+    # partições compactadas e não compactadas convivem com `part` inteiro
+    schema = ds.dataset(str(batch_dir), format="parquet", partitioning="hive").schema
+    assert pa.types.is_integer(schema.field("part").type)
+    assert not (batch_dir / STAGING_DIR).exists()
+    assert not (batch_dir / TRASH_DIR).exists()
+
+    assert "Compactação concluída: partições=1 arquivos 5 -> 2" in capsys.readouterr().out
+
+
+def test_compact_batch_respeita_tamanho_alvo(tmp_path):
+    batch_dir = tmp_path / "fact" / "batch=2025-09-27"
+    for part in range(3):
+        _write_part(batch_dir, "us", "ca", part, [f"n{part}_{i}" for i in range(100)])
+
+    # alvo minúsculo -> vários arquivos de saída
+    report = compact_batch(str(batch_dir), target_file_bytes=500)
+    assert report["files_after"] > 1
+    assert len(_read_batch(batch_dir)) == 300
+
+
+def test_compact_batch_recupera_compactacao_interrompida(tmp_path):
+    batch_dir = _small_batch(tmp_path)
+    # Simula crash entre os dois renames: partição em trash e staging órfão
+    trash = batch_dir / TRASH_DIR / "country=br" / "state=sp"
+    trash.parent.mkdir(parents=True)
+    (batch_dir / "country=br" / "state=sp").rename(trash)
+    (batch_dir / STAGING_DIR / "lixo").mkdir(parents=True)
+
+    compact_batch(str(batch_dir))
+
+    df = _read_batch(batch_dir)
+    assert "sp" in set(df["name"])
+    assert not (batch_dir / TRASH_DIR).exists()
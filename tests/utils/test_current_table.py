@@ -0,0 +1,163 @@
+# tests/utils/test_current_table.py
+from pathlib import Path
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+import pytest
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.current_table import update_current_table
+
+
+# =======================
+# Helpers
+# =======================
+
+def _write_batch(fact: Path, date: str, df: pd.DataFrame):
+    """Grava o batch no layout da fato silver: batch/country/state/part."""
+    ds.write_dataset(
+        data=pa.Table.from_pandas(df.assign(part="0"), preserve_index=False),
+        base_dir=str(fact / f"batch={date}"),
+        format="parquet",
+        partitioning=["country", "state", "part"],
+        partitioning_flavor="hive",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def _read_current(current: Path) -> pd.DataFrame:
+    dataset = ds.dataset(str(current), format="parquet", partitioning="hive")
+    return dataset.to_table().to_pandas()
+
+
+def _versions(current: Path) -> dict:
+    return json.loads((current / "_versions.json").read_text(encoding="utf-8"))
+
+
+# =======================
+# Tests
+# =======================
+
+def test_batch_inexistente_apenas_log(tmp_path, capsys):
+    out = update_current_table("2025-09-27", str(tmp_path / "fact"), str(tmp_path / "current"))
+    assert out == {"changed": [], "unchanged": [], "removed": []}
+    assert "Path do batch não existe" in capsys.readouterr().out
+
+
+def test_primeira_carga_cria_particoes_e_versoes(tmp_path, capsys):
+    fact, current = tmp_path / "fact", tmp_path / "current"
+    _write_batch(fact, "2025-09-27", pd.DataFrame([
+        {"id": "1", "name": "A", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+        {"id": "2", "name": "B", "country": "us", "state": "ca", "city": "la", "brewery_type": "micro"},
+        {"id": "3", "name": "C", "country": "br", "state": "sp", "city": "campinas", "brewery_type": "brewpub"},
+    ]))
+
+    out = update_current_table("2025-09-27", str(fact), str(current))
+
+    assert sorted(out["changed"]) == ["country=br/state=sp", "country=us/state=ca"]
+    df = _read_current(current)
+    assert sorted(df["id"]) == ["1", "2", "3"]
+    assert "part" not in df.columns
+
+    versions = _versions(current)
+    assert versions["country=us/state=ca"]["version"] == 1
+    assert versions["country=us/state=ca"]["rows"] == 2
+    assert versions["country=us/state=ca"]["batch"] == "2025-09-27"
+
+    assert "Current atualizado batch=2025-09-27: reescritas=2" in capsys.readouterr().out
+
+
+def test_incremental_reescreve_somente_particoes_alteradas(tmp_path):
+    fact, current = tmp_path / "fact", tmp_path / "current"
+    base = [
+        {"id": "1", "name": "A", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+        {"id": "3", "name": "C", "country": "br", "state": "sp", "city": "campinas", "brewery_type": "brewpub"},
+    ]
+    _write_batch(fact, "2025-09-27", pd.DataFrame(base))
+    update_current_table("2025-09-27", str(fact), str(current))
+
+    # Semana seguinte: BR igual, US com nome alterado
+    changed = [dict(base[0], name="A2"), base[1]]
+    _write_batch(fact, "2025-10-04", pd.DataFrame(changed))
+    out = update_current_table("2025-10-04", str(fact), str(current))
+
+    assert out["changed"] == ["country=us/state=ca"]
+    assert out["unchanged"] == ["country=br/state=sp"]
+
+    versions = _versions(current)
+    assert versions["country=us/state=ca"]["version"] == 2
+    assert versions["country=br/state=sp"]["version"] == 1
+    df = _read_current(current)
+    assert df.loc[df["id"] == "1", "name"].iloc[0] == "A2"
+
+
+def test_id_que_muda_de_particao_sai_da_antiga(tmp_path):
+    fact, current = tmp_path / "fact", tmp_path / "current"
+    _write_batch(fact, "2025-09-27", pd.DataFrame([
+        {"id": "1", "name": "A", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+    ]))
+    update_current_table("2025-09-27", str(fact), str(current))
+
+    _write_batch(fact, "2025-10-04", pd.DataFrame([
+        {"id": "1", "name": "A", "country": "us", "state": "or", "city": "portland", "brewery_type": "micro"},
+    ]))
+    out = update_current_table("2025-10-04", str(fact), str(current))
+
+    assert out["removed"] == ["country=us/state=ca"]
+    assert out["changed"] == ["country=us/state=or"]
+    assert not (current / "country=us" / "state=ca").exists()
+    df = _read_current(current)
+    assert len(df) == 1 and df.iloc[0]["state"] == "or"
+
+
+def test_colunas_ausentes_levanta(tmp_path):
+    fact, current = tmp_path / "fact", tmp_path / "current"
+    batch_dir = fact / "batch=2025-09-27"
+    batch_dir.mkdir(parents=True)
+    pq.write_table(pa.table({"name": ["A"], "country": ["us"], "state": ["ca"]}), str(batch_dir / "x.parquet"))
+
+    with pytest.raises(AirflowFailException) as exc:
+        update_current_table("2025-09-27", str(fact), str(current))
+    assert "Colunas ausentes em batch=2025-09-27" in str(exc.value)
+
+
+def test_id_ausente_do_snapshot_sai_do_current(tmp_path):
+    fact, current = tmp_path / "fact", tmp_path / "current"
+    _write_batch(fact, "2025-09-27", pd.DataFrame([
+        {"id": "1", "name": "A", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+        {"id": "2", "name": "B", "country": "us", "state": "ca", "city": "la", "brewery_type": "micro"},
+        {"id": "3", "name": "C", "country": "br", "state": "sp", "city": "campinas", "brewery_type": "brewpub"},
+    ]))
+    update_current_table("2025-09-27", str(fact), str(current))
+
+    # Id 2 e toda a partição BR foram removidos na origem
+    _write_batch(fact, "2025-10-04", pd.DataFrame([
+        {"id": "1", "name": "A", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+    ]))
+    out = update_current_table("2025-10-04", str(fact), str(current))
+
+    assert out["changed"] == ["country=us/state=ca"]
+    assert out["removed"] == ["country=br/state=sp"]
+    assert sorted(_read_current(current)["id"]) == ["1"]
+    assert sorted(pd.read_parquet(current / "_index.parquet")["id"]) == ["1"]
+    assert "country=br/state=sp" not in _versions(current)
+
+
+def test_batch_parcial_sem_snapshot_apenas_upsert(tmp_path):
+    fact, current = tmp_path / "fact", tmp_path / "current"
+    _write_batch(fact, "2025-09-27", pd.DataFrame([
+        {"id": "1", "name": "A", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+        {"id": "2", "name": "B", "country": "us", "state": "ca", "city": "la", "brewery_type": "micro"},
+    ]))
+    update_current_table("2025-09-27", str(fact), str(current))
+
+    _write_batch(fact, "2025-10-04", pd.DataFrame([
+        {"id": "1", "name": "A2", "country": "us", "state": "ca", "city": "sf", "brewery_type": "micro"},
+    ]))
+    update_current_table("2025-10-04", str(fact), str(current), snapshot=False)
+
+    df = _read_current(current)
+    assert sorted(df["id"]) == ["1", "2"]
+    assert df.loc[df["id"] == "1", "name"].iloc[0] == "A2"
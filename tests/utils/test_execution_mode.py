@@ -0,0 +1,20 @@
+import pytest
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.execution_mode import FUSED, MULTI_DAG, execution_mode
+
+
+def test_padrao_multi_dag(env_clean):
+    assert execution_mode() == MULTI_DAG
+
+
+@pytest.mark.parametrize("valor,esperado", [("fused", FUSED), (" FUSED ", FUSED), ("multi_dag", MULTI_DAG)])
+def test_modo_por_env(env_clean, valor, esperado):
+    env_clean.setenv("OPENBREWERYDB_EXECUTION_MODE", valor)
+    assert execution_mode() == esperado
+
+
+def test_modo_invalido_levanta(env_clean):
+    env_clean.setenv("OPENBREWERYDB_EXECUTION_MODE", "single")
+    with pytest.raises(AirflowFailException, match="OPENBREWERYDB_EXECUTION_MODE"):
+        execution_mode()
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from dags.utils.fused_pipeline import fused_pipeline
+from dags.utils.gold_pipeline import gold_pipeline
+from dags.utils.normalization import normalize_brewery_table, normalize_name
+from dags.utils.raw_reader import read_raw_table
+from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+from dags.utils.silver_pipeline import silver_pipeline_arrow
+from dags.utils.update_dim import update_dim
+
+DAY = "2025-09-27"
+DIMS = ["country", "state", "city", "brewery_type"]
+
+
+def _brewery(i, **over):
+    row = {"id": f"id-{i}", "name": f"Brew {i % 7}", "brewery_type": ["micro", "Brewpub"][i % 2],
+           "city": ["São Paulo", "San Diego", "Austin"][i % 3], "state": ["SP", "California", "Texas"][i % 3],
+           "country": ["Brazil", "United States", "United States"][i % 3], "phone": None, "latitude": "1.5"}
+    row.update(over)
+    return row
+
+
+@pytest.fixture
+def raw_files(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    files = []
+    for page in range(4):
+        rows = [_brewery(page * 5 + j) for j in range(5)]
+        # duplicata mais completa em outra página e linha sem cidade (descartada)
+        rows.append(_brewery(page, phone="123"))
+        rows.append(_brewery(100 + page, city=None))
+        path = raw / f"page_{page}.json"
+        path.write_text(json.dumps(rows), encoding="utf-8")
+        files.append(str(path))
+    return files
+
+
+def _multi_dag(raw_files, base, batch_size):
+    fact, dim, gold = str(base / "fact"), str(base / "dim"), str(base / "gold" / f"batch={DAY}")
+    os.makedirs(dim)
+    for i in range(0, len(raw_files), batch_size):
+        # update_dimensions da DAG silver
+        df = pd.concat([pd.read_json(f) for f in raw_files[i:i + batch_size]], ignore_index=True)
+        for col in DIMS:
+            work = df[[col]].dropna()
+            work[f"{col}_norm"] = work[col].map(normalize_name)
+            update_dim(work, col, f"{col}_norm", os.path.join(dim, f"dim_{col}.parquet"))
+    written = []
+    for i in range(0, len(raw_files), batch_size):
+        table = normalize_brewery_table(read_raw_table(raw_files[i:i + batch_size]))
+        written += silver_pipeline_arrow(table, fact, dim, DAY, part=i)
+    written = remove_duplicates_batch(DAY, fact, files=written)
+    gold_pipeline(os.path.join(fact, f"batch={DAY}"), gold, files=written)
+    return fact, dim, gold
+
+
+def _silver(fact):
+    df = ds.dataset(os.path.join(fact, f"batch={DAY}"), format="parquet", partitioning="hive").to_table().to_pandas()
+    df["part"] = df["part"].astype(str)
+    return df[sorted(df.columns)].sort_values("id").reset_index(drop=True)
+
+
+def test_mesmas_saidas_do_fluxo_em_tres_etapas(tmp_path, raw_files):
+    fact, dim, gold = _multi_dag(raw_files, tmp_path / "multi", batch_size=2)
+
+    base = tmp_path / "fused"
+    f_fact, f_dim, f_gold = str(base / "fact"), str(base / "dim"), str(base / "gold" / f"batch={DAY}")
+    written = fused_pipeline(raw_files, DAY, f_fact, f_dim, f_gold, batch_size=2)
+
+    assert written and all(os.path.exists(f) for f in written)
+    pd.testing.assert_frame_equal(_silver(f_fact), _silver(fact))
+    for col in DIMS:
+        name = f"dim_{col}.parquet"
+        assert pd.read_parquet(os.path.join(f_dim, name)).equals(pd.read_parquet(os.path.join(dim, name)))
+    for name in ("total.parquet", "rollups.parquet", "sketches.parquet", "_partials/partials.parquet"):
+        assert pq.read_table(os.path.join(f_gold, name)).equals(pq.read_table(os.path.join(gold, name))), name
+    with open(os.path.join(f_gold, "_partials", "manifest.json")) as a, \
+            open(os.path.join(gold, "_partials", "manifest.json")) as b:
+        assert json.load(a) == json.load(b)
+    # sidecars de estatística por partição
+    assert sorted(os.listdir(os.path.join(f_fact, f"batch={DAY}", "country=brazil", "state=sp"))) == \
+        sorted(os.listdir(os.path.join(fact, f"batch={DAY}", "country=brazil", "state=sp")))
+
+
+def test_raw_vazia_grava_gold_vazia(tmp_path):
+    empty = tmp_path / "page_1.json"
+    empty.write_text("[]")
+    gold = tmp_path / "gold"
+
+    assert fused_pipeline([str(empty)], DAY, str(tmp_path / "fact"), str(tmp_path / "dim"), str(gold)) == []
+    assert pq.read_table(gold / "total.parquet").num_rows == 0
@@ -0,0 +1,114 @@
+# tests/utils/test_geo.py
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.geo import (
+    GeoGridIndex, build_geo_gold, density_table, geohash_center, geohash_encode, haversine_km,
+)
+
+
+def test_geohash_valores_conhecidos_e_centro():
+    lat = np.array([57.64911, 42.6, -25.38])
+    lon = np.array([10.40744, -5.6, -49.27])
+    assert geohash_encode(lat, lon, 11).tolist() == ["u4pruydqqvj", "ezs42e44yx9", "6gkzwgdwvc1"]
+    # prefixo = célula-pai
+    assert geohash_encode(lat, lon, 5).tolist() == ["u4pru", "ezs42", "6gkzw"]
+
+    c_lat, c_lon = geohash_center(np.array(["u4pruydqqvj"]), 11)
+    assert c_lat[0] == pytest.approx(57.64911, abs=1e-5)
+    assert c_lon[0] == pytest.approx(10.40744, abs=1e-5)
+
+
+def test_density_table_soma_total():
+    rng = np.random.default_rng(0)
+    lat, lon = rng.uniform(-60, 60, 1000), rng.uniform(-170, 170, 1000)
+    for precision in (2, 3, 4):
+        t = density_table(lat, lon, precision)
+        assert sum(t["count"].to_pylist()) == 1000
+        assert len(set(t["geohash"].to_pylist())) == t.num_rows
+
+
+def _brute(lat, lon, ids, q_lat, q_lon):
+    d = haversine_km(q_lat, q_lon, lat, lon)
+    order = np.argsort(d, kind="stable")
+    return [(ids[i], d[i]) for i in order]
+
+
+@pytest.mark.parametrize("q", [(37.77, -122.42), (-23.55, -46.63), (64.1, -21.9), (0.0, 179.9), (89.5, 0.0)])
+def test_within_e_nearest_iguais_ao_brute_force(q):
+    rng = np.random.default_rng(1)
+    lat = np.concatenate([rng.uniform(-90, 90, 3000), q[0] + rng.normal(0, 0.3, 300)]).clip(-90, 90)
+    lon = np.concatenate([rng.uniform(-180, 180, 3000), q[1] + rng.normal(0, 0.3, 300)])
+    lon = (lon + 180) % 360 - 180
+    ids = [f"b{i}" for i in range(len(lat))]
+    index = GeoGridIndex.build(lat, lon, ids, cell_deg=0.5)
+    brute = _brute(lat, lon, ids, *q)
+
+    for radius in (5, 50, 500):
+        expected = [i for i, d in brute if d <= radius]
+        got = [i for i, _ in index.within(*q, radius)]
+        assert sorted(got) == sorted(expected)
+
+    got = index.nearest(*q, k=7)
+    assert [i for i, _ in got] == [i for i, _ in brute[:7]]
+
+
+def test_save_load_mmap(tmp_path):
+    index = GeoGridIndex.build([10.0, 10.1, -30.0], [20.0, 20.1, 40.0], ["a", "b", None], cell_deg=1.0)
+    index.save(str(tmp_path / "idx"))
+    loaded = GeoGridIndex.load(str(tmp_path / "idx"))
+    assert isinstance(loaded.lat, np.memmap)
+    assert [i for i, _ in loaded.nearest(10.0, 20.0, k=2)] == ["a", "b"]
+    assert loaded.within(-30.0, 40.0, 1)[0][0] == ""
+    assert GeoGridIndex.build([], [], []).nearest(0, 0) == []
+
+
+def test_build_geo_gold(tmp_path):
+    silver = tmp_path / "silver" / "country=us" / "state=ca" / "part=0"
+    silver.mkdir(parents=True)
+    df = pd.DataFrame({
+        "id": ["a", "b", "c", "d"],
+        "latitude": [37.77, 37.78, None, 95.0],
+        "longitude": [-122.42, -122.41, -120.0, 0.0],
+    })
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), str(silver / "d.parquet"))
+
+    summary = build_geo_gold(str(tmp_path / "silver"), str(tmp_path / "gold"), resolutions=(3, 5))
+    assert summary["points"] == 2 and summary["skipped"] == 2
+
+    density = pq.read_table(str(tmp_path / "gold" / "geo" / "density" / "precision=3" / "data.parquet"))
+    assert density.to_pylist()[0]["geohash"] == "9q8" and density.to_pylist()[0]["count"] == 2
+
+    index = GeoGridIndex.load(str(tmp_path / "gold" / "geo" / "index"))
+    assert [i for i, _ in index.within(37.775, -122.415, 2)] in (["a", "b"], ["b", "a"])
+
+
+def test_build_geo_gold_le_so_arquivos_do_manifesto(tmp_path):
+    silver = tmp_path / "silver"
+    listed = silver / "country=us" / "state=ca" / "part=0" / "a.parquet"
+    staged = silver / "country=us" / "state=ca" / "part=-1" / "staging.parquet"
+    for path, ids in ((listed, ["a"]), (staged, ["x", "y"])):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(pa.table({"id": ids, "latitude": [37.77] * len(ids), "longitude": [-122.42] * len(ids)}),
+                       str(path))
+
+    summary = build_geo_gold(str(silver), str(tmp_path / "gold"), resolutions=(3,), files=[str(listed)])
+
+    # o arquivo fora do manifesto (ex.: compactação em andamento) não entra
+    assert summary["points"] == 1
+    assert build_geo_gold(str(silver), str(tmp_path / "gold2"), files=[])["points"] == 0
+    assert not (tmp_path / "gold2").exists()
+
+
+def test_build_geo_gold_sem_coordenadas(tmp_path):
+    silver = tmp_path / "silver"
+    silver.mkdir()
+    pq.write_table(pa.table({"id": ["a"]}), str(silver / "d.parquet"))
+    with pytest.raises(AirflowFailException):
+        build_geo_gold(str(silver), str(tmp_path / "gold"))
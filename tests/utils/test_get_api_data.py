@@ -1,7 +1,7 @@
 # tests/utils/test_get_api_data.py
 import pytest
 import requests
-from dags.utils.get_api_data import get_api_data  # ajuste se o caminho for diferente
+from dags.utils.get_api_data import get_api_data, api_base_url, DEFAULT_API_URL  # ajuste se o caminho for diferente
 
 class _FakeResponse:
     def __init__(self, status_code=200, json_data=None, text="", raise_http=False):
@@ -149,3 +149,12 @@ def test_erro_inesperado(monkeypatch, capsys):
     captured = capsys.readouterr().out
     assert f"GET {url}" in captured
     assert f"Erro inesperado em {url}" in captured
+
+
+def test_api_base_url_padrao(env_clean):
+    assert api_base_url() == DEFAULT_API_URL
+
+
+def test_api_base_url_por_env(env_clean):
+    env_clean.setenv("OPENBREWERYDB_API_URL", "http://127.0.0.1:8099/v1/breweries/")
+    assert api_base_url() == "http://127.0.0.1:8099/v1/breweries"
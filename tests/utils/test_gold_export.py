@@ -0,0 +1,70 @@
+# tests/utils/test_gold_export.py
+import os
+import sqlite3
+
+import pytest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.gold_export import export_gold_sqlite
+
+
+def _write_total(batch_dir, rows):
+    os.makedirs(batch_dir, exist_ok=True)
+    df = pd.DataFrame(rows, columns=["country", "state", "city", "brewery_type", "count"])
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), os.path.join(batch_dir, "total.parquet"))
+
+
+def test_export_tabelas_indices_e_views(tmp_path):
+    batch_dir = str(tmp_path / "gold" / "batch=2025-01-01")
+    _write_total(batch_dir, [
+        ("us", "ca", "sf", "micro", 5),
+        ("us", "ca", "la", "brewpub", 2),
+        ("br", "sp", "campinas", None, 1),
+    ] + [("ie", f"s{i % 20}", f"c{i}", "micro", 1) for i in range(500)])
+    db = str(tmp_path / "export" / "gold.sqlite")
+
+    assert export_gold_sqlite(batch_dir, db, batch="2025-01-01") == db
+    assert not os.path.exists(db + ".tmp")
+
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT SUM(count) FROM breweries_count WHERE country != 'ie'").fetchone() == (8,)
+        assert conn.execute("SELECT count FROM v_by_country WHERE country = 'us'").fetchone() == (7,)
+        assert conn.execute(
+            "SELECT count FROM v_by_country_state_city WHERE country='us' AND state='ca' AND city='sf'"
+        ).fetchone() == (5,)
+        assert conn.execute("SELECT value FROM export_metadata WHERE key = 'batch'").fetchone() == ("2025-01-01",)
+
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"ix_count_keys", "ix_rollup_keys"} <= indexes
+        plan = " ".join(str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT count FROM breweries_count WHERE country = 'us' AND state = 'ca'"
+        ))
+        assert "ix_count_keys" in plan
+    finally:
+        conn.close()
+
+
+def test_reexport_substitui_arquivo(tmp_path):
+    db = str(tmp_path / "gold.sqlite")
+    b1, b2 = str(tmp_path / "batch=1"), str(tmp_path / "batch=2")
+    _write_total(b1, [("us", "ca", "sf", "micro", 5)])
+    _write_total(b2, [("us", "ca", "sf", "micro", 9)])
+
+    export_gold_sqlite(b1, db, batch="1")
+    export_gold_sqlite(b2, db, batch="2")
+
+    conn = sqlite3.connect(db)
+    try:
+        assert conn.execute("SELECT count FROM breweries_count").fetchall() == [(9,)]
+    finally:
+        conn.close()
+
+
+def test_sem_total_falha(tmp_path):
+    with pytest.raises(AirflowFailException):
+        export_gold_sqlite(str(tmp_path), str(tmp_path / "x.sqlite"))
+    assert not os.path.exists(tmp_path / "x.sqlite")
@@ -83,6 +83,8 @@ def test_agrega_de_particoes(tmp_path, capsys):
 
     total_path = gold / "total.parquet"
     assert total_path.exists()
+    # escrita atômica: sem temporários sobrando
+    assert not list(gold.glob("*.tmp"))
 
     df = _read_parquet_df(total_path)
     # colunas e ordenação por count desc
@@ -151,4 +153,206 @@ def test_dataset_sem_dados(tmp_path, capsys):
     assert df.empty
 
     logs = capsys.readouterr().out
-    assert "Nenhum dado agregado encontrado. (batches=" in logs
+    assert "Nenhum dado agregado encontrado. (partitions=0" in logs
+
+
+def test_agrega_igual_ao_groupby_pandas(tmp_path):
+    silver = tmp_path / "silver"
+    gold = tmp_path / "gold"
+
+    # Colunas extras (não-chave) e várias partições/arquivos
+    rows = []
+    for i in range(200):
+        rows.append({
+            "name": f"b{i}",
+            "city": f"c{i % 7}",
+            "brewery_type": ["micro", "brewpub", None][i % 3],
+            "phone": None if i % 2 else str(i),
+        })
+    df = pd.DataFrame(rows)
+    for j, (country, state) in enumerate([("us", "ca"), ("us", "or"), ("br", "sp")]):
+        _write_parquet_rows(
+            silver / f"country={country}" / f"state={state}" / "part=0" / "data.parquet",
+            df.iloc[j::3],
+        )
+
+    gold_pipeline(str(silver), str(gold), batch_size=16)
+    out = _read_parquet_df(gold / "total.parquet")
+
+    keys = ["country", "state", "city", "brewery_type"]
+    full = pd.concat(
+        [df.iloc[j::3].assign(country=c, state=s) for j, (c, s) in enumerate([("us", "ca"), ("us", "or"), ("br", "sp")])]
+    )
+    expected = full.groupby(keys, dropna=False).size().rename("count").reset_index()
+
+    merged = out.merge(expected, on=keys, how="outer", suffixes=("", "_exp"), indicator=True)
+    assert (merged["_merge"] == "both").all()
+    assert (merged["count"] == merged["count_exp"]).all()
+    assert out["count"].is_monotonic_decreasing
+
+    # Rollups da mesma passada batem com os totais
+    rollups = _read_parquet_df(gold / "rollups.parquet")
+    by_state = rollups[rollups["grouping_level"] == "country,state"]
+    exp_state = full.groupby(["country", "state"]).size()
+    assert by_state.set_index(["country", "state"])["count"].sort_index().tolist() == exp_state.sort_index().tolist()
+    assert rollups[rollups["grouping_level"] == "country"]["count"].sum() == len(full)
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_modo_paralelo_igual_ao_serial(tmp_path, pool):
+    silver = tmp_path / "silver"
+    for country, state, cities in [("us", "ca", ["sf", "la"]), ("us", "or", ["pdx"]), ("br", "sp", ["campinas"])]:
+        for part in range(3):
+            df = pd.DataFrame({
+                "city": [cities[i % len(cities)] for i in range(5 + part)],
+                "brewery_type": ["micro", "brewpub"] * 2 + ["micro"] * (1 + part),
+                "name": [f"n{i}" for i in range(5 + part)],
+            })
+            _write_parquet_rows(silver / f"country={country}" / f"state={state}" / f"part={part}" / "d.parquet", df)
+
+    gold_pipeline(str(silver), str(tmp_path / "serial"), batch_size=4)
+    gold_pipeline(str(silver), str(tmp_path / "par"), batch_size=4, workers=3, pool=pool)
+
+    serial = _read_parquet_df(tmp_path / "serial" / "total.parquet")
+    par = _read_parquet_df(tmp_path / "par" / "total.parquet")
+    pd.testing.assert_frame_equal(serial, par)
+    assert par["count"].sum() == 3 * (5 + 6 + 7)
+
+
+def _write_silver_with_stats(silver: Path, country: str, state: str, df: pd.DataFrame):
+    from dags.utils.partition_stats import compute_partition_stats, write_stats_file
+
+    part_dir = silver / f"country={country}" / f"state={state}" / "part=0"
+    _write_parquet_rows(part_dir / "data.parquet", df)
+    write_stats_file(compute_partition_stats(pa.Table.from_pandas(df, preserve_index=False)), str(part_dir))
+
+
+def test_incremental_reaproveita_particoes_inalteradas(tmp_path, capsys, monkeypatch):
+    import dags.utils.gold_pipeline as gp
+
+    base = pd.DataFrame({"city": ["sf", "la", "sf"], "brewery_type": ["micro", "micro", "brewpub"], "name": ["a", "b", "c"]})
+    day1, day2 = tmp_path / "silver" / "batch=d1", tmp_path / "silver" / "batch=d2"
+    for silver in (day1, day2):
+        _write_silver_with_stats(silver, "us", "ca", base)
+        _write_silver_with_stats(silver, "br", "sp", base.assign(city="campinas"))
+    # d2: só us/or é nova e br/sp mudou
+    _write_silver_with_stats(day2, "us", "or", base.assign(city="pdx"))
+    _write_silver_with_stats(day2, "br", "sp", base.assign(city="santos"))
+
+    gold1, gold2, full = tmp_path / "gold" / "batch=d1", tmp_path / "gold" / "batch=d2", tmp_path / "full"
+    gold_pipeline(str(day1), str(gold1))
+    assert (gold1 / "_partials" / "manifest.json").exists()
+
+    calls = []
+    original = gp._aggregate_files
+    monkeypatch.setattr(gp, "_aggregate_files", lambda paths, *a: calls.append(paths) or original(paths, *a))
+    capsys.readouterr()
+    gold_pipeline(str(day2), str(gold2), previous_gold_path=str(gold1))
+
+    # us/ca reaproveitada; us/or e br/sp recalculadas
+    assert len(calls) == 2
+    assert all("state=ca" not in p for paths in calls for p in paths)
+    assert "reaproveitadas=1 recalculadas=2" in capsys.readouterr().out
+
+    monkeypatch.setattr(gp, "_aggregate_files", original)
+    gold_pipeline(str(day2), str(full))
+    pd.testing.assert_frame_equal(
+        _read_parquet_df(gold2 / "total.parquet"), _read_parquet_df(full / "total.parquet")
+    )
+
+
+def test_previous_batch_path(tmp_path):
+    from dags.utils.gold_partials import previous_batch_path
+
+    for day in ("2025-01-01", "2025-01-02", "2025-01-04"):
+        (tmp_path / f"batch={day}" / "_partials").mkdir(parents=True)
+        (tmp_path / f"batch={day}" / "_partials" / "manifest.json").write_text("{}")
+    (tmp_path / "batch=2025-01-03").mkdir()  # sem parciais
+
+    assert previous_batch_path(str(tmp_path), "2025-01-04") == str(tmp_path / "batch=2025-01-02")
+    assert previous_batch_path(str(tmp_path), "2025-01-01") is None
+    assert previous_batch_path(str(tmp_path / "nada"), "2025-01-01") is None
+
+
+def test_grava_sketches_por_particao(tmp_path):
+    from dags.utils.sketches import merge_sketches, read_sketches
+
+    silver = tmp_path / "silver"
+    for country, state, n_cities in [("us", "ca", 30), ("us", "or", 12)]:
+        df = pd.DataFrame({
+            "city": [f"{state}{i % n_cities}" for i in range(120)],
+            "brewery_type": ["micro"] * 70 + ["brewpub"] * 40 + ["large"] * 10,
+        })
+        _write_parquet_rows(silver / f"country={country}" / f"state={state}" / "part=0" / "d.parquet", df)
+
+    gold_pipeline(str(silver), str(tmp_path / "gold"))
+    sketches = read_sketches(str(tmp_path / "gold" / "sketches.parquet"))
+
+    assert sketches[("us", "ca")].distinct_cities() == pytest.approx(30, rel=0.05)
+    assert sketches[("us", "or")].distinct_cities() == pytest.approx(12, rel=0.05)
+    top = merge_sketches([sketches], country="us").top_brewery_types(k=2)
+    assert top == [{"brewery_type": "micro", "count": 140}, {"brewery_type": "brewpub", "count": 80}]
+
+    gold_pipeline(str(silver), str(tmp_path / "sem"), sketch_config=None)
+    assert not (tmp_path / "sem" / "sketches.parquet").exists()
+
+
+def test_publica_metricas_da_etapa(tmp_path, env_clean):
+    import json
+    env_clean.setenv("OPENBREWERYDB_METRICS_DIR", str(tmp_path / "logs"))
+    silver = tmp_path / "silver"
+    df = pd.DataFrame({"name": ["a", "b", "c"], "city": ["x", "x", "y"], "brewery_type": ["micro"] * 3})
+    _write_parquet_rows(silver / "country=us" / "state=ca" / "part-0.parquet", df)
+
+    gold_pipeline(str(silver), str(tmp_path / "gold" / "batch=2025-09-27"))
+
+    state = json.loads((tmp_path / "logs" / "openbrewerydb.prom.json").read_text())
+    s = state["gold_pipeline"]["2025-09-27"]
+    assert s["rows_in"] == 3
+    assert s["rows_out"] == 2
+    assert s["bytes_read"] > 0 and s["bytes_written"] > 0
+    assert s["errors"] == 0
+
+
+def test_agrega_so_arquivos_do_manifesto(tmp_path):
+    silver = tmp_path / "silver"
+    gold = tmp_path / "gold"
+    listed = silver / "country=US" / "state=CA" / "city=SF" / "brewery_type=micro" / "run.parquet"
+    _write_parquet_rows(listed, pd.DataFrame({"dummy": [1, 2]}))
+    # fora do manifesto: não entra na agregação
+    _write_parquet_rows(
+        silver / "country=BR" / "state=SP" / "city=Campinas" / "brewery_type=micro" / "old.parquet",
+        pd.DataFrame({"dummy": [3]}),
+    )
+
+    gold_pipeline(str(silver), str(gold), files=[str(listed)])
+
+    df = _read_parquet_df(gold / "total.parquet")
+    assert df[["country", "state", "city", "brewery_type", "count"]].values.tolist() == [["US", "CA", "SF", "micro", 2]]
+
+
+def test_manifesto_vazio_grava_gold_vazia(tmp_path):
+    silver = tmp_path / "silver"
+    _write_parquet_rows(silver / "country=US" / "data.parquet", pd.DataFrame({"dummy": [1]}))
+
+    gold_pipeline(str(silver), str(tmp_path / "gold"), files=[])
+
+    assert _read_parquet_df(tmp_path / "gold" / "total.parquet").empty
+
+
+def test_rerun_vazio_limpa_derivados_e_mantem_tipos(tmp_path):
+    silver, gold = tmp_path / "silver", tmp_path / "gold"
+    data = silver / "country=US" / "state=CA" / "part=0" / "data.parquet"
+    _write_parquet_rows(data, pd.DataFrame({"city": ["SF"], "brewery_type": ["micro"]}))
+    gold_pipeline(str(silver), str(gold))
+    full_schema = pq.read_schema(str(gold / "total.parquet"))
+    assert (gold / "_partials").exists() and (gold / "sketches.parquet").exists()
+
+    # Mesmo batch reprocessado sem dados: nada do run anterior fica no diretório
+    gold_pipeline(str(silver), str(gold), files=[])
+
+    assert not (gold / "_partials").exists() and not (gold / "sketches.parquet").exists()
+    assert pq.read_table(str(gold / "total.parquet")).num_rows == 0
+    assert pq.read_schema(str(gold / "total.parquet")).equals(full_schema)
+    assert pq.read_table(str(gold / "rollups.parquet")).num_rows == 0
+    assert not list(gold.glob("*.tmp"))
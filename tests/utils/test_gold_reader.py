@@ -0,0 +1,123 @@
+# tests/utils/test_gold_reader.py
+import json
+import os
+import threading
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dags.utils.aggregation import rollup_table
+from dags.utils.gold_reader import GoldReader, latest_gold_batch, make_server
+
+
+LEAF = [
+    ("us", "ca", "sf", "micro", 5),
+    ("us", "ca", "sf", "brewpub", 2),
+    ("us", "ca", "la", "micro", 4),
+    ("us", "or", "pdx", "micro", 6),
+    ("br", "sp", "campinas", "micro", 1),
+]
+
+
+def _write_gold(root, day, rows, with_rollups=True):
+    batch_dir = os.path.join(root, f"batch={day}")
+    os.makedirs(batch_dir, exist_ok=True)
+    leaf = pa.Table.from_pandas(
+        pd.DataFrame(rows, columns=["country", "state", "city", "brewery_type", "count"]), preserve_index=False
+    )
+    pq.write_table(leaf, os.path.join(batch_dir, "total.parquet"))
+    if with_rollups:
+        pq.write_table(rollup_table(leaf), os.path.join(batch_dir, "rollups.parquet"))
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.mark.parametrize("with_rollups", [True, False])
+def test_count_e_top(tmp_path, with_rollups):
+    _write_gold(str(tmp_path), "2025-01-01", LEAF, with_rollups=with_rollups)
+    reader = GoldReader(str(tmp_path))
+
+    assert reader.batch == "2025-01-01"
+    assert reader.count("us") == 17
+    assert reader.count("us", "ca") == 11
+    assert reader.count("us", "ca", "sf") == 7
+    assert reader.count("us", brewery_type="micro") == 15
+    assert reader.count("us", "ca", "sf", "brewpub") == 2
+    assert reader.count("xx") == 0
+
+    assert reader.top(2, by="city") == [
+        {"country": "us", "state": "ca", "city": "sf", "count": 7},
+        {"country": "us", "state": "or", "city": "pdx", "count": 6},
+    ]
+    assert [r["city"] for r in reader.top(5, by="city", country="us", state="ca")] == ["sf", "la"]
+    assert reader.top(1, by="state", brewery_type="micro") == [
+        {"country": "us", "state": "ca", "brewery_type": "micro", "count": 9}
+    ]
+
+    with pytest.raises(ValueError):
+        reader.count("us", city="sf")
+    with pytest.raises(ValueError):
+        reader.top(3, by="country", state="ca")
+
+
+def test_cache_lru_ttl_e_invalidacao_por_batch(tmp_path):
+    clock = _Clock()
+    _write_gold(str(tmp_path), "2025-01-01", LEAF)
+    reader = GoldReader(str(tmp_path), cache_size=2, ttl_seconds=10, refresh_interval=1, clock=clock)
+
+    reader.count("us")
+    reader.count("us")
+    assert (reader.hits, reader.misses) == (1, 1)
+
+    # LRU: a 3ª chave expulsa a menos recente ("us")
+    reader.count("br")
+    reader.count("us", "ca")
+    reader.count("us")
+    assert reader.misses == 4
+
+    # TTL expirado -> recalcula
+    clock.t = 11
+    reader.count("us")
+    assert reader.misses == 5
+
+    # Batch novo é detectado após refresh_interval e invalida o cache
+    _write_gold(str(tmp_path), "2025-01-08", [("us", "ca", "sf", "micro", 1)])
+    assert reader.count("us") == 17
+    clock.t = 12.5
+    assert reader.count("us") == 1
+    assert reader.batch == "2025-01-08"
+
+
+def test_sem_batch(tmp_path):
+    assert latest_gold_batch(str(tmp_path / "nada")) is None
+    with pytest.raises(LookupError):
+        GoldReader(str(tmp_path)).count("us")
+
+
+def test_servidor_http(tmp_path):
+    _write_gold(str(tmp_path), "2025-01-01", LEAF)
+    server = make_server(GoldReader(str(tmp_path)), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/count?country=us&state=ca") as r:
+            assert json.load(r) == {"batch": "2025-01-01", "count": 11}
+        with urllib.request.urlopen(f"{base}/top?n=1&by=state") as r:
+            assert json.load(r)["rows"] == [{"country": "us", "state": "ca", "count": 11}]
+        with pytest.raises(HTTPError) as e:
+            urllib.request.urlopen(f"{base}/count?state=ca")
+        assert e.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
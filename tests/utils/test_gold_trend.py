@@ -0,0 +1,73 @@
+# tests/utils/test_gold_trend.py
+import os
+from datetime import date
+
+import pytest
+import pandas as pd
+import pyarrow.parquet as pq
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.aggregation import rollup_table
+from dags.utils.gold_trend import read_trend, trend_files, update_trend
+
+
+def _write_batch(gold_root, day, leaf_rows):
+    import pyarrow as pa
+
+    leaf = pd.DataFrame(leaf_rows, columns=["country", "state", "city", "brewery_type", "count"])
+    batch_dir = os.path.join(gold_root, f"batch={day}")
+    os.makedirs(batch_dir, exist_ok=True)
+    pq.write_table(rollup_table(pa.Table.from_pandas(leaf, preserve_index=False)), os.path.join(batch_dir, "rollups.parquet"))
+
+
+def _state_rows(df):
+    return df[df["grouping_level"] == "country,state"].set_index(["country", "state"])
+
+
+def test_incremental_com_delta_e_crescimento(tmp_path):
+    gold = str(tmp_path)
+    _write_batch(gold, "2025-12-29", [("us", "ca", "sf", "micro", 4), ("us", "or", "pdx", "micro", 2)])
+    _write_batch(gold, "2026-01-05", [("us", "ca", "sf", "micro", 5), ("br", "sp", "x", None, 1)])
+
+    first = update_trend(gold, "2025-12-29")
+    second = update_trend(gold, "2026-01-05")
+
+    # Particionado por ano, um arquivo por batch
+    assert first.endswith(os.path.join("trend", "year=2025", "batch=2025-12-29.parquet"))
+    assert second.endswith(os.path.join("trend", "year=2026", "batch=2026-01-05.parquet"))
+
+    df1 = _state_rows(pq.read_table(first).to_pandas())
+    assert pd.isna(df1.loc[("us", "ca"), "delta"]) and pd.isna(df1.loc[("us", "ca"), "prev_batch"])
+
+    df2 = _state_rows(pq.read_table(second).to_pandas())
+    assert df2.loc[("us", "ca"), "prev_count"] == 4
+    assert df2.loc[("us", "ca"), "delta"] == 1
+    assert df2.loc[("us", "ca"), "growth"] == pytest.approx(0.25)
+    assert df2.loc[("us", "ca"), "prev_batch"] == date(2025, 12, 29)
+    # chave que sumiu entra zerada; chave nova sem crescimento definido
+    assert df2.loc[("us", "or"), "count"] == 0 and df2.loc[("us", "or"), "delta"] == -2
+    assert df2.loc[("br", "sp"), "delta"] == 1 and pd.isna(df2.loc[("br", "sp"), "growth"])
+
+    # Nível country casa chaves nulas entre batches
+    country = pq.read_table(second).to_pandas().query("grouping_level == 'country'").set_index("country")
+    assert country.loc["us", "prev_count"] == 6 and country.loc["us", "count"] == 5
+
+
+def test_reprocessar_batch_e_leitura_por_intervalo(tmp_path):
+    gold = str(tmp_path)
+    for day, n in [("2025-01-06", 1), ("2025-01-13", 2), ("2025-01-20", 3)]:
+        _write_batch(gold, day, [("us", "ca", "sf", "micro", n)])
+        update_trend(gold, day)
+    update_trend(gold, "2025-01-13")  # idempotente
+
+    trend = os.path.join(gold, "trend")
+    assert sorted(trend_files(trend)) == ["2025-01-06", "2025-01-13", "2025-01-20"]
+
+    df = read_trend(trend, start="2025-01-13", end="2025-01-20")
+    assert set(df["batch"]) == {date(2025, 1, 13), date(2025, 1, 20)}
+    assert _state_rows(df[df["batch"] == date(2025, 1, 20)])["delta"].tolist() == [1]
+
+
+def test_sem_rollups_falha(tmp_path):
+    with pytest.raises(AirflowFailException):
+        update_trend(str(tmp_path), "2025-01-01")
@@ -0,0 +1,106 @@
+import sqlite3
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from airflow.exceptions import AirflowFailException
+
+from dags.utils import lake_tasks, storage
+from dags.utils.manifest import build_manifest, manifest_files, read_manifest, scan_raw_manifest, write_manifest
+from dags.utils.normalization import normalize_brewery_table, normalize_name
+from dags.utils.raw_reader import read_raw_table
+from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+from dags.utils.save_api_data import save_api_data
+from dags.utils.silver_pipeline import clear_batch, silver_pipeline_arrow
+from dags.utils.update_dim import update_dim
+
+DAY = "2025-09-27"
+REMOTE_FACT = "memory://lake/silver/fact"
+DIMS = ["country", "state", "city", "brewery_type"]
+
+
+@pytest.fixture
+def memory_lake():
+    root = f"memory://lake-{uuid.uuid4().hex[:8]}"
+    yield root
+    fs, path = storage.filesystem(root)
+    if fs.exists(path):
+        fs.rm(path, recursive=True)
+
+
+def test_silver_batch_path():
+    assert lake_tasks.silver_batch_path(DAY, "lake/fact") == "lake/fact/batch=2025-09-27"
+
+
+@pytest.mark.parametrize("call, skipped", [
+    (lambda: lake_tasks.update_current(DAY, REMOTE_FACT, "memory://lake/silver/current"),
+     {"changed": [], "unchanged": [], "removed": []}),
+    (lambda: lake_tasks.update_gold_trend(DAY, "memory://lake/gold"), None),
+    (lambda: lake_tasks.export_gold("memory://lake/gold/batch=2025-09-27", DAY), None),
+    (lambda: lake_tasks.build_geo(DAY, "memory://lake/gold/batch=2025-09-27", REMOTE_FACT), {}),
+    (lambda: lake_tasks.build_search(DAY, REMOTE_FACT, "memory://lake/gold/search"), {}),
+], ids=["update_current", "update_gold_trend", "export_gold", "build_geo", "build_search"])
+def test_tasks_locais_pulam_com_lake_remoto(call, skipped, capsys):
+    # Não falham o run (a gold segue) nem passam em silêncio
+    assert call() == skipped
+    assert "exige raiz local do lake" in capsys.readouterr().out
+
+
+def test_require_local():
+    lake_tasks.require_local("data_lake_mock/raw", "backfill")
+    with pytest.raises(AirflowFailException, match="exige raiz local"):
+        lake_tasks.require_local("memory://lake/raw", "backfill")
+
+
+def test_update_current_local_roda(tmp_path):
+    out = lake_tasks.update_current(DAY, str(tmp_path / "fact"), str(tmp_path / "current"))
+    assert out == {"changed": [], "unchanged": [], "removed": []}
+
+
+def test_cadeia_silver_com_lake_em_memory(memory_lake):
+    raw, dim = storage.join(memory_lake, "raw"), storage.join(memory_lake, "silver", "dim")
+    fact = storage.join(memory_lake, "silver", "fact")
+    rows = [{"id": f"id-{i}", "name": f"Brew {i % 3}", "brewery_type": "micro", "city": "San Diego",
+             "state": "California", "country": "United States"} for i in range(6)]
+    save_api_data(rows, raw, 1, day=DAY)
+
+    # Mesma sequência de tasks da DAG transformation_silver
+    raw_manifest = scan_raw_manifest(raw, DAY)
+    table = read_raw_table(manifest_files(raw_manifest))
+    df = table.to_pandas()
+    storage.makedirs(dim)
+    for col in DIMS:
+        work = df[[col]].dropna()
+        work[f"{col}_norm"] = work[col].map(normalize_name)
+        update_dim(work, col, f"{col}_norm", storage.join(dim, f"dim_{col}.parquet"))
+    clear_batch(fact, DAY)
+    written = silver_pipeline_arrow(normalize_brewery_table(table), fact, dim, DAY, part=0)
+    written = remove_duplicates_batch(DAY, fact, files=written)
+    silver_manifest = build_manifest("silver", DAY, fact, written)
+
+    final_manifest = lake_tasks.compact_fact(silver_manifest, fact)
+    index = lake_tasks.build_stats_index(DAY, fact)
+    lake_tasks.update_current(DAY, fact, storage.join(memory_lake, "silver", "current"))
+    path = write_manifest(final_manifest)
+
+    assert final_manifest == silver_manifest
+    assert index["rows"] == 3  # dedup por name/city/state/country/type
+    assert read_manifest(path)["files"] == silver_manifest["files"]
+    assert all(storage.exists(f) for f in manifest_files(final_manifest))
+
+
+def test_export_gold_nao_regride_para_batch_antigo(tmp_path):
+    gold, db = tmp_path / "gold", str(tmp_path / "export" / "gold.sqlite")
+    for day, n in (("2025-09-27", 1), ("2025-10-04", 2)):
+        (gold / f"batch={day}").mkdir(parents=True)
+        pq.write_table(pa.table({"country": ["us"], "state": ["ca"], "city": ["sf"], "brewery_type": ["micro"],
+                                 "count": pa.array([n], pa.int64())}), str(gold / f"batch={day}" / "total.parquet"))
+
+    assert lake_tasks.export_gold(str(gold / "batch=2025-10-04"), "2025-10-04", db) == db
+    # Rerun do batch anterior (gold DAG ou backfill): o export do mais novo fica
+    assert lake_tasks.export_gold(str(gold / "batch=2025-09-27"), "2025-09-27", db) is None
+
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT value FROM export_metadata WHERE key = 'batch'").fetchone() == ("2025-10-04",)
+        assert conn.execute("SELECT count FROM breweries_count").fetchall() == [(2,)]
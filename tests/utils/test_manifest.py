@@ -0,0 +1,124 @@
+import json
+import os
+from collections import namedtuple
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from airflow.datasets import Dataset
+from airflow.exceptions import AirflowFailException
+from dags.utils.manifest import (
+    build_manifest,
+    collecting_visitor,
+    manifest_files,
+    manifest_from_events,
+    manifest_path,
+    read_manifest,
+    refresh_manifest,
+    scan_manifest,
+    write_manifest,
+)
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+    return str(path)
+
+
+def test_build_manifest_relativo_e_particoes(tmp_path):
+    root = tmp_path / "fact"
+    files = [
+        _touch(root / "batch=2025-09-27" / "country=us" / "state=ca" / "part=0" / "b.parquet"),
+        _touch(root / "batch=2025-09-27" / "country=us" / "state=ca" / "part=0" / "a.parquet"),
+        _touch(root / "batch=2025-09-27" / "country=br" / "state=sp" / "part=10" / "a.parquet"),
+    ]
+
+    m = build_manifest("silver", "2025-09-27", str(root), files, rows=3)
+
+    assert m["stage"] == "silver" and m["batch"] == "2025-09-27" and m["rows"] == 3
+    assert m["files"] == sorted(os.path.relpath(f, root) for f in files)
+    assert m["partitions"] == [
+        "batch=2025-09-27/country=br/state=sp/part=10",
+        "batch=2025-09-27/country=us/state=ca/part=0",
+    ]
+    assert sorted(manifest_files(m)) == sorted(files)
+
+
+def test_write_e_read_manifest(tmp_path):
+    m = build_manifest("raw", "2025-09-27", str(tmp_path), [_touch(tmp_path / "year=2025" / "p1.json")])
+
+    path = write_manifest(m)
+
+    assert path == manifest_path(str(tmp_path), "2025-09-27", "raw")
+    assert "/_manifests/batch=2025-09-27/raw.json" in path
+    assert read_manifest(path) == json.loads(json.dumps(m))
+    assert not os.path.exists(f"{path}.tmp")
+
+
+@pytest.mark.parametrize("conteudo", ["{nao é json", json.dumps({"stage": "raw"})])
+def test_read_manifest_invalido_levanta(tmp_path, conteudo):
+    path = tmp_path / "m.json"
+    path.write_text(conteudo)
+    with pytest.raises(AirflowFailException):
+        read_manifest(str(path))
+
+
+def test_refresh_manifest_relista_so_as_particoes(tmp_path):
+    root = tmp_path / "fact"
+    old = _touch(root / "batch=d" / "country=us" / "state=ca" / "part=0" / "a.parquet")
+    m = build_manifest("silver", "d", str(root), [old])
+
+    # compactação trocou o arquivo da partição; outra partição não é relistada
+    os.remove(old)
+    new = _touch(root / "batch=d" / "country=us" / "state=ca" / "part=0" / "compacted.parquet")
+    _touch(root / "batch=d" / "country=br" / "state=sp" / "part=0" / "x.parquet")
+    _touch(root / "batch=d" / "country=us" / "state=ca" / "_stats" / "s.parquet")
+
+    refreshed = refresh_manifest(m, depth=3)
+
+    assert manifest_files(refreshed) == [new]
+
+
+def test_scan_manifest_fallback_glob(tmp_path):
+    f = _touch(tmp_path / "year=2025" / "month=09" / "day=27" / "p1.json")
+    _touch(tmp_path / "year=2025" / "month=09" / "day=28" / "p1.json")
+
+    m = scan_manifest("raw", "2025-09-27", str(tmp_path), "year=2025/month=09/day=27/*.json")
+
+    assert manifest_files(m) == [f]
+    assert m["source"] == "glob"
+
+
+# chave dos eventos no Airflow 3 (hashable, com name/uri do asset)
+_AssetKey = namedtuple("_AssetKey", ["name", "uri"])
+
+
+def test_manifest_from_events(tmp_path):
+    dataset = Dataset("/logs/trigger_gold.csv")
+    old = write_manifest(build_manifest("silver", "2025-09-26", str(tmp_path), []))
+    new = write_manifest(build_manifest("silver", "2025-09-27", str(tmp_path), []))
+    events = {
+        _AssetKey("outro", "/logs/outro.csv"): [SimpleNamespace(extra={"manifest": old})],
+        _AssetKey("gold", dataset.uri): [SimpleNamespace(extra={"manifest": old}), SimpleNamespace(extra={"manifest": new})],
+    }
+
+    assert manifest_from_events({"triggering_asset_events": events}, dataset)["batch"] == "2025-09-27"
+    assert manifest_from_events({"triggering_dataset_events": events}, dataset)["batch"] == "2025-09-27"
+
+
+@pytest.mark.parametrize("context", [{}, {"triggering_asset_events": {}},
+                                     {"triggering_asset_events": {"/logs/trigger_gold.csv": [SimpleNamespace(extra={})]}}])
+def test_manifest_from_events_sem_manifesto(context):
+    assert manifest_from_events(context, Dataset("/logs/trigger_gold.csv")) is None
+
+
+def test_collecting_visitor_acumula_arquivos_escritos(tmp_path):
+    written = []
+    ds.write_dataset(pa.table({"k": ["a", "b"], "v": [1, 2]}), str(tmp_path), format="parquet",
+                     partitioning=["k"], partitioning_flavor="hive", file_visitor=collecting_visitor(written))
+
+    assert sorted(os.path.relpath(p, tmp_path).split(os.sep)[0] for p in written) == ["k=a", "k=b"]
+    assert all(os.path.exists(p) for p in written)
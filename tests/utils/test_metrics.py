@@ -0,0 +1,153 @@
+import contextvars
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from dags.utils import metrics
+from dags.utils.metrics import (
+    PROM_FILE, STATE_FILE, batch_from_path, instrumented, record, record_files, stage_metrics,
+)
+
+
+def test_stage_metrics_acumula_contadores(env_clean, tmp_path):
+    f = tmp_path / "a.bin"
+    f.write_bytes(b"x" * 100)
+    with stage_metrics("etapa", "2025-09-27") as m:
+        record(rows_in=10)
+        record(rows_in=5, rows_out=12)
+        record_files([str(f)], written=True)
+        record_files([str(f), str(f)], written=False)
+
+    assert m.status == "ok"
+    assert m.values == {"rows_in": 15, "rows_out": 12, "bytes_read": 200, "bytes_written": 100, "files": 3}
+    assert m.duration_s >= 0
+    assert m.peak_rss_bytes > 0
+
+
+@pytest.mark.skipif(metrics._current_rss_bytes() is None, reason="requer /proc/self/statm")
+def test_pico_de_rss_e_por_etapa(env_clean):
+    size = 256 * 2**20
+    with stage_metrics("pesada", "b") as heavy:
+        buf = b"x" * size
+        time.sleep(5 * metrics.RSS_SAMPLE_INTERVAL_S)
+        del buf
+    with stage_metrics("leve", "b") as light:
+        pass
+
+    # ru_maxrss repetiria o pico da etapa pesada na leve
+    assert heavy.peak_rss_bytes - light.peak_rss_bytes > size // 2
+
+
+def test_record_concorrente_nao_perde_contagens(env_clean):
+    n_threads, n_calls = 8, 5000
+
+    def worker():
+        for _ in range(n_calls):
+            record(rows_in=1, files=1)
+
+    with stage_metrics("etapa", "b") as m:
+        # Mesmo contexto em todas as threads, como a leitura antecipada (prefetch) faz
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(worker,))
+                   for _ in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert m.values["rows_in"] == m.values["files"] == n_threads * n_calls
+
+
+def test_record_fora_de_etapa_e_noop(env_clean):
+    record(rows_in=1)
+    record_files(["/nao/existe"], written=True)
+
+
+def test_contador_desconhecido():
+    with pytest.raises(ValueError):
+        with stage_metrics("etapa", "b") as m:
+            m.add(linhas=1)
+
+
+def test_erro_marca_status_e_repropaga(env_clean, tmp_path):
+    env_clean.setenv("OPENBREWERYDB_METRICS_DIR", str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with stage_metrics("etapa", "2025-09-27"):
+            raise RuntimeError("boom")
+
+    state = json.loads((tmp_path / STATE_FILE).read_text())
+    assert state["etapa"]["2025-09-27"]["errors"] == 1
+
+
+def test_textfile_acumula_por_batch(env_clean, tmp_path):
+    env_clean.setenv("OPENBREWERYDB_METRICS_DIR", str(tmp_path))
+    for rows in (10, 20):
+        with stage_metrics("silver_pipeline", "2025-09-27"):
+            record(rows_in=rows, rows_out=rows)
+    with stage_metrics("silver_pipeline", "2025-09-28"):
+        record(rows_out=7)
+
+    state = json.loads((tmp_path / STATE_FILE).read_text())
+    assert state["silver_pipeline"]["2025-09-27"]["rows_out"] == 30
+    assert state["silver_pipeline"]["2025-09-27"]["calls"] == 2
+    assert state["silver_pipeline"]["2025-09-28"]["rows_out"] == 7
+
+    prom = (tmp_path / PROM_FILE).read_text()
+    assert "# TYPE openbrewerydb_stage_rows_out gauge" in prom
+    assert 'openbrewerydb_stage_rows_out{stage="silver_pipeline",batch="2025-09-27"} 30' in prom
+    assert 'openbrewerydb_stage_calls{stage="silver_pipeline",batch="2025-09-28"} 1' in prom
+
+
+def test_textfile_limita_batches(env_clean, tmp_path, monkeypatch):
+    env_clean.setenv("OPENBREWERYDB_METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "KEEP_BATCHES", 2)
+    for day in ("2025-09-01", "2025-09-02", "2025-09-03"):
+        with stage_metrics("gold_pipeline", day):
+            pass
+    state = json.loads((tmp_path / STATE_FILE).read_text())
+    assert sorted(state["gold_pipeline"]) == ["2025-09-02", "2025-09-03"]
+
+
+def test_statsd_udp(env_clean):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.settimeout(5)
+        env_clean.setenv("OPENBREWERYDB_STATSD", f"127.0.0.1:{sock.getsockname()[1]}")
+        with stage_metrics("gold_pipeline", "2025-09-27"):
+            record(rows_out=42)
+        lines = sock.recv(65535).decode().splitlines()
+
+    assert "openbrewerydb.gold_pipeline.rows_out:42|c" in lines
+    assert any(line.startswith("openbrewerydb.gold_pipeline.duration:") and line.endswith("|ms") for line in lines)
+
+
+def test_falha_de_envio_nao_quebra_etapa(env_clean, tmp_path):
+    blocker = tmp_path / "arquivo"
+    blocker.write_text("x")
+    env_clean.setenv("OPENBREWERYDB_METRICS_DIR", str(blocker / "sub"))
+    with stage_metrics("etapa", "b"):
+        record(rows_in=1)
+
+
+def test_instrumented_extrai_batch(env_clean):
+    seen = {}
+
+    @instrumented("etapa", batch=lambda a: a["date"])
+    def fn(x, date="2025-01-01"):
+        seen["stage"] = metrics._current.get()
+        record(rows_out=x)
+        return x * 2
+
+    assert fn(3, date="2025-09-27") == 6
+    assert seen["stage"].batch == "2025-09-27"
+    assert seen["stage"].values["rows_out"] == 3
+    assert fn(1) == 2
+    assert seen["stage"].batch == "2025-01-01"
+
+
+def test_batch_from_path():
+    assert batch_from_path("/gold/batch=2025-09-27/") == "2025-09-27"
+    assert batch_from_path("/gold/outro") is None
+    assert batch_from_path(None) is None
@@ -2,10 +2,12 @@
 import types
 import unicodedata as real_unicodedata
 import pandas as pd
+import pyarrow as pa
 import pytest
 
 from airflow.exceptions import AirflowFailException
-from dags.utils.normalization import normalize_name, normalize_brewery_df
+from dags.utils.normalization import normalize_name, normalize_brewery_df, normalize_brewery_table
+from dags.utils.schema import BREWERY_SCHEMA
 
 
 # -----------------------------
@@ -106,3 +108,37 @@ def test_normalize_brewery_df_erro(monkeypatch, capsys):
 
     logs = capsys.readouterr().out
     assert "Erro ao normalizar DataFrame breweries" in logs
+
+
+# -----------------------------
+# normalize_brewery_table
+# -----------------------------
+
+def test_normalize_brewery_table_conforma_schema(capsys):
+    table = pa.table({
+        "id": [1, 2],
+        "name": ["Cervejaria A", None],
+        "latitude": ["-23.5", "invalid"],
+        "longitude": [-46.6, None],
+        "extra": ["x", "y"],
+    })
+
+    out = normalize_brewery_table(table)
+
+    assert out.schema.equals(BREWERY_SCHEMA)
+    assert out["id"].to_pylist() == ["1", "2"]
+    assert out["latitude"].to_pylist() == [-23.5, None]
+    assert out["longitude"].to_pylist() == [-46.6, None]
+    assert out["city"].null_count == 2  # coluna ausente vira nula
+
+    logs = capsys.readouterr().out
+    assert "colunas fora do schema descartadas: ['extra']" in logs
+    assert "normalize_brewery_table concluído: rows=2" in logs
+
+
+def test_normalize_brewery_table_vazia_ou_none(capsys):
+    with pytest.raises(AirflowFailException):
+        normalize_brewery_table(pa.table({"id": pa.array([], pa.string())}))
+    with pytest.raises(AirflowFailException):
+        normalize_brewery_table(None)
+    assert "Tabela vazia recebida em normalize_brewery_table" in capsys.readouterr().out
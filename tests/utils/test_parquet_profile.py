@@ -0,0 +1,69 @@
+# tests/utils/test_parquet_profile.py
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dags.utils.parquet_profile import ParquetWriteProfile, DEFAULT_WRITE_PROFILE
+from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+
+
+def _write_batch(batch_dir: Path, df: pd.DataFrame):
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), str(batch_dir / "data.parquet"))
+
+
+def _rows():
+    return pd.DataFrame([
+        {"name": n, "country": "us", "state": "ca", "city": c, "brewery_type": t, "part": "0", "phone": None}
+        for n, c, t in [("Z", "sf", "micro"), ("A", "la", "micro"), ("B", "sf", "brewpub"), ("C", "la", "brewpub")]
+    ])
+
+
+def test_sort_ordena_apenas_colunas_presentes():
+    table = pa.table({"city": ["b", "a", "a"], "name": ["x", "z", "y"]})
+    out = DEFAULT_WRITE_PROFILE.sort(table)
+    assert out["city"].to_pylist() == ["a", "a", "b"]
+    assert out["name"].to_pylist() == ["y", "z", "x"]
+
+
+def test_dedup_escreve_com_perfil_padrao(tmp_path):
+    batch_dir = tmp_path / "fact" / "batch=2025-09-27"
+    _write_batch(batch_dir, _rows())
+
+    remove_duplicates_batch("2025-09-27", str(tmp_path / "fact"))
+
+    files = list(batch_dir.rglob("*.parquet"))
+    assert len(files) == 1
+    pf = pq.ParquetFile(files[0])
+    col_city = pf.metadata.row_group(0).column(pf.schema_arrow.get_field_index("city"))
+    assert col_city.compression == "ZSTD"
+    assert col_city.is_stats_set and col_city.statistics.min == "la" and col_city.statistics.max == "sf"
+    assert "RLE_DICTIONARY" in col_city.encodings
+
+    # ordenado por (city, brewery_type, name) dentro da partição
+    out = pf.read().to_pandas()
+    assert list(zip(out["city"], out["brewery_type"], out["name"])) == [
+        ("la", "brewpub", "C"), ("la", "micro", "A"), ("sf", "brewpub", "B"), ("sf", "micro", "Z"),
+    ]
+
+
+def test_perfil_customizado_row_groups_e_codec(tmp_path):
+    batch_dir = tmp_path / "fact" / "batch=2025-09-27"
+    _write_batch(batch_dir, _rows())
+    profile = ParquetWriteProfile(compression="gzip", compression_level=None, dictionary_columns=(),
+                                  max_rows_per_group=2, write_page_index=False)
+
+    remove_duplicates_batch("2025-09-27", str(tmp_path / "fact"), profile=profile)
+
+    pf = pq.ParquetFile(next(batch_dir.rglob("*.parquet")))
+    assert pf.metadata.num_row_groups == 2
+    assert pf.metadata.row_group(0).column(0).compression == "GZIP"
+
+
+def test_pyarrow_defaults_sem_ordenacao():
+    profile = ParquetWriteProfile.pyarrow_defaults()
+    assert profile.sort_by == ()
+    assert profile.write_dataset_kwargs()["preserve_order"] is False
+    table = pa.table({"city": ["b", "a"]})
+    assert profile.sort(table)["city"].to_pylist() == ["b", "a"]
@@ -0,0 +1,92 @@
+# tests/utils/test_partition_stats.py
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.partition_stats import (
+    STATS_FILE, build_batch_stats_index, compute_partition_stats, counts_from_index,
+    load_batch_stats_index, table_checksum, write_partition_stats,
+)
+from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+
+
+def _table():
+    return pa.table({
+        "id": ["1", "2", "3", "4"],
+        "name": ["A", "B", "C", None],
+        "city": ["sf", "sf", "la", "campinas"],
+        "brewery_type": ["micro", "micro", "brewpub", "micro"],
+        "phone": [None, "1", None, None],
+        "country": ["us", "us", "us", "br"],
+        "state": ["ca", "ca", "ca", "sp"],
+        "part": ["0", "0", "0", "0"],
+    })
+
+
+def test_compute_partition_stats():
+    stats = compute_partition_stats(_table().drop_columns(["country", "state", "part"]))
+
+    assert stats["rows"] == 4
+    assert stats["distinct_city"] == 3
+    assert stats["distinct_brewery_type"] == 2
+    assert stats["null_counts"]["phone"] == 3
+    assert stats["null_counts"]["name"] == 1
+    assert stats["min_max"]["city"] == ["campinas", "sf"]
+    assert stats["min_max"]["name"] == ["A", "C"]
+    assert stats["city_type_counts"] == [["campinas", "micro", 1], ["la", "brewpub", 1], ["sf", "micro", 2]]
+
+
+def test_table_checksum_ignora_ordem():
+    t = _table()
+    shuffled = t.take([3, 1, 0, 2]).select(list(reversed(t.column_names)))
+    assert table_checksum(t) == table_checksum(shuffled)
+    assert table_checksum(t) != table_checksum(t.slice(0, 3))
+
+
+def test_write_partition_stats_e_indice(tmp_path, capsys):
+    batch = tmp_path / "batch=2025-09-27"
+    written = write_partition_stats(_table(), str(batch))
+
+    assert len(written) == 2
+    sidecar = json.loads((batch / "country=us" / "state=ca" / "part=0" / STATS_FILE).read_text())
+    assert sidecar["rows"] == 3 and sidecar["country"] == "us" and sidecar["part"] == "0"
+
+    index = build_batch_stats_index(str(batch))
+    assert index["rows"] == 4
+    assert {p["path"] for p in index["partitions"]} == {
+        "country=us/state=ca/part=0", "country=br/state=sp/part=0",
+    }
+    assert load_batch_stats_index(str(batch))["rows"] == 4
+
+    counts = counts_from_index(index).set_index(["country", "state", "city", "brewery_type"])["count"]
+    assert counts[("us", "ca", "sf", "micro")] == 2
+    assert counts.sum() == 4
+
+    assert "Índice de estatísticas gravado" in capsys.readouterr().out
+
+
+def test_write_partition_stats_sem_colunas_de_particao(tmp_path):
+    with pytest.raises(AirflowFailException):
+        write_partition_stats(pa.table({"city": ["x"]}), str(tmp_path))
+
+
+def test_indice_batch_inexistente(tmp_path):
+    assert build_batch_stats_index(str(tmp_path / "nada")) == {}
+    assert load_batch_stats_index(str(tmp_path / "nada")) is None
+
+
+def test_dedup_regrava_sidecars(tmp_path):
+    batch = tmp_path / "fact" / "batch=2025-09-27"
+    batch.mkdir(parents=True)
+    df = _table().to_pandas()
+    df = pd.concat([df, df.iloc[[0]]], ignore_index=True)  # duplicado
+    df["name"] = df["name"].fillna("D")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), str(batch / "data.parquet"))
+
+    remove_duplicates_batch("2025-09-27", str(tmp_path / "fact"))
+
+    index = build_batch_stats_index(str(batch))
+    assert index["rows"] == 4
@@ -0,0 +1,95 @@
+import contextvars
+import threading
+import time
+from contextlib import closing
+
+import pytest
+
+from dags.utils.prefetch import prefetch
+
+
+def test_prefetch_preserva_ordem_e_resultados():
+    assert list(prefetch(range(10), lambda x: x * x)) == [(x, x * x) for x in range(10)]
+    assert list(prefetch([], lambda x: x)) == []
+
+
+def test_prefetch_sobrepoe_leitura_e_processamento():
+    n = 6
+    started = [threading.Event() for _ in range(n)]
+
+    def load(x):
+        started[x].set()
+        return x
+
+    for x, _ in prefetch(range(n), load, depth=1):
+        # Ainda processando o item x: a carga do x + 1 já começou na thread de fundo
+        # (numa versão sequencial ela só começaria depois deste corpo, e o wait expiraria)
+        if x + 1 < n:
+            assert started[x + 1].wait(timeout=5), f"load({x + 1}) não sobrepôs o processamento de {x}"
+
+
+def test_prefetch_limita_lotes_carregados():
+    loaded, consumed = [], []
+    lock = threading.Lock()
+    peak = 0
+
+    def load(x):
+        nonlocal peak
+        with lock:
+            loaded.append(x)
+            peak = max(peak, len(loaded) - len(consumed))
+        return x
+
+    for x, _ in prefetch(range(20), load, depth=2):
+        time.sleep(0.01)
+        with lock:
+            consumed.append(x)
+
+    # item em processamento + fila (depth) + o recém-carregado aguardando vaga
+    assert peak <= 2 + 2
+
+
+def test_prefetch_relanca_erro_na_posicao():
+    def load(x):
+        if x == 3:
+            raise ValueError("lote 3 inválido")
+        return x
+
+    seen = []
+    with pytest.raises(ValueError, match="lote 3 inválido"):
+        for x, _ in prefetch(range(6), load):
+            seen.append(x)
+    assert seen == [0, 1, 2]
+
+
+def test_prefetch_erro_ao_iterar_items():
+    def items():
+        yield 1
+        raise RuntimeError("listagem falhou")
+
+    with pytest.raises(RuntimeError, match="listagem falhou"):
+        list(prefetch(items(), lambda x: x))
+
+
+def test_prefetch_fechado_cedo_para_a_thread():
+    calls = []
+
+    with closing(prefetch(range(1000), lambda x: calls.append(x) or x, depth=1)) as it:
+        assert next(it) == (0, 0)
+
+    n = len(calls)
+    time.sleep(0.3)
+    assert len(calls) == n <= 3
+    assert not [t for t in threading.enumerate() if t.name == "prefetch"]
+
+
+def test_prefetch_propaga_contexto_do_chamador():
+    var = contextvars.ContextVar("var", default="fora")
+    var.set("etapa")
+
+    assert [v for _, v in prefetch(range(2), lambda _: var.get())] == ["etapa", "etapa"]
+
+
+def test_prefetch_depth_invalido():
+    with pytest.raises(ValueError):
+        list(prefetch(range(2), lambda x: x, depth=0))
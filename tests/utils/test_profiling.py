@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from dags.utils import profiling
+from dags.utils.profiling import TaskProfiler, profiled, profiling_enabled
+
+
+def _trabalho(n: int) -> int:
+    data = [str(i) * 10 for i in range(n)]
+    return sum(len(x) for x in sorted(data))
+
+
+def test_desligado_por_padrao(env_clean):
+    assert profiling_enabled() is False
+
+
+@pytest.mark.parametrize("valor,esperado", [("1", True), ("true", True), ("ON", True), ("0", False), ("", False)])
+def test_ligado_por_env(env_clean, valor, esperado):
+    env_clean.setenv("OPENBREWERYDB_PROFILE", valor)
+    assert profiling_enabled() is esperado
+
+
+def test_task_profiler_grava_relatorios(tmp_path):
+    out = tmp_path / "prof"
+    with TaskProfiler(str(out), interval=0.001) as prof:
+        _trabalho(50_000)
+
+    assert {"profile.pstats", "profile.txt", "stacks.collapsed", "memory_top.txt", "summary.json"} <= set(
+        os.listdir(out)
+    )
+    summary = json.loads((out / "summary.json").read_text())
+    assert summary["status"] == "ok"
+    assert summary["wall_s"] > 0 and summary["peak_traced_bytes"] > 0
+    assert summary == prof.summary
+
+    # pilhas colapsadas: "frame;frame;... N" com a função perfilada presente
+    lines = (out / "stacks.collapsed").read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_trabalho (test_profiling.py" in line for line in lines)
+    assert "_trabalho" in (out / "profile.txt").read_text()
+    assert (out / "memory_top.txt").read_text().startswith("pico rastreado:")
+
+
+def test_profiled_desligado_nao_grava(env_clean, tmp_path):
+    env_clean.setenv("OPENBREWERYDB_PROFILE_DIR", str(tmp_path))
+
+    @profiled
+    def task_body(n):
+        return _trabalho(n)
+
+    assert task_body(10) == _trabalho(10)
+    assert os.listdir(tmp_path) == []
+
+
+def test_profiled_ligado_grava_e_repropaga_erro(env_clean, tmp_path):
+    env_clean.setenv("OPENBREWERYDB_PROFILE", "1")
+    env_clean.setenv("OPENBREWERYDB_PROFILE_DIR", str(tmp_path))
+
+    @profiled
+    def task_body():
+        _trabalho(1000)
+        raise RuntimeError("falhou")
+
+    with pytest.raises(RuntimeError, match="falhou"):
+        task_body()
+
+    task_dir = tmp_path / "task_id=task_body"
+    (run_dir,) = list(task_dir.iterdir())
+    summary = json.loads((run_dir / "summary.json").read_text())
+    assert summary["status"] == "error"
+
+
+def test_falha_no_relatorio_nao_derruba(tmp_path, monkeypatch):
+    def boom(*_, **__):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(profiling.os, "makedirs", boom)
+    with TaskProfiler(str(tmp_path / "x")):
+        _trabalho(10)
@@ -0,0 +1,61 @@
+# tests/utils/test_raw_reader.py
+import json
+import pytest
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.raw_reader import read_raw_frame, read_raw_table
+from dags.utils.schema import BREWERY_SCHEMA
+
+
+def _write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_read_raw_table_concatena_paginas(tmp_path, capsys):
+    f1 = _write_json(tmp_path / "p1.json", [{"id": "1", "name": "São Bento", "latitude": "1.5"}])
+    f2 = _write_json(tmp_path / "p2.json", [{"id": 2, "name": "B", "latitude": 2.0, "extra": True}])
+
+    table = read_raw_table([f1, f2])
+
+    assert set(table.column_names) <= set(BREWERY_SCHEMA.names)
+    assert "extra" not in table.column_names
+    assert table.num_rows == 2
+    # tipos mistos viram string (cast final fica com normalize_brewery_table)
+    assert table["id"].to_pylist() == ["1", "2"]
+    assert table["latitude"].to_pylist() == ["1.5", "2.0"]
+    assert table["name"].to_pylist() == ["São Bento", "B"]
+    assert "read_raw_table: files=2 rows=2" in capsys.readouterr().out
+
+
+def test_read_raw_table_json_invalido(tmp_path):
+    bad = tmp_path / "bad.json"
+    bad.write_text("<html>", encoding="utf-8")
+    with pytest.raises(AirflowFailException) as exc:
+        read_raw_table([str(bad)])
+    assert "Erro de leitura de JSON" in str(exc.value)
+
+
+def test_read_raw_table_tipos_homogeneos_caminho_rapido(tmp_path):
+    f1 = _write_json(tmp_path / "p1.json", [{"id": "1", "latitude": 1.5}, {"id": "2", "city": "X"}])
+
+    table = read_raw_table([f1])
+
+    assert table.num_rows == 2
+    assert table["latitude"].to_pylist() == [1.5, None]
+    assert table["city"].to_pylist() == [None, "X"]
+
+
+def test_read_raw_frame_mantem_todas_as_colunas(tmp_path):
+    f1 = _write_json(tmp_path / "p1.json", [{"id": "1", "name": "A"}])
+    f2 = _write_json(tmp_path / "p2.json", [{"id": "2", "name": "B", "extra": True}])
+
+    df = read_raw_frame([f1, f2])
+
+    assert list(df["name"]) == ["A", "B"]
+    assert "extra" in df.columns
+
+    bad = tmp_path / "bad.json"
+    bad.write_text("<html>", encoding="utf-8")
+    with pytest.raises(AirflowFailException, match="Erro de leitura de JSON"):
+        read_raw_frame([str(bad)])
@@ -8,6 +8,7 @@ import pyarrow.dataset as ds
 import pytest
 
 from airflow.exceptions import AirflowFailException
+from dags.utils.partition_stats import build_batch_stats_index, write_partition_stats
 from dags.utils.remove_duplicates_batch import remove_duplicates_batch  # ajuste se necessário
 
 
@@ -144,3 +145,62 @@ def test_sem_colunas_nao_chave_usa_drop_duplicates(tmp_path, capsys):
     assert f"Dedup batch={date}: antes=3 depois=2 removidos=1" in captured
     assert f"Deduplicação concluída para batch={date}; registros finais=2" in captured
 
+
+
+def test_com_manifesto_le_e_remove_so_os_arquivos_listados(tmp_path):
+    silver_base = tmp_path / "silver_fact"
+    date = "2025-09-27"
+    batch_dir = silver_base / f"batch={date}"
+    # country/state ficam só no caminho (partição Hive), como na silver real
+    cols = ["id", "name", "city", "brewery_type"]
+
+    run = batch_dir / "country=us" / "state=ca" / "part=0" / "run.parquet"
+    _write_parquet(run, pd.DataFrame([
+        ["1", "a", "sf", "micro"],
+        ["1", "a", "sf", "micro"],
+    ], columns=cols))
+    # arquivo de outro run (fora do manifesto): não é lido nem apagado
+    other = batch_dir / "country=br" / "state=sp" / "part=0" / "other.parquet"
+    _write_parquet(other, pd.DataFrame([["9", "z", "campinas", "micro"]], columns=cols))
+
+    written = remove_duplicates_batch(date, str(silver_base), files=[str(run)])
+
+    assert written and all(os.path.exists(f) for f in written)
+    assert not run.exists()
+    assert other.exists()
+    df = pd.concat(pq.read_table(f).to_pandas() for f in written)
+    assert df["id"].tolist() == ["1"]
+
+
+def test_com_manifesto_vazio_nao_faz_nada(tmp_path):
+    silver_base = tmp_path / "silver_fact"
+    date = "2025-09-27"
+    keep = silver_base / f"batch={date}" / "data.parquet"
+    _write_parquet(keep, pd.DataFrame({"id": ["1"]}))
+
+    assert remove_duplicates_batch(date, str(silver_base), files=[]) == []
+    assert keep.exists()
+
+
+def test_com_manifesto_part_esvaziada_nao_deixa_sidecar(tmp_path):
+    silver_base = tmp_path / "silver_fact"
+    date = "2025-09-27"
+    batch_dir = silver_base / f"batch={date}"
+    cols = ["id", "name", "city", "brewery_type"]
+    # O mesmo registro nas parts 0 e 1: a dedup mantém um só e esvazia uma das parts
+    files = []
+    for part in ("0", "1"):
+        f = batch_dir / "country=us" / "state=ca" / f"part={part}" / "run.parquet"
+        _write_parquet(f, pd.DataFrame([["1", "a", "sf", "micro"]], columns=cols))
+        files.append(str(f))
+    write_partition_stats(ds.dataset(str(batch_dir), format="parquet", partitioning="hive").to_table(),
+                          str(batch_dir))
+
+    remove_duplicates_batch(date, str(silver_base), files=files)
+    index = build_batch_stats_index(str(batch_dir))
+
+    df = _read_batch_df(batch_dir)
+    assert len(df) == 1
+    assert index["rows"] == 1
+    assert [p["part"] for p in index["partitions"]] == [str(df["part"].iloc[0])]
+    assert len(list(batch_dir.glob("country=us/state=ca/part=*"))) == 1
@@ -88,3 +88,8 @@ def test_save_api_data_erro_ao_salvar(tmp_path, monkeypatch, capsys):
         Path(base_path) / "year=2025" / "month=01" / "day=02" / "breweries_page_007.json"
     )
     assert f"Erro ao salvar página {page} em {expected_file}" in captured
+
+
+def test_save_api_data_no_dia_informado(tmp_path):
+    out_path = save_api_data([{"id": 1}], str(tmp_path), 3, day="2025-09-27")
+    assert Path(out_path) == tmp_path / "year=2025" / "month=09" / "day=27" / "breweries_page_003.json"
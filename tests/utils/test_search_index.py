@@ -0,0 +1,133 @@
+# tests/utils/test_search_index.py
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from airflow.exceptions import AirflowFailException
+from dags.utils.search_index import SearchIndex, build_search_index, tokenize
+
+
+def _write(silver, country, state, rows, part="0"):
+    d = silver / f"country={country}" / f"state={state}" / f"part={part}"
+    d.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame(rows, columns=["id", "name", "city"])
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), str(d / "data.parquet"))
+
+
+def _ids(hits):
+    return sorted(h["id"] for h in hits)
+
+
+def test_tokenize():
+    assert tokenize("Cervejaria São Jorge (SP)") == ["cervejaria", "sao", "jorge", "sp"]
+    assert tokenize(None) == []
+
+
+def test_busca_tokens_prefixo_e_substring(tmp_path):
+    silver = tmp_path / "silver"
+    _write(silver, "united_states", "california", [
+        ("1", "Stone Brewing", "escondido"),
+        ("2", "Stone Cellar Taproom", "san_diego"),
+        ("3", "Ballast Point", "san_diego"),
+    ])
+    _write(silver, "brazil", "sao_paulo", [("4", "Cervejaria Bamberg", "votorantim")], part="7")
+
+    report = build_search_index(str(silver), str(tmp_path / "search"))
+    assert report == {"rebuilt": 2, "reused": 0, "removed": 0, "docs": 4}
+
+    idx = SearchIndex(str(tmp_path / "search"))
+    assert isinstance(idx.segments[0].terms, np.memmap)
+
+    assert _ids(idx.search("stone")) == ["1", "2"]
+    assert _ids(idx.search("stone san diego")) == ["2"]
+    assert _ids(idx.search("ston", prefix=False)) == []
+    assert _ids(idx.search("ston")) == ["1", "2"]
+    assert _ids(idx.search("san")) == ["2", "3"]  # cidade também é indexada
+    assert _ids(idx.substring("llast poi")) == ["3"]
+    assert _ids(idx.search("stone", country="brazil")) == []
+
+    hit = idx.search("bamberg")[0]
+    assert hit == {"id": "4", "name": "Cervejaria Bamberg", "country": "brazil", "state": "sao_paulo",
+                   "batch": None, "part": "7"}
+    assert idx.search("", limit=5) == []
+    assert len(idx.search("stone", limit=1)) == 1
+
+
+def test_manifesto_limita_arquivos_indexados(tmp_path):
+    silver = tmp_path / "silver"
+    _write(silver, "united_states", "california", [("1", "Stone Brewing", "escondido")])
+    _write(silver, "united_states", "california", [("9", "Half Written", "escondido")], part="-1")
+    listed = silver / "country=united_states" / "state=california" / "part=0" / "data.parquet"
+
+    report = build_search_index(str(silver), str(tmp_path / "search"), files=[str(listed)])
+
+    assert report["docs"] == 1
+    assert _ids(SearchIndex(str(tmp_path / "search")).search("stone half")) == []
+    assert _ids(SearchIndex(str(tmp_path / "search")).search("stone")) == ["1"]
+    assert build_search_index(str(silver), str(tmp_path / "vazio"), files=[])["docs"] == 0
+
+
+def test_incremental_reindexa_so_particoes_alteradas(tmp_path):
+    silver, index_root = tmp_path / "silver", str(tmp_path / "search")
+    _write(silver, "us", "ca", [("1", "Stone", "sd")])
+    _write(silver, "us", "or", [("2", "Deschutes", "bend")])
+    build_search_index(str(silver), index_root)
+
+    report = build_search_index(str(silver), index_root)
+    assert (report["rebuilt"], report["reused"]) == (0, 2)
+
+    # muda us/or, remove us/ca
+    _write(silver, "us", "or", [("2", "Deschutes", "bend"), ("3", "Breakside", "portland")])
+    os.utime(silver / "country=us" / "state=or" / "part=0" / "data.parquet", (1, 1))
+    import shutil
+    shutil.rmtree(silver / "country=us" / "state=ca")
+
+    report = build_search_index(str(silver), index_root)
+    assert report == {"rebuilt": 1, "reused": 0, "removed": 1, "docs": 2}
+    idx = SearchIndex(index_root)
+    assert _ids(idx.search("breakside")) == ["3"]
+    assert idx.search("stone") == []
+
+
+def test_layout_diferente_reindexa_e_hit_traz_batch(tmp_path):
+    index_root = str(tmp_path / "search")
+    rows = [("1", "Stone", "sd"), ("2", "Ballast", "sd")]
+    first = tmp_path / "fact" / "batch=2025-09-27"
+    _write(first, "us", "ca", rows, part="0")
+    build_search_index(str(first), index_root)
+    old = SearchIndex(index_root)
+
+    # Mesmo conteúdo (mesmo fingerprint), mas as linhas agora estão em part=10
+    second = tmp_path / "fact" / "batch=2025-10-04"
+    _write(second, "us", "ca", rows, part="10")
+    report = build_search_index(str(second), index_root)
+
+    assert (report["rebuilt"], report["reused"]) == (1, 0)
+    hit = SearchIndex(index_root).search("stone")[0]
+    assert (hit["batch"], hit["part"]) == ("2025-10-04", "10")
+    # versão anterior continua no disco para quem abriu o manifesto antigo
+    assert old.search("stone")[0]["part"] == "0"
+    assert sorted(os.listdir(tmp_path / "search" / "country=us" / "state=ca")) == ["seg-1", "seg-2"]
+
+    # mesmo layout em outro batch: reaproveita e aponta para o batch novo
+    third = tmp_path / "fact" / "batch=2025-10-11"
+    _write(third, "us", "ca", rows, part="10")
+    # sem sidecars o fingerprint usa tamanho + mtime dos arquivos
+    f = "country=us/state=ca/part=10/data.parquet"
+    os.utime(third / f, ns=(0, (second / f).stat().st_mtime_ns))
+    report = build_search_index(str(third), index_root)
+    assert (report["rebuilt"], report["reused"]) == (0, 1)
+    assert SearchIndex(index_root).search("stone")[0]["batch"] == "2025-10-11"
+    assert sorted(os.listdir(tmp_path / "search" / "country=us" / "state=ca")) == ["seg-2"]
+
+
+def test_colunas_ausentes(tmp_path):
+    silver = tmp_path / "silver"
+    silver.mkdir()
+    pq.write_table(pa.table({"id": ["1"]}), str(silver / "d.parquet"))
+    with pytest.raises(AirflowFailException):
+        build_search_index(str(silver), str(tmp_path / "search"))
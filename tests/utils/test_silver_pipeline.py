@@ -8,7 +8,8 @@ import pyarrow.dataset as ds
 import pytest
 
 from airflow.exceptions import AirflowFailException
-from dags.utils.silver_pipeline import silver_pipeline
+from dags.utils.silver_pipeline import clear_batch, silver_pipeline, silver_pipeline_arrow
+from dags.utils.normalization import normalize_brewery_table
 
 
 # =======================
@@ -111,3 +112,110 @@ def test_silver_pipeline_sucesso(tmp_path, capsys):
     assert (fact / f"batch={batch}" / "country=US").exists()
     assert (fact / f"batch={batch}" / "country=BR").exists()
     # pelo menos um state dentro dos países acim
+
+
+def test_silver_pipeline_arrow_mesma_saida_que_pandas(tmp_path, capsys):
+    fact_pd = tmp_path / "fact_pandas"
+    fact_pa = tmp_path / "fact_arrow"
+    dim = tmp_path / "dims"
+    _make_dims(
+        dim,
+        country_map={"United States": "US", "Brasil": "BR"},
+        state_map={"California": "CA", "São Paulo": "SP"},
+        city_map={"San Francisco": "SF", "Campinas": "Campinas"},
+        brewery_type_map={"micro": "micro", "brewpub": "brewpub"},
+    )
+    rows = [
+        {"id": "1", "country": "United States", "state": "California", "city": "San Francisco",
+         "name": "A", "brewery_type": "micro", "phone": "111"},
+        {"id": "2", "country": "Brasil", "state": "São Paulo", "city": "Campinas",
+         "name": "B", "brewery_type": "brewpub", "phone": None},
+        # sem normalização de cidade -> descartado
+        {"id": "3", "country": "Brasil", "state": "São Paulo", "city": "Desconhecida",
+         "name": "C", "brewery_type": "micro", "phone": None},
+    ]
+
+    silver_pipeline(pd.DataFrame(rows), str(fact_pd), str(dim), "2025-09-27", part=0)
+    table = normalize_brewery_table(pa.Table.from_pylist(rows))
+    silver_pipeline_arrow(table, str(fact_pa), str(dim), "2025-09-27", part=0)
+
+    cols = ["id", "name", "country", "state", "city", "brewery_type", "phone"]
+    out_pd = _read_fact_df(fact_pd)[cols].sort_values("id", ignore_index=True)
+    out_pa = _read_fact_df(fact_pa)[cols].sort_values("id", ignore_index=True)
+    assert out_pa.astype(str).equals(out_pd.astype(str))
+    assert (fact_pa / "batch=2025-09-27" / "country=US" / "state=CA" / "part=0").exists()
+
+    logs = capsys.readouterr().out
+    assert "Valores sem normalização" in logs
+    assert "Registros removidos por NA: 3 -> 2" in logs
+
+
+def test_silver_pipeline_arrow_schema_canonico_entre_parts(tmp_path):
+    fact = tmp_path / "silver_fact"
+    dim = tmp_path / "dims"
+    _make_dims(dim, {"US": "us"}, {"CA": "ca"}, {"SF": "sf"}, {"micro": "micro"})
+    base = {"country": "US", "state": "CA", "city": "SF", "name": "A", "brewery_type": "micro"}
+
+    # part 0 com latitude numérica; part 1 com latitude textual/nula
+    t0 = normalize_brewery_table(pa.Table.from_pylist([{**base, "id": 1, "latitude": 1.5}]))
+    t1 = normalize_brewery_table(pa.Table.from_pylist([{**base, "id": "x", "latitude": "n/a"}]))
+    silver_pipeline_arrow(t0, str(fact), str(dim), "2025-09-27", part=0)
+    silver_pipeline_arrow(t1, str(fact), str(dim), "2025-09-27", part=1)
+
+    schemas = [pq.read_schema(p) for p in fact.rglob("*.parquet")]
+    assert len(schemas) == 2
+    assert schemas[0].equals(schemas[1])
+    assert schemas[0].field("latitude").type == pa.float64()
+
+
+def test_silver_pipeline_arrow_tabela_vazia_levanta(tmp_path):
+    with pytest.raises(AirflowFailException):
+        silver_pipeline_arrow(pa.table({"country": pa.array([], pa.string())}),
+                              str(tmp_path / "fact"), str(tmp_path / "dims"), "2025-09-27")
+
+
+def test_silver_pipeline_arrow_dimensao_ausente_levanta(tmp_path):
+    table = normalize_brewery_table(pa.Table.from_pylist([
+        {"id": "1", "country": "US", "state": "CA", "city": "SF", "name": "A", "brewery_type": "micro"}
+    ]))
+    with pytest.raises(AirflowFailException) as exc:
+        silver_pipeline_arrow(table, str(tmp_path / "fact"), str(tmp_path / "dims"), "2025-09-27")
+    assert "Erro ao ler dimensões" in str(exc.value)
+
+
+def _run_silver_day(fact: Path, dim: Path, gold: Path, day: str, chunks: list[list[dict]]) -> pd.DataFrame:
+    """Mesma sequência da DAG silver + gold: limpa, escreve, deduplica, compacta, agrega pelo manifesto."""
+    from dags.utils.compact_silver import compact_batch
+    from dags.utils.gold_pipeline import gold_pipeline
+    from dags.utils.manifest import build_manifest, manifest_files, refresh_manifest
+    from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+
+    clear_batch(str(fact), day)
+    written = []
+    for i, rows in enumerate(chunks):
+        written += silver_pipeline_arrow(normalize_brewery_table(pa.Table.from_pylist(rows)),
+                                         str(fact), str(dim), day, part=i)
+    written = remove_duplicates_batch(day, str(fact), files=written)
+    manifest = build_manifest("silver", day, str(fact), written)
+    compact_batch(str(fact / f"batch={day}"))
+    manifest = refresh_manifest(manifest, depth=3)
+    gold_pipeline(str(fact / f"batch={day}"), str(gold), files=manifest_files(manifest))
+    return pd.read_parquet(gold / "total.parquet")
+
+
+def test_rerun_do_mesmo_dia_nao_duplica_na_gold(tmp_path):
+    fact, dim, gold = tmp_path / "fact", tmp_path / "dims", tmp_path / "gold"
+    _make_dims(dim, {"US": "us", "BR": "br"}, {"CA": "ca", "SP": "sp"}, {"SF": "sf", "Campinas": "campinas"},
+               {"micro": "micro"})
+    rows = [
+        {"id": str(i), "country": c, "state": s, "city": city, "name": f"N{i}", "brewery_type": "micro"}
+        for i, (c, s, city) in enumerate([("US", "CA", "SF")] * 3 + [("BR", "SP", "Campinas")])
+    ]
+
+    first = _run_silver_day(fact, dim, gold, "2025-09-27", [rows[:2], rows[2:]])
+    # rerun com outro fatiamento: sem limpar, part=1 do run anterior sobraria no batch
+    second = _run_silver_day(fact, dim, gold, "2025-09-27", [rows])
+
+    assert first["count"].sum() == second["count"].sum() == 4
+    assert len(_read_fact_df(fact)) == 4
+    assert not clear_batch(str(fact), "2025-10-04")
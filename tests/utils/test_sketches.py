@@ -0,0 +1,144 @@
+# tests/utils/test_sketches.py
+import random
+
+import pytest
+import pandas as pd
+
+from dags.utils.sketches import (
+    DEFAULT_SKETCH_CONFIG, CountMinSketch, HyperLogLog, PartitionSketches, SketchConfig, SpaceSaving,
+    merge_sketches, read_sketches, write_sketches,
+)
+
+
+def test_config_deriva_dimensoes():
+    cfg = SketchConfig(hll_error=0.02, cms_epsilon=0.01, cms_delta=0.01)
+    assert cfg.hll_p == 12
+    assert cfg.cms_width == 272
+    assert cfg.cms_depth == 5
+
+
+def test_config_padrao_dimensionada_para_brewery_type():
+    # ~10 tipos por partição: 136 x 5 contadores em vez de 2719 x 5 (~108 KB)
+    assert (DEFAULT_SKETCH_CONFIG.cms_width, DEFAULT_SKETCH_CONFIG.cms_depth) == (136, 5)
+    sk = PartitionSketches()
+    types = ["micro", "nano", "regional", "brewpub", "large", "planning", "bar", "contract", "proprietor", "closed"]
+    sk.add_counts({("sf", t): i + 1 for i, t in enumerate(types)}, ["city", "brewery_type"])
+    assert sk.type_cms.table.nbytes < 8 * 1024
+    assert [sk.type_cms.estimate(t) for t in types] == list(range(1, 11))
+
+
+@pytest.mark.parametrize("n", [10, 1_000, 50_000])
+def test_hll_dentro_do_erro(n):
+    hll = HyperLogLog(p=12)
+    hll.add(f"city-{i}" for i in range(n))
+    hll.add(f"city-{i}" for i in range(n // 2))  # repetidos não contam
+    # 3 desvios padrão (1.04/sqrt(4096) ~ 1.6%)
+    assert abs(hll.estimate() - n) / n < 0.05
+
+
+def test_hll_merge_equivale_a_uniao():
+    a, b, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    a.add(range(0, 6000))
+    b.add(range(4000, 10000))
+    union.add(range(0, 10000))
+    assert (a.merge(b).registers == union.registers).all()
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(11))
+
+
+def test_count_min_nunca_subestima_e_respeita_epsilon():
+    rnd = random.Random(1)
+    items = [f"t{int(rnd.paretovariate(1.2))}" for _ in range(20_000)]
+    exact = pd.Series(items).value_counts()
+    cfg = SketchConfig(cms_epsilon=0.01, cms_delta=0.01)
+    cms = CountMinSketch(width=cfg.cms_width, depth=cfg.cms_depth)
+    cms.add(exact.index, exact.values)
+    total = exact.sum()
+
+    errors = [cms.estimate(item) - n for item, n in exact.items()]
+    assert min(errors) >= 0
+    # erro <= epsilon * total com probabilidade >= 1 - delta por item
+    violations = sum(e > cfg.cms_epsilon * total for e in errors)
+    assert violations <= max(1, 3 * cfg.cms_delta * len(exact))
+
+
+def test_space_saving_encontra_heavy_hitters_e_merge():
+    rnd = random.Random(2)
+    counts = {f"x{i}": rnd.randint(1, 5) for i in range(500)}
+    counts.update({"a": 900, "b": 700, "c": 500})
+    items = list(counts.items())
+    rnd.shuffle(items)
+
+    left, right = SpaceSaving(16), SpaceSaving(16)
+    left.add(*zip(*items[:250]))
+    right.add(*zip(*items[250:]))
+    top = [item for item, _, _ in left.merge(right).top(3)]
+    assert top == ["a", "b", "c"]
+
+
+def test_space_saving_merge_credita_piso_no_erro():
+    rnd = random.Random(5)
+    streams = [[(f"x{rnd.randint(0, 60)}", 1) for _ in range(2000)] for _ in range(2)]
+    exact: dict = {}
+    summaries = []
+    for stream in streams:
+        ss = SpaceSaving(8)
+        ss.add(*zip(*stream))
+        summaries.append(ss)
+        for item, n in stream:
+            exact[item] = exact.get(item, 0) + n
+    left, right = summaries
+    floors = (left.floor(), right.floor())
+    only_left = set(left.counters) - set(right.counters)
+
+    merged = left.merge(right)
+
+    assert len(merged.counters) <= 8
+    for item, (n, err) in merged.counters.items():
+        # limites do Space-Saving continuam válidos após o merge
+        assert n - err <= exact[item] <= n
+        if item in only_left:
+            assert err >= floors[1]
+    # resumo não cheio: itens ausentes têm contagem 0 (sem crédito de piso)
+    small = SpaceSaving(8)
+    small.add(["a"], [3])
+    assert small.floor() == 0
+    assert small.merge(SpaceSaving(8, {"b": [2, 0]})).counters == {"a": [3, 0], "b": [2, 0]}
+
+
+def test_partition_sketches_vs_exato_e_roundtrip(tmp_path):
+    rnd = random.Random(3)
+    types = ["micro"] * 50 + ["brewpub"] * 30 + ["regional"] * 15 + ["large"] * 5
+    rows = [
+        (country, state, f"{state}-c{rnd.randrange(400)}", rnd.choice(types))
+        for country, states in [("us", ["ca", "or", "tx"]), ("br", ["sp", "mg"])]
+        for state in states
+        for _ in range(3000)
+    ]
+    df = pd.DataFrame(rows, columns=["country", "state", "city", "brewery_type"])
+    keys = list(df.columns)
+    cfg = SketchConfig(hll_error=0.02, cms_epsilon=0.001, topk=8)
+
+    sketches = {}
+    for (country, state), part in df.groupby(["country", "state"]):
+        counts = part.groupby(keys).size().to_dict()
+        sk = PartitionSketches(cfg)
+        sk.add_counts(counts, keys)
+        sketches[(country, state)] = sk
+
+    path = write_sketches(sketches, str(tmp_path / "sketches.parquet"), cfg)
+    loaded = read_sketches(path)
+    assert set(loaded) == set(sketches)
+
+    # distintos de city por estado
+    exact_distinct = df.groupby(["country", "state"])["city"].nunique()
+    for key, exact in exact_distinct.items():
+        assert abs(loaded[key].distinct_cities() - exact) / exact < 0.05
+
+    # top brewery_type por país (merge entre estados)
+    for country in ("us", "br"):
+        exact_top = df[df["country"] == country]["brewery_type"].value_counts()
+        merged = merge_sketches([loaded], country=country)
+        got = merged.top_brewery_types(k=3)
+        assert [g["brewery_type"] for g in got] == list(exact_top.index[:3])
+        assert merged.rows == exact_top.sum()
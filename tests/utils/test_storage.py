@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import uuid
+
+import fsspec
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from dags.utils import storage
+from dags.utils.gold_pipeline import gold_pipeline
+from dags.utils.normalization import normalize_brewery_table, normalize_name
+from dags.utils.partition_stats import build_batch_stats_index
+from dags.utils.raw_reader import read_raw_table
+from dags.utils.remove_duplicates_batch import remove_duplicates_batch
+from dags.utils.save_api_data import save_api_data
+from dags.utils.silver_pipeline import silver_pipeline_arrow
+from dags.utils.update_dim import update_dim
+
+DAY = "2025-09-27"
+DIMS = ["country", "state", "city", "brewery_type"]
+
+
+@pytest.fixture
+def memory_lake():
+    """Lake em `memory://` (stand-in de object store: sem diretórios reais, acesso só via fsspec)."""
+    root = f"memory://lake-{uuid.uuid4().hex[:8]}"
+    yield root
+    fs, path = storage.filesystem(root)
+    if fs.exists(path):
+        fs.rm(path, recursive=True)
+
+
+@pytest.fixture(params=["local", "file", "memory"])
+def lake(request, tmp_path, memory_lake):
+    return {"local": str(tmp_path), "file": f"file://{tmp_path}", "memory": memory_lake}[request.param]
+
+
+def test_lake_path_usa_env(monkeypatch):
+    monkeypatch.delenv(storage.LAKE_ROOT_ENV, raising=False)
+    assert storage.lake_path("silver", "fact") == os.path.join("data_lake_mock", "silver", "fact")
+
+    monkeypatch.setenv(storage.LAKE_ROOT_ENV, "s3://bucket/lake/")
+    assert storage.lake_path("silver", "fact") == "s3://bucket/lake/silver/fact"
+
+    # file:// na raiz vira caminho local (APIs nativas, compactação e current disponíveis)
+    monkeypatch.setenv(storage.LAKE_ROOT_ENV, "file:///srv/lake")
+    assert storage.lake_path("silver", "fact") == os.path.join("/srv/lake", "silver", "fact")
+
+
+def test_file_url_segue_pelo_fsspec(tmp_path):
+    url = f"file://{tmp_path}"
+    assert not storage.is_local(url)
+
+    storage.write_bytes(storage.join(url, "a", "x.json"), b"{}")
+
+    assert (tmp_path / "a" / "x.json").read_bytes() == b"{}"
+    assert storage.find_files(url, "*.json") == [storage.join(url, "a", "x.json")]
+    assert not os.path.exists("file:")
+
+
+def test_write_read_e_find_files(lake):
+    for rel in ["a/x.json", "a/b/y.json", "a/b/z.parquet", "a/_manifests/m.json", "a/.tmp/t.json"]:
+        storage.write_bytes(storage.join(lake, rel), rel.encode())
+
+    found = storage.find_files(storage.join(lake, "a"), "*.json")
+
+    assert found == [storage.join(lake, "a/b/y.json"), storage.join(lake, "a/x.json")]
+    assert storage.read_bytes(found[0]) == b"a/b/y.json"
+    assert storage.exists(found[0]) and storage.isdir(storage.join(lake, "a"))
+    assert storage.glob(storage.join(lake, "a", "*.json")) == [storage.join(lake, "a/x.json")]
+    assert storage.file_info(found[0])[0] == len(b"a/b/y.json")
+    assert storage.find_files(storage.join(lake, "nada")) == []
+
+    storage.remove(found)
+    assert not storage.exists(found[0])
+
+
+def test_open_file_remoto_usa_read_ahead(monkeypatch, memory_lake):
+    path = storage.join(memory_lake, "f.bin")
+    storage.write_bytes(path, b"0123456789")
+    fs, _ = storage.filesystem(path)
+    calls = []
+
+    def spy_open(p, mode="rb", **kwargs):
+        calls.append((mode, kwargs))
+        return type(fs).open(fs, p, mode)
+
+    monkeypatch.setattr(fs, "open", spy_open)
+    with storage.open_file(path) as f:
+        assert f.read(4) == b"0123"
+    with storage.open_file(path, "wb") as f:
+        f.write(b"x")
+
+    assert calls[0] == ("rb", {"block_size": storage.READ_AHEAD_BYTES, "cache_type": "readahead"})
+    assert calls[1] == ("wb", {})
+
+
+def test_arrow_filesystem_local_usa_pyarrow_nativo(tmp_path, memory_lake):
+    assert storage.arrow_filesystem(str(tmp_path)) == (None, str(tmp_path))
+    filesystem, path = storage.arrow_filesystem(storage.join(memory_lake, "x"))
+    assert filesystem is not None and "://" not in path
+
+
+def test_map_concurrent_preserva_ordem_e_propaga_erro():
+    assert storage.map_concurrent(lambda x: x * 2, range(20), workers=4) == [x * 2 for x in range(20)]
+    assert storage.map_concurrent(str, []) == []
+
+    def boom(x):
+        if x == 3:
+            raise ValueError("falhou 3")
+        return x
+
+    with pytest.raises(ValueError, match="falhou 3"):
+        storage.map_concurrent(boom, range(6), workers=3)
+
+
+def test_map_files_paralelo_so_fora_do_disco_local(tmp_path, memory_lake):
+    main = threading.get_ident()
+
+    def thread_of(_):
+        return threading.get_ident()
+
+    local = [str(tmp_path / f"{i}.json") for i in range(4)]
+    remote = [storage.join(memory_lake, f"{i}.json") for i in range(4)]
+    assert set(storage.map_files(thread_of, local)) == {main}
+    assert main not in storage.map_files(thread_of, remote)
+    assert storage.map_files(thread_of, []) == []
+
+
+def _pages():
+    rows = [
+        {"id": f"id-{i}", "name": f"Brew {i % 5}", "brewery_type": ["micro", "Brewpub"][i % 2],
+         "city": ["São Paulo", "San Diego"][i % 2], "state": ["SP", "California"][i % 2],
+         "country": ["Brazil", "United States"][i % 2], "phone": None}
+        for i in range(12)
+    ]
+    return [rows[:6], rows[6:] + [dict(rows[0], phone="123")]]
+
+
+def _run_chain(root: str) -> tuple[list[str], str]:
+    raw, dim = storage.join(root, "raw"), storage.join(root, "silver", "dim")
+    fact, gold = storage.join(root, "silver", "fact"), storage.join(root, "gold", f"batch={DAY}")
+    files = [save_api_data(page, raw, i + 1, day=DAY) for i, page in enumerate(_pages())]
+
+    storage.makedirs(dim)
+    table = read_raw_table(files)
+    df = table.to_pandas()
+    for col in DIMS:
+        work = df[[col]].dropna()
+        work[f"{col}_norm"] = work[col].map(normalize_name)
+        update_dim(work, col, f"{col}_norm", storage.join(dim, f"dim_{col}.parquet"))
+
+    written = silver_pipeline_arrow(normalize_brewery_table(table), fact, dim, DAY, part=0)
+    written = remove_duplicates_batch(DAY, fact, files=written)
+    build_batch_stats_index(storage.join(fact, f"batch={DAY}"))
+    gold_pipeline(storage.join(fact, f"batch={DAY}"), gold, files=written)
+    return written, gold
+
+
+def test_cadeia_raw_silver_gold_em_object_store(tmp_path, memory_lake):
+    local_written, local_gold = _run_chain(str(tmp_path))
+    written, gold = _run_chain(memory_lake)
+
+    assert written and all(w.startswith("memory://") and storage.exists(w) for w in written)
+    assert sorted(os.path.relpath(w, memory_lake) for w in written) == \
+        sorted(os.path.relpath(w, str(tmp_path)) for w in local_written)
+    for name in ("total.parquet", "rollups.parquet", "sketches.parquet", "_partials/partials.parquet"):
+        assert storage.read_table(storage.join(gold, name)).equals(pq.read_table(os.path.join(local_gold, name))), name
+    with storage.open_file(storage.join(gold, "_partials", "manifest.json")) as f:
+        assert json.load(f)["keys"] == ["country", "state", "city", "brewery_type"]
+    # pandas resolve a URL pelo mesmo fsspec
+    pd.testing.assert_frame_equal(pd.read_parquet(storage.join(gold, "total.parquet")),
+                                  pd.read_parquet(os.path.join(local_gold, "total.parquet")))
+
+    # nada foi escrito no disco local com o lake em memory://
+    assert not os.path.exists("memory:")
+    assert fsspec.filesystem("memory").exists(storage.strip(storage.join(memory_lake, "raw")))